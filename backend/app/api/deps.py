@@ -1,12 +1,14 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 from jose import jwt, JWTError
-from app.core.database import get_db
+from app.core.database import SessionLocal, get_db
 from app.core.config import settings
 from app.core.security import decode_token
 from app.models.usuario import Usuario, RolUsuario
 from app.schemas.auth import TokenData
+from app.services.cache_reportes import invalidar_cache_reportes
 from typing import Optional
 
 # OAuth2 scheme
@@ -114,3 +116,26 @@ def get_admin_or_coordinador_or_cajero(current_user: Usuario = Depends(get_curre
             detail="Se requieren permisos de administrador, coordinador o cajero"
         )
     return current_user
+
+
+# Clave en Session.info de las sesiones cuyo commit invalida el cache de reportes
+_INVALIDA_REPORTES = "invalida_reportes"
+
+
+def invalidar_reportes_en_escritura(request: Request, db: Session = Depends(get_db)):
+    """
+    Dependencia de router: en escrituras (POST, PUT, PATCH, DELETE) marca la
+    sesión del request para que el commit invalide el cache de reportes.
+    La invalidación ocurre dentro de db.commit() (ver _invalidar_al_confirmar),
+    antes de enviar la respuesta: un cliente que vuelve a pedir los reportes
+    justo después de la escritura ya no recibe la versión cacheada. Una
+    escritura que termina en rollback no invalida nada.
+    """
+    if request.method not in ("GET", "HEAD", "OPTIONS"):
+        db.info[_INVALIDA_REPORTES] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidar_al_confirmar(session: Session) -> None:
+    if session.info.get(_INVALIDA_REPORTES):
+        invalidar_cache_reportes()
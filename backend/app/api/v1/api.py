@@ -1,19 +1,25 @@
-from fastapi import APIRouter
-from app.api.v1.endpoints import auth, estudiantes, caja, reportes, instructores, uploads, vehiculos, tarifas, usuarios, caja_fuerte
+from fastapi import APIRouter, Depends
+from app.api.v1.endpoints import auth, estudiantes, caja, reportes, instructores, uploads, vehiculos, tarifas, usuarios, caja_fuerte, metricas
+from app.api.deps import invalidar_reportes_en_escritura
 
 api_router = APIRouter()
 
+# Escrituras que cambian los números de reportes (vehículos e instructores:
+# fechas de SOAT, tecnomecánica y licencias de las alertas operativas)
+invalida_reportes = [Depends(invalidar_reportes_en_escritura)]
+
 # Incluir routers de endpoints
 api_router.include_router(auth.router, prefix="/auth", tags=["Autenticación"])
-api_router.include_router(estudiantes.router, prefix="/estudiantes", tags=["Estudiantes"])
-api_router.include_router(caja.router, prefix="/caja", tags=["Caja y Pagos"])
-api_router.include_router(caja_fuerte.router, prefix="/caja-fuerte", tags=["Caja Fuerte"])
+api_router.include_router(estudiantes.router, prefix="/estudiantes", tags=["Estudiantes"], dependencies=invalida_reportes)
+api_router.include_router(caja.router, prefix="/caja", tags=["Caja y Pagos"], dependencies=invalida_reportes)
+api_router.include_router(caja_fuerte.router, prefix="/caja-fuerte", tags=["Caja Fuerte"], dependencies=invalida_reportes)
 api_router.include_router(reportes.router, prefix="/reportes", tags=["Reportes"])
-api_router.include_router(instructores.router, prefix="/instructores", tags=["Instructores"])
+api_router.include_router(instructores.router, prefix="/instructores", tags=["Instructores"], dependencies=invalida_reportes)
 api_router.include_router(uploads.router, prefix="/uploads", tags=["Uploads"])
-api_router.include_router(vehiculos.router, prefix="/vehiculos", tags=["Vehículos"])
+api_router.include_router(vehiculos.router, prefix="/vehiculos", tags=["Vehículos"], dependencies=invalida_reportes)
 api_router.include_router(tarifas.router, prefix="/tarifas", tags=["Tarifas"])
 api_router.include_router(usuarios.router, prefix="/usuarios", tags=["Usuarios"])
+api_router.include_router(metricas.router, prefix="/metrics", tags=["Métricas"])
 
 # Aquí se agregarán más routers cuando se creen los módulos
 # api_router.include_router(registro.router, prefix="/registro", tags=["Registro"])
@@ -1,16 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, Header
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, func, select
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime, timedelta
 from decimal import Decimal
+import io
 import logging
+import zipfile
 from io import BytesIO
-import os
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
-from reportlab.lib import colors
 
 from app.core.database import get_db
 from app.core.config import settings
@@ -21,6 +19,27 @@ from app.models.caja import Caja, MovimientoCaja, EstadoCaja, TipoMovimiento, Co
 from app.models.caja_fuerte import CajaFuerte, MovimientoCajaFuerte
 from app.models.pago import Pago, DetallePago, MetodoPago, EstadoPago
 from app.models.estudiante import Estudiante, EstadoEstudiante
+from app.models.outbox import EventoOutbox
+from app.utils.fechas import filtro_fechas
+from app.utils.paginacion import codificar_cursor, filtro_despues_de_cursor
+from app.utils.pdf import formato_moneda
+from app.services.resumen_financiero import (
+    acumular_flujo, ORIGEN_PAGO, ORIGEN_MOVIMIENTO, CATEGORIA_PAGO_ESTUDIANTE
+)
+from app.services.snapshots_financieros import congelar_caja, congelar_meses_pendientes
+from app.services.contadores_caja import COLUMNAS_INGRESO_POR_METODO, COLUMNAS_EGRESO_POR_METODO, egresos_por_metodo
+from app.services.documentos_pdf import (
+    DocumentoPdf, obtener_documento, leer_documento, huella, etag_coincide,
+    DOCUMENTO_RECIBO_PAGO, DOCUMENTO_RECIBO_EGRESO, DOCUMENTO_RECIBO_MOVIMIENTO, DOCUMENTO_CIERRE_CAJA
+)
+from app.services.formatos_pdf import (
+    FORMATO_RECIBO_PAGO, FORMATO_RECIBO_EGRESO, FORMATO_RECIBO_MOVIMIENTO, FORMATO_CIERRE_CAJA
+)
+from app.services.render_pdf import renderizar_pdf
+from app.services.outbox import (
+    encolar_evento, notificar_outbox, manejador_outbox,
+    TIPO_RECIBO_PAGO, TIPO_FACTURA_FACTUS, TIPO_CIERRE_PDF
+)
 from app.schemas.caja import (
     CajaApertura, CajaCierre, CajaResumen, CajaDetalle,
     MovimientoCajaCreate, MovimientoCajaGeneralCreate, MovimientoCajaResponse, DetallePagoResponse,
@@ -141,7 +160,15 @@ def cerrar_caja(
 
     _registrar_ingresos_caja_fuerte_por_cierre(caja, efectivo_entregado_real, db, current_user)
 
+    # Congelar los totales de la caja y los meses que ya terminaron
+    congelar_caja(db, caja)
+    congelar_meses_pendientes(db)
+
+    # El PDF de cierre se genera y archiva una sola vez, fuera del request
+    encolar_evento(db, TIPO_CIERRE_PDF, caja.id)
+
     db.commit()
+    notificar_outbox()
     db.refresh(caja)
     
     return _build_caja_detalle(caja, db)
@@ -156,29 +183,32 @@ def _get_or_create_caja_fuerte(db: Session) -> CajaFuerte:
     return caja_fuerte
 
 
-def _apply_caja_fuerte_delta(caja_fuerte: CajaFuerte, metodo: MetodoPago, delta: Decimal):
-    if metodo == MetodoPago.EFECTIVO:
-        caja_fuerte.saldo_efectivo = Decimal(str(caja_fuerte.saldo_efectivo)) + delta
-    elif metodo == MetodoPago.NEQUI:
-        caja_fuerte.saldo_nequi = Decimal(str(caja_fuerte.saldo_nequi)) + delta
-    elif metodo == MetodoPago.NEQUI_ESCUELA:
-        caja_fuerte.saldo_nequi_escuela = Decimal(str(caja_fuerte.saldo_nequi_escuela)) + delta
-    elif metodo == MetodoPago.NEQUI_GERENCIA:
-        caja_fuerte.saldo_nequi_gerencia = Decimal(str(caja_fuerte.saldo_nequi_gerencia)) + delta
-    elif metodo == MetodoPago.DAVIPLATA:
-        caja_fuerte.saldo_daviplata = Decimal(str(caja_fuerte.saldo_daviplata)) + delta
-    elif metodo == MetodoPago.BRE_B:
-        caja_fuerte.saldo_bre_b = Decimal(str(caja_fuerte.saldo_bre_b)) + delta
-    elif metodo == MetodoPago.TRANSFERENCIA_BANCARIA:
-        caja_fuerte.saldo_transferencia_bancaria = Decimal(str(caja_fuerte.saldo_transferencia_bancaria)) + delta
-    elif metodo == MetodoPago.TARJETA_DEBITO:
-        caja_fuerte.saldo_tarjeta_debito = Decimal(str(caja_fuerte.saldo_tarjeta_debito)) + delta
-    elif metodo == MetodoPago.TARJETA_CREDITO:
-        caja_fuerte.saldo_tarjeta_credito = Decimal(str(caja_fuerte.saldo_tarjeta_credito)) + delta
-    elif metodo == MetodoPago.CREDISMART:
-        caja_fuerte.saldo_credismart = Decimal(str(caja_fuerte.saldo_credismart)) + delta
-    elif metodo == MetodoPago.SISTECREDITO:
-        caja_fuerte.saldo_sistecredito = Decimal(str(caja_fuerte.saldo_sistecredito)) + delta
+# Método -> columna de saldo en CajaFuerte
+_COLUMNA_SALDO_CAJA_FUERTE = {
+    MetodoPago.EFECTIVO: "saldo_efectivo",
+    MetodoPago.NEQUI: "saldo_nequi",
+    MetodoPago.NEQUI_ESCUELA: "saldo_nequi_escuela",
+    MetodoPago.NEQUI_GERENCIA: "saldo_nequi_gerencia",
+    MetodoPago.DAVIPLATA: "saldo_daviplata",
+    MetodoPago.BRE_B: "saldo_bre_b",
+    MetodoPago.TRANSFERENCIA_BANCARIA: "saldo_transferencia_bancaria",
+    MetodoPago.TARJETA_DEBITO: "saldo_tarjeta_debito",
+    MetodoPago.TARJETA_CREDITO: "saldo_tarjeta_credito",
+    MetodoPago.CREDISMART: "saldo_credismart",
+    MetodoPago.SISTECREDITO: "saldo_sistecredito",
+}
+
+
+def _apply_caja_fuerte_delta(db: Session, caja_fuerte: CajaFuerte, metodo: MetodoPago, delta: Decimal):
+    """Suma delta al saldo del método con un UPDATE atómico (sin perder escrituras concurrentes)"""
+    columna = _COLUMNA_SALDO_CAJA_FUERTE.get(metodo)
+    if not columna:
+        return
+    db.query(CajaFuerte).filter(CajaFuerte.id == caja_fuerte.id).update(
+        {getattr(CajaFuerte, columna): getattr(CajaFuerte, columna) + delta},
+        synchronize_session=False
+    )
+    db.expire(caja_fuerte, [columna])
 
 
 def _get_caja_fuerte_saldo_por_metodo(caja_fuerte: CajaFuerte, metodo: MetodoPago) -> Decimal:
@@ -230,7 +260,7 @@ def _registrar_ingresos_caja_fuerte_por_cierre(
             observaciones=f"Ingreso automático por cierre de caja #{caja.id}",
             usuario_id=current_user.id,
         )
-        _apply_caja_fuerte_delta(caja_fuerte, metodo, Decimal(str(monto)))
+        _apply_caja_fuerte_delta(db, caja_fuerte, metodo, Decimal(str(monto)))
         db.add(mov)
 
     registrar(MetodoPago.EFECTIVO, efectivo_entregado, f"CIERRE CAJA #{caja.id} - PRODUCCION EFECTIVO")
@@ -259,7 +289,7 @@ def _registrar_ingreso_caja_fuerte_por_pago(
         observaciones=f"Ingreso digital por pago estudiante #{pago.estudiante_id}",
         usuario_id=current_user.id,
     )
-    _apply_caja_fuerte_delta(caja_fuerte, metodo, Decimal(str(monto)))
+    _apply_caja_fuerte_delta(db, caja_fuerte, metodo, Decimal(str(monto)))
     db.add(mov)
 
 
@@ -274,6 +304,8 @@ def _registrar_egreso_caja_fuerte_por_movimiento(
         return
 
     caja_fuerte = _get_or_create_caja_fuerte(db)
+    # Bloquear la fila para validar el saldo (la caja ya está bloqueada: mismo orden que el cierre)
+    db.refresh(caja_fuerte, with_for_update=True)
     monto_decimal = Decimal(str(monto))
     saldo_disponible = _get_caja_fuerte_saldo_por_metodo(caja_fuerte, metodo)
     if monto_decimal > saldo_disponible:
@@ -297,7 +329,7 @@ def _registrar_egreso_caja_fuerte_por_movimiento(
         observaciones=f"Descuento digital por egreso de caja #{movimiento.id}",
         usuario_id=current_user.id,
     )
-    _apply_caja_fuerte_delta(caja_fuerte, metodo, -monto_decimal)
+    _apply_caja_fuerte_delta(db, caja_fuerte, metodo, -monto_decimal)
     db.add(mov)
 
 
@@ -384,33 +416,87 @@ def get_dashboard(
 
 @router.get("/historial", response_model=List[CajaResumen])
 def get_historial_cajas(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     fecha_inicio: Optional[datetime] = None,
     fecha_fin: Optional[datetime] = None,
+    cursor: Optional[str] = Query(None, description="Cursor de X-Siguiente-Cursor (reemplaza a skip)"),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_admin_or_coordinador_or_cajero)
 ):
-    """Obtener historial de cajas cerradas con filtros"""
+    """
+    Obtener historial de cajas cerradas con filtros.
+
+    La página se arma en una sola consulta: los conteos de pagos y egresos se
+    agregan solo para las cajas de la página y los usuarios se cargan con
+    joinedload. Si hay más cajas, el header X-Siguiente-Cursor trae el cursor
+    de la siguiente página (keyset sobre fecha_apertura, id).
+    """
     # Solo cajas cerradas
-    query = db.query(Caja).filter(
+    pagina = db.query(Caja.id).filter(
         Caja.estado == EstadoCaja.CERRADA
-    ).order_by(Caja.fecha_apertura.desc())
+    )
+    
+    if fecha_inicio or fecha_fin:
+        pagina = pagina.filter(*filtro_fechas(Caja.fecha_apertura, fecha_inicio, fecha_fin))
+    
+    if cursor:
+        try:
+            pagina = pagina.filter(filtro_despues_de_cursor(Caja.fecha_apertura, Caja.id, cursor))
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor de paginación inválido"
+            )
+    pagina = pagina.order_by(Caja.fecha_apertura.desc(), Caja.id.desc())
+    if not cursor:
+        pagina = pagina.offset(skip)
+    pagina = pagina.limit(limit + 1).cte("pagina")
     
-    if fecha_inicio:
-        query = query.filter(Caja.fecha_apertura >= fecha_inicio)
+    ids_pagina = select(pagina.c.id)
+    num_pagos = db.query(
+        Pago.caja_id.label("caja_id"),
+        func.count(Pago.id).label("cantidad")
+    ).filter(Pago.caja_id.in_(ids_pagina)).group_by(Pago.caja_id).subquery("num_pagos")
+    num_egresos = db.query(
+        MovimientoCaja.caja_id.label("caja_id"),
+        func.count(MovimientoCaja.id).label("cantidad")
+    ).filter(
+        MovimientoCaja.caja_id.in_(ids_pagina),
+        MovimientoCaja.tipo == TipoMovimiento.EGRESO
+    ).group_by(MovimientoCaja.caja_id).subquery("num_egresos")
     
-    if fecha_fin:
-        query = query.filter(Caja.fecha_apertura <= fecha_fin)
+    filas = db.query(
+        Caja,
+        func.coalesce(num_pagos.c.cantidad, 0),
+        func.coalesce(num_egresos.c.cantidad, 0)
+    ).join(
+        pagina, pagina.c.id == Caja.id
+    ).outerjoin(
+        num_pagos, num_pagos.c.caja_id == Caja.id
+    ).outerjoin(
+        num_egresos, num_egresos.c.caja_id == Caja.id
+    ).options(
+        joinedload(Caja.usuario_apertura),
+        joinedload(Caja.usuario_cierre)
+    ).order_by(Caja.fecha_apertura.desc(), Caja.id.desc()).all()
     
-    cajas = query.offset(skip).limit(limit).all()
+    if len(filas) > limit:
+        filas = filas[:limit]
+        ultima = filas[-1][0]
+        response.headers["X-Siguiente-Cursor"] = codificar_cursor(ultima.fecha_apertura, ultima.id)
     
-    return [_build_caja_resumen(c, db) for c in cajas]
+    return [
+        _build_caja_resumen(caja, db, num_pagos=pagos, num_egresos=egresos)
+        for caja, pagos, egresos in filas
+    ]
 
 
 @router.get("/pagos/{pago_id}/recibo-pdf")
 def get_recibo_pago_pdf(
     pago_id: int,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_admin_or_coordinador_or_cajero)
 ):
@@ -419,10 +505,7 @@ def get_recibo_pago_pdf(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Pago no encontrado")
 
     db.refresh(pago, ['detalles_pago', 'estudiante', 'usuario'])
-    estudiante = pago.estudiante
-
-    pdf_bytes = _build_pago_pdf_bytes(pago)
-    return _pdf_response(BytesIO(pdf_bytes), f"recibo_pago_{pago.id}.pdf")
+    return _pdf_documento_response(_documento_recibo_pago(pago), f"recibo_pago_{pago.id}.pdf", if_none_match)
 
 
 @router.get("/pagos/{pago_id}/recibo-termico", response_model=ReciboTermicoData)
@@ -442,6 +525,7 @@ def get_recibo_pago_termico(
 @router.get("/egresos/{egreso_id}/recibo-pdf")
 def get_recibo_egreso_pdf(
     egreso_id: int,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_admin_or_coordinador_or_cajero)
 ):
@@ -452,33 +536,7 @@ def get_recibo_egreso_pdf(
     if not egreso:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Egreso no encontrado")
 
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=letter)
-    _pdf_header(c, "Recibo de egreso")
-    y = 580
-    c.setLineWidth(0.5)
-    c.line(80, y, 532, y)
-    y -= 20
-
-    y = _pdf_section(c, "Datos del egreso", y)
-    y = _pdf_kv(c, "ID egreso", egreso.id, y)
-    y = _pdf_kv(c, "Fecha", egreso.fecha.strftime("%Y-%m-%d %H:%M"), y)
-    y = _pdf_kv(c, "Concepto", egreso.concepto, y)
-    y = _pdf_kv(c, "Categoria", egreso.categoria.value if egreso.categoria else "OTROS", y)
-    y = _pdf_kv(c, "Metodo", str(egreso.metodo_pago), y)
-    if egreso.numero_factura:
-        y = _pdf_kv(c, "Factura", egreso.numero_factura, y)
-
-    y -= 6
-    y = _pdf_section(c, "Monto", y)
-    y = _pdf_kv(c, "Total", _fmt_money(egreso.monto), y)
-
-    y -= 6
-    y = _pdf_section(c, "Atendido por", y)
-    y = _pdf_kv(c, "Usuario", egreso.usuario.nombre_completo if egreso.usuario else "N/A", y)
-    c.showPage()
-    c.save()
-    return _pdf_response(buffer, f"recibo_egreso_{egreso.id}.pdf")
+    return _pdf_documento_response(_documento_recibo_egreso(egreso), f"recibo_egreso_{egreso.id}.pdf", if_none_match)
 
 
 @router.get("/egresos/{egreso_id}/recibo-termico", response_model=ReciboTermicoData)
@@ -501,6 +559,7 @@ def get_recibo_egreso_termico(
 @router.get("/movimientos/{movimiento_id}/recibo-pdf")
 def get_recibo_movimiento_pdf(
     movimiento_id: int,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_admin_or_coordinador_or_cajero)
 ):
@@ -511,44 +570,11 @@ def get_recibo_movimiento_pdf(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Movimiento no encontrado")
 
     db.refresh(movimiento, ['detalles_pago', 'usuario'])
-
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=letter)
-    titulo = "Recibo de ingreso" if movimiento.tipo == TipoMovimiento.INGRESO else "Recibo de egreso"
-    _pdf_header(c, titulo)
-    y = 580
-    c.setLineWidth(0.5)
-    c.line(80, y, 532, y)
-    y -= 20
-
-    y = _pdf_section(c, "Datos del movimiento", y)
-    y = _pdf_kv(c, "ID", movimiento.id, y)
-    y = _pdf_kv(c, "Fecha", movimiento.fecha.strftime("%Y-%m-%d %H:%M"), y)
-    y = _pdf_kv(c, "Concepto", movimiento.concepto, y)
-    y = _pdf_kv(c, "Categoria", movimiento.categoria.value if movimiento.categoria else "OTROS", y)
-    if movimiento.tercero_nombre:
-        y = _pdf_kv(c, "Pagado por", movimiento.tercero_nombre, y)
-    if movimiento.tercero_documento:
-        y = _pdf_kv(c, "Documento", movimiento.tercero_documento, y)
-
-    y -= 6
-    y = _pdf_section(c, "Monto", y)
-    y = _pdf_kv(c, "Total", _fmt_money(movimiento.monto), y)
-
-    y -= 6
-    y = _pdf_section(c, "Metodo de pago", y)
-    if movimiento.es_pago_mixto:
-        for d in movimiento.detalles_pago:
-            y = _pdf_kv(c, str(d.metodo_pago), _fmt_money(d.monto), y)
-    else:
-        y = _pdf_kv(c, "Metodo", str(movimiento.metodo_pago), y)
-
-    y -= 6
-    y = _pdf_section(c, "Atendido por", y)
-    y = _pdf_kv(c, "Usuario", movimiento.usuario.nombre_completo if movimiento.usuario else "N/A", y)
-    c.showPage()
-    c.save()
-    return _pdf_response(buffer, f"recibo_movimiento_{movimiento.id}.pdf")
+    return _pdf_documento_response(
+        _documento_recibo_movimiento(movimiento),
+        f"recibo_movimiento_{movimiento.id}.pdf",
+        if_none_match
+    )
 
 
 @router.get("/movimientos/{movimiento_id}/recibo-termico", response_model=ReciboTermicoData)
@@ -570,6 +596,8 @@ def get_recibo_movimiento_termico(
 @router.get("/{caja_id}/cierre-pdf")
 def get_cierre_caja_pdf(
     caja_id: int,
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_admin_or_coordinador_or_cajero)
 ):
@@ -577,95 +605,47 @@ def get_cierre_caja_pdf(
     if not caja:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Caja no encontrada")
 
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=letter)
-    _pdf_header(c, "Cierre de caja")
-    y = 580
-    c.setLineWidth(0.5)
-    c.line(80, y, 532, y)
-    y -= 20
-
-    y = _pdf_section(c, "Datos de caja", y)
-    y = _pdf_kv(c, "ID caja", caja.id, y)
-    y = _pdf_kv(c, "Apertura", caja.fecha_apertura.strftime("%Y-%m-%d %H:%M"), y)
-    if caja.fecha_cierre:
-        y = _pdf_kv(c, "Cierre", caja.fecha_cierre.strftime("%Y-%m-%d %H:%M"), y)
-    y = _pdf_kv(c, "Usuario apertura", caja.usuario_apertura.nombre_completo, y)
-    y = _pdf_kv(c, "Usuario cierre", caja.usuario_cierre.nombre_completo if caja.usuario_cierre else "N/A", y)
-
-    y -= 6
-    y = _pdf_section(c, "Totales", y)
-    y = _pdf_kv(c, "Saldo inicial", _fmt_money(caja.saldo_inicial), y)
-    y = _pdf_kv(c, "Ingresos", _fmt_money(caja.total_ingresos), y)
-    y = _pdf_kv(c, "Egresos", _fmt_money(caja.total_egresos), y)
-    y = _pdf_kv(c, "Efectivo teorico", _fmt_money(caja.efectivo_teorico or 0), y)
-    y = _pdf_kv(c, "Efectivo fisico", _fmt_money(caja.efectivo_fisico or 0), y)
-    base_fija = Decimal(str(caja.saldo_inicial or 0))
-    produccion_teorica = Decimal(str(caja.total_ingresos_efectivo or 0)) - Decimal(str(caja.total_egresos_efectivo or 0))
-    if produccion_teorica < 0:
-        produccion_teorica = Decimal("0")
-    efectivo_entregado = (caja.efectivo_fisico or Decimal("0")) - base_fija
-    if efectivo_entregado < 0:
-        efectivo_entregado = Decimal("0")
-    y = _pdf_kv(c, "Base fija en caja", _fmt_money(base_fija), y)
-    y = _pdf_kv(c, "Produccion teorica (efectivo)", _fmt_money(produccion_teorica), y)
-    y = _pdf_kv(c, "Efectivo entregado (produccion)", _fmt_money(efectivo_entregado), y)
-    y = _pdf_kv(c, "Diferencia", _fmt_money(caja.diferencia or 0), y)
-
-    # Detalle de egresos
-    egresos = db.query(MovimientoCaja).filter(
-        MovimientoCaja.caja_id == caja.id,
-        MovimientoCaja.tipo == TipoMovimiento.EGRESO
-    ).order_by(MovimientoCaja.fecha.desc()).all()
+    filename = f"cierre_caja_{caja.id}.pdf"
+    if caja.estado != EstadoCaja.CERRADA:
+        # Caja abierta: cambia con cada movimiento, no se archiva
+        return _pdf_response(BytesIO(renderizar_pdf(FORMATO_CIERRE_CAJA, _datos_cierre_caja(caja, db))), filename)
+    return _pdf_documento_response(_documento_cierre_caja(caja, db), filename, if_none_match, accept_encoding)
 
-    y = _ensure_space(c, y, 180, "Cierre de caja (continuacion)")
-    y = _pdf_section(c, "Detalle de egresos", y)
-    table_headers = ["Fecha", "Concepto", "Categoria", "Metodo", "Monto"]
-    table_widths = [80, 170, 90, 70, 42]
-    y = _pdf_table_header(c, table_headers, table_widths, y)
-    for e in egresos:
-        if y < 90:
-            c.showPage()
-            _pdf_header(c, "Cierre de caja (continuacion)")
-            y = 580
-            c.setLineWidth(0.5)
-            c.line(80, y, 532, y)
-            y -= 20
-            y = _pdf_section(c, "Detalle de egresos", y)
-            y = _pdf_table_header(c, table_headers, table_widths, y)
-        concepto = (e.concepto or "")[:24]
-        categoria = e.categoria.value if e.categoria else "OTROS"
-        metodo = str(e.metodo_pago)
-        y = _pdf_table_row(
-            c,
-            [
-                e.fecha.strftime("%Y-%m-%d"),
-                concepto,
-                categoria,
-                metodo,
-                _fmt_money(e.monto)
-            ],
-            table_widths,
-            y
-        )
 
-    # Resumen por categoria (top 5)
-    resumen = db.query(
-        MovimientoCaja.categoria,
-        func.sum(MovimientoCaja.monto).label("total")
+@router.get("/cierres-pdf")
+def exportar_cierres_pdf(
+    anio: int = Query(..., ge=2000, le=2100),
+    mes: int = Query(..., ge=1, le=12),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_admin_or_coordinador_or_cajero)
+):
+    """
+    ZIP con los PDF de cierre de las cajas cerradas del mes (por fecha de
+    apertura). Los PDF salen del archivo; los que falten se generan antes de
+    empezar a enviar el ZIP, que se transmite archivo por archivo.
+    """
+    inicio = datetime(anio, mes, 1)
+    fin = datetime(anio + 1, 1, 1) if mes == 12 else datetime(anio, mes + 1, 1)
+    cajas = db.query(Caja).options(
+        joinedload(Caja.usuario_apertura),
+        joinedload(Caja.usuario_cierre)
     ).filter(
-        MovimientoCaja.caja_id == caja.id,
-        MovimientoCaja.tipo == TipoMovimiento.EGRESO
-    ).group_by(MovimientoCaja.categoria).order_by(func.sum(MovimientoCaja.monto).desc()).limit(5).all()
-
-    y = _ensure_space(c, y, 140, "Cierre de caja (continuacion)")
-    y = _pdf_section(c, "Resumen por categoria", y)
-    for r in resumen:
-        nombre = r.categoria.value if r.categoria else "OTROS"
-        y = _pdf_kv(c, nombre, _fmt_money(r.total or 0), y)
-    c.showPage()
-    c.save()
-    return _pdf_response(buffer, f"cierre_caja_{caja.id}.pdf")
+        Caja.estado == EstadoCaja.CERRADA,
+        Caja.fecha_apertura >= inicio,
+        Caja.fecha_apertura < fin
+    ).order_by(Caja.fecha_apertura, Caja.id).all()
+    if not cajas:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No hay cajas cerradas en el mes")
+
+    documentos = [
+        (f"cierre_caja_{caja.id}_{caja.fecha_apertura.strftime('%Y-%m-%d')}.pdf", _documento_cierre_caja(caja, db))
+        for caja in cajas
+    ]
+    return StreamingResponse(
+        _zip_documentos(documentos),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="cierres_caja_{anio}-{mes:02d}.zip"'}
+    )
 
 
 # ==================== PAGOS ENDPOINTS ====================
@@ -680,8 +660,9 @@ def registrar_pago(
     Registrar un pago de estudiante.
     El pago se asocia a la caja abierta y actualiza el saldo del estudiante.
     """
-    # Verificar que hay una caja abierta
-    caja_abierta = db.query(Caja).filter(Caja.estado == EstadoCaja.ABIERTA).with_for_update().first()
+    # Verificar que hay una caja abierta (sin bloquearla: los totales se suman
+    # con un UPDATE atómico, ver _aplicar_totales_caja)
+    caja_abierta = db.query(Caja).filter(Caja.estado == EstadoCaja.ABIERTA).first()
     
     if not caja_abierta:
         raise HTTPException(
@@ -754,8 +735,18 @@ def registrar_pago(
         
         db.add(nuevo_pago)
         db.flush()  # Para obtener el ID del pago
+
+        # Totales de caja según método (antes que la caja fuerte: mismo orden
+        # de bloqueo que cerrar_caja y registrar_egreso)
+        totales_caja: Dict[str, Decimal] = {}
+        if pago_data.es_pago_mixto:
+            for detalle in pago_data.detalles_pago:
+                _actualizar_caja_por_metodo(totales_caja, detalle.metodo_pago, detalle.monto)
+        else:
+            _actualizar_caja_por_metodo(totales_caja, pago_data.metodo_pago, pago_data.monto)
+        _aplicar_totales_caja(db, caja_abierta.id, totales_caja)
         
-        # Si es pago mixto, crear detalles y actualizar caja por cada método
+        # Si es pago mixto, crear detalles por cada método
         if pago_data.es_pago_mixto:
             for detalle in pago_data.detalles_pago:
                 # Crear detalle
@@ -767,8 +758,10 @@ def registrar_pago(
                 )
                 db.add(nuevo_detalle)
                 
-                # Actualizar totales de caja según método
-                _actualizar_caja_por_metodo(caja_abierta, detalle.metodo_pago, detalle.monto)
+                acumular_flujo(
+                    db, nuevo_pago.fecha_pago, TipoMovimiento.INGRESO, ORIGEN_PAGO,
+                    detalle.metodo_pago, detalle.monto, CATEGORIA_PAGO_ESTUDIANTE
+                )
                 _registrar_ingreso_caja_fuerte_por_pago(
                     nuevo_pago,
                     detalle.metodo_pago,
@@ -777,8 +770,11 @@ def registrar_pago(
                     current_user
                 )
         else:
-            # Pago simple - actualizar caja según método único
-            _actualizar_caja_por_metodo(caja_abierta, pago_data.metodo_pago, pago_data.monto)
+            # Pago simple
+            acumular_flujo(
+                db, nuevo_pago.fecha_pago, TipoMovimiento.INGRESO, ORIGEN_PAGO,
+                pago_data.metodo_pago, pago_data.monto, CATEGORIA_PAGO_ESTUDIANTE
+            )
             _registrar_ingreso_caja_fuerte_por_pago(
                 nuevo_pago,
                 pago_data.metodo_pago,
@@ -790,15 +786,20 @@ def registrar_pago(
         # Actualizar saldo del estudiante
         if estudiante.saldo_pendiente is not None:
             estudiante.saldo_pendiente = max(Decimal("0"), saldo_pendiente_actual - monto_pago)
+
+        # Recibo por correo y factura electrónica: en el mismo commit que el
+        # pago y ejecutados por el despachador del outbox, fuera del request
+        encolar_evento(db, TIPO_RECIBO_PAGO, nuevo_pago.id)
+        if _factus_habilitado():
+            nuevo_pago.factura_estado = "PENDIENTE"
+            encolar_evento(db, TIPO_FACTURA_FACTUS, nuevo_pago.id)
         
         db.commit()
+        notificar_outbox()
         db.refresh(nuevo_pago)
         
         # Cargar explícitamente las relaciones necesarias
         db.refresh(nuevo_pago, ['detalles_pago', 'estudiante', 'usuario'])
-
-        _enviar_recibo_pago(nuevo_pago)
-        _intentar_facturar_pago_factus(nuevo_pago, db)
         
         return _build_pago_response(nuevo_pago)
         
@@ -847,7 +848,8 @@ def registrar_egreso(
     """
     Registrar un egreso (gasto) en la caja abierta
     """
-    # Verificar que hay una caja abierta
+    # Verificar que hay una caja abierta. Se bloquea porque el egreso valida
+    # el saldo disponible por método; los pagos no la bloquean.
     caja_abierta = db.query(Caja).filter(Caja.estado == EstadoCaja.ABIERTA).with_for_update().first()
     
     if not caja_abierta:
@@ -882,7 +884,7 @@ def registrar_egreso(
                 montos_por_metodo[metodo_simple] = Decimal(str(egreso_data.monto))
 
         for metodo, monto_solicitado in montos_por_metodo.items():
-            saldo_disponible = _saldo_disponible_caja_por_metodo(caja_abierta, metodo, db)
+            saldo_disponible = _saldo_disponible_caja_por_metodo(caja_abierta, metodo)
             if monto_solicitado > saldo_disponible:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -911,7 +913,8 @@ def registrar_egreso(
         
         db.add(nuevo_egreso)
         db.flush()
-        
+
+        totales_caja: Dict[str, Decimal] = {}
         if egreso_data.es_pago_mixto:
             for d in (egreso_data.detalles_pago or []):
                 db.add(DetallePagoMovimientoCaja(
@@ -920,7 +923,11 @@ def registrar_egreso(
                     monto=d.monto,
                     referencia=d.referencia
                 ))
-                _actualizar_egresos_caja_por_metodo(caja_abierta, d.metodo_pago, d.monto)
+                _actualizar_egresos_caja_por_metodo(totales_caja, d.metodo_pago, d.monto)
+                acumular_flujo(
+                    db, nuevo_egreso.fecha, TipoMovimiento.EGRESO, ORIGEN_MOVIMIENTO,
+                    d.metodo_pago, d.monto, egreso_data.categoria
+                )
                 _registrar_egreso_caja_fuerte_por_movimiento(
                     nuevo_egreso,
                     d.metodo_pago,
@@ -929,7 +936,11 @@ def registrar_egreso(
                     current_user
                 )
         else:
-            _actualizar_egresos_caja_por_metodo(caja_abierta, egreso_data.metodo_pago, egreso_data.monto)
+            _actualizar_egresos_caja_por_metodo(totales_caja, egreso_data.metodo_pago, egreso_data.monto)
+            acumular_flujo(
+                db, nuevo_egreso.fecha, TipoMovimiento.EGRESO, ORIGEN_MOVIMIENTO,
+                egreso_data.metodo_pago, egreso_data.monto, egreso_data.categoria
+            )
             _registrar_egreso_caja_fuerte_por_movimiento(
                 nuevo_egreso,
                 egreso_data.metodo_pago,
@@ -937,6 +948,7 @@ def registrar_egreso(
                 db,
                 current_user
             )
+        _aplicar_totales_caja(db, caja_abierta.id, totales_caja)
         
         db.commit()
         db.refresh(nuevo_egreso)
@@ -970,7 +982,7 @@ def registrar_movimiento(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Solo se permiten ingresos en este módulo"
         )
-    caja_abierta = db.query(Caja).filter(Caja.estado == EstadoCaja.ABIERTA).with_for_update().first()
+    caja_abierta = db.query(Caja).filter(Caja.estado == EstadoCaja.ABIERTA).first()
     if not caja_abierta:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -995,6 +1007,19 @@ def registrar_movimiento(
         )
         db.add(nuevo_mov)
 
+        # Totales de caja primero: mismo orden de bloqueo que registrar_pago
+        if movimiento_data.tipo == TipoMovimiento.INGRESO:
+            actualizar_totales = _actualizar_caja_por_metodo
+        else:
+            actualizar_totales = _actualizar_egresos_caja_por_metodo
+        totales_caja: Dict[str, Decimal] = {}
+        if movimiento_data.es_pago_mixto:
+            for d in (movimiento_data.detalles_pago or []):
+                actualizar_totales(totales_caja, d.metodo_pago, d.monto)
+        else:
+            actualizar_totales(totales_caja, movimiento_data.metodo_pago, movimiento_data.monto)
+        _aplicar_totales_caja(db, caja_abierta.id, totales_caja)
+
         if movimiento_data.es_pago_mixto:
             for d in (movimiento_data.detalles_pago or []):
                 db.add(DetallePagoMovimientoCaja(
@@ -1003,21 +1028,24 @@ def registrar_movimiento(
                     monto=d.monto,
                     referencia=d.referencia
                 ))
-                if movimiento_data.tipo == TipoMovimiento.INGRESO:
-                    _actualizar_caja_por_metodo(caja_abierta, d.metodo_pago, d.monto)
-                else:
-                    _actualizar_egresos_caja_por_metodo(caja_abierta, d.metodo_pago, d.monto)
+                acumular_flujo(
+                    db, nuevo_mov.fecha, movimiento_data.tipo, ORIGEN_MOVIMIENTO,
+                    d.metodo_pago, d.monto, movimiento_data.categoria
+                )
         else:
-            if movimiento_data.tipo == TipoMovimiento.INGRESO:
-                _actualizar_caja_por_metodo(caja_abierta, movimiento_data.metodo_pago, movimiento_data.monto)
-            else:
-                _actualizar_egresos_caja_por_metodo(caja_abierta, movimiento_data.metodo_pago, movimiento_data.monto)
+            acumular_flujo(
+                db, nuevo_mov.fecha, movimiento_data.tipo, ORIGEN_MOVIMIENTO,
+                movimiento_data.metodo_pago, movimiento_data.monto, movimiento_data.categoria
+            )
 
         db.commit()
         db.refresh(nuevo_mov)
         db.refresh(nuevo_mov, ['detalles_pago', 'usuario'])
 
         return _build_movimiento_response(nuevo_mov)
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         logger.exception("Error al registrar movimiento")
@@ -1029,57 +1057,43 @@ def registrar_movimiento(
 
 # ==================== HELPER FUNCTIONS ====================
 
-def _actualizar_caja_por_metodo(caja: Caja, metodo: MetodoPago, monto: Decimal) -> None:
-    """Actualizar totales de caja según método de pago"""
-    if metodo == MetodoPago.EFECTIVO:
-        caja.total_ingresos_efectivo += monto
-    # Transferencias - cada una por separado
-    elif metodo == MetodoPago.NEQUI:
-        caja.total_nequi += monto
-        caja.total_ingresos_transferencia += monto  # Legacy
-    elif metodo == MetodoPago.NEQUI_ESCUELA:
-        caja.total_nequi_escuela += monto
-        caja.total_ingresos_transferencia += monto  # Legacy
-    elif metodo == MetodoPago.NEQUI_GERENCIA:
-        caja.total_nequi_gerencia += monto
-        caja.total_ingresos_transferencia += monto  # Legacy
-    elif metodo == MetodoPago.DAVIPLATA:
-        caja.total_daviplata += monto
-        caja.total_ingresos_transferencia += monto  # Legacy
-    elif metodo == MetodoPago.BRE_B:
-        caja.total_bre_b += monto
-        caja.total_ingresos_transferencia += monto  # Legacy
-    elif metodo == MetodoPago.TRANSFERENCIA_BANCARIA:
-        caja.total_transferencia_bancaria += monto
-        caja.total_ingresos_transferencia += monto  # Legacy
-    # Tarjetas - cada una por separado
-    elif metodo == MetodoPago.TARJETA_DEBITO:
-        caja.total_tarjeta_debito += monto
-        caja.total_ingresos_tarjeta += monto  # Legacy
-    elif metodo == MetodoPago.TARJETA_CREDITO:
-        caja.total_tarjeta_credito += monto
-        caja.total_ingresos_tarjeta += monto  # Legacy
-    # Créditos - se trackean pero NO entran a caja (plata diferida de financieras)
-    elif metodo == MetodoPago.CREDISMART:
-        caja.total_credismart += monto
-    elif metodo == MetodoPago.SISTECREDITO:
-        caja.total_sistecredito += monto
-
-
-def _actualizar_egresos_caja_por_metodo(caja: Caja, metodo: MetodoPago, monto: Decimal) -> None:
-    if metodo == MetodoPago.EFECTIVO:
-        caja.total_egresos_efectivo += monto
-    elif metodo in [
-        MetodoPago.NEQUI,
-        MetodoPago.NEQUI_ESCUELA,
-        MetodoPago.NEQUI_GERENCIA,
-        MetodoPago.DAVIPLATA,
-        MetodoPago.BRE_B,
-        MetodoPago.TRANSFERENCIA_BANCARIA
-    ]:
-        caja.total_egresos_transferencia += monto
-    elif metodo in [MetodoPago.TARJETA_DEBITO, MetodoPago.TARJETA_CREDITO]:
-        caja.total_egresos_tarjeta += monto
+def _sumar_total(totales: Dict[str, Decimal], columna: str, monto: Decimal) -> None:
+    totales[columna] = totales.get(columna, Decimal("0")) + Decimal(str(monto))
+
+
+def _actualizar_caja_por_metodo(totales: Dict[str, Decimal], metodo: MetodoPago, monto: Decimal) -> None:
+    """Acumular en `totales` (columna -> monto) el ingreso según método de pago"""
+    for columna in COLUMNAS_INGRESO_POR_METODO.get(metodo, ()):
+        _sumar_total(totales, columna, monto)
+
+
+def _actualizar_egresos_caja_por_metodo(totales: Dict[str, Decimal], metodo: MetodoPago, monto: Decimal) -> None:
+    """Acumular en `totales` (columna -> monto) el egreso según método de pago"""
+    for columna in COLUMNAS_EGRESO_POR_METODO.get(metodo, ()):
+        _sumar_total(totales, columna, monto)
+
+
+def _aplicar_totales_caja(db: Session, caja_id: int, totales: Dict[str, Decimal]) -> None:
+    """
+    Suma los totales a la caja con un UPDATE atómico (col = col + :monto) en
+    lugar de leer-modificar-escribir con la fila bloqueada todo el request:
+    los pagos concurrentes solo se esperan entre este UPDATE y el commit.
+    Si la caja se cerró mientras tanto no actualiza nada y lanza 400.
+    """
+    if not totales:
+        return
+    actualizadas = db.query(Caja).filter(
+        Caja.id == caja_id,
+        Caja.estado == EstadoCaja.ABIERTA
+    ).update(
+        {getattr(Caja, columna): getattr(Caja, columna) + monto for columna, monto in totales.items()},
+        synchronize_session=False
+    )
+    if not actualizadas:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La caja fue cerrada. Abra una nueva caja para registrar el movimiento."
+        )
 
 
 def _ingresos_por_metodo_en_caja(caja: Caja, metodo: MetodoPago) -> Decimal:
@@ -1108,42 +1122,27 @@ def _ingresos_por_metodo_en_caja(caja: Caja, metodo: MetodoPago) -> Decimal:
     return Decimal("0")
 
 
-def _egresos_por_metodo_en_caja(caja_id: int, metodo: MetodoPago, db: Session) -> Decimal:
-    egreso_simple = db.query(func.coalesce(func.sum(MovimientoCaja.monto), 0)).filter(
-        MovimientoCaja.caja_id == caja_id,
-        MovimientoCaja.tipo == TipoMovimiento.EGRESO,
-        MovimientoCaja.es_pago_mixto == 0,
-        MovimientoCaja.metodo_pago == metodo
-    ).scalar() or Decimal("0")
-
-    egreso_mixto = db.query(func.coalesce(func.sum(DetallePagoMovimientoCaja.monto), 0)).join(
-        MovimientoCaja,
-        DetallePagoMovimientoCaja.movimiento_id == MovimientoCaja.id
-    ).filter(
-        MovimientoCaja.caja_id == caja_id,
-        MovimientoCaja.tipo == TipoMovimiento.EGRESO,
-        MovimientoCaja.es_pago_mixto == 1,
-        DetallePagoMovimientoCaja.metodo_pago == metodo
-    ).scalar() or Decimal("0")
-
-    return Decimal(str(egreso_simple)) + Decimal(str(egreso_mixto))
-
-
-def _saldo_disponible_caja_por_metodo(caja: Caja, metodo: MetodoPago, db: Session) -> Decimal:
-    ingresos = _ingresos_por_metodo_en_caja(caja, metodo)
-    egresos = _egresos_por_metodo_en_caja(caja.id, metodo, db)
-    saldo = ingresos - egresos
+def _saldo_disponible_caja_por_metodo(caja: Caja, metodo: MetodoPago) -> Decimal:
+    """Saldo por método desde los totales de la caja (sin consultar movimientos)"""
+    saldo = _ingresos_por_metodo_en_caja(caja, metodo) - egresos_por_metodo(caja, metodo)
     return saldo if saldo > 0 else Decimal("0")
 
-def _build_caja_resumen(caja: Caja, db: Session) -> CajaResumen:
-    """Construir resumen de caja"""
-    num_pagos = db.query(Pago).filter(Pago.caja_id == caja.id).count()
-    num_egresos = db.query(MovimientoCaja).filter(
-        and_(
-            MovimientoCaja.caja_id == caja.id,
-            MovimientoCaja.tipo == TipoMovimiento.EGRESO
-        )
-    ).count()
+def _build_caja_resumen(
+    caja: Caja,
+    db: Session,
+    num_pagos: Optional[int] = None,
+    num_egresos: Optional[int] = None
+) -> CajaResumen:
+    """Construir resumen de caja (los conteos se consultan si no vienen dados)"""
+    if num_pagos is None:
+        num_pagos = db.query(Pago).filter(Pago.caja_id == caja.id).count()
+    if num_egresos is None:
+        num_egresos = db.query(MovimientoCaja).filter(
+            and_(
+                MovimientoCaja.caja_id == caja.id,
+                MovimientoCaja.tipo == TipoMovimiento.EGRESO
+            )
+        ).count()
     
     return CajaResumen(
         id=caja.id,
@@ -1184,52 +1183,152 @@ def _build_caja_resumen(caja: Caja, db: Session) -> CajaResumen:
     )
 
 
-def _build_pago_pdf_bytes(pago: Pago) -> bytes:
+def _texto_decimal(valor) -> Optional[str]:
+    return str(valor) if valor is not None else None
+
+
+def _datos_recibo_pago(pago: Pago) -> dict:
     estudiante = pago.estudiante
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=letter)
-    _pdf_header(c, "Recibo de pago")
-    y = 580
-    c.setLineWidth(0.5)
-    c.line(80, y, 532, y)
-    y -= 20
-
-    y = _pdf_section(c, "Datos del pago", y)
-    y = _pdf_kv(c, "ID pago", pago.id, y)
-    y = _pdf_kv(c, "Fecha", pago.fecha_pago.strftime("%Y-%m-%d %H:%M"), y)
-    y = _pdf_kv(c, "Concepto", pago.concepto, y)
-    y = _pdf_kv(c, "Monto", _fmt_money(pago.monto), y)
-    metodo = pago.metodo_pago.value if pago.metodo_pago else "MIXTO"
-    y = _pdf_kv(c, "Metodo", metodo, y)
-    if pago.referencia_pago:
-        y = _pdf_kv(c, "Referencia", pago.referencia_pago, y)
-
-    y -= 6
-    y = _pdf_section(c, "Estudiante", y)
-    y = _pdf_kv(c, "Nombre", estudiante.usuario.nombre_completo if estudiante and estudiante.usuario else "N/A", y)
-    y = _pdf_kv(c, "Cedula", estudiante.usuario.cedula if estudiante and estudiante.usuario else "N/A", y)
-    y = _pdf_kv(c, "Matricula", estudiante.matricula_numero if estudiante else "N/A", y)
-    if estudiante and estudiante.saldo_pendiente and estudiante.saldo_pendiente > 0:
-        y = _pdf_kv(c, "Saldo pendiente", _fmt_money(estudiante.saldo_pendiente), y)
+    usuario_estudiante = estudiante.usuario if estudiante else None
+    return {
+        "id": pago.id,
+        "fecha": pago.fecha_pago.isoformat(),
+        "concepto": pago.concepto,
+        "monto": str(pago.monto),
+        "metodo": pago.metodo_pago.value if pago.metodo_pago else None,
+        "referencia": pago.referencia_pago,
+        "estudiante": {
+            "nombre": usuario_estudiante.nombre_completo if usuario_estudiante else None,
+            "cedula": usuario_estudiante.cedula if usuario_estudiante else None,
+            "matricula": estudiante.matricula_numero if estudiante else None,
+            "saldo_pendiente": _texto_decimal(estudiante.saldo_pendiente) if estudiante else None,
+        },
+        "detalles": [
+            {"metodo": d.metodo_pago.value, "monto": str(d.monto), "referencia": d.referencia}
+            for d in pago.detalles_pago
+        ] if pago.es_pago_mixto else [],
+        "usuario": pago.usuario.nombre_completo if pago.usuario else None,
+    }
+
+
+def _datos_recibo_egreso(egreso: MovimientoCaja) -> dict:
+    return {
+        "id": egreso.id,
+        "fecha": egreso.fecha.isoformat(),
+        "concepto": egreso.concepto,
+        "categoria": egreso.categoria.value if egreso.categoria else None,
+        "metodo": str(egreso.metodo_pago),
+        "factura": egreso.numero_factura,
+        "monto": str(egreso.monto),
+        "usuario": egreso.usuario.nombre_completo if egreso.usuario else None,
+    }
+
+
+def _datos_recibo_movimiento(movimiento: MovimientoCaja) -> dict:
+    return {
+        "id": movimiento.id,
+        "ingreso": movimiento.tipo == TipoMovimiento.INGRESO,
+        "fecha": movimiento.fecha.isoformat(),
+        "concepto": movimiento.concepto,
+        "categoria": movimiento.categoria.value if movimiento.categoria else None,
+        "tercero_nombre": movimiento.tercero_nombre,
+        "tercero_documento": movimiento.tercero_documento,
+        "monto": str(movimiento.monto),
+        "metodo": str(movimiento.metodo_pago),
+        "detalles": [
+            {"metodo": str(d.metodo_pago), "monto": str(d.monto)}
+            for d in movimiento.detalles_pago
+        ] if movimiento.es_pago_mixto else None,
+        "usuario": movimiento.usuario.nombre_completo if movimiento.usuario else None,
+    }
 
-    if pago.es_pago_mixto and pago.detalles_pago:
-        y -= 6
-        y = _pdf_section(c, "Detalle pago mixto", y)
-        for d in pago.detalles_pago:
-            referencia = f" ({d.referencia})" if d.referencia else ""
-            y = _pdf_kv(
-                c,
-                d.metodo_pago.value,
-                f"{_fmt_money(d.monto)}{referencia}",
-                y
-            )
 
-    y -= 6
-    y = _pdf_section(c, "Atendido por", y)
-    y = _pdf_kv(c, "Usuario", pago.usuario.nombre_completo if pago.usuario else "N/A", y)
-    c.showPage()
-    c.save()
-    return buffer.getvalue()
+def _datos_cierre_caja(caja: Caja, db: Session) -> dict:
+    egresos = db.query(MovimientoCaja).filter(
+        MovimientoCaja.caja_id == caja.id,
+        MovimientoCaja.tipo == TipoMovimiento.EGRESO
+    ).order_by(MovimientoCaja.fecha.desc()).all()
+
+    # Resumen por categoria (top 5)
+    resumen = db.query(
+        MovimientoCaja.categoria,
+        func.sum(MovimientoCaja.monto).label("total")
+    ).filter(
+        MovimientoCaja.caja_id == caja.id,
+        MovimientoCaja.tipo == TipoMovimiento.EGRESO
+    ).group_by(MovimientoCaja.categoria).order_by(func.sum(MovimientoCaja.monto).desc()).limit(5).all()
+
+    return {
+        "id": caja.id,
+        "fecha_apertura": caja.fecha_apertura.isoformat(),
+        "fecha_cierre": caja.fecha_cierre.isoformat() if caja.fecha_cierre else None,
+        "usuario_apertura": caja.usuario_apertura.nombre_completo,
+        "usuario_cierre": caja.usuario_cierre.nombre_completo if caja.usuario_cierre else None,
+        "saldo_inicial": _texto_decimal(caja.saldo_inicial),
+        "total_ingresos": _texto_decimal(caja.total_ingresos),
+        "total_egresos": _texto_decimal(caja.total_egresos),
+        "total_ingresos_efectivo": _texto_decimal(caja.total_ingresos_efectivo),
+        "total_egresos_efectivo": _texto_decimal(caja.total_egresos_efectivo),
+        "efectivo_teorico": _texto_decimal(caja.efectivo_teorico),
+        "efectivo_fisico": _texto_decimal(caja.efectivo_fisico),
+        "diferencia": _texto_decimal(caja.diferencia),
+        "egresos": [
+            {
+                "fecha": e.fecha.isoformat(),
+                "concepto": e.concepto,
+                "categoria": e.categoria.value if e.categoria else None,
+                "metodo": str(e.metodo_pago),
+                "monto": str(e.monto),
+            }
+            for e in egresos
+        ],
+        "resumen_categorias": [
+            {"categoria": r.categoria.value if r.categoria else None, "total": _texto_decimal(r.total)}
+            for r in resumen
+        ],
+    }
+
+
+# Los documentos guardados se versionan con la huella de sus datos: si cambia
+# algo de lo que se imprime, el PDF se vuelve a generar
+
+def _documento_recibo_pago(pago: Pago) -> DocumentoPdf:
+    datos = _datos_recibo_pago(pago)
+    return obtener_documento(
+        DOCUMENTO_RECIBO_PAGO, pago.id, huella(datos), lambda: renderizar_pdf(FORMATO_RECIBO_PAGO, datos)
+    )
+
+
+def _documento_recibo_egreso(egreso: MovimientoCaja) -> DocumentoPdf:
+    datos = _datos_recibo_egreso(egreso)
+    return obtener_documento(
+        DOCUMENTO_RECIBO_EGRESO, egreso.id, huella(datos), lambda: renderizar_pdf(FORMATO_RECIBO_EGRESO, datos)
+    )
+
+
+def _documento_recibo_movimiento(movimiento: MovimientoCaja) -> DocumentoPdf:
+    datos = _datos_recibo_movimiento(movimiento)
+    return obtener_documento(
+        DOCUMENTO_RECIBO_MOVIMIENTO, movimiento.id, huella(datos),
+        lambda: renderizar_pdf(FORMATO_RECIBO_MOVIMIENTO, datos)
+    )
+
+
+def _documento_cierre_caja(caja: Caja, db: Session) -> DocumentoPdf:
+    """
+    PDF de cierre archivado (comprimido). Solo para cajas cerradas: la versión
+    sale de los campos de la caja, así servir un cierre ya archivado no
+    consulta los egresos.
+    """
+    version = huella(
+        caja.fecha_cierre, caja.usuario_cierre_id, caja.saldo_inicial, caja.total_ingresos,
+        caja.total_egresos, caja.efectivo_teorico, caja.efectivo_fisico, caja.diferencia
+    )
+    return obtener_documento(
+        DOCUMENTO_CIERRE_CAJA, caja.id, version,
+        lambda: renderizar_pdf(FORMATO_CIERRE_CAJA, _datos_cierre_caja(caja, db)),
+        comprimido=True
+    )
 
 
 def _enviar_recibo_pago(pago: Pago) -> None:
@@ -1238,7 +1337,7 @@ def _enviar_recibo_pago(pago: Pago) -> None:
 
     estudiante = pago.estudiante
     saldo = estudiante.saldo_pendiente or Decimal("0")
-    saldo_linea = f"Saldo pendiente: {_fmt_money(saldo)}" if saldo > 0 else "Saldo pendiente: $0"
+    saldo_linea = f"Saldo pendiente: {formato_moneda(saldo)}" if saldo > 0 else "Saldo pendiente: $0"
     referencia = pago.referencia_pago if pago.referencia_pago else "N/A"
     metodo = pago.metodo_pago.value if pago.metodo_pago else "MIXTO"
 
@@ -1250,7 +1349,7 @@ def _enviar_recibo_pago(pago: Pago) -> None:
         "Gracias por tu pago. Adjuntamos el recibo en PDF.\n\n"
         "Resumen del pago:\n"
         f"- Fecha: {pago.fecha_pago.strftime('%Y-%m-%d %H:%M')}\n"
-        f"- Monto: {_fmt_money(pago.monto)}\n"
+        f"- Monto: {formato_moneda(pago.monto)}\n"
         f"- Concepto: {pago.concepto}\n"
         f"- Metodo: {metodo}\n"
         f"- Referencia: {referencia}\n\n"
@@ -1263,7 +1362,7 @@ def _enviar_recibo_pago(pago: Pago) -> None:
         f"NIT {settings.HABEAS_NIT}\n"
     )
 
-    pdf_bytes = _build_pago_pdf_bytes(pago)
+    pdf_bytes = _documento_recibo_pago(pago).ruta.read_bytes()
     filename = f"recibo_pago_{pago.id}.pdf"
     enviado = send_email(
         estudiante.usuario.email,
@@ -1273,12 +1372,62 @@ def _enviar_recibo_pago(pago: Pago) -> None:
     )
     if not enviado:
         logger.warning("No se pudo enviar recibo de pago a %s", estudiante.usuario.email)
+        # Sin SMTP configurado no tiene sentido reintentar
+        if settings.SMTP_USER and settings.SMTP_PASSWORD:
+            raise RuntimeError(f"No se pudo enviar recibo de pago a {estudiante.usuario.email}")
+
+
+def _factus_habilitado() -> bool:
+    try:
+        from app.integrations.factus import is_factus_enabled
+    except Exception as exc:
+        logger.warning("Factus no disponible: %s", exc)
+        return False
+    return is_factus_enabled()
+
+
+def _cargar_pago_outbox(db: Session, pago_id: int) -> Optional[Pago]:
+    return db.query(Pago).options(
+        joinedload(Pago.detalles_pago),
+        joinedload(Pago.usuario),
+        joinedload(Pago.estudiante).joinedload(Estudiante.usuario)
+    ).filter(Pago.id == pago_id).first()
+
+
+@manejador_outbox(TIPO_RECIBO_PAGO)
+def _procesar_recibo_pago(db: Session, evento: EventoOutbox) -> None:
+    """Evento del outbox: enviar el recibo del pago por correo (falla -> reintento)."""
+    pago = _cargar_pago_outbox(db, evento.entidad_id)
+    if pago is not None:
+        _enviar_recibo_pago(pago)
+
+
+@manejador_outbox(TIPO_CIERRE_PDF)
+def _procesar_cierre_pdf(db: Session, evento: EventoOutbox) -> None:
+    """Evento del outbox: generar y archivar el PDF de cierre de la caja."""
+    caja = db.query(Caja).options(
+        joinedload(Caja.usuario_apertura),
+        joinedload(Caja.usuario_cierre)
+    ).filter(Caja.id == evento.entidad_id).first()
+    if caja is not None and caja.estado == EstadoCaja.CERRADA:
+        _documento_cierre_caja(caja, db)
+
+
+@manejador_outbox(TIPO_FACTURA_FACTUS)
+def _procesar_factura_factus(db: Session, evento: EventoOutbox) -> None:
+    """Evento del outbox: emitir la factura electrónica del pago (falla -> reintento)."""
+    pago = _cargar_pago_outbox(db, evento.entidad_id)
+    if pago is not None:
+        _intentar_facturar_pago_factus(pago, db)
 
 
 def _intentar_facturar_pago_factus(pago: Pago, db: Session) -> None:
-    """Emitir factura electrónica en Factus (sin bloquear el pago)."""
+    """
+    Emitir factura electrónica en Factus. Los errores quedan en el pago
+    (factura_estado/factura_error) y se relanzan para que el outbox reintente.
+    """
     try:
-        from app.integrations.factus import emitir_factura_pago, FactusError, is_factus_enabled
+        from app.integrations.factus import emitir_factura_pago, is_factus_enabled
     except Exception as exc:
         logger.warning("Factus no disponible: %s", exc)
         return
@@ -1313,11 +1462,13 @@ def _intentar_facturar_pago_factus(pago: Pago, db: Session) -> None:
                     pago.factura_error = "Factus no devolvió datos de factura"
             db.commit()
             db.refresh(pago)
-    except FactusError as exc:
+    except Exception as exc:
+        db.rollback()
         pago.factura_estado = "ERROR"
         pago.factura_error = str(exc)
         db.commit()
         db.refresh(pago)
+        raise
 
 
 def _build_caja_detalle(caja: Caja, db: Session) -> CajaDetalle:
@@ -1511,93 +1662,66 @@ def _build_recibo_termico_movimiento(movimiento: MovimientoCaja) -> ReciboTermic
     )
 
 
-def _pdf_header(c: canvas.Canvas, titulo: str) -> None:
-    _draw_logo(c)
-    c.setFont("Helvetica-Bold", 16)
-    c.drawCentredString(306, 652, "CEA EDUCAR")
-    c.setFont("Helvetica", 11)
-    c.drawCentredString(306, 636, "Centro de ensenanza automovilistica")
-    c.setFont("Helvetica-Bold", 14)
-    c.drawCentredString(306, 620, titulo)
-
-
-def _draw_logo(c: canvas.Canvas) -> None:
-    logo_path = os.getenv("CEA_LOGO_PATH")
-    if not logo_path:
-        repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "..", ".."))
-        assets_dir = os.path.join(repo_root, "frontend", "src", "assets")
-        logo_path = os.path.join(assets_dir, "cea_educar_final.png")
-        if not os.path.exists(logo_path) and os.path.isdir(assets_dir):
-            for f in os.listdir(assets_dir):
-                if f.lower().endswith(".png"):
-                    logo_path = os.path.join(assets_dir, f)
-                    break
-    if logo_path and os.path.exists(logo_path):
-        try:
-            logo = ImageReader(logo_path)
-            c.drawImage(logo, 186, 675, width=240, height=120, preserveAspectRatio=True, mask='auto')
-        except Exception:
-            return
-
-
-def _pdf_kv(c: canvas.Canvas, label: str, value, y: int) -> int:
-    c.setFont("Helvetica-Bold", 10)
-    c.drawString(120, y, f"{label}:")
-    c.setFont("Helvetica", 10)
-    c.drawString(300, y, str(value))
-    return y - 18
-
-
-def _pdf_section(c: canvas.Canvas, titulo: str, y: int) -> int:
-    titulo = titulo.upper()
-    x = 80
-    width = 452
-    height = 18
-    rect_y = y - 12
-    c.setFillColor(colors.Color(0.95, 0.96, 0.98))
-    c.setStrokeColor(colors.Color(0.88, 0.90, 0.94))
-    c.rect(x, rect_y, width, height, fill=1, stroke=1)
-    c.setFillColor(colors.black)
-    c.setFont("Helvetica-Bold", 11)
-    text_width = c.stringWidth(titulo, "Helvetica-Bold", 11)
-    c.drawString(x + (width - text_width) / 2, y - 8, titulo)
-    return y - 24
-
-
-def _fmt_money(value: Decimal) -> str:
-    try:
-        return f"${value:,.0f}"
-    except Exception:
-        return f"${value}"
-
-
-def _ensure_space(c: canvas.Canvas, y: int, min_y: int, titulo: str) -> int:
-    if y < min_y:
-        c.showPage()
-        _pdf_header(c, titulo)
-        y = 580
-        c.setLineWidth(0.5)
-        c.line(80, y, 532, y)
-        y -= 20
-    return y
-
-
-def _pdf_table_header(c: canvas.Canvas, headers: list, widths: list, y: int) -> int:
-    x = 80
-    c.setFont("Helvetica-Bold", 9)
-    for h, w in zip(headers, widths):
-        c.drawString(x, y, h)
-        x += w
-    return y - 14
-
-
-def _pdf_table_row(c: canvas.Canvas, values: list, widths: list, y: int) -> int:
-    x = 80
-    c.setFont("Helvetica", 9)
-    for v, w in zip(values, widths):
-        c.drawString(x, y, str(v))
-        x += w
-    return y - 14
+def _pdf_documento_response(
+    documento: DocumentoPdf,
+    filename: str,
+    if_none_match: Optional[str],
+    accept_encoding: Optional[str] = None
+) -> Response:
+    """
+    PDF guardado con ETag; 304 si el cliente ya tiene esta versión. Los
+    documentos comprimidos se envían tal cual (Content-Encoding: gzip) si el
+    cliente lo acepta.
+    """
+    enviar_gzip = documento.comprimido and "gzip" in (accept_encoding or "").lower()
+    etag = f"{documento.etag}-gzip" if enviar_gzip else documento.etag
+    headers = {"ETag": f'"{etag}"', "Cache-Control": "private, no-cache"}
+    if documento.comprimido:
+        headers["Vary"] = "Accept-Encoding"
+    if etag_coincide(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    headers["Content-Disposition"] = f'inline; filename="{filename}"'
+    if enviar_gzip:
+        headers["Content-Encoding"] = "gzip"
+    elif documento.comprimido:
+        return Response(content=leer_documento(documento), media_type="application/pdf", headers=headers)
+    return FileResponse(documento.ruta, media_type="application/pdf", headers=headers)
+
+
+class _SalidaZip(io.RawIOBase):
+    """Destino no posicionable de zipfile: acumula lo escrito hasta extraerlo"""
+
+    def __init__(self):
+        self._partes = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, datos) -> int:
+        self._partes.append(bytes(datos))
+        return len(datos)
+
+    def extraer(self) -> bytes:
+        datos = b"".join(self._partes)
+        self._partes.clear()
+        return datos
+
+
+def _zip_documentos(documentos: List[Tuple[str, DocumentoPdf]]) -> Iterator[bytes]:
+    """ZIP de los documentos, un bloque por archivo. Los corruptos se listan en ERRORES.txt"""
+    salida = _SalidaZip()
+    errores = []
+    with zipfile.ZipFile(salida, "w", compression=zipfile.ZIP_DEFLATED) as archivo_zip:
+        for nombre, documento in documentos:
+            try:
+                archivo_zip.writestr(nombre, leer_documento(documento))
+            except (OSError, ValueError) as e:
+                logger.error("No se pudo agregar %s al ZIP: %s", nombre, e)
+                errores.append(f"{nombre}: {e}")
+            yield salida.extraer()
+        if errores:
+            archivo_zip.writestr("ERRORES.txt", "\n".join(errores))
+    yield salida.extraer()
 
 
 def _pdf_response(buffer: BytesIO, filename: str) -> Response:
@@ -1,22 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
-from datetime import datetime, date, time
+from datetime import datetime, date
 from decimal import Decimal
 from typing import List, Optional
 from io import BytesIO
 import json
-import os
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
-from reportlab.lib import colors
 from app.core.database import get_db
 from app.api.deps import get_admin_or_gerente
 from app.models.usuario import Usuario
 from app.models.caja_fuerte import CajaFuerte, MovimientoCajaFuerte, InventarioEfectivo
 from app.models.caja import TipoMovimiento
 from app.models.pago import MetodoPago
+from app.utils.fechas import filtro_fechas
+from app.services.formatos_pdf import FORMATO_RECIBO_CAJA_FUERTE
+from app.services.render_pdf import renderizar_pdf
 from app.schemas.caja_fuerte import (
     CajaFuerteResumen,
     MovimientoCajaFuerteCreate,
@@ -279,12 +277,8 @@ def list_movimientos(
         query = query.filter(MovimientoCajaFuerte.tipo == tipo)
     if metodo_pago:
         query = query.filter(MovimientoCajaFuerte.metodo_pago == metodo_pago)
-    if fecha_inicio:
-        inicio_dt = datetime.combine(fecha_inicio, time.min)
-        query = query.filter(MovimientoCajaFuerte.fecha >= inicio_dt)
-    if fecha_fin:
-        fin_dt = datetime.combine(fecha_fin, time.max)
-        query = query.filter(MovimientoCajaFuerte.fecha <= fin_dt)
+    if fecha_inicio or fecha_fin:
+        query = query.filter(*filtro_fechas(MovimientoCajaFuerte.fecha, fecha_inicio, fecha_fin))
 
     movimientos = query.order_by(MovimientoCajaFuerte.fecha.desc()).offset(skip).limit(limit).all()
     return [_build_movimiento_response(m) for m in movimientos]
@@ -480,36 +474,17 @@ def get_recibo_movimiento_pdf(
     if mov.tipo != TipoMovimiento.EGRESO:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Solo se generan recibos para egresos")
 
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=letter)
-    _pdf_header(c, "Recibo de egreso")
-    y = 580
-    c.setLineWidth(0.5)
-    c.line(80, y, 532, y)
-    y -= 20
-
-    y = _pdf_section(c, "Datos del egreso", y)
-    y = _pdf_kv(c, "ID egreso", mov.id, y)
-    y = _pdf_kv(c, "Fecha", mov.fecha.strftime("%Y-%m-%d %H:%M"), y)
-    y = _pdf_kv(c, "Concepto", mov.concepto, y)
-    y = _pdf_kv(c, "Categoria", mov.categoria or "OTROS", y)
-    y = _pdf_kv(c, "Metodo", str(mov.metodo_pago), y)
-
-    y -= 6
-    y = _pdf_section(c, "Monto", y)
-    y = _pdf_kv(c, "Total", _fmt_money(mov.monto), y)
-
-    y -= 6
-    y = _pdf_section(c, "Atendido por", y)
-    y = _pdf_kv(c, "Usuario", mov.usuario.nombre_completo if mov.usuario else "N/A", y)
-    y -= 8
-    y = _pdf_section(c, "Beneficiario", y)
-    c.setFont("Helvetica", 10)
-    c.drawString(120, y, "Nombre y firma:")
-    c.line(250, y - 2, 520, y - 2)
-    c.showPage()
-    c.save()
-    return _pdf_response(buffer, f"recibo_egreso_caja_fuerte_{mov.id}.pdf")
+    datos = {
+        "id": mov.id,
+        "fecha": mov.fecha.isoformat(),
+        "concepto": mov.concepto,
+        "categoria": mov.categoria,
+        "metodo": str(mov.metodo_pago),
+        "monto": str(mov.monto),
+        "usuario": mov.usuario.nombre_completo if mov.usuario else None,
+    }
+    pdf_bytes = renderizar_pdf(FORMATO_RECIBO_CAJA_FUERTE, datos)
+    return _pdf_response(BytesIO(pdf_bytes), f"recibo_egreso_caja_fuerte_{mov.id}.pdf")
 
 
 @router.get("/inventario", response_model=InventarioResponse)
@@ -572,66 +547,6 @@ def update_inventario(
     return InventarioResponse(items=response_items, total_efectivo=total_efectivo)
 
 
-def _pdf_header(c: canvas.Canvas, titulo: str) -> None:
-    _draw_logo(c)
-    c.setFont("Helvetica-Bold", 16)
-    c.drawCentredString(306, 652, "CEA EDUCAR")
-    c.setFont("Helvetica", 11)
-    c.drawCentredString(306, 636, "Centro de ensenanza automovilistica")
-    c.setFont("Helvetica-Bold", 14)
-    c.drawCentredString(306, 620, titulo)
-
-
-def _draw_logo(c: canvas.Canvas) -> None:
-    logo_path = os.getenv("CEA_LOGO_PATH")
-    if not logo_path:
-        repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "..", ".."))
-        assets_dir = os.path.join(repo_root, "frontend", "src", "assets")
-        logo_path = os.path.join(assets_dir, "cea_educar_final.png")
-        if not os.path.exists(logo_path) and os.path.isdir(assets_dir):
-            for f in os.listdir(assets_dir):
-                if f.lower().endswith(".png"):
-                    logo_path = os.path.join(assets_dir, f)
-                    break
-    if logo_path and os.path.exists(logo_path):
-        try:
-            logo = ImageReader(logo_path)
-            c.drawImage(logo, 186, 675, width=240, height=120, preserveAspectRatio=True, mask='auto')
-        except Exception:
-            return
-
-
-def _pdf_kv(c: canvas.Canvas, label: str, value, y: int) -> int:
-    c.setFont("Helvetica-Bold", 10)
-    c.drawString(120, y, f"{label}:")
-    c.setFont("Helvetica", 10)
-    c.drawString(300, y, str(value))
-    return y - 18
-
-
-def _pdf_section(c: canvas.Canvas, titulo: str, y: int) -> int:
-    titulo = titulo.upper()
-    x = 80
-    width = 452
-    height = 18
-    rect_y = y - 12
-    c.setFillColor(colors.Color(0.95, 0.96, 0.98))
-    c.setStrokeColor(colors.Color(0.88, 0.90, 0.94))
-    c.rect(x, rect_y, width, height, fill=1, stroke=1)
-    c.setFillColor(colors.black)
-    c.setFont("Helvetica-Bold", 11)
-    text_width = c.stringWidth(titulo, "Helvetica-Bold", 11)
-    c.drawString(x + (width - text_width) / 2, y - 8, titulo)
-    return y - 24
-
-
-def _fmt_money(value: Decimal) -> str:
-    try:
-        return f"${value:,.0f}"
-    except Exception:
-        return f"${value}"
-
-
 def _pdf_response(buffer: BytesIO, filename: str) -> Response:
     pdf_bytes = buffer.getvalue()
     return Response(
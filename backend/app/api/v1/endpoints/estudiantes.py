@@ -5,13 +5,7 @@ from typing import List, Optional
 from datetime import datetime, timedelta
 from decimal import Decimal
 from io import BytesIO
-import os
-import base64
 import logging
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
-from reportlab.lib import colors
 from app.core.database import get_db
 from app.core.security import get_password_hash, verify_password
 from app.core.precios import calcular_precio, obtener_categoria_licencia, es_certificado_sin_practica
@@ -22,6 +16,9 @@ from app.models.estudiante import Estudiante, EstadoEstudiante, CategoriaLicenci
 from app.models.tarifa import Tarifa
 from app.models.clase import Instructor, Vehiculo, EstadoInstructor
 from app.models.compromiso_pago import CompromisoPago, CuotaPago, FrecuenciaPago, EstadoCuota
+from app.services.referidores import obtener_o_crear_referidor
+from app.services.formatos_pdf import FORMATO_CONTRATO
+from app.services.render_pdf import renderizar_pdf, ColaPdfLlena
 from app.schemas.estudiante import (
     EstudianteCreate,
     EstudianteUpdate,
@@ -566,6 +563,9 @@ def definir_servicio(
         if servicio_data.origen_cliente == OrigenCliente.REFERIDO:
             estudiante.referido_por = servicio_data.referido_por
             estudiante.telefono_referidor = servicio_data.telefono_referidor
+            estudiante.referidor = obtener_o_crear_referidor(
+                db, servicio_data.referido_por, servicio_data.telefono_referidor
+            )
         
         # 4. Calcular o asignar valor total
         precio_minimo = calcular_precio(servicio_data.tipo_servicio, db=db)
@@ -808,6 +808,7 @@ def reactivar_estudiante(
         estudiante.origen_cliente = None
         estudiante.referido_por = None
         estudiante.telefono_referidor = None
+        estudiante.referidor = None
         estudiante.valor_total_curso = None
         estudiante.saldo_pendiente = None
         estudiante.horas_teoricas_completadas = 0
@@ -1245,157 +1246,36 @@ def _build_contrato_pdf(estudiante: Estudiante) -> Response:
 
 
 def _build_contrato_pdf_bytes(estudiante: Estudiante) -> bytes:
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=letter)
-    width, height = letter
-
-    _draw_contrato_header(c)
-    y = 680
-
-    # Fecha de inscripcion
-    y = _draw_box_row(
-        c,
-        y,
-        [
-            ("Fecha de Inscripcion", ""),
-            ("Dia", f"{estudiante.fecha_inscripcion.day:02d}"),
-            ("Mes", f"{estudiante.fecha_inscripcion.month:02d}"),
-            ("Ano", f"{estudiante.fecha_inscripcion.year}")
-        ],
-        [150, 80, 80, 120]
-    )
-
-    # Registro fotografico
-    y -= 10
-    y = _draw_section_bar(c, "REGISTRO FOTOGRAFICO", y)
-    photo_y = y - 120
-    _draw_photo_box(c, 50, photo_y, 120, 120, estudiante.foto_url)
-    _draw_rect(c, 50, photo_y, 520, 120)
-    y = photo_y - 10
-
-    # Datos de matricula y RUNT
-    y = _draw_box_row(
-        c,
-        y,
-        [
-            ("Matricula Numero", estudiante.matricula_numero or ""),
-            ("No Solicitud en el RUNT", estudiante.sicov_expediente_id or ""),
-            ("No Certificado", estudiante.no_certificado or ""),
-            ("Fecha de Salida", "")
-        ],
-        [140, 140, 120, 120]
-    )
-
-    # Datos personales
-    y -= 6
-    y = _draw_box_row(
-        c,
-        y,
-        [
-            ("Nombre del Alumno", estudiante.usuario.nombre_completo if estudiante.usuario else ""),
-            ("Tipo de Documento", _tipo_documento_label(estudiante.usuario.tipo_documento if estudiante.usuario else None)),
-            ("Numero", estudiante.usuario.cedula if estudiante.usuario else "")
-        ],
-        [250, 120, 150]
-    )
-
-    nacimiento = estudiante.fecha_nacimiento
-    y = _draw_box_row(
-        c,
-        y,
-        [
-            ("Fecha de Nacimiento", _fmt_date(nacimiento)),
-            ("Dia", f"{nacimiento.day:02d}"),
-            ("Mes", f"{nacimiento.month:02d}"),
-            ("Ano", f"{nacimiento.year}"),
-            ("Estrato", str(estudiante.estrato or "")),
-            ("Nivel SISBEN", estudiante.nivel_sisben or "")
-        ],
-        [150, 60, 60, 60, 60, 110]
-    )
-
-    y = _draw_box_row(
-        c,
-        y,
-        [
-            ("Nombre de su EPS", estudiante.eps or ""),
-            ("Nombre de su ARL", _extra(estudiante, "arl"))
-        ],
-        [250, 260]
-    )
-
-    y = _draw_box_row(
-        c,
-        y,
-        [
-            ("Estado Civil", estudiante.estado_civil or ""),
-            ("Ocupacion", estudiante.ocupacion or "")
-        ],
-        [180, 330]
-    )
+    return renderizar_pdf(FORMATO_CONTRATO, _datos_contrato(estudiante))
 
-    y = _draw_box_row(
-        c,
-        y,
-        [
-            ("Direccion", estudiante.direccion or ""),
-        ],
-        [510]
-    )
-    y = _draw_box_row(
-        c,
-        y,
-        [
-            ("Telefono", estudiante.usuario.telefono if estudiante.usuario else ""),
-            ("Correo Electronico", estudiante.usuario.email if estudiante.usuario else "")
-        ],
-        [180, 330]
-    )
 
-    # Nivel educativo / necesidades especiales
-    y -= 6
-    y = _draw_section_bar(c, "NIVEL EDUCATIVO", y)
-    y = _draw_checkbox_row(
-        c,
-        y,
-        ["Basica Primaria", "Basica Secundaria", "Tecnica", "Pregrado", "Postgrado", "Sin Estudio"],
-        estudiante.nivel_educativo
-    )
-    y = _draw_section_bar(c, "NECESIDADES ESPECIALES", y)
-    y = _draw_checkbox_row(
-        c,
-        y,
-        ["Idioma", "Discapacidad", "Otra"],
-        estudiante.necesidades_especiales
-    )
-
-    # Certificacion y categoria
-    y = _draw_section_bar(c, "MIN-TRANSPORTE", y)
+def _datos_contrato(estudiante: Estudiante) -> dict:
+    usuario = estudiante.usuario
     datos = dict(estudiante.datos_adicionales or {})
-    is_recategorizacion = bool(datos.get("recategorizacion_actual"))
-    seleccion_cert = "Recategorizar" if is_recategorizacion else "Obtener por primera vez"
-    y = _draw_certificacion_row(c, y, seleccion_cert)
-    y = _draw_boxed_checkbox_row(
-        c,
-        y,
-        ["A2", "B1", "C1"],
-        _categorias_contrato(estudiante),
-        prefix="CATEGORIA"
-    )
-    y -= 20
-
-    # Texto del contrato
-    y = _ensure_space_contrato(c, y, 120)
-    y = _draw_paragraphs(c, CONTRATO_PARRAFOS, 50, y, 520, 12)
-
-    # Firmas
-    y = _ensure_space_contrato(c, y, 140)
-    y -= 30
-    y = _draw_signature_lines(c, y)
-
-    c.showPage()
-    c.save()
-    return buffer.getvalue()
+    return {
+        "fecha_inscripcion": estudiante.fecha_inscripcion.isoformat(),
+        "foto_url": estudiante.foto_url,
+        "matricula_numero": estudiante.matricula_numero,
+        "expediente_runt": estudiante.sicov_expediente_id,
+        "no_certificado": estudiante.no_certificado,
+        "nombre": usuario.nombre_completo if usuario else "",
+        "tipo_documento": _tipo_documento_label(usuario.tipo_documento if usuario else None),
+        "numero_documento": usuario.cedula if usuario else "",
+        "fecha_nacimiento": estudiante.fecha_nacimiento.isoformat(),
+        "estrato": estudiante.estrato,
+        "nivel_sisben": estudiante.nivel_sisben,
+        "eps": estudiante.eps,
+        "arl": _extra(estudiante, "arl"),
+        "estado_civil": estudiante.estado_civil,
+        "ocupacion": estudiante.ocupacion,
+        "direccion": estudiante.direccion,
+        "telefono": usuario.telefono if usuario else "",
+        "email": usuario.email if usuario else "",
+        "nivel_educativo": estudiante.nivel_educativo,
+        "necesidades_especiales": estudiante.necesidades_especiales,
+        "recategorizacion": bool(datos.get("recategorizacion_actual")),
+        "categorias": _categorias_contrato(estudiante),
+    }
 
 
 def _enviar_habeas_data(estudiante: Estudiante) -> bool:
@@ -1460,7 +1340,12 @@ def _enviar_contrato_definir_servicio(estudiante: Estudiante) -> None:
         f"NIT {settings.HABEAS_NIT}\n"
     )
 
-    pdf_bytes = _build_contrato_pdf_bytes(estudiante)
+    try:
+        pdf_bytes = _build_contrato_pdf_bytes(estudiante)
+    except ColaPdfLlena:
+        # El servicio ya quedó definido; el contrato se puede descargar después
+        logger.warning("Render de PDF saturado, no se envió el contrato a %s", estudiante.usuario.email)
+        return
     filename = f"contrato_{estudiante.matricula_numero or estudiante.id}.pdf"
     enviado = send_email(
         estudiante.usuario.email,
@@ -1508,73 +1393,6 @@ def _enviar_acreditacion_horas(estudiante: Estudiante, tipo: str, horas: int, fe
         logger.warning("No se pudo enviar notificacion de horas a %s", estudiante.usuario.email)
 
 
-def _draw_contrato_header(c: canvas.Canvas) -> None:
-    _draw_logo_contrato(c)
-    c.setFont("Helvetica-Bold", 11)
-    c.drawCentredString(330, 770, "SISTEMA DE GESTION DE CALIDAD SGC")
-    c.setFont("Helvetica-Bold", 12)
-    c.drawCentredString(330, 752, "CONTRATO DE APRENDIZAJE")
-    _draw_header_cells(c, 720)
-
-
-def _draw_logo_contrato(c: canvas.Canvas) -> None:
-    logo_path = os.getenv("CEA_LOGO_PATH")
-    if not logo_path:
-        repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "..", ".."))
-        assets_dir = os.path.join(repo_root, "frontend", "src", "assets")
-        logo_path = os.path.join(assets_dir, "cea_educar_final.png")
-        if not os.path.exists(logo_path):
-            logo_path = os.path.join(assets_dir, "cea educar final.jpg")
-    if logo_path and os.path.exists(logo_path):
-        try:
-            logo = ImageReader(logo_path)
-            c.drawImage(logo, 30, 700, width=240, height=90, preserveAspectRatio=True, mask='auto')
-        except Exception:
-            return
-
-
-def _draw_header_cells(c: canvas.Canvas, y: int) -> None:
-    x = 200
-    w = 320
-    h = 14
-    col = w / 3
-    _draw_rect(c, x, y, w, h)
-    _draw_rect(c, x, y, col, h)
-    _draw_rect(c, x + col, y, col, h)
-    _draw_rect(c, x + 2 * col, y, col, h)
-    c.setFont("Helvetica", 7)
-    c.drawCentredString(x + col / 2, y + 4, "Vigente desde: 01/07/2022")
-    c.drawCentredString(x + col + col / 2, y + 4, "Codigo: SGC - FR 01")
-    c.drawCentredString(x + 2 * col + col / 2, y + 4, "Version: 01")
-
-
-def _draw_photo_box(c: canvas.Canvas, x: int, y: int, w: int, h: int, foto_url: Optional[str]) -> None:
-    if foto_url and foto_url.startswith("data:image"):
-        try:
-            header, data = foto_url.split(",", 1)
-            image_data = BytesIO(base64.b64decode(data))
-            c.drawImage(ImageReader(image_data), x + 5, y + 5, width=w - 10, height=h - 10, preserveAspectRatio=True, mask='auto')
-            return
-        except Exception:
-            pass
-    c.setFont("Helvetica", 8)
-    c.drawCentredString(x + w / 2, y + h / 2, "FOTO")
-
-
-def _draw_rect(c: canvas.Canvas, x: int, y: int, w: int, h: int) -> None:
-    c.setLineWidth(0.6)
-    c.rect(x, y, w, h)
-
-
-def _draw_section_bar(c: canvas.Canvas, title: str, y: int) -> int:
-    c.setFillColor(colors.Color(0.95, 0.96, 0.98))
-    c.rect(50, y - 16, 520, 16, fill=1, stroke=1)
-    c.setFillColor(colors.black)
-    c.setFont("Helvetica-Bold", 9)
-    c.drawCentredString(310, y - 12, title)
-    return y - 22
-
-
 def _tipo_documento_label(tipo: Optional[str]) -> str:
     if not tipo:
         return "CC"
@@ -1608,208 +1426,6 @@ def _categorias_contrato(estudiante: Estudiante) -> list[str]:
     return []
 
 
-def _draw_box_row(c: canvas.Canvas, y: int, items: list, widths: list, total_width: int = 520) -> int:
-    x = 50
-    h = 22
-    c.setFont("Helvetica", 8)
-    used = sum(widths)
-    if widths and used < total_width:
-        widths = list(widths)
-        widths[-1] += (total_width - used)
-    for (label, value), w in zip(items, widths):
-        _draw_rect(c, x, y - h, w, h)
-        c.setFont("Helvetica-Bold", 7)
-        c.drawString(x + 4, y - 10, label)
-        c.setFont("Helvetica", 8)
-        c.drawString(x + 4, y - 18, str(value))
-        x += w
-    return y - h
-
-
-def _draw_checkbox_row(c: canvas.Canvas, y: int, options: list, selected, prefix: Optional[str] = None) -> int:
-    x = 50
-    h = 18
-    total_width = 520
-    prefix_width = 70 if prefix else 0
-    available = max(0, total_width - prefix_width)
-    count = max(1, len(options))
-    step = min(110, max(70, available / count))
-    if isinstance(selected, (list, tuple, set)):
-        selected_norms = {str(item).lower() for item in selected}
-    else:
-        selected_norms = {str(selected).lower()} if selected else set()
-    if prefix:
-        c.setFont("Helvetica-Bold", 8)
-        c.drawString(x, y - 12, prefix)
-        x += 70
-    for opt in options:
-        opt_norm = opt.lower().replace(" ", "_")
-        _draw_rect(c, x, y - h, 12, 12)
-        if selected_norms and (opt_norm in selected_norms or opt.lower() in selected_norms):
-            c.setFont("Helvetica-Bold", 9)
-            c.drawString(x + 3, y - 12, "X")
-        c.setFont("Helvetica", 8)
-        c.drawString(x + 16, y - 12, opt)
-        x += step
-    return y - h
-
-
-def _draw_boxed_checkbox_row(
-    c: canvas.Canvas,
-    y: int,
-    options: list,
-    selected: Optional[str],
-    prefix: Optional[str] = None
-) -> int:
-    box_h = 22
-    _draw_rect(c, 50, y - box_h, 520, box_h)
-    y = _draw_checkbox_row(c, y, options, selected, prefix=prefix)
-    return y
-
-
-def _draw_certificacion_row(c: canvas.Canvas, y: int, selected: str) -> int:
-    x = 50
-    h = 40
-    _draw_rect(c, x, y - h, 520, h)
-
-    c.setFont("Helvetica-Bold", 7)
-    c.drawString(x + 4, y - 12, "Certificacion de la aptitud en")
-    c.drawString(x + 4, y - 24, "conduccion a solicitar")
-
-    selected_norm = (selected or "").lower()
-    options = ["Obtener por primera vez", "Recategorizar"]
-    option_x = x + 240
-    for index, opt in enumerate(options):
-        box_y = y - 12 - (index * 14)
-        _draw_rect(c, option_x, box_y - 8, 12, 12)
-        if opt.lower() in selected_norm:
-            c.setFont("Helvetica-Bold", 9)
-            c.drawString(option_x + 3, box_y - 7, "X")
-        c.setFont("Helvetica", 8)
-        c.drawString(option_x + 16, box_y - 7, opt)
-
-    return y - h
-
-
-def _draw_paragraphs(c: canvas.Canvas, paragraphs: list, x: int, y: int, width: int, leading: int) -> int:
-    font_name = "Helvetica"
-    font_size = 9
-    c.setFont(font_name, font_size)
-    for entry in paragraphs:
-        if isinstance(entry, tuple):
-            title, body = entry
-            c.setFont("Helvetica-Bold", font_size)
-            if y < 80:
-                c.showPage()
-                _draw_contrato_header(c)
-                y = 680
-            c.drawString(x, y, title)
-            y -= leading
-            c.setFont(font_name, font_size)
-            if not body:
-                y -= 4
-                continue
-            text = body
-        else:
-            text = entry
-        lines = _wrap_text(c, text, width, font_name, font_size)
-        for i, line in enumerate(lines):
-            if y < 80:
-                c.showPage()
-                _draw_contrato_header(c)
-                y = 680
-                c.setFont(font_name, font_size)
-            is_last = (i == len(lines) - 1)
-            _draw_justified_line(c, line, x, y, width, font_name, font_size, is_last)
-            y -= leading
-        y -= 6
-    return y
-
-
-def _wrap_text(c: canvas.Canvas, text: str, max_width: int, font_name: str, font_size: int) -> list:
-    words = text.split()
-    lines = []
-    current = []
-    for word in words:
-        test = " ".join(current + [word])
-        if c.stringWidth(test, font_name, font_size) <= max_width:
-            current.append(word)
-        else:
-            if current:
-                lines.append(" ".join(current))
-            current = [word]
-    if current:
-        lines.append(" ".join(current))
-    return lines
-
-
-def _draw_justified_line(
-    c: canvas.Canvas,
-    line: str,
-    x: int,
-    y: int,
-    width: int,
-    font_name: str,
-    font_size: int,
-    is_last: bool
-) -> None:
-    words = line.split()
-    if is_last or len(words) <= 1:
-        c.drawString(x, y, line)
-        return
-    words_width = sum(c.stringWidth(w, font_name, font_size) for w in words)
-    spaces = len(words) - 1
-    if spaces <= 0:
-        c.drawString(x, y, line)
-        return
-    space_width = (width - words_width) / spaces
-    cursor = x
-    for i, word in enumerate(words):
-        c.drawString(cursor, y, word)
-        cursor += c.stringWidth(word, font_name, font_size)
-        if i < spaces:
-            cursor += space_width
-
-
-def _draw_signature_lines(c: canvas.Canvas, y: int) -> int:
-    c.setLineWidth(0.6)
-    c.line(60, y, 260, y)
-    c.line(320, y, 520, y)
-    c.line(60, y - 50, 260, y - 50)
-    c.setFont("Helvetica", 8)
-    c.drawString(60, y - 12, "FIRMA ALUMNO: ACEPTO LAS CONDICIONES DEL CEAP")
-    c.drawString(320, y - 12, "FIRMA REPRESENTANTE LEGAL CEA")
-    c.drawString(60, y - 62, "FIRMA DE ACUDIENTE O PADRE DE FAMILIA")
-    _draw_rect(c, 480, y - 80, 50, 50)
-    _draw_rep_signature(c, 330, y + 4, 150, 30)
-    return y - 90
-
-
-def _draw_rep_signature(c: canvas.Canvas, x: int, y: int, w: int, h: int) -> None:
-    repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "..", ".."))
-    assets_dir = os.path.join(repo_root, "frontend", "src", "assets")
-    signature_path = os.path.join(assets_dir, "firma jerson.png")
-    if signature_path and os.path.exists(signature_path):
-        try:
-            c.drawImage(ImageReader(signature_path), x, y, width=w, height=h, preserveAspectRatio=True, mask="auto")
-        except Exception:
-            return
-
-
-def _ensure_space_contrato(c: canvas.Canvas, y: int, min_y: int) -> int:
-    if y < min_y:
-        c.showPage()
-        _draw_contrato_header(c)
-        return 680
-    return y
-
-
-def _fmt_date(value: datetime) -> str:
-    if not value:
-        return ""
-    return value.strftime("%Y-%m-%d")
-
-
 def _extra(estudiante: Estudiante, key: str) -> str:
     datos = estudiante.datos_adicionales or {}
     return datos.get(key, "")
@@ -1824,32 +1440,6 @@ def _pdf_response(buffer: BytesIO, filename: str) -> Response:
     )
 
 
-CONTRATO_PARRAFOS = [
-    ("1. PRIMERA. Objetivo:", "Formar personas con aptitudes, habilidades, destrezas y fundamentar los conocimientos requeridos para la conduccion de un vehiculo automotor, sin poner en riesgo su vida y la de los demas segun la reglamentacion expedida por el Ministerio de Transporte, Decreto 1500 de 2009, Resolucion 3245 del 21 de Julio de 2009 y demas requisitos legales aplicables y reglamentarios."),
-    ("2. SEGUNDA. Naturaleza de la capacitacion.", "El alumno aspira a obtener la certificacion de aptitud en conduccion para la categoria A2___, B1___, C1___, de acuerdo con la formacion que imparte el Centro de Ensenanza Automovilistica y la aplicabilidad que el mismo tiene para la obtencion de la licencia de conduccion en la categoria seleccionada anteriormente por el alumno."),
-    ("3. TERCERA. Duracion y Periodos de la formacion.", "La formacion tiene una duracion maxima de 3 meses, comprendidos entre la fecha de iniciacion de los modulos de la formacion y la fecha de terminacion de los mismos. La capacitacion se encuentra distribuida en 3 modulos: Modulo de formacion teorica, Modulo de formacion basica aplicada y el Modulo de formacion especifica."),
-    ("PARAGRAFO. 1°", "Este contrato puede ser modificado en su duracion parcial y total, cuando por el rendimiento en la formacion del alumno y previo analisis de las evaluaciones que el Centro de Ensenanza le aplique al terminar cada bloque modular se identifique alguna necesidad de recapacitar al alumno en algun(os) tema(s) especifico(s)."),
-    ("PARAGRAFO. 2º", "La certificacion de la aptitud en conduccion del alumno esta sujeta al cumplimiento y aprobacion de los rangos establecidos por el Ministerio de Transporte al momento de realizar la evaluacion teorico-Practica."),
-    ("4. CUARTO: Contenido y desarrollo del curso:", "La formacion de conductores se llevara a cabo en (3) tres modulos con temas relacionados con:"),
-    ("MODULO I FORMACION TEORICA:", "ADAPTACION AL MEDIO: Ubicacion del vehiculo en la via y sus componentes, senales de transito, accidentalidad en Colombia, Normas de transito, Autoridades de transito, elementos, personas, definicion de terminos y factores que intervienen en el transito, la via, el vehiculo. ETICA, PREVENCION DE CONFLICTOS Y COMUNICACION: Valores del conductor, el peaton: deberes y responsabilidades, el conductor: deberes y responsabilidades, conductas apropiadas e inapropiadas de los usuarios de la via, los derechos humanos, compromiso con el medio ambiente, la movilidad y el transito, accesibilidad y sus barreras, respeto por el espacio publico, el alcohol y otras sustancias, cultura ciudadana, la agresividad y la velocidad, la responsabilidad social, autocontrol y autodiagnostico del conductor, respeto a la vida, sensibilizacion ante la incapacidad."),
-    ("MODULO II FORMACION BASICA APLICADA:", "MECANICA BASICA: Descripcion del vehiculo, partes esenciales y localizacion, accesorios del motor, cambio de aceite y llantas, funcionamiento de averias mas frecuentes. MARCO LEGAL: Aspectos legales de transito, documentos obligatorios, licencias, clasificacion y requisitos, Codigo Nacional de transito y sus reglamentaciones, procedimientos juridicos, normas de salud ocupacional, normas ambientales, normas de convivencia y restricciones por ciudades. TECNICAS EN CONDUCCION: Componentes del vehiculo, elementos de seguridad, inspeccion al vehiculo, adaptacion al vehiculo, familiarizacion con los distintos controles, conceptos de velocidad, operacion del control de velocidades o seleccion de velocidades, conduccion del vehiculo, manejo de las distancias en la conduccion, primeros auxilios en salud o mecanicos, adaptacion viso-espacial al vehiculo, parqueo y estacionamientos."),
-    ("MODULO III FORMACION ESPECIFICA:", "UNIDAD PRACTICA: Taller inspeccion pre operacional, ajuste de asiento, adaptacion Visio-espacial, utilizacion de elementos de seguridad, puesta en marcha del motor, regulacion de velocidades, puesta en marcha del vehiculo, coordinacion, aceleracion-freno-embrague, aceleracion y desaceleracion, control de cambios, conduccion del vehiculo en via urbana, carretera, terreno plano, terreno inclinado, maniobra de cruces y adelantamientos, utilizacion de senales luminicas, corporales y acusticas, utilizacion de calzadas, carriles, afrontar y utilizacion de glorietas, afrontar intersecciones, respeto a las marcas viales y senales de transito, distancias de reaccion, frenado, maniobras de adelantamiento, reversa, entrada y salida de curvas, parqueo, estacionamiento frontal y en reversa, utilizacion del equipo de seguridad, nomenclatura urbana y nacional, normas de seguridad en el aseguramiento de la carga, uso de salidas de emergencia."),
-    ("5. HORARIOS.", "Los horarios para las clases practicas se programaran con antelacion para que se puedan adecuar a la disponibilidad de tiempo de cada uno de los alumnos, en cuanto a las clases teoricas, se le entregara al alumno al inicio de sus clases el cronograma con sus respectivos horarios debido a que estos modulos se desarrollan en grupo, por lo cual tienen un horario fijo."),
-    ("6. METODOLOGIA.", "Clases presenciales, talleres con ejercicios, conferencias y practicas de campo orientadas a trabajar para el desarrollo de las habilidades teorico-practicas como conductor en cada modulo y al finalizar cada modulo se realizara una evaluacion."),
-    ("7. INTENSIDAD HORARIA.", "Al alumno se le impartira la formacion teorico-practica de acuerdo a la intensidad horaria reglamentada en el Anexo I de la Resolucion 3245 de 2009 emitida por el Ministerio de Transporte."),
-    ("8. CONDICIONES PARA LA PRESTACION DEL SERVICIO:", ""),
-    ("8.1", "Para acceder al proceso de capacitacion y de formacion como conductor, el aspirante debera como minimo, saber leer y escribir, tener 16 anos cumplidos para el servicio diferente al publico, y tener 18 anos para vehiculos de servicio publico. (Art. 15 Decreto 1500 de 2009)."),
-    ("8.2", "Cuando se este impartiendo ensenanza practica solo podran ir en el vehiculo el instructor debidamente acreditado y el aprendiz, excepto en los vehiculos tipo B2, C2, B3 y C3, de acuerdo a lo establecido por el Ministerio de Transporte. (Art. 7 Decreto 1500 de 2009)."),
-    ("8.3", "Quien padezca una limitacion fisica, podra obtener la licencia de conduccion, si ademas de cumplir con todos los requisitos, demuestra en el examen de aptitud fisica, mental y de coordinacion motriz, que se encuentra habilitado y adiestrado para conducir con dicha limitacion. (Art. 21 Ley 769 de 2002)."),
-    ("8.4", "Los horarios son programados por el Centro de Ensenanza, por lo tanto, no se responsabiliza por la ensenanza impartida por fuera de dicha programacion."),
-    ("8.5", "En caso de que el alumno suspenda su clase practica previamente programada, debe informar con 2 horas de anticipacion para realizar la reprogramacion de la misma."),
-    ("8.5", "Para el desarrollo de las clases el alumno debera presentarse en el Centro de Ensenanza Automovilistica en el horario programado."),
-    ("8.6", "Una vez iniciado el curso, no se admite interferencia de terceras personas."),
-    ("8.7", "No es posible cambiar horas teoricas por horas practicas, ya que la estructura curricular esta basada en modulos que son necesarios aprobar en todos los aspectos tanto teoricos como practicos."),
-    ("8.8", "Es deber del alumno manifestar al centro de ensenanza el grado de conformidad con el sistema de aprendizaje empleado por los instructores, para retroalimentar el Sistema de mejoramiento continuo de nuestra empresa.")
-]
-
-
 def _build_estudiante_response(estudiante: Estudiante, db: Session = None) -> EstudianteResponse:
     """Helper para construir la respuesta con datos del usuario"""
     # Obtener historial de pagos si hay DB session
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends
+
+from app.api.deps import get_admin_user
+from app.core.metricas import estadisticas_metricas, reiniciar_metricas
+from app.models.usuario import Usuario
+
+router = APIRouter()
+
+
+@router.get("")
+def get_metricas(
+    current_user: Usuario = Depends(get_admin_user)
+):
+    """
+    Histogramas por ruta de duración, tiempo en base de datos y número de
+    consultas, con la consulta más lenta observada, y profundidad de la cola de
+    render de PDF (métricas de este proceso).
+    """
+    return estadisticas_metricas()
+
+
+@router.delete("")
+def delete_metricas(
+    current_user: Usuario = Depends(get_admin_user)
+):
+    """Reinicia los histogramas"""
+    reiniciar_metricas()
+    return {"message": "Métricas reiniciadas"}
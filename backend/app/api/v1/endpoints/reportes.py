@@ -1,27 +1,53 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, extract, cast, Date, or_, String
-from typing import Optional
+from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi.responses import StreamingResponse, FileResponse
+from sqlalchemy.orm import Session, joinedload, contains_eager
+from sqlalchemy import func, and_, extract, cast, or_, select, values, column, literal_column, String, Date, text
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta, date
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
 from decimal import Decimal
+from io import BytesIO
+import json
 
-from app.core.database import get_db
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from app.core.database import get_db, SessionLocal
+from app.core.config import settings
 from app.api.deps import get_admin_or_gerente
 from app.models.usuario import Usuario
 from app.models.caja import Caja, MovimientoCaja, EstadoCaja, ConceptoMovimientoCaja, TipoMovimiento
-from app.models.pago import Pago, DetallePago, MetodoPago, EstadoPago
-from app.models.compromiso_pago import CuotaPago, EstadoCuota
-from app.models.estudiante import Estudiante, EstadoEstudiante
+from app.models.pago import Pago, MetodoPago, EstadoPago
+from app.models.compromiso_pago import CompromisoPago, CuotaPago, EstadoCuota
+from app.models.estudiante import Estudiante, EstadoEstudiante, OrigenCliente
+from app.models.referidor import Referidor
 from app.models.clase import MantenimientoVehiculo, Vehiculo, Instructor
+from app.models.vencimiento import Vencimiento, TipoEntidadVencimiento
+from app.models.snapshot_financiero import COLUMNAS_TOTALES_CAJA
+from app.models.resumen_financiero import ResumenFinancieroDiario
+from app.utils.fechas import filtro_fechas, rango_timestamps
+from app.utils.paginacion import codificar_cursor, filtro_despues_de_cursor
+from app.utils.exportacion import stream_csv, stream_xlsx
+from app.services.cache_reportes import obtener_cache, guardar_cache, version_cache, estadisticas_cache
+from app.services.resumen_financiero import TotalesPeriodo, totales_periodo, totales_en_vivo, flujos_financieros
+from app.services.analitica import motor_analitico, DIMENSIONES
+from app.services.jobs_reportes import (
+    enviar_job, obtener_job, ruta_resultado, ColaJobsLlena, ESTADO_COMPLETADO, TIPOS_CONTENIDO
+)
+from app.services.snapshots_financieros import (
+    totales_con_snapshots, cajas_con_snapshot, verificar_snapshots, inicio_mes, siguiente_mes
+)
 from app.schemas.reportes import (
-    DashboardEjecutivo, KPIDashboard, KPIMetrica,
+    DashboardEjecutivo, KPIDashboard, KPIMetrica, ResumenLista, PaginaLista, ConceptoPagoResumen,
     GraficoEvolucionIngresos, GraficoMetodosPago,
     GraficoEstudiantesCategorias, GraficoEgresos,
     DatoPunto, DatoCategoria,
     EstudianteRegistrado, EstudiantePago, EgresoCajaItem, MovimientoCajaItem, ReferidoRanking,
     AlertasOperativas, AlertasVencimientosResponse,
     AlertaDocumentoVehiculo, AlertaDocumentoInstructor, AlertaPin, AlertaPagoVencido, AlertaCompromiso,
-    CierreFinancieroResponse, CierreCajaItem
+    CierreFinancieroResponse, CierreCajaItem, AnaliticaResponse,
+    TendenciasResponse, PeriodoTendencia, SolicitudJobReporte, JobReporteResponse
 )
 
 router = APIRouter()
@@ -49,55 +75,559 @@ def get_dashboard_ejecutivo(
     # Convertir a fechas locales (sin hora) para comparar
     fecha_inicio_date = fecha_inicio.date()
     fecha_fin_date = fecha_fin.date()
+
+    params_cache = {
+        "fecha_inicio": fecha_inicio_date,
+        "fecha_fin": fecha_fin_date,
+        "comparar": comparar_periodo_anterior
+    }
+    en_cache = obtener_cache("dashboard", params_cache)
+    if en_cache is not None:
+        # La clave es por día: el período exacto y la hora son los de este request
+        return en_cache.model_copy(update={
+            "periodo_inicio": fecha_inicio,
+            "periodo_fin": fecha_fin,
+            "fecha_generacion": datetime.utcnow()
+        })
+    version = version_cache()
     
-    print(f"\n📅 REPORTES - Período (fecha local): {fecha_inicio_date} hasta {fecha_fin_date}")
-    
-    # Calcular KPIs
-    kpis = _calcular_kpis(db, fecha_inicio_date, fecha_fin_date, comparar_periodo_anterior)
-    
-    # Gráfico de evolución de ingresos (período seleccionado)
-    grafico_ingresos = _grafico_evolucion_ingresos(db, fecha_inicio_date, fecha_fin_date)
-    
-    # Gráfico de métodos de pago (período actual)
-    grafico_metodos = _grafico_metodos_pago(db, fecha_inicio_date, fecha_fin_date)
-    
-    # Gráfico de estudiantes por categoría
-    grafico_estudiantes = _grafico_estudiantes_categorias(db)
-    
-    # Gráfico de egresos por categoría (período actual)
-    grafico_egresos = _grafico_egresos_categoria(db, fecha_inicio_date, fecha_fin_date)
-    
-    # Ranking de referidos
-    ranking_referidos = _ranking_referidos(db, fecha_inicio_date, fecha_fin_date)
+    respuesta = _construir_dashboard(db, fecha_inicio, fecha_fin, comparar_periodo_anterior)
+    guardar_cache("dashboard", params_cache, respuesta, version)
+    return respuesta
+
+
+def _construir_dashboard(
+    db: Session,
+    fecha_inicio: datetime,
+    fecha_fin: datetime,
+    comparar: bool,
+    paralelo: Optional[bool] = None
+) -> DashboardEjecutivo:
+    fecha_inicio_date = fecha_inicio.date()
+    fecha_fin_date = fecha_fin.date()
     
-    # Listas de estudiantes
-    lista_registrados = _lista_estudiantes_registrados(db, fecha_inicio_date, fecha_fin_date)
-    lista_pagos = _lista_estudiantes_pagos(db, fecha_inicio_date, fecha_fin_date)
-    lista_egresos = _lista_egresos_caja(db, fecha_inicio_date, fecha_fin_date)
-    lista_otros = _lista_otros_movimientos(db, fecha_inicio_date, fecha_fin_date)
+    # KPIs, gráficos, ranking y listas (independientes entre sí)
+    secciones = _calcular_secciones_dashboard(
+        db, fecha_inicio_date, fecha_fin_date, comparar, paralelo
+    )
+    resumen_listas = {}
+    for nombre in _LISTAS_DASHBOARD:
+        pagina = secciones[f"lista_{nombre}"]
+        secciones[f"lista_{nombre}"] = pagina.items
+        resumen_listas[nombre] = ResumenLista(total=pagina.total, siguiente_cursor=pagina.siguiente_cursor)
     
     return DashboardEjecutivo(
-        kpis=kpis,
-        grafico_ingresos=grafico_ingresos,
-        grafico_metodos_pago=grafico_metodos,
-        grafico_estudiantes=grafico_estudiantes,
-        grafico_egresos=grafico_egresos,
-        ranking_referidos=ranking_referidos,
-        lista_estudiantes_registrados=lista_registrados,
-        lista_estudiantes_pagos=lista_pagos,
-        lista_egresos_caja=lista_egresos,
-        lista_otros_movimientos=lista_otros,
+        **secciones,
+        resumen_listas=resumen_listas,
         fecha_generacion=datetime.utcnow(),
         periodo_inicio=fecha_inicio,
         periodo_fin=fecha_fin
     )
 
 
+# Secciones del dashboard: campo de DashboardEjecutivo -> función(db, inicio, fin, comparar)
+_SECCIONES_DASHBOARD = {
+    "kpis": lambda db, fi, ff, comparar: _calcular_kpis(db, fi, ff, comparar),
+    "grafico_ingresos": lambda db, fi, ff, comparar: _grafico_evolucion_ingresos(db, fi, ff),
+    "grafico_metodos_pago": lambda db, fi, ff, comparar: _grafico_metodos_pago(db, fi, ff),
+    "grafico_estudiantes": lambda db, fi, ff, comparar: _grafico_estudiantes_categorias(db),
+    "grafico_egresos": lambda db, fi, ff, comparar: _grafico_egresos_categoria(db, fi, ff),
+    "ranking_referidos": lambda db, fi, ff, comparar: _ranking_referidos(db, fi, ff),
+    "conceptos_pagos": lambda db, fi, ff, comparar: _conceptos_pagos(db, fi, ff),
+    # Listas de detalle: solo la primera página, el resto se pide por cursor
+    "lista_estudiantes_registrados": lambda db, fi, ff, comparar: _pagina_lista(
+        db, "estudiantes_registrados", fi, ff, settings.REPORTES_LISTA_TAMANO_PAGINA
+    ),
+    "lista_estudiantes_pagos": lambda db, fi, ff, comparar: _pagina_lista(
+        db, "estudiantes_pagos", fi, ff, settings.REPORTES_LISTA_TAMANO_PAGINA
+    ),
+    "lista_egresos_caja": lambda db, fi, ff, comparar: _pagina_lista(
+        db, "egresos_caja", fi, ff, settings.REPORTES_LISTA_TAMANO_PAGINA
+    ),
+    "lista_otros_movimientos": lambda db, fi, ff, comparar: _pagina_lista(
+        db, "otros_movimientos", fi, ff, settings.REPORTES_LISTA_TAMANO_PAGINA
+    ),
+}
+
+# Pool compartido por todas las peticiones: acota las conexiones extra que
+# abre el dashboard (ver pool_size/max_overflow en app/core/database.py)
+_DASHBOARD_EXECUTOR = ThreadPoolExecutor(
+    max_workers=settings.REPORTES_DASHBOARD_HILOS,
+    thread_name_prefix="dashboard"
+)
+
+
+def _seccion_en_sesion_propia(funcion, fecha_inicio: date, fecha_fin: date, comparar: bool):
+    db = SessionLocal()
+    try:
+        return funcion(db, fecha_inicio, fecha_fin, comparar)
+    finally:
+        db.close()
+
+
+def _calcular_secciones_dashboard(
+    db: Session,
+    fecha_inicio: date,
+    fecha_fin: date,
+    comparar: bool,
+    paralelo: Optional[bool] = None
+) -> dict:
+    """
+    Calcula las secciones del dashboard. En modo paralelo cada sección corre
+    en el pool con su propia sesión; si no, todas usan la sesión del request.
+    """
+    if paralelo is None:
+        paralelo = settings.REPORTES_DASHBOARD_PARALELO
+    if not paralelo:
+        return {
+            campo: funcion(db, fecha_inicio, fecha_fin, comparar)
+            for campo, funcion in _SECCIONES_DASHBOARD.items()
+        }
+    # Cada tarea corre en una copia del contexto para que sus consultas se
+    # sumen a la medición del request (app/core/metricas.py)
+    futuros = {
+        campo: _DASHBOARD_EXECUTOR.submit(
+            contextvars.copy_context().run,
+            _seccion_en_sesion_propia, funcion, fecha_inicio, fecha_fin, comparar
+        )
+        for campo, funcion in _SECCIONES_DASHBOARD.items()
+    }
+    return {campo: futuro.result() for campo, futuro in futuros.items()}
+
+
+# ==================== TENDENCIAS ====================
+
+@router.get("/tendencias", response_model=TendenciasResponse)
+def get_tendencias(
+    granularidad: str = Query("mes", description="mes, semana o trimestre"),
+    periodos: int = Query(12, ge=1, le=60),
+    fecha_fin: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_admin_or_gerente)
+):
+    """
+    KPIs del dashboard para N períodos consecutivos que terminan en fecha_fin
+    (hoy por defecto), con el cambio porcentual frente al período anterior.
+    Todos los períodos salen de una sola consulta agrupada por período.
+    """
+    if granularidad not in _GRANULARIDADES_TENDENCIA:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Granularidad no válida. Opciones: {', '.join(_GRANULARIDADES_TENDENCIA)}"
+        )
+    fecha_fin = fecha_fin or datetime.utcnow().date()
+
+    params_cache = {"granularidad": granularidad, "periodos": periodos, "fecha_fin": fecha_fin}
+    en_cache = obtener_cache("tendencias", params_cache)
+    if en_cache is not None:
+        return en_cache.model_copy(update={"fecha_generacion": datetime.utcnow()})
+    version = version_cache()
+
+    respuesta = _construir_tendencias(db, granularidad, periodos, fecha_fin)
+    guardar_cache("tendencias", params_cache, respuesta, version)
+    return respuesta
+
+
+def _construir_tendencias(db: Session, granularidad: str, periodos: int, fecha_fin: date) -> TendenciasResponse:
+    # Un período extra al inicio sirve de base para comparar el primero
+    rangos = _rangos_tendencia(granularidad, periodos + 1, fecha_fin)
+    kpis = _calcular_kpis_por_periodo(db, granularidad, rangos)
+
+    serie = []
+    for i in range(1, len(rangos)):
+        inicio, fin = rangos[i]
+        actual, anterior = kpis[i], kpis[i - 1]
+        actual.ingresos_totales = _kpi_metrica(
+            actual.ingresos_totales.valor_actual, anterior.ingresos_totales.valor_actual
+        )
+        actual.egresos_totales = _kpi_metrica(
+            actual.egresos_totales.valor_actual, anterior.egresos_totales.valor_actual, menor_es_mejor=True
+        )
+        serie.append(PeriodoTendencia(
+            periodo=_etiqueta_periodo(granularidad, inicio),
+            fecha_inicio=inicio,
+            fecha_fin=fin,
+            kpis=actual,
+            cambios_porcentuales=_cambios_porcentuales(actual, anterior)
+        ))
+
+    return TendenciasResponse(
+        granularidad=granularidad,
+        periodos=serie,
+        fecha_generacion=datetime.utcnow()
+    )
+
+
+# ==================== JOBS DE REPORTES ====================
+
+@router.post("/jobs", response_model=JobReporteResponse, status_code=status.HTTP_202_ACCEPTED)
+def crear_job_reporte(
+    solicitud: SolicitudJobReporte,
+    current_user: Usuario = Depends(get_admin_or_gerente)
+):
+    """
+    Encola un reporte pesado (dashboard interanual, tendencias, cierre o
+    exportación de todo el histórico) y retorna el id del job. El avance se
+    consulta en /reportes/jobs/{id} y el archivo en /reportes/jobs/{id}/resultado.
+    """
+    if solicitud.tipo not in _JOBS_REPORTES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tipo de reporte no válido. Opciones: {', '.join(_JOBS_REPORTES)}"
+        )
+    formatos, preparar = _JOBS_REPORTES[solicitud.tipo]
+    if solicitud.formato not in formatos:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Formato no válido para {solicitud.tipo}. Opciones: {', '.join(formatos)}"
+        )
+    try:
+        generar = preparar(solicitud)
+        job = enviar_job(
+            solicitud.tipo,
+            solicitud.formato,
+            solicitud.model_dump(mode="json", exclude={"tipo", "formato"}),
+            generar
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except ColaJobsLlena as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e))
+    return _job_response(job)
+
+
+@router.get("/jobs/{job_id}", response_model=JobReporteResponse)
+def get_job_reporte(
+    job_id: str,
+    current_user: Usuario = Depends(get_admin_or_gerente)
+):
+    """Estado de un job de reporte (404 si no existe o ya venció)"""
+    return _job_response(_job_o_404(job_id))
+
+
+@router.get("/jobs/{job_id}/resultado")
+def descargar_resultado_job(
+    job_id: str,
+    current_user: Usuario = Depends(get_admin_or_gerente)
+):
+    """Archivo generado por un job completado"""
+    job = _job_o_404(job_id)
+    if job.estado != ESTADO_COMPLETADO:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"El reporte no está listo (estado: {job.estado})"
+        )
+    return FileResponse(
+        ruta_resultado(job),
+        media_type=TIPOS_CONTENIDO[job.formato],
+        filename=f"{job.tipo}_{job.creado_en:%Y%m%d_%H%M%S}.{job.formato}"
+    )
+
+
+def _job_o_404(job_id: str):
+    job = obtener_job(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Reporte no encontrado o vencido"
+        )
+    return job
+
+
+def _job_response(job) -> JobReporteResponse:
+    return JobReporteResponse(
+        id=job.id,
+        tipo=job.tipo,
+        formato=job.formato,
+        estado=job.estado,
+        creado_en=job.creado_en,
+        expira_en=job.expira_en,
+        iniciado_en=job.iniciado_en,
+        terminado_en=job.terminado_en,
+        error=job.error,
+        tamano_bytes=job.tamano_bytes,
+        url_resultado=(
+            f"{settings.API_V1_STR}/reportes/jobs/{job.id}/resultado"
+            if job.estado == ESTADO_COMPLETADO else None
+        )
+    )
+
+
+def _periodo_job(solicitud: SolicitudJobReporte):
+    """Mismo período por defecto que el dashboard (mes actual)"""
+    fecha_fin = solicitud.fecha_fin or datetime.utcnow()
+    fecha_inicio = solicitud.fecha_inicio or fecha_fin.replace(day=1)
+    return fecha_inicio, fecha_fin
+
+
+def _preparar_job_dashboard(solicitud: SolicitudJobReporte):
+    fecha_inicio, fecha_fin = _periodo_job(solicitud)
+
+    def generar():
+        # Secciones en serie: el job ya ocupa un hilo del pool de jobs y no
+        # debe tomar además las conexiones del pool del dashboard
+        db = SessionLocal()
+        try:
+            dashboard = _construir_dashboard(
+                db, fecha_inicio, fecha_fin, solicitud.comparar_periodo_anterior, paralelo=False
+            )
+        finally:
+            db.close()
+        if solicitud.formato == "pdf":
+            yield _pdf_dashboard(dashboard)
+        else:
+            yield dashboard.model_dump_json()
+    return generar
+
+
+def _preparar_job_tendencias(solicitud: SolicitudJobReporte):
+    if solicitud.granularidad not in _GRANULARIDADES_TENDENCIA:
+        raise ValueError(f"Granularidad no válida. Opciones: {', '.join(_GRANULARIDADES_TENDENCIA)}")
+    fecha_fin = (solicitud.fecha_fin or datetime.utcnow()).date()
+
+    def generar():
+        db = SessionLocal()
+        try:
+            tendencias = _construir_tendencias(db, solicitud.granularidad, solicitud.periodos, fecha_fin)
+        finally:
+            db.close()
+        if solicitud.formato == "pdf":
+            yield _pdf_tendencias(tendencias)
+        else:
+            yield tendencias.model_dump_json()
+    return generar
+
+
+def _preparar_job_cierre(solicitud: SolicitudJobReporte):
+    fecha_inicio, fecha_fin = _periodo_job(solicitud)
+    return lambda: _stream_cierre_financiero(fecha_inicio, fecha_fin)
+
+
+def _preparar_job_exportar(solicitud: SolicitudJobReporte):
+    nombre = (solicitud.lista or "").replace("-", "_")
+    if nombre not in _LISTAS_DASHBOARD:
+        raise ValueError(f"Lista no válida. Opciones: {', '.join(l.replace('_', '-') for l in _LISTAS_DASHBOARD)}")
+    inicio, fin = _periodo_lista(solicitud.fecha_inicio, solicitud.fecha_fin)
+    encabezados = list(_LISTAS_DASHBOARD[nombre][4].model_fields.keys())
+    if solicitud.formato == "xlsx":
+        return lambda: stream_xlsx(nombre, encabezados, _filas_exportacion(nombre, inicio, fin))
+    return lambda: stream_csv(encabezados, _filas_exportacion(nombre, inicio, fin))
+
+
+# Tipo de job -> (formatos, función que valida la solicitud y retorna el generador)
+_JOBS_REPORTES = {
+    "dashboard": (("json", "pdf"), _preparar_job_dashboard),
+    "tendencias": (("json", "pdf"), _preparar_job_tendencias),
+    "cierre-financiero": (("json",), _preparar_job_cierre),
+    "exportar": (("csv", "xlsx"), _preparar_job_exportar),
+}
+
+
+def _pdf_tabla(titulo: str, subtitulo: str, secciones: List[Tuple[str, List[Tuple[str, str]]]]) -> bytes:
+    """PDF simple: título y secciones de pares etiqueta/valor, con salto de página"""
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
+    ancho, alto = letter
+
+    def encabezado() -> float:
+        c.setFont("Helvetica-Bold", 14)
+        c.drawCentredString(ancho / 2, alto - 60, titulo)
+        c.setFont("Helvetica", 10)
+        c.drawCentredString(ancho / 2, alto - 76, subtitulo)
+        return alto - 110
+
+    y = encabezado()
+    for nombre_seccion, filas in secciones:
+        if y < 72 + 18 * 2:
+            c.showPage()
+            y = encabezado()
+        c.setFont("Helvetica-Bold", 11)
+        c.drawString(72, y, nombre_seccion)
+        y -= 18
+        for etiqueta, valor in filas:
+            if y < 72:
+                c.showPage()
+                y = encabezado()
+            c.setFont("Helvetica", 10)
+            c.drawString(90, y, etiqueta)
+            c.drawRightString(ancho - 72, y, valor)
+            y -= 14
+        y -= 10
+    c.save()
+    return buffer.getvalue()
+
+
+def _filas_kpis(kpis: KPIDashboard) -> List[Tuple[str, str]]:
+    return [
+        ("Ingresos totales", f"${kpis.ingresos_totales.valor_actual:,.0f}"),
+        ("Egresos totales", f"${kpis.egresos_totales.valor_actual:,.0f}"),
+        ("Ingreso neto", f"${kpis.ingreso_neto:,.0f}"),
+        ("Margen operativo", f"{kpis.margen_operativo:.1f}%"),
+        ("Ingreso promedio por caja", f"${kpis.ingresos_promedio_por_caja:,.0f}"),
+        ("Nuevas matrículas", str(kpis.nuevas_matriculas_mes)),
+        ("Tasa de deserción", f"{kpis.tasa_desercion:.1f}%"),
+        ("Ticket promedio", f"${kpis.ticket_promedio:,.0f}"),
+        ("Días promedio de pago", f"{kpis.dias_promedio_pago:.1f}"),
+        ("Tasa de cobranza", f"{kpis.tasa_cobranza:.1f}%"),
+        ("Pagos vencidos", f"{kpis.porcentaje_pagos_vencidos:.1f}%"),
+    ]
+
+
+def _pdf_dashboard(dashboard: DashboardEjecutivo) -> bytes:
+    return _pdf_tabla(
+        "Dashboard ejecutivo",
+        f"{dashboard.periodo_inicio:%Y-%m-%d} a {dashboard.periodo_fin:%Y-%m-%d}",
+        [
+            ("KPIs", _filas_kpis(dashboard.kpis)),
+            ("Ingresos por método de pago", [
+                (dato.nombre, f"${dato.valor:,.0f}") for dato in dashboard.grafico_metodos_pago.datos
+            ]),
+            ("Egresos por categoría", [
+                (dato.nombre, f"${dato.valor:,.0f}") for dato in dashboard.grafico_egresos.datos
+            ]),
+        ]
+    )
+
+
+def _pdf_tendencias(tendencias: TendenciasResponse) -> bytes:
+    return _pdf_tabla(
+        f"Tendencias por {tendencias.granularidad}",
+        f"{len(tendencias.periodos)} períodos",
+        [
+            (f"{p.periodo} ({p.fecha_inicio:%Y-%m-%d} a {p.fecha_fin:%Y-%m-%d})", _filas_kpis(p.kpis))
+            for p in tendencias.periodos
+        ]
+    )
+
+
+# ==================== LISTAS DE DETALLE (PAGINADAS) ====================
+
+def _periodo_lista(fecha_inicio: Optional[datetime], fecha_fin: Optional[datetime]):
+    """Mismo período por defecto que el dashboard (mes actual)"""
+    if not fecha_fin:
+        fecha_fin = datetime.utcnow()
+    if not fecha_inicio:
+        fecha_inicio = fecha_fin.replace(day=1)
+    return fecha_inicio.date(), fecha_fin.date()
+
+
+@router.get("/listas/estudiantes-registrados", response_model=PaginaLista[EstudianteRegistrado])
+def get_lista_estudiantes_registrados(
+    fecha_inicio: Optional[datetime] = None,
+    fecha_fin: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limite: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_admin_or_gerente)
+):
+    inicio, fin = _periodo_lista(fecha_inicio, fecha_fin)
+    return _pagina_lista(db, "estudiantes_registrados", inicio, fin, limite, cursor)
+
+
+@router.get("/listas/estudiantes-pagos", response_model=PaginaLista[EstudiantePago])
+def get_lista_estudiantes_pagos(
+    fecha_inicio: Optional[datetime] = None,
+    fecha_fin: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limite: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_admin_or_gerente)
+):
+    inicio, fin = _periodo_lista(fecha_inicio, fecha_fin)
+    return _pagina_lista(db, "estudiantes_pagos", inicio, fin, limite, cursor)
+
+
+@router.get("/listas/egresos-caja", response_model=PaginaLista[EgresoCajaItem])
+def get_lista_egresos_caja(
+    fecha_inicio: Optional[datetime] = None,
+    fecha_fin: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limite: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_admin_or_gerente)
+):
+    inicio, fin = _periodo_lista(fecha_inicio, fecha_fin)
+    return _pagina_lista(db, "egresos_caja", inicio, fin, limite, cursor)
+
+
+@router.get("/listas/otros-movimientos", response_model=PaginaLista[MovimientoCajaItem])
+def get_lista_otros_movimientos(
+    fecha_inicio: Optional[datetime] = None,
+    fecha_fin: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limite: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_admin_or_gerente)
+):
+    inicio, fin = _periodo_lista(fecha_inicio, fecha_fin)
+    return _pagina_lista(db, "otros_movimientos", inicio, fin, limite, cursor)
+
+
+@router.get("/exportar/{lista}")
+def exportar_lista(
+    lista: str,
+    formato: str = Query("csv", pattern="^(csv|xlsx)$"),
+    fecha_inicio: Optional[datetime] = None,
+    fecha_fin: Optional[datetime] = None,
+    current_user: Usuario = Depends(get_admin_or_gerente)
+):
+    """
+    Exporta una lista de detalle completa (estudiantes-registrados,
+    estudiantes-pagos, egresos-caja, otros-movimientos) como CSV o XLSX.
+    """
+    nombre = lista.replace("-", "_")
+    if nombre not in _LISTAS_DASHBOARD:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Lista no encontrada"
+        )
+    inicio, fin = _periodo_lista(fecha_inicio, fecha_fin)
+    schema = _LISTAS_DASHBOARD[nombre][4]
+    encabezados = list(schema.model_fields.keys())
+    filas = _filas_exportacion(nombre, inicio, fin)
+    archivo = f"{nombre}_{inicio.isoformat()}_{fin.isoformat()}.{formato}"
+
+    if formato == "xlsx":
+        contenido = stream_xlsx(nombre, encabezados, filas)
+        media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    else:
+        contenido = stream_csv(encabezados, filas)
+        media_type = "text/csv; charset=utf-8"
+
+    return StreamingResponse(
+        contenido,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{archivo}"'}
+    )
+
+
+def _filas_exportacion(nombre: str, fecha_inicio: date, fecha_fin: date):
+    """
+    Filas de la lista como tuplas, leídas con cursor del servidor (yield_per).
+    Usa su propia sesión porque se consume mientras se envía la respuesta.
+    """
+    construir_query, columna_fecha, columna_id, datos_fila, _ = _LISTAS_DASHBOARD[nombre]
+    db = SessionLocal()
+    try:
+        query = construir_query(db, fecha_inicio, fecha_fin).order_by(
+            columna_fecha.desc(), columna_id.desc()
+        ).yield_per(settings.REPORTES_EXPORTACION_LOTE)
+        for fila in query:
+            yield tuple(datos_fila(fila).values())
+    finally:
+        db.close()
+
+
 @router.get("/alertas-operativas", response_model=AlertasOperativas)
 def get_alertas_operativas(
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_admin_or_gerente)
 ):
+    en_cache = obtener_cache("alertas-operativas", {})
+    if en_cache is not None:
+        return en_cache
+    version = version_cache()
+
     ahora = datetime.utcnow()
 
     caja = db.query(Caja).filter(Caja.estado == EstadoCaja.ABIERTA).order_by(Caja.fecha_apertura.desc()).first()
@@ -123,13 +653,12 @@ def get_alertas_operativas(
     compromisos_por_vencer_cantidad = compromisos_query.count()
     compromisos_por_vencer_total = compromisos_query.with_entities(func.sum(CuotaPago.saldo_cuota)).scalar() or Decimal('0')
 
-    pin_por_vencer_cantidad = 0
     pin_limite = ahora + timedelta(days=90)
-    estudiantes_pin = db.query(Estudiante).filter(Estudiante.sicov_pin.isnot(None)).all()
-    for est in estudiantes_pin:
-        fecha_pin = _parse_pin_vencimiento(est)
-        if fecha_pin and ahora <= fecha_pin <= pin_limite:
-            pin_por_vencer_cantidad += 1
+    pin_por_vencer_cantidad = db.query(func.count(Estudiante.id)).filter(
+        Estudiante.sicov_pin.isnot(None),
+        Estudiante.pin_vencimiento >= ahora,
+        Estudiante.pin_vencimiento <= pin_limite
+    ).scalar() or 0
 
     fallas_abiertas_cantidad = db.query(MantenimientoVehiculo).filter(
         MantenimientoVehiculo.tipo == "FALLA",
@@ -140,7 +669,7 @@ def get_alertas_operativas(
         Estudiante.estado == EstadoEstudiante.LISTO_EXAMEN
     ).count()
 
-    return AlertasOperativas(
+    respuesta = AlertasOperativas(
         caja_abierta=caja_abierta,
         caja_id=caja.id if caja else None,
         caja_abierta_horas=caja_abierta_horas,
@@ -152,6 +681,8 @@ def get_alertas_operativas(
         fallas_abiertas_cantidad=fallas_abiertas_cantidad,
         estudiantes_listos_examen_cantidad=estudiantes_listos_examen_cantidad
     )
+    guardar_cache("alertas-operativas", {}, respuesta, version)
+    return respuesta
 
 
 @router.get("/alertas-vencimientos", response_model=AlertasVencimientosResponse)
@@ -163,115 +694,151 @@ def get_alertas_vencimientos(
     ahora = datetime.utcnow()
     fin = ahora + timedelta(days=dias)
     fin_date = fin.date()
+    hoy = ahora.date()
+
+    # Un solo recorrido ordenado del calendario de vencimientos: los pagos
+    # solo interesan vencidos y las cuotas solo desde ahora en adelante.
+    vencimientos = db.query(Vencimiento).filter(
+        *filtro_fechas(Vencimiento.fecha_vencimiento, fecha_fin=fin_date),
+        or_(
+            Vencimiento.tipo_entidad.notin_([TipoEntidadVencimiento.PAGO.value, TipoEntidadVencimiento.CUOTA.value]),
+            and_(Vencimiento.tipo_entidad == TipoEntidadVencimiento.PAGO.value, Vencimiento.fecha_vencimiento < ahora),
+            and_(
+                Vencimiento.tipo_entidad == TipoEntidadVencimiento.CUOTA.value,
+                Vencimiento.fecha_vencimiento >= ahora,
+                Vencimiento.fecha_vencimiento <= fin
+            )
+        )
+    ).order_by(Vencimiento.fecha_vencimiento, Vencimiento.id).all()
+
+    ids_por_tipo = {tipo.value: set() for tipo in TipoEntidadVencimiento}
+    for v in vencimientos:
+        ids_por_tipo[v.tipo_entidad].add(v.entidad_id)
+
+    # Cargar las entidades referenciadas en lote, una consulta por tipo
+    placas = {}
+    if ids_por_tipo[TipoEntidadVencimiento.VEHICULO.value]:
+        placas = dict(db.query(Vehiculo.id, Vehiculo.placa).filter(
+            Vehiculo.id.in_(ids_por_tipo[TipoEntidadVencimiento.VEHICULO.value])
+        ).all())
+
+    instructores = {}
+    if ids_por_tipo[TipoEntidadVencimiento.INSTRUCTOR.value]:
+        instructores = {
+            inst.id: inst
+            for inst in db.query(Instructor).options(joinedload(Instructor.usuario)).filter(
+                Instructor.id.in_(ids_por_tipo[TipoEntidadVencimiento.INSTRUCTOR.value])
+            ).all()
+        }
+
+    pagos = {}
+    if ids_por_tipo[TipoEntidadVencimiento.PAGO.value]:
+        pagos = {
+            fila.id: fila
+            for fila in db.query(Pago.id, Pago.estudiante_id, Pago.monto).filter(
+                Pago.id.in_(ids_por_tipo[TipoEntidadVencimiento.PAGO.value])
+            ).all()
+        }
+
+    cuotas = {}
+    if ids_por_tipo[TipoEntidadVencimiento.CUOTA.value]:
+        cuotas = {
+            fila.id: fila
+            for fila in db.query(CuotaPago.id, CuotaPago.saldo_cuota, CompromisoPago.estudiante_id).join(
+                CompromisoPago, CuotaPago.compromiso_id == CompromisoPago.id
+            ).filter(
+                CuotaPago.id.in_(ids_por_tipo[TipoEntidadVencimiento.CUOTA.value])
+            ).all()
+        }
+
+    ids_estudiantes = set(ids_por_tipo[TipoEntidadVencimiento.ESTUDIANTE.value])
+    ids_estudiantes.update(p.estudiante_id for p in pagos.values())
+    ids_estudiantes.update(c.estudiante_id for c in cuotas.values())
+    estudiantes = {}
+    if ids_estudiantes:
+        estudiantes = {
+            est.id: est
+            for est in db.query(Estudiante).options(joinedload(Estudiante.usuario)).filter(
+                Estudiante.id.in_(ids_estudiantes)
+            ).all()
+        }
+
+    def nombre_estudiante(estudiante_id):
+        est = estudiantes.get(estudiante_id)
+        return est.usuario.nombre_completo if est and est.usuario else "SIN NOMBRE"
 
     documentos = []
-    vehiculos = db.query(Vehiculo).all()
-    for v in vehiculos:
-        if v.soat_vencimiento and v.soat_vencimiento <= fin_date:
-            documentos.append(AlertaDocumentoVehiculo(
-                vehiculo_id=v.id,
-                placa=v.placa,
-                documento="SOAT",
-                fecha_vencimiento=datetime.combine(v.soat_vencimiento, datetime.min.time()),
-                dias_restantes=(v.soat_vencimiento - ahora.date()).days
-            ))
-        if v.rtm_vencimiento and v.rtm_vencimiento <= fin_date:
-            documentos.append(AlertaDocumentoVehiculo(
-                vehiculo_id=v.id,
-                placa=v.placa,
-                documento="RTM",
-                fecha_vencimiento=datetime.combine(v.rtm_vencimiento, datetime.min.time()),
-                dias_restantes=(v.rtm_vencimiento - ahora.date()).days
-            ))
-        if v.tecnomecanica_vencimiento and v.tecnomecanica_vencimiento <= fin_date:
+    documentos_instructor = []
+    pins = []
+    pagos_vencidos = []
+    compromisos = []
+    # El calendario viene ordenado por fecha, así que cada lista queda ordenada
+    # por días restantes (y los pagos por mora descendente).
+    for v in vencimientos:
+        dias_restantes = (v.fecha_vencimiento.date() - hoy).days
+        if v.tipo_entidad == TipoEntidadVencimiento.VEHICULO.value:
+            if v.entidad_id not in placas:
+                continue
             documentos.append(AlertaDocumentoVehiculo(
-                vehiculo_id=v.id,
-                placa=v.placa,
-                documento="TECNOMECANICA",
-                fecha_vencimiento=datetime.combine(v.tecnomecanica_vencimiento, datetime.min.time()),
-                dias_restantes=(v.tecnomecanica_vencimiento - ahora.date()).days
+                vehiculo_id=v.entidad_id,
+                placa=placas[v.entidad_id],
+                documento=v.documento,
+                fecha_vencimiento=v.fecha_vencimiento,
+                dias_restantes=dias_restantes
             ))
-        if v.seguro_vencimiento and v.seguro_vencimiento <= fin_date:
-            documentos.append(AlertaDocumentoVehiculo(
-                vehiculo_id=v.id,
-                placa=v.placa,
-                documento="SEGURO",
-                fecha_vencimiento=datetime.combine(v.seguro_vencimiento, datetime.min.time()),
-                dias_restantes=(v.seguro_vencimiento - ahora.date()).days
+        elif v.tipo_entidad == TipoEntidadVencimiento.INSTRUCTOR.value:
+            inst = instructores.get(v.entidad_id)
+            if inst is None:
+                continue
+            documentos_instructor.append(AlertaDocumentoInstructor(
+                instructor_id=inst.id,
+                nombre_completo=inst.usuario.nombre_completo if inst.usuario else "SIN NOMBRE",
+                documento=v.documento,
+                fecha_vencimiento=v.fecha_vencimiento,
+                dias_restantes=dias_restantes
             ))
-
-    pins = []
-    estudiantes = db.query(Estudiante).all()
-    for est in estudiantes:
-        fecha_pin = _parse_pin_vencimiento(est)
-        if fecha_pin and fecha_pin.date() <= fin_date:
+        elif v.tipo_entidad == TipoEntidadVencimiento.ESTUDIANTE.value:
+            est = estudiantes.get(v.entidad_id)
+            if est is None:
+                continue
             pins.append(AlertaPin(
                 estudiante_id=est.id,
-                nombre_completo=est.usuario.nombre_completo,
-                cedula=est.usuario.cedula,
-                fecha_vencimiento=fecha_pin,
-                dias_restantes=(fecha_pin.date() - ahora.date()).days
+                nombre_completo=est.usuario.nombre_completo if est.usuario else "SIN NOMBRE",
+                cedula=est.usuario.cedula if est.usuario else "",
+                fecha_vencimiento=v.fecha_vencimiento,
+                dias_restantes=dias_restantes
             ))
-
-    pagos_vencidos = []
-    pagos = db.query(Pago).filter(
-        Pago.estado == EstadoPago.PENDIENTE,
-        Pago.fecha_vencimiento.isnot(None),
-        Pago.fecha_vencimiento < ahora
-    ).all()
-    for p in pagos:
-        pagos_vencidos.append(AlertaPagoVencido(
-            pago_id=p.id,
-            estudiante_id=p.estudiante_id,
-            nombre_completo=p.estudiante.usuario.nombre_completo if p.estudiante and p.estudiante.usuario else "SIN NOMBRE",
-            monto=p.monto,
-            fecha_vencimiento=p.fecha_vencimiento,
-            dias_mora=(ahora.date() - p.fecha_vencimiento.date()).days
-        ))
-
-    compromisos = []
-    cuotas = db.query(CuotaPago).filter(
-        CuotaPago.estado.in_([EstadoCuota.PENDIENTE, EstadoCuota.PARCIAL]),
-        CuotaPago.fecha_vencimiento >= ahora,
-        CuotaPago.fecha_vencimiento <= fin
-    ).all()
-    for c in cuotas:
-        compromisos.append(AlertaCompromiso(
-            cuota_id=c.id,
-            estudiante_id=c.estudiante_id,
-            nombre_completo=c.estudiante.usuario.nombre_completo if c.estudiante and c.estudiante.usuario else "SIN NOMBRE",
-            saldo_cuota=c.saldo_cuota,
-            fecha_vencimiento=c.fecha_vencimiento,
-            dias_restantes=(c.fecha_vencimiento.date() - ahora.date()).days
-        ))
-
-    documentos_instructor = []
-    instructores = db.query(Instructor).all()
-    for inst in instructores:
-        nombre = inst.usuario.nombre_completo if inst.usuario else "SIN NOMBRE"
-        if inst.licencia_vigencia_hasta and inst.licencia_vigencia_hasta <= fin_date:
-            documentos_instructor.append(AlertaDocumentoInstructor(
-                instructor_id=inst.id,
-                nombre_completo=nombre,
-                documento="LICENCIA",
-                fecha_vencimiento=datetime.combine(inst.licencia_vigencia_hasta, datetime.min.time()),
-                dias_restantes=(inst.licencia_vigencia_hasta - ahora.date()).days
+        elif v.tipo_entidad == TipoEntidadVencimiento.PAGO.value:
+            p = pagos.get(v.entidad_id)
+            if p is None:
+                continue
+            pagos_vencidos.append(AlertaPagoVencido(
+                pago_id=p.id,
+                estudiante_id=p.estudiante_id,
+                nombre_completo=nombre_estudiante(p.estudiante_id),
+                monto=p.monto,
+                fecha_vencimiento=v.fecha_vencimiento,
+                dias_mora=-dias_restantes
             ))
-        if inst.certificado_vigencia_hasta and inst.certificado_vigencia_hasta <= fin_date:
-            documentos_instructor.append(AlertaDocumentoInstructor(
-                instructor_id=inst.id,
-                nombre_completo=nombre,
-                documento="CERTIFICADO",
-                fecha_vencimiento=datetime.combine(inst.certificado_vigencia_hasta, datetime.min.time()),
-                dias_restantes=(inst.certificado_vigencia_hasta - ahora.date()).days
+        elif v.tipo_entidad == TipoEntidadVencimiento.CUOTA.value:
+            c = cuotas.get(v.entidad_id)
+            if c is None:
+                continue
+            compromisos.append(AlertaCompromiso(
+                cuota_id=c.id,
+                estudiante_id=c.estudiante_id,
+                nombre_completo=nombre_estudiante(c.estudiante_id),
+                saldo_cuota=c.saldo_cuota,
+                fecha_vencimiento=v.fecha_vencimiento,
+                dias_restantes=dias_restantes
             ))
 
     return AlertasVencimientosResponse(
-        documentos_vehiculo=sorted(documentos, key=lambda d: d.dias_restantes),
-        documentos_instructor=sorted(documentos_instructor, key=lambda d: d.dias_restantes),
-        pins_por_vencer=sorted(pins, key=lambda p: p.dias_restantes),
-        pagos_vencidos=sorted(pagos_vencidos, key=lambda p: p.dias_mora, reverse=True),
-        compromisos_por_vencer=sorted(compromisos, key=lambda c: c.dias_restantes)
+        documentos_vehiculo=documentos,
+        documentos_instructor=documentos_instructor,
+        pins_por_vencer=pins,
+        pagos_vencidos=pagos_vencidos,
+        compromisos_por_vencer=compromisos
     )
 
 
@@ -279,9 +846,15 @@ def get_alertas_vencimientos(
 def get_cierre_financiero(
     fecha_inicio: Optional[datetime] = None,
     fecha_fin: Optional[datetime] = None,
+    stream: bool = False,
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_admin_or_gerente)
 ):
+    """
+    Cierre financiero del período: totales por método de pago y una fila por
+    caja. Con stream=true (cierres de varios años) el mismo JSON se envía por
+    partes: primero las cajas a medida que se leen y al final los totales.
+    """
     if not fecha_fin:
         fecha_fin = datetime.utcnow()
     if not fecha_inicio:
@@ -289,94 +862,259 @@ def get_cierre_financiero(
     fecha_inicio_date = fecha_inicio.date()
     fecha_fin_date = fecha_fin.date()
 
-    cajas = db.query(Caja).filter(
-        cast(Caja.fecha_apertura, Date) >= fecha_inicio_date,
-        cast(Caja.fecha_apertura, Date) <= fecha_fin_date
-    ).all()
-
-    total_ingresos = sum([_ingresos_caja(c) for c in cajas], Decimal('0'))
-    total_egresos = sum([_egresos_caja(c) for c in cajas], Decimal('0'))
-    total_efectivo = sum([c.total_ingresos_efectivo or Decimal('0') for c in cajas], Decimal('0'))
-    total_transferencias = sum([c.total_ingresos_transferencia or Decimal('0') for c in cajas], Decimal('0'))
-    total_tarjetas = sum([c.total_ingresos_tarjeta or Decimal('0') for c in cajas], Decimal('0'))
-    total_nequi = sum([c.total_nequi or Decimal('0') for c in cajas], Decimal('0'))
-    total_nequi_escuela = sum([c.total_nequi_escuela or Decimal('0') for c in cajas], Decimal('0'))
-    total_nequi_gerencia = sum([c.total_nequi_gerencia or Decimal('0') for c in cajas], Decimal('0'))
-    total_daviplata = sum([c.total_daviplata or Decimal('0') for c in cajas], Decimal('0'))
-    total_bre_b = sum([c.total_bre_b or Decimal('0') for c in cajas], Decimal('0'))
-    total_transferencia_bancaria = sum([c.total_transferencia_bancaria or Decimal('0') for c in cajas], Decimal('0'))
-    total_tarjeta_debito = sum([c.total_tarjeta_debito or Decimal('0') for c in cajas], Decimal('0'))
-    total_tarjeta_credito = sum([c.total_tarjeta_credito or Decimal('0') for c in cajas], Decimal('0'))
-    total_credismart = sum([c.total_credismart or Decimal('0') for c in cajas], Decimal('0'))
-    total_sistecredito = sum([c.total_sistecredito or Decimal('0') for c in cajas], Decimal('0'))
-
-    total_egresos_efectivo = sum([c.total_egresos_efectivo or Decimal('0') for c in cajas], Decimal('0'))
-    saldo_inicial_base = Decimal('0')
-    if cajas:
-        primera_caja = min(cajas, key=lambda c: c.fecha_apertura or datetime.min)
-        saldo_inicial_base = primera_caja.saldo_inicial or Decimal('0')
-    saldo_efectivo_teorico = saldo_inicial_base + total_efectivo - total_egresos_efectivo
-
-    cajas_response = [
-        CierreCajaItem(
-            id=c.id,
-            fecha_apertura=c.fecha_apertura,
-            fecha_cierre=c.fecha_cierre,
-            estado=c.estado.value if hasattr(c.estado, "value") else str(c.estado),
-            total_ingresos=_ingresos_caja(c),
-            total_egresos=_egresos_caja(c),
-            diferencia=c.diferencia
+    if stream:
+        return StreamingResponse(
+            _stream_cierre_financiero(fecha_inicio, fecha_fin),
+            media_type="application/json"
         )
-        for c in cajas
-    ]
 
-    return CierreFinancieroResponse(
+    params_cache = {"fecha_inicio": fecha_inicio_date, "fecha_fin": fecha_fin_date}
+    en_cache = obtener_cache("cierre-financiero", params_cache)
+    if en_cache is not None:
+        return en_cache.model_copy(update={"fecha_inicio": fecha_inicio, "fecha_fin": fecha_fin})
+    version = version_cache()
+
+    fuente = _fuente_cierre(fecha_inicio_date, fecha_fin_date)
+    ingresos = _suma_columnas(fuente, _COLUMNAS_INGRESOS_CAJA)
+    egresos = _suma_columnas(fuente, _COLUMNAS_EGRESOS_CAJA)
+    orden = (fuente.c.fecha_apertura, fuente.c.id)
+    # Una sola consulta: cada fila es una caja y las funciones de ventana
+    # agregan los totales del período y el saldo inicial de la primera caja.
+    filas = db.query(
+        *_columnas_cierre_caja(fuente),
+        func.sum(ingresos).over().label("suma_ingresos"),
+        func.sum(egresos).over().label("suma_egresos"),
+        func.sum(func.coalesce(fuente.c.total_egresos_efectivo, 0)).over().label("suma_egresos_efectivo"),
+        *[
+            func.sum(func.coalesce(fuente.c[columna], 0)).over().label(campo)
+            for campo, columna in _TOTALES_CIERRE_POR_METODO.items()
+        ],
+        func.first_value(func.coalesce(fuente.c.saldo_inicial, 0)).over(order_by=orden).label("saldo_inicial_base"),
+    ).order_by(*orden).all()
+
+    cero = Decimal('0')
+    primera = filas[0] if filas else None
+    totales_metodo = {
+        campo: (getattr(primera, campo) if primera else None) or cero
+        for campo in _TOTALES_CIERRE_POR_METODO
+    }
+    saldo_inicial_base = (primera.saldo_inicial_base if primera else None) or cero
+    suma_egresos_efectivo = (primera.suma_egresos_efectivo if primera else None) or cero
+
+    respuesta = CierreFinancieroResponse(
         fecha_inicio=fecha_inicio,
         fecha_fin=fecha_fin,
-        total_ingresos=total_ingresos,
-        total_egresos=total_egresos,
-        saldo_efectivo_teorico=saldo_efectivo_teorico,
-        total_efectivo=total_efectivo,
-        total_transferencias=total_transferencias,
-        total_tarjetas=total_tarjetas,
-        total_nequi=total_nequi,
-        total_nequi_escuela=total_nequi_escuela,
-        total_nequi_gerencia=total_nequi_gerencia,
-        total_daviplata=total_daviplata,
-        total_bre_b=total_bre_b,
-        total_transferencia_bancaria=total_transferencia_bancaria,
-        total_tarjeta_debito=total_tarjeta_debito,
-        total_tarjeta_credito=total_tarjeta_credito,
-        total_credismart=total_credismart,
-        total_sistecredito=total_sistecredito,
-        cajas=cajas_response
+        total_ingresos=(primera.suma_ingresos if primera else None) or cero,
+        total_egresos=(primera.suma_egresos if primera else None) or cero,
+        saldo_efectivo_teorico=saldo_inicial_base + totales_metodo["total_efectivo"] - suma_egresos_efectivo,
+        **totales_metodo,
+        cajas=[_item_cierre_caja(f) for f in filas]
     )
+    guardar_cache("cierre-financiero", params_cache, respuesta, version)
+    return respuesta
+
+
+@router.get("/cache/estadisticas")
+def get_estadisticas_cache(
+    current_user: Usuario = Depends(get_admin_or_gerente)
+):
+    """Aciertos, fallos y tamaño del cache de reportes"""
+    return estadisticas_cache()
+
+
+@router.get("/analitica", response_model=AnaliticaResponse)
+def get_analitica(
+    agrupar_por: str = Query("metodo_pago", description="Dimensiones separadas por coma: " + ", ".join(DIMENSIONES)),
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    tipo: Optional[str] = Query(None, description="INGRESO o EGRESO (coma para varios)"),
+    origen: Optional[str] = None,
+    metodo_pago: Optional[str] = None,
+    categoria: Optional[str] = None,
+    current_user: Usuario = Depends(get_admin_or_gerente)
+):
+    """
+    Cortes ad-hoc de ingresos y egresos (p. ej. método de pago por semana o
+    referidor por mes) resueltos en memoria por el motor columnar.
+    """
+    dimensiones = [d.strip() for d in agrupar_por.split(",") if d.strip()]
+    filtros = {
+        nombre: [v.strip() for v in valor.split(",") if v.strip()]
+        for nombre, valor in (("tipo", tipo), ("origen", origen), ("metodo_pago", metodo_pago), ("categoria", categoria))
+        if valor
+    }
+    try:
+        grupos = motor_analitico.consultar(dimensiones, fecha_inicio, fecha_fin, filtros)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return AnaliticaResponse(
+        agrupar_por=dimensiones,
+        grupos=grupos,
+        filas_en_memoria=motor_analitico.estadisticas()["filas"]
+    )
+
+
+@router.get("/snapshots/verificar")
+def verificar_consistencia_snapshots(
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_admin_or_gerente)
+):
+    """
+    Recalcula los snapshots de meses y cajas cerradas del rango (todo el
+    histórico si no se indica) y reporta las diferencias con lo guardado.
+    """
+    return verificar_snapshots(db, fecha_inicio, fecha_fin)
 
 
 # ==================== FUNCIONES AUXILIARES ====================
 
-def _ingresos_caja(caja: Caja) -> Decimal:
-    """Total de ingresos reales de caja (excluye creditos diferidos)."""
-    return (
-        (caja.total_ingresos_efectivo or Decimal('0')) +
-        (caja.total_nequi or Decimal('0')) +
-        (caja.total_nequi_escuela or Decimal('0')) +
-        (caja.total_nequi_gerencia or Decimal('0')) +
-        (caja.total_daviplata or Decimal('0')) +
-        (caja.total_bre_b or Decimal('0')) +
-        (caja.total_transferencia_bancaria or Decimal('0')) +
-        (caja.total_tarjeta_debito or Decimal('0')) +
-        (caja.total_tarjeta_credito or Decimal('0'))
-    )
+# Columnas que suman los ingresos reales de caja (excluye créditos diferidos)
+_COLUMNAS_INGRESOS_CAJA = (
+    "total_ingresos_efectivo",
+    "total_nequi",
+    "total_nequi_escuela",
+    "total_nequi_gerencia",
+    "total_daviplata",
+    "total_bre_b",
+    "total_transferencia_bancaria",
+    "total_tarjeta_debito",
+    "total_tarjeta_credito",
+)
+
+# Columnas de egresos (todos los métodos)
+_COLUMNAS_EGRESOS_CAJA = (
+    "total_egresos_efectivo",
+    "total_egresos_transferencia",
+    "total_egresos_tarjeta",
+)
+
+# Campo de CierreFinancieroResponse -> columna de Caja que se acumula
+_TOTALES_CIERRE_POR_METODO = {
+    "total_efectivo": "total_ingresos_efectivo",
+    "total_transferencias": "total_ingresos_transferencia",
+    "total_tarjetas": "total_ingresos_tarjeta",
+    "total_nequi": "total_nequi",
+    "total_nequi_escuela": "total_nequi_escuela",
+    "total_nequi_gerencia": "total_nequi_gerencia",
+    "total_daviplata": "total_daviplata",
+    "total_bre_b": "total_bre_b",
+    "total_transferencia_bancaria": "total_transferencia_bancaria",
+    "total_tarjeta_debito": "total_tarjeta_debito",
+    "total_tarjeta_credito": "total_tarjeta_credito",
+    "total_credismart": "total_credismart",
+    "total_sistecredito": "total_sistecredito",
+}
 
 
 def _egresos_caja(caja: Caja) -> Decimal:
     """Total de egresos (todos los métodos)."""
+    return sum(
+        (getattr(caja, columna) or Decimal('0') for columna in _COLUMNAS_EGRESOS_CAJA),
+        Decimal('0')
+    )
+
+
+def _fuente_cierre(fecha_inicio: date, fecha_fin: date):
+    """
+    Cajas del período como subquery: con snapshots las cajas cerradas se leen
+    de snapshots_caja y solo las abiertas de la tabla cajas.
+    """
+    if settings.REPORTES_USAR_SNAPSHOTS:
+        return cajas_con_snapshot(fecha_inicio, fecha_fin)
+    return select(
+        Caja.id, Caja.fecha_apertura, Caja.fecha_cierre, Caja.estado,
+        *[getattr(Caja, columna) for columna in COLUMNAS_TOTALES_CAJA]
+    ).where(
+        *filtro_fechas(Caja.fecha_apertura, fecha_inicio, fecha_fin)
+    ).subquery("cajas_periodo")
+
+
+def _suma_columnas(fuente, columnas):
+    """Expresión SQL: suma de las columnas de la fuente tratando NULL como 0"""
+    expresion = func.coalesce(fuente.c[columnas[0]], 0)
+    for columna in columnas[1:]:
+        expresion = expresion + func.coalesce(fuente.c[columna], 0)
+    return expresion
+
+
+def _columnas_cierre_caja(fuente):
+    """Columnas por caja que necesita CierreCajaItem"""
     return (
-        (caja.total_egresos_efectivo or Decimal('0')) +
-        (caja.total_egresos_transferencia or Decimal('0')) +
-        (caja.total_egresos_tarjeta or Decimal('0'))
+        fuente.c.id,
+        fuente.c.fecha_apertura,
+        fuente.c.fecha_cierre,
+        fuente.c.estado,
+        fuente.c.diferencia,
+        _suma_columnas(fuente, _COLUMNAS_INGRESOS_CAJA).label("total_ingresos"),
+        _suma_columnas(fuente, _COLUMNAS_EGRESOS_CAJA).label("total_egresos"),
+    )
+
+
+def _item_cierre_caja(fila) -> CierreCajaItem:
+    return CierreCajaItem(
+        id=fila.id,
+        fecha_apertura=fila.fecha_apertura,
+        fecha_cierre=fila.fecha_cierre,
+        estado=fila.estado.value if hasattr(fila.estado, "value") else str(fila.estado),
+        total_ingresos=fila.total_ingresos or Decimal('0'),
+        total_egresos=fila.total_egresos or Decimal('0'),
+        diferencia=fila.diferencia
+    )
+
+
+def _stream_cierre_financiero(fecha_inicio: datetime, fecha_fin: datetime):
+    """
+    Cierre financiero como JSON por partes, con la misma forma que
+    CierreFinancieroResponse: las cajas se leen con cursor del servidor y se
+    emiten a medida que llegan; los totales se acumulan y van al final.
+    Usa su propia sesión porque se consume mientras se envía la respuesta.
+    """
+    cero = Decimal('0')
+    totales_metodo = {campo: cero for campo in _TOTALES_CIERRE_POR_METODO}
+    total_ingresos = cero
+    total_egresos = cero
+    total_egresos_efectivo = cero
+    saldo_inicial_base = None
+
+    db = SessionLocal()
+    try:
+        fuente = _fuente_cierre(fecha_inicio.date(), fecha_fin.date())
+        filas = db.query(
+            *_columnas_cierre_caja(fuente),
+            fuente.c.saldo_inicial,
+            fuente.c.total_egresos_efectivo,
+            *[fuente.c[columna].label(campo) for campo, columna in _TOTALES_CIERRE_POR_METODO.items()],
+        ).order_by(fuente.c.fecha_apertura, fuente.c.id).yield_per(settings.REPORTES_EXPORTACION_LOTE)
+
+        yield '{"cajas":['
+        separador = ""
+        for fila in filas:
+            item = _item_cierre_caja(fila)
+            yield separador + item.model_dump_json()
+            separador = ","
+            if saldo_inicial_base is None:
+                saldo_inicial_base = fila.saldo_inicial or cero
+            total_ingresos += item.total_ingresos
+            total_egresos += item.total_egresos
+            total_egresos_efectivo += fila.total_egresos_efectivo or cero
+            for campo in totales_metodo:
+                totales_metodo[campo] += getattr(fila, campo) or cero
+    finally:
+        db.close()
+
+    resumen = CierreFinancieroResponse(
+        fecha_inicio=fecha_inicio,
+        fecha_fin=fecha_fin,
+        total_ingresos=total_ingresos,
+        total_egresos=total_egresos,
+        saldo_efectivo_teorico=(saldo_inicial_base or cero) + totales_metodo["total_efectivo"] - total_egresos_efectivo,
+        **totales_metodo,
+        cajas=[]
     )
+    yield "]," + json.dumps(resumen.model_dump(mode="json", exclude={"cajas"}))[1:]
+
 
 def _calcular_kpis(
     db: Session,
@@ -392,52 +1130,38 @@ def _calcular_kpis(
         fecha_inicio_anterior = fecha_inicio - timedelta(days=dias_periodo)
         fecha_fin_anterior = fecha_inicio
     
-    # INGRESOS TOTALES (de cajas por fecha de apertura, incluye abiertas y cerradas)
-    # Usar CAST a DATE para comparar solo fechas, ignorando horas
-    cajas_periodo = db.query(Caja).filter(
-        and_(
-            cast(Caja.fecha_apertura, Date) >= fecha_inicio,
-            cast(Caja.fecha_apertura, Date) <= fecha_fin
-        )
-    ).all()
-    
-    print(f"💼 Cajas encontradas en el período: {len(cajas_periodo)}")
-    ingresos_cajas_periodo = Decimal('0')
-    for caja in cajas_periodo:
-        total_caja = _ingresos_caja(caja)
-        ingresos_cajas_periodo += total_caja
-        print(f"  - Caja ID {caja.id} ({caja.fecha_apertura.date()}): Total=${total_caja}")
-
-    ingresos_actual = _sumar_ingresos_periodo(db, fecha_inicio, fecha_fin)
-    print(f"💵 Total ingresos del período (por movimientos): ${ingresos_actual}")
+    # INGRESOS POR CAJA (cajas por fecha de apertura, incluye abiertas y cerradas)
+    num_cajas, ingresos_cajas_periodo = db.query(
+        func.count(Caja.id),
+        func.sum(_suma_columnas(Caja.__table__, _COLUMNAS_INGRESOS_CAJA))
+    ).filter(
+        *filtro_fechas(Caja.fecha_apertura, fecha_inicio, fecha_fin)
+    ).one()
+
+    totales_actual = _totales_financieros(db, fecha_inicio, fecha_fin)
+    ingresos_actual = totales_actual.ingresos
     
     ingresos_anterior = None
     cambio_ingresos = None
     tendencia_ingresos = "neutral"
     
     if comparar:
-        cajas_anterior = db.query(Caja).filter(
-            and_(
-                cast(Caja.fecha_apertura, Date) >= fecha_inicio_anterior,
-                cast(Caja.fecha_apertura, Date) < fecha_fin_anterior
-            )
-        ).all()
-
-        ingresos_anterior = _sumar_ingresos_periodo(db, fecha_inicio_anterior, fecha_fin_anterior)
+        totales_anterior = _totales_financieros(db, fecha_inicio_anterior, fecha_fin_anterior)
+        ingresos_anterior = totales_anterior.ingresos
         
         if ingresos_anterior > 0:
             cambio_ingresos = float(((ingresos_actual - ingresos_anterior) / ingresos_anterior) * 100)
             tendencia_ingresos = "up" if cambio_ingresos > 0 else "down" if cambio_ingresos < 0 else "neutral"
     
     # EGRESOS TOTALES (de cajas por fecha de apertura)
-    egresos_actual = _sumar_egresos_periodo(db, fecha_inicio, fecha_fin)
+    egresos_actual = totales_actual.egresos
     
     egresos_anterior = None
     cambio_egresos = None
     tendencia_egresos = "neutral"
     
     if comparar:
-        egresos_anterior = _sumar_egresos_periodo(db, fecha_inicio_anterior, fecha_fin_anterior)
+        egresos_anterior = totales_anterior.egresos
         
         if egresos_anterior > 0:
             cambio_egresos = float(((egresos_actual - egresos_anterior) / egresos_anterior) * 100)
@@ -450,8 +1174,8 @@ def _calcular_kpis(
 
     ingreso_neto = ingresos_actual - egresos_actual
     ingresos_promedio_por_caja = (
-        ingresos_cajas_periodo / len(cajas_periodo)
-        if len(cajas_periodo) > 0
+        (ingresos_cajas_periodo or Decimal('0')) / num_cajas
+        if num_cajas
         else Decimal('0')
     )
     
@@ -473,25 +1197,20 @@ def _calcular_kpis(
     
     # NUEVAS MATRÍCULAS DEL MES
     nuevas_matriculas = db.query(Estudiante).filter(
-        and_(
-            cast(Estudiante.fecha_inscripcion, Date) >= fecha_inicio,
-            cast(Estudiante.fecha_inscripcion, Date) <= fecha_fin
-        )
+        *filtro_fechas(Estudiante.fecha_inscripcion, fecha_inicio, fecha_fin)
     ).count()
 
     activos_periodo = db.query(Estudiante).filter(
         and_(
             Estudiante.estado.in_([EstadoEstudiante.INSCRITO, EstadoEstudiante.EN_FORMACION, EstadoEstudiante.LISTO_EXAMEN]),
-            cast(Estudiante.fecha_inscripcion, Date) >= fecha_inicio,
-            cast(Estudiante.fecha_inscripcion, Date) <= fecha_fin
+            *filtro_fechas(Estudiante.fecha_inscripcion, fecha_inicio, fecha_fin)
         )
     ).count()
 
     inactivos_periodo = db.query(Estudiante).filter(
         and_(
             Estudiante.estado.in_([EstadoEstudiante.GRADUADO, EstadoEstudiante.DESERTOR, EstadoEstudiante.RETIRADO]),
-            cast(Estudiante.fecha_inscripcion, Date) >= fecha_inicio,
-            cast(Estudiante.fecha_inscripcion, Date) <= fecha_fin
+            *filtro_fechas(Estudiante.fecha_inscripcion, fecha_inicio, fecha_fin)
         )
     ).count()
     
@@ -501,51 +1220,34 @@ def _calcular_kpis(
     if total_estudiantes > 0:
         tasa_desercion = (inactivos_periodo / total_estudiantes) * 100
     
-    # DÍAS PROMEDIO DE PAGO (simplificado - calcular de pagos)
-    pagos_periodo = db.query(Pago).filter(
-        and_(
-            Pago.estado == EstadoPago.COMPLETADO,
-            cast(Pago.fecha_pago, Date) >= fecha_inicio,
-            cast(Pago.fecha_pago, Date) <= fecha_fin
-        )
-    ).all()
-    
-    total_dias = 0
-    count_pagos = 0
-    for pago in pagos_periodo:
-        estudiante = pago.estudiante
-        if estudiante and estudiante.fecha_inscripcion and pago.fecha_pago:
-            if pago.fecha_vencimiento:
-                dias = (pago.fecha_pago - pago.fecha_vencimiento).days
-            else:
-                dias = (pago.fecha_pago - estudiante.fecha_inscripcion).days
-            if dias < 0:
-                dias = 0
-            total_dias += dias
-            count_pagos += 1
-    
-    dias_promedio_pago = 0.0
-    if count_pagos > 0:
-        dias_promedio_pago = total_dias / count_pagos
+    # DÍAS PROMEDIO DE PAGO Y TICKET PROMEDIO (pagos completados del período),
+    # agregados en SQL como en _calcular_kpis_por_periodo
+    referencia = func.coalesce(Pago.fecha_vencimiento, Estudiante.fecha_inscripcion)
+    dias_pago = func.greatest(func.floor(extract("epoch", Pago.fecha_pago - referencia) / 86400), 0)
+    con_referencia = Estudiante.fecha_inscripcion.isnot(None)
+    count_pagos, total_dias, total_pagado_periodo = db.query(
+        func.count().filter(con_referencia),
+        func.sum(dias_pago).filter(con_referencia),
+        func.sum(Pago.monto)
+    ).select_from(Pago).outerjoin(
+        Estudiante, Estudiante.id == Pago.estudiante_id
+    ).filter(
+        Pago.estado == EstadoPago.COMPLETADO,
+        *filtro_fechas(Pago.fecha_pago, fecha_inicio, fecha_fin)
+    ).one()
 
-    # TICKET PROMEDIO (por pago completado en el período)
+    dias_promedio_pago = 0.0
     ticket_promedio = Decimal('0')
-    if count_pagos > 0:
-        total_pagado_periodo = sum((p.monto or Decimal('0')) for p in pagos_periodo)
-        ticket_promedio = total_pagado_periodo / count_pagos
+    if count_pagos:
+        dias_promedio_pago = float(total_dias or 0) / count_pagos
+        ticket_promedio = (total_pagado_periodo or Decimal('0')) / count_pagos
     
     # TASA DE COBRANZA
     total_valor_cursos = db.query(func.sum(Estudiante.valor_total_curso)).filter(
-        and_(
-            cast(Estudiante.fecha_inscripcion, Date) >= fecha_inicio,
-            cast(Estudiante.fecha_inscripcion, Date) <= fecha_fin
-        )
+        *filtro_fechas(Estudiante.fecha_inscripcion, fecha_inicio, fecha_fin)
     ).scalar() or Decimal('0')
     saldo_pendiente_periodo = db.query(func.sum(Estudiante.saldo_pendiente)).filter(
-        and_(
-            cast(Estudiante.fecha_inscripcion, Date) >= fecha_inicio,
-            cast(Estudiante.fecha_inscripcion, Date) <= fecha_fin
-        )
+        *filtro_fechas(Estudiante.fecha_inscripcion, fecha_inicio, fecha_fin)
     ).scalar() or Decimal('0')
     total_pagado = total_valor_cursos - saldo_pendiente_periodo
     tasa_cobranza = 0.0
@@ -557,8 +1259,7 @@ def _calcular_kpis(
         and_(
             Pago.estado == EstadoPago.PENDIENTE,
             Pago.fecha_vencimiento.isnot(None),
-            cast(Pago.fecha_vencimiento, Date) >= fecha_inicio,
-            cast(Pago.fecha_vencimiento, Date) <= fecha_fin
+            *filtro_fechas(Pago.fecha_vencimiento, fecha_inicio, fecha_fin)
         )
     )
     pagos_vencidos_periodo = pagos_pendientes_periodo.filter(Pago.fecha_vencimiento < ahora)
@@ -594,6 +1295,261 @@ def _calcular_kpis(
     )
 
 
+# Granularidad de tendencias -> unidad de date_trunc
+_GRANULARIDADES_TENDENCIA = {
+    "mes": "month",
+    "semana": "week",
+    "trimestre": "quarter",
+}
+
+_ESTADOS_ACTIVOS = (EstadoEstudiante.INSCRITO, EstadoEstudiante.EN_FORMACION, EstadoEstudiante.LISTO_EXAMEN)
+_ESTADOS_INACTIVOS = (EstadoEstudiante.GRADUADO, EstadoEstudiante.DESERTOR, EstadoEstudiante.RETIRADO)
+
+# Campos numéricos de KPIDashboard comparados entre períodos
+_CAMPOS_CAMBIO_TENDENCIA = (
+    "ingreso_neto", "ingresos_promedio_por_caja", "margen_operativo",
+    "nuevas_matriculas_mes", "tasa_desercion", "ticket_promedio",
+    "dias_promedio_pago", "tasa_cobranza", "porcentaje_pagos_vencidos",
+)
+
+
+def _inicio_periodo(granularidad: str, fecha: date) -> date:
+    """Primer día del período que contiene la fecha (semanas ISO, de lunes)"""
+    if granularidad == "semana":
+        return fecha - timedelta(days=fecha.weekday())
+    if granularidad == "trimestre":
+        return fecha.replace(month=(fecha.month - 1) // 3 * 3 + 1, day=1)
+    return inicio_mes(fecha)
+
+
+def _siguiente_periodo(granularidad: str, inicio: date) -> date:
+    if granularidad == "semana":
+        return inicio + timedelta(days=7)
+    if granularidad == "trimestre":
+        return siguiente_mes(siguiente_mes(siguiente_mes(inicio)))
+    return siguiente_mes(inicio)
+
+
+def _rangos_tendencia(granularidad: str, cantidad: int, fecha_fin: date) -> List[Tuple[date, date]]:
+    """
+    Los `cantidad` períodos (inicio, fin) que terminan en el que contiene
+    fecha_fin, del más antiguo al más reciente. El último se corta en fecha_fin.
+    """
+    inicio = _inicio_periodo(granularidad, fecha_fin)
+    inicios = [inicio]
+    for _ in range(cantidad - 1):
+        inicio = _inicio_periodo(granularidad, inicio - timedelta(days=1))
+        inicios.insert(0, inicio)
+    return [
+        (inicio, min(_siguiente_periodo(granularidad, inicio) - timedelta(days=1), fecha_fin))
+        for inicio in inicios
+    ]
+
+
+def _etiqueta_periodo(granularidad: str, inicio: date) -> str:
+    if granularidad == "semana":
+        anio, semana, _ = inicio.isocalendar()
+        return f"{anio}-W{semana:02d}"
+    if granularidad == "trimestre":
+        return f"{inicio.year}-T{(inicio.month - 1) // 3 + 1}"
+    return f"{inicio:%Y-%m}"
+
+
+def _kpi_metrica(actual: Decimal, anterior: Decimal, menor_es_mejor: bool = False) -> KPIMetrica:
+    """KPIMetrica con el mismo criterio de cambio y tendencia que _calcular_kpis"""
+    cambio = None
+    tendencia = "neutral"
+    if anterior > 0:
+        cambio = float(((actual - anterior) / anterior) * 100)
+        if menor_es_mejor:
+            tendencia = "down" if cambio > 0 else "up" if cambio < 0 else "neutral"
+        else:
+            tendencia = "up" if cambio > 0 else "down" if cambio < 0 else "neutral"
+    return KPIMetrica(valor_actual=actual, valor_anterior=anterior, cambio_porcentual=cambio, tendencia=tendencia)
+
+
+def _cambios_porcentuales(actual: KPIDashboard, anterior: KPIDashboard) -> Dict[str, Optional[float]]:
+    cambios = {
+        "ingresos_totales": actual.ingresos_totales.cambio_porcentual,
+        "egresos_totales": actual.egresos_totales.cambio_porcentual,
+    }
+    for campo in _CAMPOS_CAMBIO_TENDENCIA:
+        valor_actual, valor_anterior = getattr(actual, campo), getattr(anterior, campo)
+        cambios[campo] = (
+            float((Decimal(str(valor_actual)) - Decimal(str(valor_anterior))) / abs(Decimal(str(valor_anterior))) * 100)
+            if valor_anterior else None
+        )
+    return cambios
+
+
+def _por_periodo(unidad: str, columna):
+    """
+    Inicio del período (date_trunc) de una columna DateTime, como fecha. La
+    unidad va literal (viene de _GRANULARIDADES_TENDENCIA) para que el SELECT
+    y el GROUP BY sean la misma expresión.
+    """
+    return cast(func.date_trunc(literal_column(f"'{unidad}'"), columna), Date)
+
+
+def _calcular_kpis_por_periodo(
+    db: Session,
+    granularidad: str,
+    rangos: List[Tuple[date, date]]
+) -> List[KPIDashboard]:
+    """
+    KPIs de _calcular_kpis para cada período de `rangos`, en una sola consulta:
+    cada tabla se recorre una vez agrupada por date_trunc y los agregados se
+    unen a la lista de períodos. Los ingresos/egresos salen del resumen diario
+    (o de los flujos en vivo), no de los snapshots mensuales, porque las
+    semanas y el período en curso no coinciden con meses congelados.
+    Saldo pendiente y estudiantes activos/inactivos son valores actuales,
+    iguales en todos los períodos (como en el dashboard).
+    """
+    unidad = _GRANULARIDADES_TENDENCIA[granularidad]
+    fecha_inicio, fecha_fin = rangos[0][0], rangos[-1][1]
+    ahora = datetime.utcnow()
+
+    lista_periodos = values(column("periodo", Date), name="periodos").data([(inicio,) for inicio, _ in rangos])
+
+    # Ingresos y egresos
+    if settings.REPORTES_USAR_RESUMEN_DIARIO:
+        flujos = select(
+            ResumenFinancieroDiario.fecha, ResumenFinancieroDiario.tipo, ResumenFinancieroDiario.monto
+        ).where(
+            ResumenFinancieroDiario.fecha >= fecha_inicio,
+            ResumenFinancieroDiario.fecha <= fecha_fin
+        ).subquery("flujos")
+    else:
+        flujos = flujos_financieros(fecha_inicio, fecha_fin).subquery("flujos")
+    es_ingreso = flujos.c.tipo == TipoMovimiento.INGRESO.value
+    periodo = _por_periodo(unidad, flujos.c.fecha)
+    financiero = select(
+        periodo.label("periodo"),
+        func.sum(flujos.c.monto).filter(es_ingreso).label("ingresos"),
+        func.sum(flujos.c.monto).filter(~es_ingreso).label("egresos")
+    ).group_by(periodo).subquery("financiero")
+
+    # Cajas abiertas en cada período (snapshots de las cerradas si aplica)
+    fuente_cajas = _fuente_cierre(fecha_inicio, fecha_fin)
+    periodo = _por_periodo(unidad, fuente_cajas.c.fecha_apertura)
+    cajas = select(
+        periodo.label("periodo"),
+        func.count().label("cantidad"),
+        func.sum(_suma_columnas(fuente_cajas, _COLUMNAS_INGRESOS_CAJA)).label("ingresos")
+    ).group_by(periodo).subquery("cajas")
+
+    # Estudiantes inscritos en el período
+    periodo = _por_periodo(unidad, Estudiante.fecha_inscripcion)
+    estudiantes = select(
+        periodo.label("periodo"),
+        func.count().label("nuevas"),
+        func.count().filter(Estudiante.estado.in_(_ESTADOS_ACTIVOS)).label("activos"),
+        func.count().filter(Estudiante.estado.in_(_ESTADOS_INACTIVOS)).label("inactivos"),
+        func.sum(Estudiante.valor_total_curso).label("valor_cursos"),
+        func.sum(Estudiante.saldo_pendiente).label("saldo_pendiente")
+    ).where(
+        *filtro_fechas(Estudiante.fecha_inscripcion, fecha_inicio, fecha_fin)
+    ).group_by(periodo).subquery("estudiantes_periodo")
+
+    # Pagos completados: ticket promedio y días promedio de pago
+    referencia = func.coalesce(Pago.fecha_vencimiento, Estudiante.fecha_inscripcion)
+    dias_pago = func.greatest(func.floor(extract("epoch", Pago.fecha_pago - referencia) / 86400), 0)
+    con_referencia = Estudiante.fecha_inscripcion.isnot(None)
+    periodo = _por_periodo(unidad, Pago.fecha_pago)
+    pagos = select(
+        periodo.label("periodo"),
+        func.count().filter(con_referencia).label("cantidad"),
+        func.sum(dias_pago).filter(con_referencia).label("dias"),
+        func.sum(Pago.monto).label("monto")
+    ).select_from(Pago).outerjoin(
+        Estudiante, Estudiante.id == Pago.estudiante_id
+    ).where(
+        Pago.estado == EstadoPago.COMPLETADO,
+        *filtro_fechas(Pago.fecha_pago, fecha_inicio, fecha_fin)
+    ).group_by(periodo).subquery("pagos_periodo")
+
+    # Pagos pendientes que vencen en el período
+    periodo = _por_periodo(unidad, Pago.fecha_vencimiento)
+    pendientes = select(
+        periodo.label("periodo"),
+        func.count().label("pendientes"),
+        func.count().filter(Pago.fecha_vencimiento < ahora).label("vencidos")
+    ).where(
+        Pago.estado == EstadoPago.PENDIENTE,
+        Pago.fecha_vencimiento.isnot(None),
+        *filtro_fechas(Pago.fecha_vencimiento, fecha_inicio, fecha_fin)
+    ).group_by(periodo).subquery("pendientes_periodo")
+
+    # Valores actuales (no dependen del período)
+    saldo_actual = select(func.sum(Estudiante.saldo_pendiente)).where(
+        Estudiante.saldo_pendiente > 0
+    ).scalar_subquery()
+    activos_actual = select(func.count()).select_from(Estudiante).where(
+        Estudiante.estado.in_(_ESTADOS_ACTIVOS)
+    ).scalar_subquery()
+    inactivos_actual = select(func.count()).select_from(Estudiante).where(
+        Estudiante.estado.in_(_ESTADOS_INACTIVOS)
+    ).scalar_subquery()
+
+    consulta = select(
+        lista_periodos.c.periodo,
+        financiero.c.ingresos.label("ingresos"),
+        financiero.c.egresos.label("egresos"),
+        cajas.c.cantidad.label("cajas"),
+        cajas.c.ingresos.label("ingresos_cajas"),
+        estudiantes.c.nuevas,
+        estudiantes.c.activos,
+        estudiantes.c.inactivos,
+        estudiantes.c.valor_cursos,
+        estudiantes.c.saldo_pendiente.label("saldo_pendiente_periodo"),
+        pagos.c.cantidad.label("pagos"),
+        pagos.c.dias.label("dias_pago"),
+        pagos.c.monto.label("monto_pagos"),
+        pendientes.c.pendientes,
+        pendientes.c.vencidos,
+        saldo_actual.label("saldo_pendiente"),
+        activos_actual.label("total_activos"),
+        inactivos_actual.label("total_inactivos")
+    ).select_from(lista_periodos)
+    for agregado in (financiero, cajas, estudiantes, pagos, pendientes):
+        consulta = consulta.outerjoin(agregado, agregado.c.periodo == lista_periodos.c.periodo)
+    filas = {fila.periodo: fila for fila in db.execute(consulta).all()}
+
+    return [_kpis_de_fila(filas[inicio]) for inicio, _ in rangos]
+
+
+def _kpis_de_fila(fila) -> KPIDashboard:
+    """KPIDashboard de un período a partir de los agregados de la consulta"""
+    cero = Decimal('0')
+    ingresos = Decimal(str(fila.ingresos or 0))
+    egresos = Decimal(str(fila.egresos or 0))
+    cantidad_cajas = fila.cajas or 0
+    activos, inactivos = fila.activos or 0, fila.inactivos or 0
+    cantidad_pagos = fila.pagos or 0
+    valor_cursos = fila.valor_cursos or cero
+    pendientes = fila.pendientes or 0
+
+    return KPIDashboard(
+        ingresos_totales=KPIMetrica(valor_actual=ingresos),
+        egresos_totales=KPIMetrica(valor_actual=egresos),
+        ingreso_neto=ingresos - egresos,
+        ingresos_promedio_por_caja=(fila.ingresos_cajas or cero) / cantidad_cajas if cantidad_cajas else cero,
+        saldo_pendiente=fila.saldo_pendiente or cero,
+        margen_operativo=float((ingresos - egresos) / ingresos * 100) if ingresos > 0 else 0.0,
+        total_estudiantes_activos=fila.total_activos or 0,
+        total_estudiantes_inactivos=fila.total_inactivos or 0,
+        nuevas_matriculas_mes=fila.nuevas or 0,
+        tasa_desercion=inactivos / (activos + inactivos) * 100 if activos + inactivos else 0.0,
+        ticket_promedio=(fila.monto_pagos or cero) / cantidad_pagos if cantidad_pagos else cero,
+        dias_promedio_pago=float(fila.dias_pago or 0) / cantidad_pagos if cantidad_pagos else 0.0,
+        tasa_cobranza=(
+            float((valor_cursos - (fila.saldo_pendiente_periodo or cero)) / valor_cursos * 100)
+            if valor_cursos > 0 else 0.0
+        ),
+        porcentaje_pagos_vencidos=(fila.vencidos or 0) / pendientes * 100 if pendientes else 0.0
+    )
+
+
 def _grafico_evolucion_ingresos(db: Session, fecha_inicio: date, fecha_fin: date) -> GraficoEvolucionIngresos:
     """Gráfico de evolución de ingresos del período seleccionado"""
     
@@ -617,33 +1573,19 @@ def _grafico_evolucion_ingresos(db: Session, fecha_inicio: date, fecha_fin: date
         formato_agrupacion = 'YYYY-MM'
         label_agrupacion = 'mes'
     
-    pagos = db.query(Pago).filter(
-        and_(
-            Pago.estado == EstadoPago.COMPLETADO,
-            cast(Pago.fecha_pago, Date) >= fecha_inicio,
-            cast(Pago.fecha_pago, Date) <= fecha_fin
-        )
-    ).all()
-    movimientos = db.query(MovimientoCaja).filter(
-        and_(
-            MovimientoCaja.tipo == TipoMovimiento.INGRESO,
-            cast(MovimientoCaja.fecha, Date) >= fecha_inicio,
-            cast(MovimientoCaja.fecha, Date) <= fecha_fin
-        )
-    ).all()
-
-    buckets = {}
-    for pago in pagos:
-        key = _bucket_key(pago.fecha_pago, label_agrupacion)
-        buckets[key] = buckets.get(key, Decimal('0')) + (pago.monto or Decimal('0'))
-    for mov in movimientos:
-        key = _bucket_key(mov.fecha, label_agrupacion)
-        buckets[key] = buckets.get(key, Decimal('0')) + (mov.monto or Decimal('0'))
-
-    datos = [
-        DatoPunto(fecha=key, valor=buckets[key])
-        for key in _ordenar_buckets(list(buckets.keys()), label_agrupacion)
-    ]
+    # Mismo rango de días que los KPIs, el resumen diario y los snapshots (filtro_fechas)
+    desde, hasta = rango_timestamps(fecha_inicio, fecha_fin)
+    filas = db.execute(_SQL_EVOLUCION_INGRESOS, {
+        "unidad": _UNIDADES_AGRUPACION[label_agrupacion][0],
+        "paso": _UNIDADES_AGRUPACION[label_agrupacion][1],
+        "formato": formato_agrupacion,
+        "desde": desde,
+        "hasta": hasta,
+        "estado_pago": EstadoPago.COMPLETADO.name,
+        "tipo_ingreso": TipoMovimiento.INGRESO.name,
+    }).all()
+
+    datos = [DatoPunto(fecha=fila.etiqueta, valor=fila.total) for fila in filas]
     
     total_periodo = sum(d.valor for d in datos)
     promedio_por_periodo = total_periodo / len(datos) if datos else Decimal('0')
@@ -655,50 +1597,57 @@ def _grafico_evolucion_ingresos(db: Session, fecha_inicio: date, fecha_fin: date
     )
 
 
-def _parse_pin_vencimiento(estudiante: Estudiante) -> Optional[datetime]:
-    datos_adicionales = estudiante.datos_adicionales or {}
-    posibles_keys = [
-        "pin_vencimiento",
-        "pin_fecha_vencimiento",
-        "sicov_pin_vencimiento",
-        "sicov_pin_fecha_vencimiento",
-        "pin_expiracion",
-        "pin_expira",
-        "fecha_vencimiento_pin"
-    ]
-    for key in posibles_keys:
-        value = datos_adicionales.get(key)
-        fecha = _parse_fecha(value)
-        if fecha:
-            return fecha
-    if estudiante.fecha_inscripcion:
-        return estudiante.fecha_inscripcion + timedelta(days=90)
-    return None
-
-
-def _parse_fecha(value) -> Optional[datetime]:
-    if not value:
-        return None
-    if isinstance(value, datetime):
-        return value
-    if isinstance(value, date):
-        return datetime.combine(value, datetime.min.time())
-    if isinstance(value, str):
-        for fmt in ("%Y-%m-%d", "%Y/%m/%d", "%d/%m/%Y"):
-            try:
-                return datetime.strptime(value, fmt)
-            except ValueError:
-                continue
-        try:
-            return datetime.fromisoformat(value)
-        except ValueError:
-            return None
-    return None
+# Granularidad del gráfico -> (unidad de date_trunc, paso de generate_series)
+_UNIDADES_AGRUPACION = {
+    'hora': ('hour', '1 hour'),
+    'dia': ('day', '1 day'),
+    'semana': ('week', '1 week'),
+    'mes': ('month', '1 month'),
+}
+
+# Ingresos (pagos + movimientos de ingreso) por bucket, con los buckets sin
+# movimientos en cero. Filtro y buckets usan el timestamp guardado, igual que
+# el resto del dashboard: un día del gráfico es el mismo día de los KPIs, así
+# el total del gráfico coincide con ingresos_totales. La serie va del bucket
+# del primer día al del último. Las horas de días distintos se acumulan en la
+# misma etiqueta (HH24:00), igual que antes.
+_SQL_EVOLUCION_INGRESOS = text("""
+    WITH ingresos AS (
+        SELECT p.fecha_pago AS fecha, p.monto
+        FROM pagos p
+        WHERE p.estado = :estado_pago
+          AND p.fecha_pago >= :desde AND p.fecha_pago < :hasta
+        UNION ALL
+        SELECT m.fecha, m.monto
+        FROM movimientos_caja m
+        WHERE m.tipo = :tipo_ingreso
+          AND m.fecha >= :desde AND m.fecha < :hasta
+    ),
+    por_bucket AS (
+        SELECT date_trunc(:unidad, fecha) AS bucket, SUM(monto) AS total
+        FROM ingresos
+        GROUP BY 1
+    ),
+    serie AS (
+        SELECT generate_series(
+            date_trunc(:unidad, CAST(:desde AS timestamp)),
+            date_trunc(:unidad, CAST(:hasta AS timestamp) - interval '1 microsecond'),
+            CAST(:paso AS interval)
+        ) AS bucket
+    )
+    SELECT to_char(s.bucket, :formato) AS etiqueta, COALESCE(SUM(b.total), 0) AS total
+    FROM serie s
+    LEFT JOIN por_bucket b ON b.bucket = s.bucket
+    GROUP BY 1
+    ORDER BY 1
+""")
 
 
 def _grafico_metodos_pago(db: Session, fecha_inicio: date, fecha_fin: date) -> GraficoMetodosPago:
     """Gráfico de ingresos por método de pago (desde Cajas)"""
-    totales = _sumar_ingresos_por_metodo_periodo(db, fecha_inicio, fecha_fin)
+    totales = _totales_por_metodo_label(
+        _totales_financieros(db, fecha_inicio, fecha_fin).ingresos_por_metodo
+    )
     total_general = sum(totales.values())
     
     datos = [
@@ -778,88 +1727,44 @@ def _grafico_estudiantes_categorias(db: Session) -> GraficoEstudiantesCategorias
     )
 
 
-def _sumar_ingresos_periodo(db: Session, fecha_inicio: date, fecha_fin: date) -> Decimal:
-    pagos = db.query(Pago).filter(
-        and_(
-            Pago.estado == EstadoPago.COMPLETADO,
-            cast(Pago.fecha_pago, Date) >= fecha_inicio,
-            cast(Pago.fecha_pago, Date) <= fecha_fin
-        )
-    ).all()
-    movimientos = db.query(MovimientoCaja).filter(
-        and_(
-            MovimientoCaja.tipo == TipoMovimiento.INGRESO,
-            cast(MovimientoCaja.fecha, Date) >= fecha_inicio,
-            cast(MovimientoCaja.fecha, Date) <= fecha_fin
-        )
-    ).all()
-    total_pagos = sum((p.monto or Decimal('0')) for p in pagos)
-    total_movs = sum((m.monto or Decimal('0')) for m in movimientos)
-    return total_pagos + total_movs
+def _totales_financieros(db: Session, fecha_inicio: date, fecha_fin: date) -> TotalesPeriodo:
+    """Totales del período: meses congelados desde snapshots y el resto con _totales_tramo."""
+    if settings.REPORTES_USAR_SNAPSHOTS:
+        return totales_con_snapshots(db, fecha_inicio, fecha_fin, _totales_tramo)
+    return _totales_tramo(db, fecha_inicio, fecha_fin)
 
 
-def _sumar_egresos_periodo(db: Session, fecha_inicio: date, fecha_fin: date) -> Decimal:
-    egresos = db.query(MovimientoCaja).filter(
-        and_(
-            MovimientoCaja.tipo == TipoMovimiento.EGRESO,
-            cast(MovimientoCaja.fecha, Date) >= fecha_inicio,
-            cast(MovimientoCaja.fecha, Date) <= fecha_fin
-        )
-    ).all()
-    return sum((e.monto or Decimal('0')) for e in egresos)
-
-
-def _sumar_ingresos_por_metodo_periodo(db: Session, fecha_inicio: date, fecha_fin: date) -> dict:
-    totales = {
-        'Efectivo': Decimal('0'),
-        'Nequi': Decimal('0'),
-        'Nequi Escuela': Decimal('0'),
-        'Nequi Gerencia': Decimal('0'),
-        'Daviplata': Decimal('0'),
-        'Bre-B': Decimal('0'),
-        'Transferencia Bancaria': Decimal('0'),
-        'Tarjeta Débito': Decimal('0'),
-        'Tarjeta Crédito': Decimal('0'),
-        'CrediSmart': Decimal('0'),
-        'Sistecredito': Decimal('0')
-    }
+def _totales_tramo(db: Session, fecha_inicio: date, fecha_fin: date) -> TotalesPeriodo:
+    """Totales de ingresos/egresos del tramo: resumen diario o cálculo en vivo."""
+    if settings.REPORTES_USAR_RESUMEN_DIARIO:
+        return totales_periodo(db, fecha_inicio, fecha_fin)
+    return totales_en_vivo(db, fecha_inicio, fecha_fin)
 
-    pagos = db.query(Pago).filter(
-        and_(
-            Pago.estado == EstadoPago.COMPLETADO,
-            cast(Pago.fecha_pago, Date) >= fecha_inicio,
-            cast(Pago.fecha_pago, Date) <= fecha_fin
-        )
-    ).all()
-    movimientos = db.query(MovimientoCaja).filter(
-        and_(
-            MovimientoCaja.tipo == TipoMovimiento.INGRESO,
-            cast(MovimientoCaja.fecha, Date) >= fecha_inicio,
-            cast(MovimientoCaja.fecha, Date) <= fecha_fin
-        )
-    ).all()
 
-    def acumular_metodo(metodo, monto: Decimal):
+def _totales_por_metodo_label(por_metodo: dict) -> dict:
+    """Convierte {metodo: monto} a {etiqueta: monto} con todos los métodos."""
+    totales = {etiqueta: Decimal('0') for etiqueta in _ETIQUETA_A_METODO}
+    for metodo, monto in por_metodo.items():
         key = _map_metodo_label(metodo)
-        if not key:
-            return
-        totales[key] += monto
-
-    for pago in pagos:
-        if pago.es_pago_mixto:
-            for d in pago.detalles_pago:
-                acumular_metodo(d.metodo_pago, d.monto)
-        else:
-            acumular_metodo(pago.metodo_pago, pago.monto)
+        if key:
+            totales[key] += monto
+    return totales
 
-    for mov in movimientos:
-        if mov.es_pago_mixto:
-            for d in mov.detalles_pago:
-                acumular_metodo(d.metodo_pago, d.monto)
-        else:
-            acumular_metodo(mov.metodo_pago, mov.monto)
 
-    return totales
+_ETIQUETAS_METODO = {
+    MetodoPago.EFECTIVO.value: 'Efectivo',
+    MetodoPago.NEQUI.value: 'Nequi',
+    MetodoPago.NEQUI_ESCUELA.value: 'Nequi Escuela',
+    MetodoPago.NEQUI_GERENCIA.value: 'Nequi Gerencia',
+    MetodoPago.DAVIPLATA.value: 'Daviplata',
+    MetodoPago.BRE_B.value: 'Bre-B',
+    MetodoPago.TRANSFERENCIA_BANCARIA.value: 'Transferencia Bancaria',
+    MetodoPago.TARJETA_DEBITO.value: 'Tarjeta Débito',
+    MetodoPago.TARJETA_CREDITO.value: 'Tarjeta Crédito',
+    MetodoPago.CREDISMART.value: 'CrediSmart',
+    MetodoPago.SISTECREDITO.value: 'Sistecredito'
+}
+_ETIQUETA_A_METODO = {etiqueta: metodo for metodo, etiqueta in _ETIQUETAS_METODO.items()}
 
 
 def _map_metodo_label(metodo) -> Optional[str]:
@@ -869,64 +1774,23 @@ def _map_metodo_label(metodo) -> Optional[str]:
         metodo_val = metodo.value
     else:
         metodo_val = str(metodo)
-    etiquetas = {
-        MetodoPago.EFECTIVO.value: 'Efectivo',
-        MetodoPago.NEQUI.value: 'Nequi',
-        MetodoPago.NEQUI_ESCUELA.value: 'Nequi Escuela',
-        MetodoPago.NEQUI_GERENCIA.value: 'Nequi Gerencia',
-        MetodoPago.DAVIPLATA.value: 'Daviplata',
-        MetodoPago.BRE_B.value: 'Bre-B',
-        MetodoPago.TRANSFERENCIA_BANCARIA.value: 'Transferencia Bancaria',
-        MetodoPago.TARJETA_DEBITO.value: 'Tarjeta Débito',
-        MetodoPago.TARJETA_CREDITO.value: 'Tarjeta Crédito',
-        MetodoPago.CREDISMART.value: 'CrediSmart',
-        MetodoPago.SISTECREDITO.value: 'Sistecredito'
-    }
-    return etiquetas.get(metodo_val)
-
-
-def _bucket_key(fecha: datetime, label_agrupacion: str) -> str:
-    if label_agrupacion == 'hora':
-        return fecha.strftime('%H:00')
-    if label_agrupacion == 'dia':
-        return fecha.strftime('%Y-%m-%d')
-    if label_agrupacion == 'semana':
-        year, week, _ = fecha.isocalendar()
-        return f"{year}-{week:02d}"
-    return fecha.strftime('%Y-%m')
-
-
-def _ordenar_buckets(keys: list, label_agrupacion: str) -> list:
-    if label_agrupacion == 'hora':
-        return sorted(keys, key=lambda k: int(k.split(':')[0]))
-    if label_agrupacion == 'semana':
-        return sorted(keys, key=lambda k: (int(k.split('-')[0]), int(k.split('-')[1])))
-    return sorted(keys)
+    return _ETIQUETAS_METODO.get(metodo_val)
 
 
 def _grafico_egresos_categoria(db: Session, fecha_inicio: date, fecha_fin: date) -> GraficoEgresos:
     """Gráfico de egresos por categoría"""
-    resultado = db.query(
-        MovimientoCaja.categoria,
-        func.sum(MovimientoCaja.monto).label('total')
-    ).filter(
-        and_(
-            MovimientoCaja.tipo == TipoMovimiento.EGRESO,
-            cast(MovimientoCaja.fecha, Date) >= fecha_inicio,
-            cast(MovimientoCaja.fecha, Date) <= fecha_fin
-        )
-    ).group_by(MovimientoCaja.categoria).all()
+    por_categoria = _totales_financieros(db, fecha_inicio, fecha_fin).egresos_por_categoria
     
-    total = sum((r.total or Decimal('0')) for r in resultado)
+    total = sum(por_categoria.values(), Decimal('0'))
     
     datos = [
         DatoCategoria(
-            nombre=r.categoria.value if r.categoria else "OTROS",
-            valor=r.total or Decimal('0'),
-            porcentaje=float((r.total / total) * 100) if total > 0 and r.total else 0.0
+            nombre=nombre,
+            valor=valor,
+            porcentaje=float((valor / total) * 100) if total > 0 else 0.0
         )
-        for r in resultado
-        if r.total and r.total > 0
+        for nombre, valor in por_categoria.items()
+        if valor and valor > 0
     ]
     
     # Ordenar por valor descendente y tomar top 5
@@ -942,96 +1806,108 @@ def _grafico_egresos_categoria(db: Session, fecha_inicio: date, fecha_fin: date)
     )
 
 
-def _lista_estudiantes_registrados(db: Session, fecha_inicio: date, fecha_fin: date) -> list:
-    """Lista de estudiantes registrados en el período"""
-    estudiantes = db.query(Estudiante).filter(
-        and_(
-            cast(Estudiante.fecha_inscripcion, Date) >= fecha_inicio,
-            cast(Estudiante.fecha_inscripcion, Date) <= fecha_fin
-        )
-    ).order_by(Estudiante.fecha_inscripcion.desc()).all()
-    
-    lista = []
-    for est in estudiantes:
-        lista.append(EstudianteRegistrado(
-            id=est.id,
-            nombre_completo=est.usuario.nombre_completo if est.usuario else "N/A",
-            documento=est.usuario.cedula if est.usuario else "N/A",
-            categoria=est.categoria.value if est.categoria else None,
-            fecha_inscripcion=est.fecha_inscripcion,
-            origen_cliente=est.origen_cliente.value if est.origen_cliente else None,
-            referido_por=est.referido_por,
-            valor_total_curso=est.valor_total_curso,
-            estado=est.estado.value
-        ))
-    
-    return lista
+def _query_estudiantes_registrados(db: Session, fecha_inicio: date, fecha_fin: date):
+    """Estudiantes registrados en el período"""
+    return db.query(Estudiante).options(
+        joinedload(Estudiante.usuario)
+    ).filter(
+        *filtro_fechas(Estudiante.fecha_inscripcion, fecha_inicio, fecha_fin)
+    )
 
 
-def _lista_estudiantes_pagos(db: Session, fecha_inicio: date, fecha_fin: date) -> list:
-    """Lista de estudiantes que realizaron pagos en el período"""
-    pagos = db.query(Pago).filter(
-        and_(
-            Pago.estado == EstadoPago.COMPLETADO,
-            cast(Pago.fecha_pago, Date) >= fecha_inicio,
-            cast(Pago.fecha_pago, Date) <= fecha_fin
-        )
-    ).order_by(Pago.fecha_pago.desc()).all()
-    
-    lista = []
-    for pago in pagos:
-        est = pago.estudiante
-        if not est or not est.usuario:
-            continue
-            
-        lista.append(EstudiantePago(
-            pago_id=pago.id,
-            estudiante_id=est.id,
-            nombre_completo=est.usuario.nombre_completo,
-            documento=est.usuario.cedula,
-            categoria=est.categoria.value if est.categoria else None,
-            fecha_pago=pago.fecha_pago,
-            concepto=pago.concepto,
-            monto=pago.monto,
-            metodo_pago=pago.metodo_pago.value if pago.metodo_pago else None,
-            es_pago_mixto=bool(pago.es_pago_mixto),
-            saldo_pendiente=est.saldo_pendiente
-        ))
-    
-    return lista
+def _datos_estudiante_registrado(est: Estudiante) -> dict:
+    return dict(
+        id=est.id,
+        nombre_completo=est.usuario.nombre_completo if est.usuario else "N/A",
+        documento=est.usuario.cedula if est.usuario else "N/A",
+        categoria=est.categoria.value if est.categoria else None,
+        fecha_inscripcion=est.fecha_inscripcion,
+        origen_cliente=est.origen_cliente.value if est.origen_cliente else None,
+        referido_por=est.referido_por,
+        valor_total_curso=est.valor_total_curso,
+        estado=est.estado.value
+    )
 
 
-def _lista_egresos_caja(db: Session, fecha_inicio: date, fecha_fin: date) -> list:
-    egresos = db.query(MovimientoCaja).filter(
-        and_(
-            MovimientoCaja.tipo == TipoMovimiento.EGRESO,
-            cast(MovimientoCaja.fecha, Date) >= fecha_inicio,
-            cast(MovimientoCaja.fecha, Date) <= fecha_fin
-        )
-    ).order_by(MovimientoCaja.fecha.desc()).all()
+def _query_estudiantes_pagos(db: Session, fecha_inicio: date, fecha_fin: date):
+    """Pagos completados en el período (solo de estudiantes con usuario)"""
+    return db.query(Pago).join(
+        Pago.estudiante
+    ).join(
+        Estudiante.usuario
+    ).options(
+        contains_eager(Pago.estudiante).contains_eager(Estudiante.usuario)
+    ).filter(
+        Pago.estado == EstadoPago.COMPLETADO,
+        *filtro_fechas(Pago.fecha_pago, fecha_inicio, fecha_fin)
+    )
 
-    lista = []
-    for eg in egresos:
-        if eg.es_pago_mixto:
-            metodo_label = "MIXTO"
-        else:
-            metodo = eg.metodo_pago
-            metodo_label = metodo.value if hasattr(metodo, "value") else (metodo or "N/A")
-        lista.append(EgresoCajaItem(
-            egreso_id=eg.id,
-            fecha=eg.fecha,
-            concepto=eg.concepto,
-            categoria=eg.categoria.value if eg.categoria else None,
-            metodo_pago=metodo_label,
-            monto=eg.monto,
-            usuario=eg.usuario.nombre_completo if eg.usuario else None,
-            numero_factura=eg.numero_factura,
-            observaciones=eg.observaciones
-        ))
-    return lista
 
+def _conceptos_pagos(db: Session, fecha_inicio: date, fecha_fin: date) -> List[ConceptoPagoResumen]:
+    """Cantidad y total por concepto de los mismos pagos de la lista estudiantes_pagos"""
+    total = func.sum(Pago.monto)
+    filas = db.query(
+        Pago.concepto, func.count(Pago.id), total
+    ).join(
+        Pago.estudiante
+    ).join(
+        Estudiante.usuario
+    ).filter(
+        Pago.estado == EstadoPago.COMPLETADO,
+        *filtro_fechas(Pago.fecha_pago, fecha_inicio, fecha_fin)
+    ).group_by(Pago.concepto).order_by(total.desc()).all()
+    return [
+        ConceptoPagoResumen(concepto=concepto, cantidad=cantidad, total=total or 0)
+        for concepto, cantidad, total in filas
+    ]
 
-def _lista_otros_movimientos(db: Session, fecha_inicio: date, fecha_fin: date) -> list:
+
+def _datos_estudiante_pago(pago: Pago) -> dict:
+    est = pago.estudiante
+    return dict(
+        pago_id=pago.id,
+        estudiante_id=est.id,
+        nombre_completo=est.usuario.nombre_completo,
+        documento=est.usuario.cedula,
+        categoria=est.categoria.value if est.categoria else None,
+        fecha_pago=pago.fecha_pago,
+        concepto=pago.concepto,
+        monto=pago.monto,
+        metodo_pago=pago.metodo_pago.value if pago.metodo_pago else None,
+        es_pago_mixto=bool(pago.es_pago_mixto),
+        saldo_pendiente=est.saldo_pendiente
+    )
+
+
+def _query_egresos_caja(db: Session, fecha_inicio: date, fecha_fin: date):
+    return db.query(MovimientoCaja).options(
+        joinedload(MovimientoCaja.usuario)
+    ).filter(
+        MovimientoCaja.tipo == TipoMovimiento.EGRESO,
+        *filtro_fechas(MovimientoCaja.fecha, fecha_inicio, fecha_fin)
+    )
+
+
+def _datos_egreso_caja(eg: MovimientoCaja) -> dict:
+    if eg.es_pago_mixto:
+        metodo_label = "MIXTO"
+    else:
+        metodo = eg.metodo_pago
+        metodo_label = metodo.value if hasattr(metodo, "value") else (metodo or "N/A")
+    return dict(
+        egreso_id=eg.id,
+        fecha=eg.fecha,
+        concepto=eg.concepto,
+        categoria=eg.categoria.value if eg.categoria else None,
+        metodo_pago=metodo_label,
+        monto=eg.monto,
+        usuario=eg.usuario.nombre_completo if eg.usuario else None,
+        numero_factura=eg.numero_factura,
+        observaciones=eg.observaciones
+    )
+
+
+def _query_otros_movimientos(db: Session, fecha_inicio: date, fecha_fin: date):
     categorias = [
         ConceptoMovimientoCaja.ESTUDIANTE_NO_REGISTRADO,
         ConceptoMovimientoCaja.PAGO_PRESTAMO_EMPLEADO,
@@ -1039,99 +1915,144 @@ def _lista_otros_movimientos(db: Session, fecha_inicio: date, fecha_fin: date) -
         ConceptoMovimientoCaja.INGRESO_ADMINISTRATIVO,
         ConceptoMovimientoCaja.OTROS,
     ]
-    movimientos = db.query(MovimientoCaja).filter(
-        and_(
-            MovimientoCaja.tipo == TipoMovimiento.INGRESO,
-            MovimientoCaja.categoria.in_(categorias),
-            cast(MovimientoCaja.fecha, Date) >= fecha_inicio,
-            cast(MovimientoCaja.fecha, Date) <= fecha_fin
+    return db.query(MovimientoCaja).options(
+        joinedload(MovimientoCaja.usuario)
+    ).filter(
+        MovimientoCaja.tipo == TipoMovimiento.INGRESO,
+        MovimientoCaja.categoria.in_(categorias),
+        *filtro_fechas(MovimientoCaja.fecha, fecha_inicio, fecha_fin)
+    )
+
+
+def _datos_otro_movimiento(mov: MovimientoCaja) -> dict:
+    metodo = mov.metodo_pago
+    metodo_label = metodo.value if hasattr(metodo, "value") else (metodo or "N/A")
+    return dict(
+        movimiento_id=mov.id,
+        tipo=mov.tipo.value if hasattr(mov.tipo, "value") else str(mov.tipo),
+        fecha=mov.fecha,
+        concepto=mov.concepto,
+        categoria=mov.categoria.value if mov.categoria else None,
+        metodo_pago=metodo_label,
+        monto=mov.monto,
+        tercero_nombre=mov.tercero_nombre,
+        tercero_documento=mov.tercero_documento,
+        usuario=mov.usuario.nombre_completo if mov.usuario else None
+    )
+
+
+# Listas de detalle del dashboard: nombre -> (query, columna fecha, columna id, datos de la fila, schema)
+_LISTAS_DASHBOARD = {
+    "estudiantes_registrados": (
+        _query_estudiantes_registrados, Estudiante.fecha_inscripcion, Estudiante.id,
+        _datos_estudiante_registrado, EstudianteRegistrado
+    ),
+    "estudiantes_pagos": (
+        _query_estudiantes_pagos, Pago.fecha_pago, Pago.id,
+        _datos_estudiante_pago, EstudiantePago
+    ),
+    "egresos_caja": (
+        _query_egresos_caja, MovimientoCaja.fecha, MovimientoCaja.id,
+        _datos_egreso_caja, EgresoCajaItem
+    ),
+    "otros_movimientos": (
+        _query_otros_movimientos, MovimientoCaja.fecha, MovimientoCaja.id,
+        _datos_otro_movimiento, MovimientoCajaItem
+    ),
+}
+
+
+def _pagina_lista(
+    db: Session,
+    nombre: str,
+    fecha_inicio: date,
+    fecha_fin: date,
+    limite: int,
+    cursor: Optional[str] = None
+) -> PaginaLista:
+    """
+    Una página de la lista ordenada por fecha descendente. El total solo se
+    calcula en la primera página (sin cursor).
+    """
+    construir_query, columna_fecha, columna_id, datos_fila, schema = _LISTAS_DASHBOARD[nombre]
+    query = construir_query(db, fecha_inicio, fecha_fin)
+
+    total = None
+    if cursor:
+        try:
+            query = query.filter(filtro_despues_de_cursor(columna_fecha, columna_id, cursor))
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor de paginación inválido"
+            )
+    else:
+        total = query.order_by(None).count()
+
+    filas = query.order_by(columna_fecha.desc(), columna_id.desc()).limit(limite + 1).all()
+    siguiente_cursor = None
+    if len(filas) > limite:
+        filas = filas[:limite]
+        ultima = filas[-1]
+        siguiente_cursor = codificar_cursor(
+            getattr(ultima, columna_fecha.key), getattr(ultima, columna_id.key)
         )
-    ).order_by(MovimientoCaja.fecha.desc()).all()
 
-    lista = []
-    for mov in movimientos:
-        metodo = mov.metodo_pago
-        metodo_label = metodo.value if hasattr(metodo, "value") else (metodo or "N/A")
-        lista.append(MovimientoCajaItem(
-            movimiento_id=mov.id,
-            tipo=mov.tipo.value if hasattr(mov.tipo, "value") else str(mov.tipo),
-            fecha=mov.fecha,
-            concepto=mov.concepto,
-            categoria=mov.categoria.value if mov.categoria else None,
-            metodo_pago=metodo_label,
-            monto=mov.monto,
-            tercero_nombre=mov.tercero_nombre,
-            tercero_documento=mov.tercero_documento,
-            usuario=mov.usuario.nombre_completo if mov.usuario else None
-        ))
-    return lista
+    return PaginaLista(
+        items=[schema(**datos_fila(fila)) for fila in filas],
+        total=total,
+        siguiente_cursor=siguiente_cursor
+    )
 
 
 def _ranking_referidos(db: Session, fecha_inicio: date, fecha_fin: date) -> list:
     """Ranking de referidos que más estudiantes envían"""
-    from app.models.estudiante import OrigenCliente
-    
-    # Obtener todos los estudiantes referidos en el período (o todos si se requiere vista completa)
-    estudiantes_referidos = db.query(Estudiante).filter(
-        and_(
-            Estudiante.origen_cliente == OrigenCliente.REFERIDO,
-            Estudiante.referido_por.isnot(None),
-            cast(Estudiante.fecha_inscripcion, Date) >= fecha_inicio,
-            cast(Estudiante.fecha_inscripcion, Date) <= fecha_fin
-        )
-    ).all()
-    
+    ranking = _consulta_ranking_referidos(db, fecha_inicio, fecha_fin)
     # Si no hay datos en el período, mostrar ranking histórico
-    if not estudiantes_referidos:
-        estudiantes_referidos = db.query(Estudiante).filter(
-            Estudiante.origen_cliente == OrigenCliente.REFERIDO,
-            Estudiante.referido_por.isnot(None)
-        ).all()
-    
-    # Agrupar por referido
-    referidos_dict = {}
-    for est in estudiantes_referidos:
-        nombre_ref = est.referido_por.strip().upper()
-        if not nombre_ref:
-            continue
-            
-        if nombre_ref not in referidos_dict:
-            referidos_dict[nombre_ref] = {
-                'nombre': est.referido_por,
-                'telefono': est.telefono_referidor,
-                'estudiantes': [],
-                'total_ingresos': Decimal('0'),
-                'activos': 0,
-                'graduados': 0,
-                'ultima_fecha': None
-            }
-        
-        ref_data = referidos_dict[nombre_ref]
-        ref_data['estudiantes'].append(est)
-        ref_data['total_ingresos'] += est.valor_total_curso or Decimal('0')
-        
-        if est.estado in [EstadoEstudiante.INSCRITO, EstadoEstudiante.EN_FORMACION, EstadoEstudiante.LISTO_EXAMEN]:
-            ref_data['activos'] += 1
-        elif est.estado == EstadoEstudiante.GRADUADO:
-            ref_data['graduados'] += 1
-            
-        if not ref_data['ultima_fecha'] or est.fecha_inscripcion > ref_data['ultima_fecha']:
-            ref_data['ultima_fecha'] = est.fecha_inscripcion
-    
-    # Convertir a lista y ordenar por total de estudiantes
-    ranking = [
+    if not ranking:
+        ranking = _consulta_ranking_referidos(db)
+    return ranking
+
+
+def _consulta_ranking_referidos(
+    db: Session,
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    limite: int = 10
+) -> list:
+    """Top de referidores agrupado en SQL (usa ix_estudiantes_referidor_fecha_inscripcion)"""
+    total_estudiantes = func.count(Estudiante.id)
+    ultima_fecha = func.max(Estudiante.fecha_inscripcion)
+    filas = db.query(
+        Referidor.nombre,
+        Referidor.telefono,
+        total_estudiantes.label("total_estudiantes"),
+        func.coalesce(func.sum(Estudiante.valor_total_curso), 0).label("total_ingresos"),
+        func.count(Estudiante.id).filter(
+            Estudiante.estado.in_([EstadoEstudiante.INSCRITO, EstadoEstudiante.EN_FORMACION, EstadoEstudiante.LISTO_EXAMEN])
+        ).label("activos"),
+        func.count(Estudiante.id).filter(Estudiante.estado == EstadoEstudiante.GRADUADO).label("graduados"),
+        ultima_fecha.label("ultima_fecha"),
+    ).join(
+        Estudiante, Estudiante.referidor_id == Referidor.id
+    ).filter(
+        Estudiante.origen_cliente == OrigenCliente.REFERIDO,
+        *filtro_fechas(Estudiante.fecha_inscripcion, fecha_inicio, fecha_fin)
+    ).group_by(
+        Referidor.id
+    ).order_by(
+        total_estudiantes.desc(), ultima_fecha.desc().nulls_last(), Referidor.id
+    ).limit(limite).all()
+
+    return [
         ReferidoRanking(
-            referido_nombre=data['nombre'],
-            telefono=data['telefono'],
-            total_estudiantes_referidos=len(data['estudiantes']),
-            total_ingresos_generados=data['total_ingresos'],
-            estudiantes_activos=data['activos'],
-            estudiantes_graduados=data['graduados'],
-            ultima_referencia_fecha=data['ultima_fecha']
+            referido_nombre=f.nombre,
+            telefono=f.telefono,
+            total_estudiantes_referidos=f.total_estudiantes,
+            total_ingresos_generados=f.total_ingresos,
+            estudiantes_activos=f.activos,
+            estudiantes_graduados=f.graduados,
+            ultima_referencia_fecha=f.ultima_fecha
         )
-        for nombre_ref, data in referidos_dict.items()
+        for f in filas
     ]
-    
-    # Ordenar por total de estudiantes referidos (descendente) y tomar top 10
-    ranking.sort(key=lambda x: x.total_estudiantes_referidos, reverse=True)
-    return ranking[:10]
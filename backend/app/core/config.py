@@ -72,6 +72,42 @@ class Settings(BaseSettings):
     FACTUS_ITEM_IS_EXCLUDED: int = 0
     FACTUS_ITEM_DISCOUNT_RATE: int = 0
     FACTUS_ITEM_CODE_REFERENCE: Optional[str] = None
+
+    # Reportes
+    REPORTES_USAR_RESUMEN_DIARIO: bool = True
+    REPORTES_USAR_SNAPSHOTS: bool = True
+    REPORTES_CACHE_ENABLED: bool = True
+    REPORTES_CACHE_TTL_SECONDS: int = 60
+    REPORTES_CACHE_MAX_ENTRADAS: int = 128
+    REPORTES_DASHBOARD_PARALELO: bool = True
+    REPORTES_DASHBOARD_HILOS: int = 4
+    REPORTES_LISTA_TAMANO_PAGINA: int = 50
+    REPORTES_EXPORTACION_LOTE: int = 1000
+    REPORTES_ANALITICA_RECARGA_SEGUNDOS: int = 3600
+    REPORTES_JOBS_DIR: str = "reportes_jobs"
+    REPORTES_JOBS_HILOS: int = 2
+    REPORTES_JOBS_MAX_PENDIENTES: int = 20
+    REPORTES_JOBS_TTL_SECONDS: int = 86400
+
+    # Recibos PDF ya generados (app/services/documentos_pdf.py)
+    DOCUMENTOS_PDF_DIR: str = "documentos_pdf"
+
+    # Render de PDF en procesos aparte (app/services/render_pdf.py); 0 = en el hilo del request
+    PDF_RENDER_PROCESOS: int = 2
+    PDF_RENDER_MAX_PENDIENTES: int = 32
+    PDF_RENDER_TIMEOUT_SEGUNDOS: int = 60
+
+    # Outbox (correos y facturación fuera del request)
+    OUTBOX_ENABLED: bool = True
+    OUTBOX_INTERVALO_SEGUNDOS: int = 5
+    OUTBOX_LOTE: int = 20
+    OUTBOX_MAX_INTENTOS: int = 8
+    OUTBOX_BACKOFF_BASE_SEGUNDOS: int = 30
+    OUTBOX_BACKOFF_MAX_SEGUNDOS: int = 3600
+    OUTBOX_RESERVA_SEGUNDOS: int = 300
+
+    # Métricas (Server-Timing y /metrics)
+    METRICAS_ENABLED: bool = True
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,293 @@
+"""
+Instrumentación por request: consultas SQL, tiempo en base de datos y tiempo
+del handler.
+
+- Los eventos de SQLAlchemy (before/after_cursor_execute) suman cada consulta
+  a la medición del request en curso, guardada en un ContextVar.
+- MetricasMiddleware crea la medición, agrega Server-Timing y X-Consultas-DB
+  a la respuesta y acumula histogramas por ruta (ver estadisticas_metricas).
+- presupuesto_consultas() permite a scripts o tests exigir un máximo de
+  consultas para un bloque de código.
+- El render de PDF (app.services.render_pdf) publica la profundidad de su
+  cola, la espera y el tiempo de render.
+
+Las métricas son por proceso, igual que el cache de reportes.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+# Límites superiores (inclusive) de los buckets de los histogramas
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+BUCKETS_CONSULTAS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+LARGO_MAXIMO_SQL = 500
+
+
+@dataclass
+class Medicion:
+    """Consultas y tiempos de un request (o de un bloque medido)"""
+    consultas: int = 0
+    tiempo_db: float = 0.0
+    mas_lenta: float = 0.0
+    sql_mas_lenta: Optional[str] = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def registrar(self, duracion: float, sql: str) -> None:
+        # Las secciones paralelas del dashboard registran desde varios hilos
+        with self._lock:
+            self.consultas += 1
+            self.tiempo_db += duracion
+            if duracion > self.mas_lenta:
+                self.mas_lenta = duracion
+                self.sql_mas_lenta = sql
+
+
+_medicion_actual: ContextVar[Optional[Medicion]] = ContextVar("medicion_actual", default=None)
+# Mediciones de bloque (medir_consultas): ven todas las consultas del proceso,
+# también las que corren en el hilo del event loop de un TestClient
+_mediciones_bloque: Tuple[Medicion, ...] = ()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _antes_de_consulta(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("inicio_consulta", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _despues_de_consulta(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get("inicio_consulta")
+    if not inicios:
+        return
+    duracion = time.perf_counter() - inicios.pop()
+    medicion = _medicion_actual.get()
+    if medicion is not None:
+        medicion.registrar(duracion, statement)
+    for extra in _mediciones_bloque:
+        extra.registrar(duracion, statement)
+
+
+# ==================== HISTOGRAMAS POR RUTA ====================
+
+class _Histograma:
+    def __init__(self, limites: Tuple[float, ...]):
+        self.limites = limites
+        self.conteos = [0] * (len(limites) + 1)  # el último es +Inf
+        self.suma = 0.0
+        self.total = 0
+        self.maximo = 0.0
+
+    def observar(self, valor: float) -> None:
+        self.total += 1
+        self.suma += valor
+        self.maximo = max(self.maximo, valor)
+        for i, limite in enumerate(self.limites):
+            if valor <= limite:
+                self.conteos[i] += 1
+                return
+        self.conteos[-1] += 1
+
+    def como_dict(self) -> Dict[str, Any]:
+        buckets = {str(limite): conteo for limite, conteo in zip(self.limites, self.conteos)}
+        buckets["+Inf"] = self.conteos[-1]
+        return {
+            "total": self.total,
+            "promedio": round(self.suma / self.total, 3) if self.total else 0.0,
+            "maximo": round(self.maximo, 3),
+            "buckets": buckets,
+        }
+
+
+class _MetricasRuta:
+    def __init__(self):
+        self.duracion_ms = _Histograma(BUCKETS_MS)
+        self.db_ms = _Histograma(BUCKETS_MS)
+        self.consultas = _Histograma(BUCKETS_CONSULTAS)
+        self.consulta_mas_lenta_ms = 0.0
+        self.sql_mas_lenta: Optional[str] = None
+
+
+_LOCK = threading.Lock()
+_RUTAS: Dict[Tuple[str, str], _MetricasRuta] = {}
+
+
+def registrar_request(metodo: str, ruta: str, duracion: float, medicion: Medicion) -> None:
+    with _LOCK:
+        metricas = _RUTAS.get((metodo, ruta))
+        if metricas is None:
+            metricas = _RUTAS[(metodo, ruta)] = _MetricasRuta()
+        metricas.duracion_ms.observar(duracion * 1000)
+        metricas.db_ms.observar(medicion.tiempo_db * 1000)
+        metricas.consultas.observar(medicion.consultas)
+        if medicion.mas_lenta * 1000 > metricas.consulta_mas_lenta_ms:
+            metricas.consulta_mas_lenta_ms = medicion.mas_lenta * 1000
+            metricas.sql_mas_lenta = (medicion.sql_mas_lenta or "")[:LARGO_MAXIMO_SQL]
+
+
+def estadisticas_metricas() -> Dict[str, Any]:
+    with _LOCK:
+        return {
+            "render_pdf": {
+                "en_cola": _RENDER_PDF.en_cola,
+                "en_proceso": _RENDER_PDF.en_proceso,
+                "max_en_cola": _RENDER_PDF.max_en_cola,
+                "rechazados": _RENDER_PDF.rechazados,
+                "espera_ms": _RENDER_PDF.espera_ms.como_dict(),
+                "render_ms": _RENDER_PDF.render_ms.como_dict(),
+            },
+            "rutas": [
+                {
+                    "metodo": metodo,
+                    "ruta": ruta,
+                    "duracion_ms": m.duracion_ms.como_dict(),
+                    "db_ms": m.db_ms.como_dict(),
+                    "consultas": m.consultas.como_dict(),
+                    "consulta_mas_lenta_ms": round(m.consulta_mas_lenta_ms, 3),
+                    "sql_mas_lenta": m.sql_mas_lenta,
+                }
+                for (metodo, ruta), m in sorted(_RUTAS.items(), key=lambda item: (item[0][1], item[0][0]))
+            ]
+        }
+
+
+def reiniciar_metricas() -> None:
+    global _RENDER_PDF
+    with _LOCK:
+        _RUTAS.clear()
+        anterior = _RENDER_PDF
+        _RENDER_PDF = _MetricasRenderPdf()
+        # La cola actual no se reinicia, solo los acumulados
+        _RENDER_PDF.en_cola = anterior.en_cola
+        _RENDER_PDF.en_proceso = anterior.en_proceso
+
+
+# ==================== RENDER DE PDF ====================
+
+class _MetricasRenderPdf:
+    def __init__(self):
+        self.en_cola = 0
+        self.en_proceso = 0
+        self.max_en_cola = 0
+        self.rechazados = 0
+        self.espera_ms = _Histograma(BUCKETS_MS)
+        self.render_ms = _Histograma(BUCKETS_MS)
+
+
+_RENDER_PDF = _MetricasRenderPdf()
+
+
+def actualizar_cola_pdf(en_cola: int, en_proceso: int) -> None:
+    with _LOCK:
+        _RENDER_PDF.en_cola = en_cola
+        _RENDER_PDF.en_proceso = en_proceso
+        _RENDER_PDF.max_en_cola = max(_RENDER_PDF.max_en_cola, en_cola)
+
+
+def registrar_render_pdf(espera: float, duracion: float) -> None:
+    with _LOCK:
+        _RENDER_PDF.espera_ms.observar(espera * 1000)
+        _RENDER_PDF.render_ms.observar(duracion * 1000)
+
+
+def registrar_rechazo_pdf() -> None:
+    with _LOCK:
+        _RENDER_PDF.rechazados += 1
+
+
+# ==================== MIDDLEWARE ====================
+
+_RUTAS_POR_ENDPOINT: Dict[Any, str] = {}
+
+
+def _plantilla_ruta(scope) -> str:
+    """Ruta con parámetros sin resolver (/caja/{caja_id}) para no explotar la cardinalidad"""
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return "sin_ruta"
+    if not _RUTAS_POR_ENDPOINT:
+        for route in scope["app"].routes:
+            if hasattr(route, "endpoint"):
+                _RUTAS_POR_ENDPOINT.setdefault(route.endpoint, route.path)
+    return _RUTAS_POR_ENDPOINT.get(endpoint, "sin_ruta")
+
+
+class MetricasMiddleware:
+    """Middleware ASGI: mide cada request HTTP y agrega Server-Timing"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.METRICAS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        medicion = Medicion()
+        token = _medicion_actual.set(medicion)
+        inicio = time.perf_counter()
+        duracion_handler = None
+
+        async def send_con_metricas(message):
+            nonlocal duracion_handler
+            if message["type"] == "http.response.start":
+                duracion_handler = time.perf_counter() - inicio
+                encabezados = list(message.get("headers", []))
+                server_timing = (
+                    f'db;dur={medicion.tiempo_db * 1000:.1f};desc="{medicion.consultas} consultas", '
+                    f'db-max;dur={medicion.mas_lenta * 1000:.1f}, '
+                    f'app;dur={duracion_handler * 1000:.1f}'
+                )
+                encabezados.append((b"server-timing", server_timing.encode("latin-1")))
+                encabezados.append((b"x-consultas-db", str(medicion.consultas).encode("latin-1")))
+                message = {**message, "headers": encabezados}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_con_metricas)
+        finally:
+            _medicion_actual.reset(token)
+            registrar_request(
+                scope.get("method", ""),
+                _plantilla_ruta(scope),
+                duracion_handler if duracion_handler is not None else time.perf_counter() - inicio,
+                medicion
+            )
+
+
+# ==================== PRESUPUESTO DE CONSULTAS ====================
+
+@contextmanager
+def medir_consultas():
+    """Mide todas las consultas que ejecuta el proceso mientras dura el bloque"""
+    global _mediciones_bloque
+    medicion = Medicion()
+    with _LOCK:
+        _mediciones_bloque = _mediciones_bloque + (medicion,)
+    try:
+        yield medicion
+    finally:
+        with _LOCK:
+            _mediciones_bloque = tuple(m for m in _mediciones_bloque if m is not medicion)
+
+
+@contextmanager
+def presupuesto_consultas(maximo: int):
+    """
+    Falla con AssertionError si el bloque ejecuta más de `maximo` consultas.
+    Uso (script o test con TestClient):
+        with presupuesto_consultas(5):
+            client.get("/api/v1/caja/historial")
+    """
+    with medir_consultas() as medicion:
+        yield medicion
+    assert medicion.consultas <= maximo, (
+        f"Se ejecutaron {medicion.consultas} consultas (máximo {maximo}); "
+        f"la más lenta ({medicion.mas_lenta * 1000:.1f} ms): {(medicion.sql_mas_lenta or '')[:200]}"
+    )
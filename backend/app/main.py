@@ -1,7 +1,12 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.api.v1.api import api_router
 from app.core.config import settings
+from app.core.metricas import MetricasMiddleware
+from app.services.outbox import despachador_outbox
+from app.services.render_pdf import ColaPdfLlena, iniciar_render_pdf, detener_render_pdf
+from app.utils.pdf import cargar_marca
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -16,12 +21,51 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Consultas-DB", "X-Siguiente-Cursor"],
 )
 
+# Consultas SQL y tiempos por request (Server-Timing, /api/v1/metrics)
+app.add_middleware(MetricasMiddleware)
+
 # Incluir routers
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 
+# Despachador del outbox (recibos por correo y facturas Factus)
+@app.on_event("startup")
+def iniciar_outbox():
+    if settings.OUTBOX_ENABLED:
+        despachador_outbox.iniciar()
+
+
+@app.on_event("shutdown")
+def detener_outbox():
+    despachador_outbox.detener()
+
+
+# Logo de los PDF decodificado una vez, no en el primer recibo, y procesos de
+# render de PDF listos antes del primer request
+@app.on_event("startup")
+def precargar_marca_pdf():
+    cargar_marca()
+    iniciar_render_pdf()
+
+
+@app.on_event("shutdown")
+def detener_procesos_pdf():
+    detener_render_pdf()
+
+
+# Cola de render de PDF llena: el cliente reintenta en unos segundos
+@app.exception_handler(ColaPdfLlena)
+def cola_pdf_llena(request: Request, exc: ColaPdfLlena):
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "5"}
+    )
+
+
 @app.get("/")
 def root():
     return {"message": "CEA EDUCAR API - Sistema de Gestión"}
@@ -1,4 +1,5 @@
 from app.models.usuario import Usuario, RolUsuario
+from app.models.referidor import Referidor
 from app.models.estudiante import Estudiante, CategoriaLicencia, EstadoEstudiante, OrigenCliente, TipoServicio
 from app.models.pago import Pago, MetodoPago, EstadoPago
 from app.models.compromiso_pago import CompromisoPago, CuotaPago, FrecuenciaPago, EstadoCuota
@@ -16,14 +17,23 @@ from app.models.clase import (
 )
 from app.models.tarifa import Tarifa
 from app.models.caja import Caja, MovimientoCaja, EstadoCaja, TipoMovimiento, ConceptoMovimientoCaja
+from app.models.resumen_financiero import ResumenFinancieroDiario
+from app.models.snapshot_financiero import SnapshotCaja, SnapshotMensual, MesCongelado
+from app.models.vencimiento import Vencimiento, TipoEntidadVencimiento
+from app.models.outbox import EventoOutbox, EstadoEventoOutbox
 
 __all__ = [
     "Usuario", "RolUsuario",
+    "Referidor",
     "Estudiante", "CategoriaLicencia", "EstadoEstudiante", "OrigenCliente", "TipoServicio",
     "Pago", "MetodoPago", "EstadoPago",
     "CompromisoPago", "CuotaPago", "FrecuenciaPago", "EstadoCuota",
     "Clase", "Instructor", "Vehiculo", "Evaluacion", "MantenimientoVehiculo", "RepuestoMantenimiento", "CombustibleVehiculo",
     "AdjuntoMantenimientoVehiculo", "AdjuntoCombustibleVehiculo", "VehiculoConsumoUmbral",
     "Tarifa",
-    "Caja", "MovimientoCaja", "EstadoCaja", "TipoMovimiento", "ConceptoMovimientoCaja"
+    "Caja", "MovimientoCaja", "EstadoCaja", "TipoMovimiento", "ConceptoMovimientoCaja",
+    "ResumenFinancieroDiario",
+    "SnapshotCaja", "SnapshotMensual", "MesCongelado",
+    "Vencimiento", "TipoEntidadVencimiento",
+    "EventoOutbox", "EstadoEventoOutbox"
 ]
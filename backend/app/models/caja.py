@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Numeric, Text, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Numeric, Text, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from decimal import Decimal
@@ -26,7 +26,7 @@ class Caja(Base):
     id = Column(Integer, primary_key=True, index=True)
     
     # Control de apertura/cierre
-    fecha_apertura = Column(DateTime, default=datetime.utcnow, nullable=False)
+    fecha_apertura = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     fecha_cierre = Column(DateTime)
     usuario_apertura_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
     usuario_cierre_id = Column(Integer, ForeignKey("usuarios.id"))
@@ -54,6 +54,17 @@ class Caja(Base):
     total_egresos_transferencia = Column(Numeric(12, 2), default=0, nullable=False)
     total_egresos_tarjeta = Column(Numeric(12, 2), default=0, nullable=False)
     
+    # Egresos por método (saldo disponible al registrar egresos). El efectivo
+    # usa total_egresos_efectivo; ver app/services/contadores_caja.py
+    total_egresos_nequi = Column(Numeric(12, 2), default=0, nullable=False)
+    total_egresos_nequi_escuela = Column(Numeric(12, 2), default=0, nullable=False)
+    total_egresos_nequi_gerencia = Column(Numeric(12, 2), default=0, nullable=False)
+    total_egresos_daviplata = Column(Numeric(12, 2), default=0, nullable=False)
+    total_egresos_bre_b = Column(Numeric(12, 2), default=0, nullable=False)
+    total_egresos_transferencia_bancaria = Column(Numeric(12, 2), default=0, nullable=False)
+    total_egresos_tarjeta_debito = Column(Numeric(12, 2), default=0, nullable=False)
+    total_egresos_tarjeta_credito = Column(Numeric(12, 2), default=0, nullable=False)
+    
     # Créditos - NO cuentan como efectivo en caja
     total_credismart = Column(Numeric(12, 2), default=0, nullable=False)
     total_sistecredito = Column(Numeric(12, 2), default=0, nullable=False)
@@ -143,6 +154,10 @@ class ConceptoMovimientoCaja(str, enum.Enum):
 class MovimientoCaja(Base):
     """Modelo de Movimientos de Caja (principalmente egresos)"""
     __tablename__ = "movimientos_caja"
+    __table_args__ = (
+        Index("ix_movimientos_caja_tipo_fecha", "tipo", "fecha"),
+        Index("ix_movimientos_caja_caja_id_tipo", "caja_id", "tipo"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     caja_id = Column(Integer, ForeignKey("cajas.id"), nullable=False)
@@ -162,7 +177,7 @@ class MovimientoCaja(Base):
     
     # Control
     usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
-    fecha = Column(DateTime, default=datetime.utcnow, nullable=False)
+    fecha = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     observaciones = Column(Text)
     tercero_nombre = Column(String(255))
     tercero_documento = Column(String(50))
@@ -185,7 +200,7 @@ class DetallePagoMovimientoCaja(Base):
     __tablename__ = "detalles_pago_movimiento_caja"
 
     id = Column(Integer, primary_key=True, index=True)
-    movimiento_id = Column(Integer, ForeignKey("movimientos_caja.id"), nullable=False)
+    movimiento_id = Column(Integer, ForeignKey("movimientos_caja.id"), nullable=False, index=True)
     metodo_pago = Column(SQLEnum(MetodoPago), nullable=False)
     monto = Column(Numeric(10, 2), nullable=False)
     referencia = Column(String(100))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Numeric, String, Text, Enum as SQLEnum
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Numeric, String, Text, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from decimal import Decimal
@@ -49,6 +49,9 @@ class CajaFuerte(Base):
 
 class MovimientoCajaFuerte(Base):
     __tablename__ = "movimientos_caja_fuerte"
+    __table_args__ = (
+        Index("ix_movimientos_caja_fuerte_caja_fecha", "caja_fuerte_id", "fecha"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     caja_fuerte_id = Column(Integer, ForeignKey("caja_fuerte.id"), nullable=False)
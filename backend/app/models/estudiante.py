@@ -1,8 +1,10 @@
-from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Text, JSON, Enum as SQLEnum, Numeric
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Text, JSON, Enum as SQLEnum, Numeric, Index, event
 from sqlalchemy.orm import relationship
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Optional
 import enum
 from app.core.database import Base
+from app.utils.fechas import parse_fecha
 
 
 class CategoriaLicencia(str, enum.Enum):
@@ -59,6 +61,9 @@ class TipoServicio(str, enum.Enum):
 class Estudiante(Base):
     """Modelo de Estudiante con expediente completo"""
     __tablename__ = "estudiantes"
+    __table_args__ = (
+        Index("ix_estudiantes_referidor_fecha_inscripcion", "referidor_id", "fecha_inscripcion"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     usuario_id = Column(Integer, ForeignKey("usuarios.id"), unique=True, nullable=False)
@@ -89,6 +94,7 @@ class Estudiante(Base):
     origen_cliente = Column(SQLEnum(OrigenCliente), nullable=True)  # Se define al asignar servicio
     referido_por = Column(String(255))  # Nombre del tramitador o guarda que lo refirió
     telefono_referidor = Column(String(20))  # Teléfono del referidor
+    referidor_id = Column(Integer, ForeignKey("referidores.id"), nullable=True)  # Referidor normalizado
     
     # Tipo de servicio y modalidad
     tipo_servicio = Column(SQLEnum(TipoServicio), nullable=True)  # Se define al asignar servicio
@@ -101,7 +107,7 @@ class Estudiante(Base):
     # Información académica
     categoria = Column(SQLEnum(CategoriaLicencia))  # Se define al asignar servicio
     estado = Column(SQLEnum(EstadoEstudiante), default=EstadoEstudiante.PROSPECTO, nullable=False)
-    fecha_inscripcion = Column(DateTime, default=datetime.utcnow)
+    fecha_inscripcion = Column(DateTime, default=datetime.utcnow, index=True)
     fecha_graduacion = Column(DateTime)
     no_certificado = Column(String(50))  # Número del RUNT al graduarse
     
@@ -118,6 +124,7 @@ class Estudiante(Base):
     # Integración SICOV
     sicov_pin = Column(String(50), unique=True, index=True)
     sicov_expediente_id = Column(String(100))
+    pin_vencimiento = Column(DateTime, index=True)  # Derivado, ver calcular_pin_vencimiento
     
     # Información adicional (JSON flexible)
     datos_adicionales = Column(JSON, default=dict)
@@ -131,6 +138,7 @@ class Estudiante(Base):
     clases = relationship("Clase", back_populates="estudiante")
     pagos = relationship("Pago", back_populates="estudiante")
     evaluaciones = relationship("Evaluacion", back_populates="estudiante")
+    referidor = relationship("Referidor", back_populates="estudiantes")
     
     def __repr__(self):
         return f"<Estudiante {self.usuario.nombre_completo if self.usuario else 'N/A'} - {self.categoria} - {self.estado}>"
@@ -156,3 +164,37 @@ class Estudiante(Base):
             self.horas_teoricas_completadas >= self.horas_teoricas_requeridas and
             self.horas_practicas_completadas >= self.horas_practicas_requeridas
         )
+
+
+# Claves de datos_adicionales donde se ha guardado el vencimiento del PIN SICOV
+CLAVES_PIN_VENCIMIENTO = [
+    "pin_vencimiento",
+    "pin_fecha_vencimiento",
+    "sicov_pin_vencimiento",
+    "sicov_pin_fecha_vencimiento",
+    "pin_expiracion",
+    "pin_expira",
+    "fecha_vencimiento_pin"
+]
+DIAS_VIGENCIA_PIN = 90
+
+
+def calcular_pin_vencimiento(datos_adicionales: Optional[dict], fecha_inscripcion: Optional[datetime]) -> Optional[datetime]:
+    """Vencimiento del PIN: fecha explícita en datos_adicionales o inscripción + 90 días"""
+    datos = datos_adicionales or {}
+    for key in CLAVES_PIN_VENCIMIENTO:
+        fecha = parse_fecha(datos.get(key))
+        if fecha:
+            return fecha
+    if fecha_inscripcion:
+        return fecha_inscripcion + timedelta(days=DIAS_VIGENCIA_PIN)
+    return None
+
+
+@event.listens_for(Estudiante, "before_insert")
+@event.listens_for(Estudiante, "before_update")
+def _sincronizar_pin_vencimiento(mapper, connection, target):
+    """Mantiene pin_vencimiento al día en cada escritura del estudiante"""
+    if target.fecha_inscripcion is None and target.id is None:
+        target.fecha_inscripcion = datetime.utcnow()
+    target.pin_vencimiento = calcular_pin_vencimiento(target.datos_adicionales, target.fecha_inscripcion)
@@ -0,0 +1,42 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Index
+from datetime import datetime
+import enum
+from app.core.database import Base
+
+
+class EstadoEventoOutbox(str, enum.Enum):
+    """Estados de un evento del outbox"""
+    PENDIENTE = "PENDIENTE"
+    PROCESANDO = "PROCESANDO"
+    COMPLETADO = "COMPLETADO"
+    FALLIDO = "FALLIDO"  # Agotó los reintentos
+
+
+class EventoOutbox(Base):
+    """
+    Trabajo externo (correo, facturación electrónica) pendiente de ejecutar.
+    Se inserta en la misma transacción que el registro que lo origina y lo
+    ejecuta el despachador en segundo plano (app/services/outbox.py).
+    """
+    __tablename__ = "outbox_eventos"
+    __table_args__ = (
+        Index("ix_outbox_eventos_estado_proximo_intento", "estado", "proximo_intento"),
+        Index("ix_outbox_eventos_tipo_entidad_id", "tipo", "entidad_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    tipo = Column(String(50), nullable=False)  # RECIBO_PAGO, FACTURA_FACTUS...
+    entidad_id = Column(Integer, nullable=False)  # p. ej. id del pago
+    payload = Column(JSON, nullable=True)
+
+    estado = Column(String(20), nullable=False, default=EstadoEventoOutbox.PENDIENTE.value)
+    intentos = Column(Integer, nullable=False, default=0)
+    # Pendiente: cuándo reintentar. Procesando: hasta cuándo vale la reserva
+    proximo_intento = Column(DateTime, nullable=False, default=datetime.utcnow)
+    ultimo_error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    procesado_en = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<EventoOutbox {self.id} {self.tipo} {self.entidad_id} - {self.estado}>"
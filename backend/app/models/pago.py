@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Numeric, Text, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Numeric, Text, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -31,10 +31,14 @@ class EstadoPago(str, enum.Enum):
 class Pago(Base):
     """Modelo de Pago"""
     __tablename__ = "pagos"
+    __table_args__ = (
+        Index("ix_pagos_estado_fecha_pago", "estado", "fecha_pago"),
+        Index("ix_pagos_estado_fecha_vencimiento", "estado", "fecha_vencimiento"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     estudiante_id = Column(Integer, ForeignKey("estudiantes.id"), nullable=False)
-    caja_id = Column(Integer, ForeignKey("cajas.id"), nullable=True)  # Caja donde se registró
+    caja_id = Column(Integer, ForeignKey("cajas.id"), nullable=True, index=True)  # Caja donde se registró
     
     # Información del pago
     concepto = Column(String(255), nullable=False)  # "Matrícula", "Cuota 1/3", etc.
@@ -81,7 +85,7 @@ class DetallePago(Base):
     __tablename__ = "detalles_pago"
     
     id = Column(Integer, primary_key=True, index=True)
-    pago_id = Column(Integer, ForeignKey("pagos.id"), nullable=False)
+    pago_id = Column(Integer, ForeignKey("pagos.id"), nullable=False, index=True)
     
     # Detalle por método
     metodo_pago = Column(SQLEnum(MetodoPago), nullable=False)
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.core.database import Base
+
+
+class Referidor(Base):
+    """Tramitador o guarda de tránsito que refiere estudiantes"""
+    __tablename__ = "referidores"
+
+    id = Column(Integer, primary_key=True, index=True)
+    nombre = Column(String(255), nullable=False)  # Como se escribió la primera vez
+    nombre_normalizado = Column(String(255), nullable=False, index=True)  # Mayúsculas, espacios colapsados
+    telefono = Column(String(20), unique=True, index=True)  # Solo dígitos; clave de deduplicación
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relaciones
+    estudiantes = relationship("Estudiante", back_populates="referidor")
+
+    def __repr__(self):
+        return f"<Referidor {self.nombre} - {self.telefono or 'sin teléfono'}>"
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, Numeric, UniqueConstraint
+from datetime import datetime
+from app.core.database import Base
+
+
+class ResumenFinancieroDiario(Base):
+    """Acumulado diario de ingresos y egresos por método de pago y categoría"""
+    __tablename__ = "resumen_financiero_diario"
+    __table_args__ = (
+        UniqueConstraint(
+            "fecha", "tipo", "origen", "metodo_pago", "categoria",
+            name="uq_resumen_financiero_diario"
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    fecha = Column(Date, nullable=False, index=True)
+    tipo = Column(String(20), nullable=False)  # INGRESO, EGRESO
+    origen = Column(String(20), nullable=False)  # PAGO, MOVIMIENTO
+    metodo_pago = Column(String(50), nullable=False)
+    categoria = Column(String(50), nullable=False)  # PAGO_ESTUDIANTE para pagos
+
+    # Un pago mixto suma una vez por cada método usado
+    monto = Column(Numeric(14, 2), default=0, nullable=False)
+    cantidad = Column(Integer, default=0, nullable=False)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ResumenFinancieroDiario {self.fecha} {self.tipo} {self.metodo_pago} - ${self.monto}>"
@@ -0,0 +1,96 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Numeric, UniqueConstraint
+from datetime import datetime
+from app.core.database import Base
+
+
+# Columnas de totales de Caja que se congelan en el snapshot (mismos nombres)
+COLUMNAS_TOTALES_CAJA = (
+    "saldo_inicial",
+    "total_ingresos_efectivo",
+    "total_nequi",
+    "total_nequi_escuela",
+    "total_nequi_gerencia",
+    "total_daviplata",
+    "total_bre_b",
+    "total_transferencia_bancaria",
+    "total_tarjeta_debito",
+    "total_tarjeta_credito",
+    "total_ingresos_transferencia",
+    "total_ingresos_tarjeta",
+    "total_egresos_efectivo",
+    "total_egresos_transferencia",
+    "total_egresos_tarjeta",
+    "total_credismart",
+    "total_sistecredito",
+    "efectivo_teorico",
+    "efectivo_fisico",
+    "diferencia",
+)
+
+
+class SnapshotCaja(Base):
+    """Totales de una caja congelados al cerrarla; no se modifican después"""
+    __tablename__ = "snapshots_caja"
+
+    id = Column(Integer, primary_key=True, index=True)
+    caja_id = Column(Integer, ForeignKey("cajas.id"), unique=True, nullable=False)
+    fecha_apertura = Column(DateTime, nullable=False, index=True)
+    fecha_cierre = Column(DateTime)
+
+    saldo_inicial = Column(Numeric(12, 2), default=0, nullable=False)
+    total_ingresos_efectivo = Column(Numeric(12, 2), default=0, nullable=False)
+    total_nequi = Column(Numeric(12, 2), default=0, nullable=False)
+    total_nequi_escuela = Column(Numeric(12, 2), default=0, nullable=False)
+    total_nequi_gerencia = Column(Numeric(12, 2), default=0, nullable=False)
+    total_daviplata = Column(Numeric(12, 2), default=0, nullable=False)
+    total_bre_b = Column(Numeric(12, 2), default=0, nullable=False)
+    total_transferencia_bancaria = Column(Numeric(12, 2), default=0, nullable=False)
+    total_tarjeta_debito = Column(Numeric(12, 2), default=0, nullable=False)
+    total_tarjeta_credito = Column(Numeric(12, 2), default=0, nullable=False)
+    total_ingresos_transferencia = Column(Numeric(12, 2), default=0, nullable=False)
+    total_ingresos_tarjeta = Column(Numeric(12, 2), default=0, nullable=False)
+    total_egresos_efectivo = Column(Numeric(12, 2), default=0, nullable=False)
+    total_egresos_transferencia = Column(Numeric(12, 2), default=0, nullable=False)
+    total_egresos_tarjeta = Column(Numeric(12, 2), default=0, nullable=False)
+    total_credismart = Column(Numeric(12, 2), default=0, nullable=False)
+    total_sistecredito = Column(Numeric(12, 2), default=0, nullable=False)
+    efectivo_teorico = Column(Numeric(12, 2))
+    efectivo_fisico = Column(Numeric(12, 2))
+    diferencia = Column(Numeric(12, 2))
+
+    congelado_en = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<SnapshotCaja caja={self.caja_id} {self.fecha_apertura}>"
+
+
+class SnapshotMensual(Base):
+    """
+    Flujos financieros de un mes terminado, con la misma granularidad que
+    resumen_financiero_diario (tipo, método de pago y categoría).
+    """
+    __tablename__ = "snapshots_mensuales"
+    __table_args__ = (
+        UniqueConstraint("mes", "tipo", "metodo_pago", "categoria", name="uq_snapshots_mensuales"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    mes = Column(Date, nullable=False, index=True)  # Primer día del mes
+    tipo = Column(String(20), nullable=False)  # INGRESO, EGRESO
+    metodo_pago = Column(String(50), nullable=False)
+    categoria = Column(String(50), nullable=False)
+    monto = Column(Numeric(14, 2), default=0, nullable=False)
+    cantidad = Column(Integer, default=0, nullable=False)
+
+    congelado_en = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<SnapshotMensual {self.mes} {self.tipo} {self.metodo_pago} - ${self.monto}>"
+
+
+class MesCongelado(Base):
+    """Marca de meses ya congelados (un mes sin movimientos no deja filas en snapshots_mensuales)"""
+    __tablename__ = "meses_congelados"
+
+    mes = Column(Date, primary_key=True)
+    congelado_en = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,175 @@
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint, Index, event, inspect
+from sqlalchemy.orm import Session
+from datetime import datetime, date
+from typing import Dict, Optional
+import enum
+from app.core.database import Base
+from app.models.clase import Vehiculo, Instructor
+from app.models.estudiante import Estudiante
+from app.models.pago import Pago, EstadoPago
+from app.models.compromiso_pago import CuotaPago, EstadoCuota
+
+
+class TipoEntidadVencimiento(str, enum.Enum):
+    """Entidades con fechas de vencimiento"""
+    VEHICULO = "VEHICULO"
+    INSTRUCTOR = "INSTRUCTOR"
+    ESTUDIANTE = "ESTUDIANTE"
+    PAGO = "PAGO"
+    CUOTA = "CUOTA"
+
+
+class Vencimiento(Base):
+    """
+    Calendario de vencimientos: una fila por documento o compromiso con fecha
+    de vencimiento. Se mantiene automáticamente al escribir las entidades
+    (ver eventos al final del módulo).
+    """
+    __tablename__ = "vencimientos"
+    __table_args__ = (
+        UniqueConstraint("tipo_entidad", "entidad_id", "documento", name="uq_vencimientos_entidad_documento"),
+        Index("ix_vencimientos_tipo_entidad_entidad_id", "tipo_entidad", "entidad_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    tipo_entidad = Column(String(20), nullable=False)  # TipoEntidadVencimiento
+    entidad_id = Column(Integer, nullable=False)
+    documento = Column(String(30), nullable=False)  # SOAT, RTM, LICENCIA, PIN, PAGO, CUOTA...
+    fecha_vencimiento = Column(DateTime, nullable=False, index=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<Vencimiento {self.tipo_entidad} {self.entidad_id} {self.documento} - {self.fecha_vencimiento}>"
+
+
+def _como_datetime(valor) -> Optional[datetime]:
+    if valor is None or isinstance(valor, datetime):
+        return valor
+    if isinstance(valor, date):
+        return datetime.combine(valor, datetime.min.time())
+    return None
+
+
+def _documentos_vehiculo(v: Vehiculo) -> Dict[str, Optional[datetime]]:
+    return {
+        "SOAT": _como_datetime(v.soat_vencimiento),
+        "RTM": _como_datetime(v.rtm_vencimiento),
+        "TECNOMECANICA": _como_datetime(v.tecnomecanica_vencimiento),
+        "SEGURO": _como_datetime(v.seguro_vencimiento),
+    }
+
+
+def _documentos_instructor(inst: Instructor) -> Dict[str, Optional[datetime]]:
+    return {
+        "LICENCIA": _como_datetime(inst.licencia_vigencia_hasta),
+        "CERTIFICADO": _como_datetime(inst.certificado_vigencia_hasta),
+    }
+
+
+def _documentos_estudiante(est: Estudiante) -> Dict[str, Optional[datetime]]:
+    return {"PIN": est.pin_vencimiento}
+
+
+def _documentos_pago(pago: Pago) -> Dict[str, Optional[datetime]]:
+    # Solo los pagos pendientes tienen un vencimiento que vigilar
+    return {"PAGO": pago.fecha_vencimiento if pago.estado == EstadoPago.PENDIENTE else None}
+
+
+def _documentos_cuota(cuota: CuotaPago) -> Dict[str, Optional[datetime]]:
+    abierta = cuota.estado in (EstadoCuota.PENDIENTE, EstadoCuota.PARCIAL)
+    return {"CUOTA": cuota.fecha_vencimiento if abierta else None}
+
+
+# Modelo -> (tipo de entidad, atributos que afectan los vencimientos, documentos)
+ENTIDADES_CON_VENCIMIENTO = {
+    Vehiculo: (
+        TipoEntidadVencimiento.VEHICULO,
+        ("soat_vencimiento", "rtm_vencimiento", "tecnomecanica_vencimiento", "seguro_vencimiento"),
+        _documentos_vehiculo,
+    ),
+    Instructor: (
+        TipoEntidadVencimiento.INSTRUCTOR,
+        ("licencia_vigencia_hasta", "certificado_vigencia_hasta"),
+        _documentos_instructor,
+    ),
+    Estudiante: (
+        TipoEntidadVencimiento.ESTUDIANTE,
+        ("pin_vencimiento",),
+        _documentos_estudiante,
+    ),
+    Pago: (
+        TipoEntidadVencimiento.PAGO,
+        ("fecha_vencimiento", "estado"),
+        _documentos_pago,
+    ),
+    CuotaPago: (
+        TipoEntidadVencimiento.CUOTA,
+        ("fecha_vencimiento", "estado"),
+        _documentos_cuota,
+    ),
+}
+
+
+def _filas_vencimiento(tipo: TipoEntidadVencimiento, entidad_id: int, documentos: Dict[str, Optional[datetime]]) -> list:
+    ahora = datetime.utcnow()
+    return [
+        {
+            "tipo_entidad": tipo.value,
+            "entidad_id": entidad_id,
+            "documento": documento,
+            "fecha_vencimiento": fecha,
+            "updated_at": ahora,
+        }
+        for documento, fecha in documentos.items()
+        if fecha is not None
+    ]
+
+
+def _sincronizar(connection, tipo: TipoEntidadVencimiento, entidad_id: int, documentos: Dict[str, Optional[datetime]]) -> None:
+    tabla = Vencimiento.__table__
+    connection.execute(tabla.delete().where(
+        tabla.c.tipo_entidad == tipo.value,
+        tabla.c.entidad_id == entidad_id
+    ))
+    filas = _filas_vencimiento(tipo, entidad_id, documentos)
+    if filas:
+        connection.execute(tabla.insert(), filas)
+
+
+def _registrar_eventos(modelo, tipo: TipoEntidadVencimiento, atributos: tuple, documentos) -> None:
+    @event.listens_for(modelo, "after_insert")
+    def _al_insertar(mapper, connection, target):
+        _sincronizar(connection, tipo, target.id, documentos(target))
+
+    @event.listens_for(modelo, "after_update")
+    def _al_actualizar(mapper, connection, target):
+        estado = inspect(target)
+        if any(estado.attrs[atributo].history.has_changes() for atributo in atributos):
+            _sincronizar(connection, tipo, target.id, documentos(target))
+
+    @event.listens_for(modelo, "after_delete")
+    def _al_eliminar(mapper, connection, target):
+        _sincronizar(connection, tipo, target.id, {})
+
+
+for _modelo, (_tipo, _atributos, _documentos) in ENTIDADES_CON_VENCIMIENTO.items():
+    _registrar_eventos(_modelo, _tipo, _atributos, _documentos)
+
+
+def reconstruir_vencimientos(db: Session, lote: int = 500) -> int:
+    """Recalcula toda la tabla de vencimientos desde las entidades (backfill)"""
+    db.query(Vencimiento).delete(synchronize_session=False)
+    total = 0
+    for modelo, (tipo, _, documentos) in ENTIDADES_CON_VENCIMIENTO.items():
+        filas = []
+        for entidad in db.query(modelo).yield_per(lote):
+            filas.extend(_filas_vencimiento(tipo, entidad.id, documentos(entidad)))
+            if len(filas) >= lote:
+                db.execute(Vencimiento.__table__.insert(), filas)
+                total += len(filas)
+                filas = []
+        if filas:
+            db.execute(Vencimiento.__table__.insert(), filas)
+            total += len(filas)
+    db.commit()
+    return total
@@ -1,7 +1,9 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Dict, Generic, List, Optional, TypeVar
 from decimal import Decimal
-from datetime import datetime
+from datetime import date, datetime
+
+T = TypeVar("T")
 
 
 # ==================== DATOS PARA GRÁFICOS ====================
@@ -77,6 +79,51 @@ class KPIDashboard(BaseModel):
         from_attributes = True
 
 
+class PeriodoTendencia(BaseModel):
+    """KPIs de un período de la serie y su cambio frente al período anterior"""
+    periodo: str  # "YYYY-MM", "YYYY-Www" o "YYYY-Tn"
+    fecha_inicio: date
+    fecha_fin: date
+    kpis: KPIDashboard
+    # Campo numérico de KPIDashboard -> % de cambio (None si el anterior es 0)
+    cambios_porcentuales: Dict[str, Optional[float]] = {}
+
+
+class TendenciasResponse(BaseModel):
+    """N períodos consecutivos de KPIs (del más antiguo al más reciente)"""
+    granularidad: str
+    periodos: List[PeriodoTendencia]
+    fecha_generacion: datetime
+
+
+# ==================== JOBS DE REPORTES ====================
+
+class SolicitudJobReporte(BaseModel):
+    """Reporte a calcular en segundo plano (mismos parámetros que su endpoint)"""
+    tipo: str  # dashboard, tendencias, cierre-financiero, exportar
+    formato: str = "json"  # json, csv, xlsx o pdf según el tipo
+    fecha_inicio: Optional[datetime] = None
+    fecha_fin: Optional[datetime] = None
+    comparar_periodo_anterior: bool = False
+    lista: Optional[str] = None  # solo exportar
+    granularidad: str = "mes"  # solo tendencias
+    periodos: int = Field(12, ge=1, le=60)  # solo tendencias
+
+
+class JobReporteResponse(BaseModel):
+    id: str
+    tipo: str
+    formato: str
+    estado: str  # PENDIENTE, EN_PROCESO, COMPLETADO, ERROR
+    creado_en: datetime
+    expira_en: datetime
+    iniciado_en: Optional[datetime] = None
+    terminado_en: Optional[datetime] = None
+    error: Optional[str] = None
+    tamano_bytes: Optional[int] = None
+    url_resultado: Optional[str] = None
+
+
 # ==================== LISTAS DE ESTUDIANTES ====================
 
 class EstudianteRegistrado(BaseModel):
@@ -200,6 +247,28 @@ class GraficoEgresos(BaseModel):
         from_attributes = True
 
 
+# ==================== LISTAS PAGINADAS ====================
+
+class ResumenLista(BaseModel):
+    """Total de filas de una lista del dashboard y cursor de su segunda página"""
+    total: int
+    siguiente_cursor: Optional[str] = None
+
+
+class PaginaLista(BaseModel, Generic[T]):
+    """Página de una lista del dashboard (paginación por cursor)"""
+    items: List[T]
+    total: Optional[int] = None  # Solo se calcula en la primera página
+    siguiente_cursor: Optional[str] = None
+
+
+class ConceptoPagoResumen(BaseModel):
+    """Pagos completados del período agrupados por concepto"""
+    concepto: str
+    cantidad: int
+    total: Decimal
+
+
 class DashboardEjecutivo(BaseModel):
     """Dashboard ejecutivo completo"""
     kpis: KPIDashboard
@@ -212,6 +281,10 @@ class DashboardEjecutivo(BaseModel):
     lista_estudiantes_pagos: List[EstudiantePago]
     lista_egresos_caja: List[EgresoCajaItem]
     lista_otros_movimientos: List[MovimientoCajaItem]
+    # Las listas traen solo la primera página; el resto via /reportes/listas/...
+    resumen_listas: Dict[str, ResumenLista] = {}
+    # Resumen por concepto sobre todos los pagos del período, no solo la primera página
+    conceptos_pagos: List[ConceptoPagoResumen] = []
     fecha_generacion: datetime
     periodo_inicio: datetime
     periodo_fin: datetime
@@ -320,6 +393,21 @@ class CierreFinancieroResponse(BaseModel):
     cajas: List[CierreCajaItem]
 
 
+# ==================== ANALÍTICA AD-HOC ====================
+
+class GrupoAnalitica(BaseModel):
+    """Un grupo del corte: valor de cada dimensión, monto y número de flujos"""
+    dimensiones: Dict[str, str]
+    monto: Decimal
+    cantidad: int
+
+
+class AnaliticaResponse(BaseModel):
+    agrupar_por: List[str]
+    grupos: List[GrupoAnalitica]
+    filas_en_memoria: int
+
+
 # ==================== REPORTE FINANCIERO ====================
 
 class AnalisisIngresos(BaseModel):
@@ -0,0 +1,370 @@
+"""
+Motor analítico columnar en memoria para cortes ad-hoc de reportes.
+
+Los flujos financieros (pagos, detalles de pagos mixtos, movimientos y
+detalles de movimientos mixtos, ver flujos_financieros) se cargan en
+arreglos NumPy, una columna por dimensión:
+
+    dia          días desde 1970-01-01 (int32), ordenado ascendente
+    tipo, origen, metodo, categoria   códigos enteros con su diccionario
+    estudiante   id del estudiante que pagó (0 en movimientos de caja)
+    centavos     monto en centavos (int64)
+
+Las consultas recortan el rango de días con searchsorted, filtran con
+máscaras y agrupan con bincount, sin ir a la base de datos.
+
+La carga es incremental: se guarda el mayor id leído de cada tabla de origen
+(high-water mark) y solo se traen filas nuevas cuando cambió la versión del
+cache de reportes, es decir, cuando hubo escrituras en caja o estudiantes.
+Los cambios sobre filas ya cargadas (p. ej. un pago anulado) se recogen en la
+recarga completa periódica (REPORTES_ANALITICA_RECARGA_SEGUNDOS).
+"""
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import and_, or_, select
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.estudiante import Estudiante
+from app.models.referidor import Referidor
+from app.services.cache_reportes import version_cache
+from app.services.resumen_financiero import (
+    flujos_financieros, FUENTE_PAGO, FUENTE_DETALLE_PAGO, FUENTE_MOVIMIENTO, FUENTE_DETALLE_MOVIMIENTO
+)
+
+EPOCA = date(1970, 1, 1)
+FUENTES = (FUENTE_PAGO, FUENTE_DETALLE_PAGO, FUENTE_MOVIMIENTO, FUENTE_DETALLE_MOVIMIENTO)
+DIMENSIONES = ("tipo", "origen", "metodo_pago", "categoria", "referidor", "dia", "semana", "mes")
+DIMENSIONES_FILTRABLES = ("tipo", "origen", "metodo_pago", "categoria")
+SIN_REFERIDOR = "SIN REFERIDOR"
+_CAMPOS = ("dia", "tipo", "origen", "metodo", "categoria", "estudiante", "centavos")
+
+
+def dia_epoca(fecha: date) -> int:
+    return (fecha - EPOCA).days
+
+
+class _Diccionario:
+    """Codifica textos como enteros 0, 1, 2... (los códigos no cambian al crecer)"""
+
+    def __init__(self):
+        self.valores: List[str] = []
+        self._codigos: Dict[str, int] = {}
+
+    def codificar(self, valor: str) -> int:
+        codigo = self._codigos.get(valor)
+        if codigo is None:
+            codigo = len(self.valores)
+            self._codigos[valor] = codigo
+            self.valores.append(valor)
+        return codigo
+
+    def codigos(self, valores: Sequence[str]) -> np.ndarray:
+        return np.array([self._codigos[v] for v in valores if v in self._codigos], dtype=np.int32)
+
+
+@dataclass(frozen=True)
+class _Columnas:
+    dia: np.ndarray
+    tipo: np.ndarray
+    origen: np.ndarray
+    metodo: np.ndarray
+    categoria: np.ndarray
+    estudiante: np.ndarray
+    centavos: np.ndarray
+
+    @classmethod
+    def desde_listas(cls, dia, tipo, origen, metodo, categoria, estudiante, centavos) -> "_Columnas":
+        return cls(
+            dia=np.array(dia, dtype=np.int32),
+            tipo=np.array(tipo, dtype=np.int32),
+            origen=np.array(origen, dtype=np.int32),
+            metodo=np.array(metodo, dtype=np.int32),
+            categoria=np.array(categoria, dtype=np.int32),
+            estudiante=np.array(estudiante, dtype=np.int32),
+            centavos=np.array(centavos, dtype=np.int64),
+        )
+
+    @classmethod
+    def vacias(cls) -> "_Columnas":
+        return cls.desde_listas([], [], [], [], [], [], [])
+
+    def __len__(self) -> int:
+        return len(self.dia)
+
+    def seleccionar(self, indices) -> "_Columnas":
+        return _Columnas(**{campo: getattr(self, campo)[indices] for campo in _CAMPOS})
+
+    def concatenar(self, otras: "_Columnas") -> "_Columnas":
+        """Une dos bloques y mantiene el orden por día (orden estable)"""
+        if not len(otras):
+            return self
+        unidas = _Columnas(**{
+            campo: np.concatenate([getattr(self, campo), getattr(otras, campo)])
+            for campo in _CAMPOS
+        })
+        desordenadas = (len(self) and otras.dia.min() < self.dia[-1]) or np.any(np.diff(otras.dia) < 0)
+        if desordenadas:
+            return unidas.seleccionar(np.argsort(unidas.dia, kind="stable"))
+        return unidas
+
+
+@dataclass(frozen=True)
+class _Estado:
+    """Todo lo que necesita una consulta; se reemplaza completo en cada refresco"""
+    columnas: _Columnas
+    tipos: _Diccionario
+    origenes: _Diccionario
+    metodos: _Diccionario
+    categorias: _Diccionario
+    referidor_de_estudiante: np.ndarray  # índice: estudiante_id -> referidor_id (0 = ninguno)
+    nombres_referidor: Dict[int, str]
+    marcas: Dict[str, int]  # high-water mark por tabla de origen
+
+
+def _estado_vacio() -> _Estado:
+    return _Estado(
+        columnas=_Columnas.vacias(),
+        tipos=_Diccionario(),
+        origenes=_Diccionario(),
+        metodos=_Diccionario(),
+        categorias=_Diccionario(),
+        referidor_de_estudiante=np.zeros(1, dtype=np.int32),
+        nombres_referidor={},
+        marcas={fuente: 0 for fuente in FUENTES},
+    )
+
+
+class MotorAnalitico:
+    """Columnas en memoria con refresco incremental; una instancia por proceso"""
+
+    def __init__(self):
+        self._estado = _estado_vacio()
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._recargado_en: Optional[float] = None
+
+    # ---------- carga ----------
+
+    def _leer_flujos(self, db, estado: _Estado) -> _Columnas:
+        flujos = flujos_financieros().subquery("flujos")
+        nuevos = or_(*[
+            and_(flujos.c.fuente == fuente, flujos.c.fuente_id > marca)
+            for fuente, marca in estado.marcas.items()
+        ])
+        resultado = db.execute(
+            select(
+                flujos.c.fecha, flujos.c.tipo, flujos.c.origen, flujos.c.metodo_pago,
+                flujos.c.categoria, flujos.c.monto, flujos.c.fuente, flujos.c.fuente_id,
+                flujos.c.estudiante_id
+            ).where(nuevos).execution_options(yield_per=settings.REPORTES_EXPORTACION_LOTE)
+        )
+
+        dia, tipo, origen, metodo, categoria, estudiante, centavos = [], [], [], [], [], [], []
+        for fila in resultado:
+            if fila.fecha is None:
+                continue
+            dia.append(dia_epoca(fila.fecha))
+            tipo.append(estado.tipos.codificar(fila.tipo))
+            origen.append(estado.origenes.codificar(fila.origen))
+            metodo.append(estado.metodos.codificar(fila.metodo_pago))
+            categoria.append(estado.categorias.codificar(fila.categoria))
+            estudiante.append(fila.estudiante_id or 0)
+            centavos.append(int((Decimal(str(fila.monto or 0)) * 100).to_integral_value()))
+            if fila.fuente_id > estado.marcas[fila.fuente]:
+                estado.marcas[fila.fuente] = fila.fuente_id
+        return _Columnas.desde_listas(dia, tipo, origen, metodo, categoria, estudiante, centavos)
+
+    def _leer_referidores(self, db):
+        filas = db.query(Estudiante.id, Estudiante.referidor_id).filter(
+            Estudiante.referidor_id.isnot(None)
+        ).all()
+        mapa = np.zeros((max((f.id for f in filas), default=0) + 1), dtype=np.int32)
+        for fila in filas:
+            mapa[fila.id] = fila.referidor_id
+        nombres = dict(db.query(Referidor.id, Referidor.nombre).all())
+        return mapa, nombres
+
+    def refrescar(self, forzar: bool = False) -> None:
+        """Trae filas nuevas si hubo escrituras; recarga todo si venció el intervalo."""
+        ahora = time.monotonic()
+        completa = (
+            forzar
+            or self._recargado_en is None
+            or ahora - self._recargado_en > settings.REPORTES_ANALITICA_RECARGA_SEGUNDOS
+        )
+        if not completa and self._version == version_cache():
+            return
+
+        with self._lock:
+            completa = (
+                forzar
+                or self._recargado_en is None
+                or ahora - self._recargado_en > settings.REPORTES_ANALITICA_RECARGA_SEGUNDOS
+            )
+            version = version_cache()
+            if not completa and self._version == version:
+                return
+
+            anterior = _estado_vacio() if completa else self._estado
+            # Los diccionarios solo crecen, así que se pueden compartir con el
+            # estado anterior; las marcas se copian para no publicar a medias.
+            base = _Estado(
+                columnas=anterior.columnas,
+                tipos=anterior.tipos,
+                origenes=anterior.origenes,
+                metodos=anterior.metodos,
+                categorias=anterior.categorias,
+                referidor_de_estudiante=anterior.referidor_de_estudiante,
+                nombres_referidor=anterior.nombres_referidor,
+                marcas=dict(anterior.marcas),
+            )
+            db = SessionLocal()
+            try:
+                nuevas = self._leer_flujos(db, base)
+                referidor_de_estudiante, nombres_referidor = self._leer_referidores(db)
+            finally:
+                db.close()
+
+            self._estado = _Estado(
+                columnas=base.columnas.concatenar(nuevas),
+                tipos=base.tipos,
+                origenes=base.origenes,
+                metodos=base.metodos,
+                categorias=base.categorias,
+                referidor_de_estudiante=referidor_de_estudiante,
+                nombres_referidor=nombres_referidor,
+                marcas=base.marcas,
+            )
+            self._version = version
+            if completa:
+                self._recargado_en = ahora
+
+    # ---------- consultas ----------
+
+    @staticmethod
+    def _codificadas(estado: _Estado, columnas: _Columnas) -> Dict:
+        """Dimensiones guardadas como código: nombre -> (columna, diccionario)"""
+        return {
+            "tipo": (columnas.tipo, estado.tipos),
+            "origen": (columnas.origen, estado.origenes),
+            "metodo_pago": (columnas.metodo, estado.metodos),
+            "categoria": (columnas.categoria, estado.categorias),
+        }
+
+    def _dimension(self, estado: _Estado, columnas: _Columnas, nombre: str):
+        """(códigos 0..n-1, n, función código -> etiqueta) de una dimensión"""
+        codificadas = self._codificadas(estado, columnas)
+        if nombre in codificadas:
+            codigos, diccionario = codificadas[nombre]
+            return codigos, max(len(diccionario.valores), 1), lambda c: diccionario.valores[c]
+
+        if nombre == "referidor":
+            mapa = estado.referidor_de_estudiante
+            dentro = columnas.estudiante < len(mapa)
+            codigos = np.where(dentro, mapa[np.where(dentro, columnas.estudiante, 0)], 0)
+            return codigos, int(codigos.max(initial=0)) + 1, lambda c: estado.nombres_referidor.get(c, SIN_REFERIDOR) if c else SIN_REFERIDOR
+
+        if nombre == "dia":
+            base = int(columnas.dia.min(initial=0))
+            return columnas.dia - base, int(columnas.dia.max(initial=0)) - base + 1, \
+                lambda c: (EPOCA + timedelta(days=base + c)).isoformat()
+
+        if nombre == "semana":
+            # 1970-01-01 fue jueves: (dia + 3) // 7 agrupa semanas de lunes a domingo
+            semanas = (columnas.dia.astype(np.int64) + 3) // 7
+            base = int(semanas.min(initial=0))
+            return semanas - base, int(semanas.max(initial=0)) - base + 1, \
+                lambda c: (EPOCA + timedelta(days=(base + c) * 7 - 3)).isoformat()
+
+        if nombre == "mes":
+            meses = columnas.dia.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+            base = int(meses.min(initial=0))
+            return meses - base, int(meses.max(initial=0)) - base + 1, \
+                lambda c: f"{1970 + (base + c) // 12}-{(base + c) % 12 + 1:02d}"
+
+        raise ValueError(f"Dimensión no soportada: {nombre}")
+
+    def consultar(
+        self,
+        agrupar_por: Sequence[str],
+        fecha_inicio: Optional[date] = None,
+        fecha_fin: Optional[date] = None,
+        filtros: Optional[Dict[str, Sequence[str]]] = None
+    ) -> List[Dict]:
+        """
+        Suma de montos y cantidad de flujos agrupados por las dimensiones
+        pedidas. filtros: {dimensión: [valores]} sobre DIMENSIONES_FILTRABLES.
+        """
+        for nombre in agrupar_por:
+            if nombre not in DIMENSIONES:
+                raise ValueError(f"Dimensión no soportada: {nombre}")
+        for nombre in (filtros or {}):
+            if nombre not in DIMENSIONES_FILTRABLES:
+                raise ValueError(f"No se puede filtrar por: {nombre}")
+
+        self.refrescar()
+        estado = self._estado
+        columnas = estado.columnas
+
+        # Rango de días: las columnas están ordenadas por día
+        desde = 0 if fecha_inicio is None else np.searchsorted(columnas.dia, dia_epoca(fecha_inicio), side="left")
+        hasta = len(columnas) if fecha_fin is None else np.searchsorted(columnas.dia, dia_epoca(fecha_fin), side="right")
+        columnas = columnas.seleccionar(slice(desde, hasta))
+
+        if filtros:
+            codificadas = self._codificadas(estado, columnas)
+            mascara = np.ones(len(columnas), dtype=bool)
+            for nombre, valores in filtros.items():
+                codigos, diccionario = codificadas[nombre]
+                mascara &= np.isin(codigos, diccionario.codigos(valores))
+            columnas = columnas.seleccionar(mascara)
+
+        if not len(columnas):
+            return []
+
+        dimensiones = [self._dimension(estado, columnas, nombre) for nombre in agrupar_por]
+        if dimensiones:
+            clave = np.ravel_multi_index(
+                tuple(codigos.astype(np.int64) for codigos, _, _ in dimensiones),
+                dims=tuple(tamano for _, tamano, _ in dimensiones)
+            )
+        else:
+            clave = np.zeros(len(columnas), dtype=np.int64)
+
+        claves, inversa = np.unique(clave, return_inverse=True)
+        sumas = np.bincount(inversa, weights=columnas.centavos)
+        cantidades = np.bincount(inversa)
+        indices = np.unravel_index(claves, tuple(tamano for _, tamano, _ in dimensiones)) if dimensiones else ()
+
+        grupos = []
+        for i in range(len(claves)):
+            grupos.append({
+                "dimensiones": {
+                    nombre: etiqueta(int(indices[d][i]))
+                    for d, (nombre, (_, _, etiqueta)) in enumerate(zip(agrupar_por, dimensiones))
+                },
+                "monto": (Decimal(int(round(sumas[i]))) / 100).quantize(Decimal("0.01")),
+                "cantidad": int(cantidades[i]),
+            })
+        return grupos
+
+    def estadisticas(self) -> Dict:
+        estado = self._estado
+        return {
+            "filas": len(estado.columnas),
+            "marcas": dict(estado.marcas),
+            "version_cache": self._version,
+            "memoria_bytes": sum(
+                getattr(estado.columnas, campo).nbytes for campo in _CAMPOS
+            ),
+        }
+
+
+motor_analitico = MotorAnalitico()
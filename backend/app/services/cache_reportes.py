@@ -0,0 +1,103 @@
+"""
+Cache en memoria para las respuestas de reportes.
+
+Las entradas se identifican por endpoint + parámetros normalizados, expiran
+por TTL y se descartan por LRU cuando se supera el máximo configurado.
+Cada escritura en caja, caja fuerte o estudiantes incrementa la versión del
+cache; las entradas de una versión anterior se consideran vencidas.
+
+El cache es por proceso: con varios workers cada uno mantiene el suyo y el
+TTL acota cuánto puede tardar en reflejarse una escritura hecha en otro.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+_LOCK = threading.Lock()
+_CACHE: "OrderedDict[Tuple, Tuple[float, int, Any]]" = OrderedDict()
+_VERSION = 0
+_STATS: Dict[str, int] = {
+    "hits": 0,
+    "misses": 0,
+    "expiradas": 0,
+    "descartadas_lru": 0,
+    "invalidaciones": 0,
+}
+
+
+def _normalizar(valor: Any) -> Any:
+    if hasattr(valor, "value"):
+        return valor.value
+    if hasattr(valor, "isoformat"):
+        return valor.isoformat()
+    return valor
+
+
+def _clave(endpoint: str, params: Dict[str, Any]) -> Tuple:
+    return (endpoint,) + tuple(sorted((k, _normalizar(v)) for k, v in params.items()))
+
+
+def version_cache() -> int:
+    """Versión actual; capturarla antes de calcular y pasarla a guardar_cache."""
+    return _VERSION
+
+
+def obtener_cache(endpoint: str, params: Dict[str, Any]) -> Optional[Any]:
+    """Retorna la respuesta cacheada o None si no existe, expiró o es de otra versión."""
+    if not settings.REPORTES_CACHE_ENABLED:
+        return None
+    clave = _clave(endpoint, params)
+    with _LOCK:
+        entrada = _CACHE.get(clave)
+        if entrada is None:
+            _STATS["misses"] += 1
+            return None
+        expira_en, version, valor = entrada
+        if version != _VERSION or expira_en < time.monotonic():
+            del _CACHE[clave]
+            _STATS["expiradas"] += 1
+            _STATS["misses"] += 1
+            return None
+        _CACHE.move_to_end(clave)
+        _STATS["hits"] += 1
+        return valor
+
+
+def guardar_cache(endpoint: str, params: Dict[str, Any], valor: Any, version: int) -> None:
+    """Guarda la respuesta si no hubo escrituras mientras se calculaba."""
+    if not settings.REPORTES_CACHE_ENABLED:
+        return
+    clave = _clave(endpoint, params)
+    with _LOCK:
+        if version != _VERSION:
+            return
+        _CACHE[clave] = (time.monotonic() + settings.REPORTES_CACHE_TTL_SECONDS, version, valor)
+        _CACHE.move_to_end(clave)
+        while len(_CACHE) > settings.REPORTES_CACHE_MAX_ENTRADAS:
+            _CACHE.popitem(last=False)
+            _STATS["descartadas_lru"] += 1
+
+
+def invalidar_cache_reportes() -> None:
+    """Incrementa la versión: todo lo cacheado hasta ahora queda vencido."""
+    global _VERSION
+    with _LOCK:
+        _VERSION += 1
+        _CACHE.clear()
+        _STATS["invalidaciones"] += 1
+
+
+def estadisticas_cache() -> Dict[str, Any]:
+    with _LOCK:
+        consultas = _STATS["hits"] + _STATS["misses"]
+        return {
+            **_STATS,
+            "entradas": len(_CACHE),
+            "version": _VERSION,
+            "tasa_aciertos": round(_STATS["hits"] / consultas, 4) if consultas else 0.0,
+            "ttl_segundos": settings.REPORTES_CACHE_TTL_SECONDS,
+            "max_entradas": settings.REPORTES_CACHE_MAX_ENTRADAS,
+        }
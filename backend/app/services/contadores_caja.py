@@ -0,0 +1,189 @@
+"""
+Contadores de egresos por método de pago en la caja.
+
+Registrar un egreso valida el saldo disponible por método (ingresos menos
+egresos de la caja). Los ingresos ya viven en columnas de Caja; los egresos se
+mantienen igual, en columnas total_egresos_<método> que se suman con el
+mismo UPDATE atómico de los totales de caja, así la validación lee la fila de
+la caja en lugar de sumar movimientos y detalles de pago mixto por método.
+
+reconciliar_egresos_caja reconstruye esos contadores desde movimientos_caja y
+detalles_pago_movimiento_caja (backfill o corrección de descuadres).
+totales_caja_desde_flujos recalcula todas las columnas de totales de una caja
+desde pagos, movimientos y sus detalles (verificación de snapshots).
+"""
+from collections import defaultdict
+from decimal import Decimal
+from itertools import chain
+from typing import Dict, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.caja import Caja, MovimientoCaja, DetallePagoMovimientoCaja, TipoMovimiento
+from app.models.pago import Pago, DetallePago, MetodoPago, EstadoPago
+
+# Método -> columnas de Caja que suma un ingreso (la segunda es el total legacy).
+# Los créditos se trackean pero NO entran a caja (plata diferida de financieras)
+COLUMNAS_INGRESO_POR_METODO = {
+    MetodoPago.EFECTIVO: ("total_ingresos_efectivo",),
+    MetodoPago.NEQUI: ("total_nequi", "total_ingresos_transferencia"),
+    MetodoPago.NEQUI_ESCUELA: ("total_nequi_escuela", "total_ingresos_transferencia"),
+    MetodoPago.NEQUI_GERENCIA: ("total_nequi_gerencia", "total_ingresos_transferencia"),
+    MetodoPago.DAVIPLATA: ("total_daviplata", "total_ingresos_transferencia"),
+    MetodoPago.BRE_B: ("total_bre_b", "total_ingresos_transferencia"),
+    MetodoPago.TRANSFERENCIA_BANCARIA: ("total_transferencia_bancaria", "total_ingresos_transferencia"),
+    MetodoPago.TARJETA_DEBITO: ("total_tarjeta_debito", "total_ingresos_tarjeta"),
+    MetodoPago.TARJETA_CREDITO: ("total_tarjeta_credito", "total_ingresos_tarjeta"),
+    MetodoPago.CREDISMART: ("total_credismart",),
+    MetodoPago.SISTECREDITO: ("total_sistecredito",),
+}
+
+# Método -> columnas de Caja que suma un egreso (la segunda es el total legacy).
+# Los créditos no se permiten en egresos
+COLUMNAS_EGRESO_POR_METODO = {
+    MetodoPago.EFECTIVO: ("total_egresos_efectivo",),
+    MetodoPago.NEQUI: ("total_egresos_nequi", "total_egresos_transferencia"),
+    MetodoPago.NEQUI_ESCUELA: ("total_egresos_nequi_escuela", "total_egresos_transferencia"),
+    MetodoPago.NEQUI_GERENCIA: ("total_egresos_nequi_gerencia", "total_egresos_transferencia"),
+    MetodoPago.DAVIPLATA: ("total_egresos_daviplata", "total_egresos_transferencia"),
+    MetodoPago.BRE_B: ("total_egresos_bre_b", "total_egresos_transferencia"),
+    MetodoPago.TRANSFERENCIA_BANCARIA: ("total_egresos_transferencia_bancaria", "total_egresos_transferencia"),
+    MetodoPago.TARJETA_DEBITO: ("total_egresos_tarjeta_debito", "total_egresos_tarjeta"),
+    MetodoPago.TARJETA_CREDITO: ("total_egresos_tarjeta_credito", "total_egresos_tarjeta"),
+}
+
+# Contador propio de cada método (sin los totales legacy agrupados)
+COLUMNA_CONTADOR_EGRESO = {metodo: columnas[0] for metodo, columnas in COLUMNAS_EGRESO_POR_METODO.items()}
+
+
+def egresos_por_metodo(caja: Caja, metodo: MetodoPago) -> Decimal:
+    """Egresos de la caja en un método, leídos del contador."""
+    columna = COLUMNA_CONTADOR_EGRESO.get(metodo)
+    if columna is None:
+        return Decimal("0")
+    return Decimal(str(getattr(caja, columna) or Decimal("0")))
+
+
+def _movimientos_por_metodo(db: Session, caja_id: Optional[int], tipo: TipoMovimiento):
+    """Consultas (caja_id, método, suma) de movimientos simples y detalles de mixtos del tipo"""
+    simples = db.query(
+        MovimientoCaja.caja_id,
+        MovimientoCaja.metodo_pago,
+        func.sum(MovimientoCaja.monto)
+    ).filter(
+        MovimientoCaja.tipo == tipo,
+        MovimientoCaja.es_pago_mixto == 0
+    )
+    mixtos = db.query(
+        MovimientoCaja.caja_id,
+        DetallePagoMovimientoCaja.metodo_pago,
+        func.sum(DetallePagoMovimientoCaja.monto)
+    ).join(
+        MovimientoCaja,
+        DetallePagoMovimientoCaja.movimiento_id == MovimientoCaja.id
+    ).filter(
+        MovimientoCaja.tipo == tipo,
+        MovimientoCaja.es_pago_mixto == 1
+    )
+    if caja_id is not None:
+        simples = simples.filter(MovimientoCaja.caja_id == caja_id)
+        mixtos = mixtos.filter(MovimientoCaja.caja_id == caja_id)
+    return (
+        simples.group_by(MovimientoCaja.caja_id, MovimientoCaja.metodo_pago),
+        mixtos.group_by(MovimientoCaja.caja_id, DetallePagoMovimientoCaja.metodo_pago)
+    )
+
+
+def _acumular_por_metodo(*consultas) -> Dict[int, Dict[MetodoPago, Decimal]]:
+    totales: Dict[int, Dict[MetodoPago, Decimal]] = defaultdict(dict)
+    for id_caja, metodo, monto in chain.from_iterable(consulta.all() for consulta in consultas):
+        try:
+            metodo = MetodoPago(metodo)
+        except ValueError:
+            continue  # Métodos legacy sin contador propio
+        totales[id_caja][metodo] = totales[id_caja].get(metodo, Decimal("0")) + Decimal(str(monto or 0))
+    return totales
+
+
+def _egresos_desde_movimientos(db: Session, caja_id: Optional[int]) -> Dict[int, Dict[MetodoPago, Decimal]]:
+    return _acumular_por_metodo(*_movimientos_por_metodo(db, caja_id, TipoMovimiento.EGRESO))
+
+
+def _ingresos_desde_flujos(db: Session, caja_id: Optional[int]) -> Dict[int, Dict[MetodoPago, Decimal]]:
+    """Ingresos por caja y método: pagos completados (y sus detalles) y movimientos de ingreso"""
+    pagos_simples = db.query(
+        Pago.caja_id,
+        Pago.metodo_pago,
+        func.sum(Pago.monto)
+    ).filter(
+        Pago.estado == EstadoPago.COMPLETADO,
+        Pago.es_pago_mixto == 0
+    )
+    pagos_mixtos = db.query(
+        Pago.caja_id,
+        DetallePago.metodo_pago,
+        func.sum(DetallePago.monto)
+    ).join(
+        Pago,
+        DetallePago.pago_id == Pago.id
+    ).filter(
+        Pago.estado == EstadoPago.COMPLETADO,
+        Pago.es_pago_mixto == 1
+    )
+    if caja_id is not None:
+        pagos_simples = pagos_simples.filter(Pago.caja_id == caja_id)
+        pagos_mixtos = pagos_mixtos.filter(Pago.caja_id == caja_id)
+    return _acumular_por_metodo(
+        pagos_simples.group_by(Pago.caja_id, Pago.metodo_pago),
+        pagos_mixtos.group_by(Pago.caja_id, DetallePago.metodo_pago),
+        *_movimientos_por_metodo(db, caja_id, TipoMovimiento.INGRESO)
+    )
+
+
+def totales_caja_desde_flujos(db: Session, caja_id: int) -> Dict[str, Decimal]:
+    """
+    Columnas de totales de ingresos y egresos de la caja (columna -> monto)
+    recalculadas desde los flujos, con el mismo mapeo que usan los endpoints
+    de caja al registrar cada pago o movimiento.
+    """
+    totales: Dict[str, Decimal] = defaultdict(Decimal)
+    for mapeo, por_metodo in (
+        (COLUMNAS_INGRESO_POR_METODO, _ingresos_desde_flujos(db, caja_id).get(caja_id, {})),
+        (COLUMNAS_EGRESO_POR_METODO, _egresos_desde_movimientos(db, caja_id).get(caja_id, {})),
+    ):
+        for metodo, monto in por_metodo.items():
+            for columna in mapeo.get(metodo, ()):
+                totales[columna] += monto
+    return dict(totales)
+
+
+def reconciliar_egresos_caja(db: Session, caja_id: Optional[int] = None) -> int:
+    """
+    Recalcula los contadores de egresos por método desde los movimientos.
+    Sin caja_id reconcilia todas las cajas. Retorna cuántas cajas corrigió.
+    Los totales legacy agrupados (transferencia, tarjeta) no se tocan.
+
+    Las cajas se bloquean mientras se recalculan (igual que registrar_egreso),
+    así se puede ejecutar con una caja abierta.
+    """
+    cajas = db.query(Caja)
+    if caja_id is not None:
+        cajas = cajas.filter(Caja.id == caja_id)
+    cajas = cajas.order_by(Caja.id).with_for_update().all()
+    egresos = _egresos_desde_movimientos(db, caja_id)
+
+    corregidas = 0
+    for caja in cajas:
+        esperados = egresos.get(caja.id, {})
+        cambios = {}
+        for metodo, columna in COLUMNA_CONTADOR_EGRESO.items():
+            esperado = esperados.get(metodo, Decimal("0"))
+            if egresos_por_metodo(caja, metodo) != esperado:
+                cambios[columna] = esperado
+        if cambios:
+            for columna, valor in cambios.items():
+                setattr(caja, columna, valor)
+            corregidas += 1
+    db.commit()
+    return corregidas
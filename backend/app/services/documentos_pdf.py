@@ -0,0 +1,129 @@
+"""
+Almacén en disco de los PDF ya generados (recibos de pago, egreso y
+movimiento, cierres de caja).
+
+Un recibo no cambia una vez emitido, así que se renderiza una sola vez y se
+guarda en DOCUMENTOS_PDF_DIR, por tipo e id del documento:
+
+    <tipo>/<id>.json            índice: versión del registro y sha256 del PDF
+    <tipo>/<id>-<sha256>.pdf    contenido (el nombre es el hash del contenido)
+    <tipo>/<id>-<sha256>.pdf.gz contenido comprimido (documentos de archivo)
+
+`version` es la huella de los datos del registro que se imprimen (ver
+huella). Si el registro cambia, la huella cambia y el PDF se vuelve a
+generar. El sha256 del contenido es el ETag con el que los endpoints
+responden 304 a If-None-Match, y leer_documento lo usa como checksum.
+"""
+import gzip
+import hashlib
+import json
+import os
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+from app.core.config import settings
+
+DOCUMENTO_RECIBO_PAGO = "recibo_pago"
+DOCUMENTO_RECIBO_EGRESO = "recibo_egreso"
+DOCUMENTO_RECIBO_MOVIMIENTO = "recibo_movimiento"
+DOCUMENTO_CIERRE_CAJA = "cierre_caja"
+
+
+@dataclass
+class DocumentoPdf:
+    ruta: Path
+    etag: str  # sha256 del PDF sin comprimir
+    comprimido: bool = False
+
+
+def huella(*valores) -> str:
+    """Versión de un registro a partir de los valores que salen en el documento."""
+    crudo = json.dumps(valores, default=str, ensure_ascii=False)
+    return hashlib.sha256(crudo.encode("utf-8")).hexdigest()[:32]
+
+
+def _directorio(tipo: str) -> Path:
+    directorio = Path(settings.DOCUMENTOS_PDF_DIR) / tipo
+    directorio.mkdir(parents=True, exist_ok=True)
+    return directorio
+
+
+def _escribir_atomico(ruta: Path, contenido: bytes) -> None:
+    """Escribe en un temporal propio y lo renombra (otro worker puede estar escribiendo)"""
+    temporal = ruta.with_name(f"{ruta.name}.{uuid.uuid4().hex}.tmp")
+    temporal.write_bytes(contenido)
+    os.replace(temporal, ruta)
+
+
+def _leer_indice(ruta: Path) -> Optional[dict]:
+    try:
+        return json.loads(ruta.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _documento_del_indice(directorio: Path, documento_id: int, indice: dict) -> DocumentoPdf:
+    comprimido = bool(indice.get("comprimido"))
+    extension = ".pdf.gz" if comprimido else ".pdf"
+    return DocumentoPdf(
+        ruta=directorio / f"{documento_id}-{indice['sha256']}{extension}",
+        etag=indice["sha256"],
+        comprimido=comprimido
+    )
+
+
+def obtener_documento(
+    tipo: str,
+    documento_id: int,
+    version: str,
+    renderizar: Callable[[], bytes],
+    comprimido: bool = False
+) -> DocumentoPdf:
+    """
+    PDF guardado del documento. Solo llama a `renderizar` si no existe o si
+    se guardó con otra versión del registro. Con `comprimido` se guarda con
+    gzip (documentos de archivo que se descargan poco).
+    """
+    directorio = _directorio(tipo)
+    ruta_indice = directorio / f"{documento_id}.json"
+    indice = _leer_indice(ruta_indice)
+    anterior = _documento_del_indice(directorio, documento_id, indice) if indice else None
+    if anterior and indice.get("version") == version and anterior.ruta.exists():
+        return anterior
+
+    contenido = renderizar()
+    sha256 = hashlib.sha256(contenido).hexdigest()
+    nuevo_indice = {"version": version, "sha256": sha256, "comprimido": comprimido}
+    documento = _documento_del_indice(directorio, documento_id, nuevo_indice)
+    _escribir_atomico(documento.ruta, gzip.compress(contenido, mtime=0) if comprimido else contenido)
+    _escribir_atomico(ruta_indice, json.dumps(nuevo_indice).encode("utf-8"))
+    if anterior and anterior.ruta != documento.ruta:
+        anterior.ruta.unlink(missing_ok=True)
+    return documento
+
+
+def leer_documento(documento: DocumentoPdf) -> bytes:
+    """Contenido del PDF (descomprimido). Lanza ValueError si no coincide el checksum."""
+    contenido = documento.ruta.read_bytes()
+    if documento.comprimido:
+        contenido = gzip.decompress(contenido)
+    if hashlib.sha256(contenido).hexdigest() != documento.etag:
+        raise ValueError(f"Checksum inválido en {documento.ruta.name}")
+    return contenido
+
+
+def etag_coincide(if_none_match: Optional[str], etag: str) -> bool:
+    """True si el header If-None-Match del cliente incluye el ETag"""
+    if not if_none_match:
+        return False
+    for valor in if_none_match.split(","):
+        valor = valor.strip()
+        if valor == "*":
+            return True
+        if valor.startswith("W/"):
+            valor = valor[2:]
+        if valor.strip('"') == etag:
+            return True
+    return False
@@ -0,0 +1,646 @@
+"""
+Formatos PDF de la escuela: recibos de caja y caja fuerte, cierre de caja y
+contrato de aprendizaje.
+
+Cada formato es una función `datos -> bytes` sobre un dict plano (str, int,
+bool, None, listas y dicts): fechas en ISO y montos como str de Decimal. Los
+endpoints arman ese dict desde los modelos (los `_datos_*` de cada endpoint)
+y app.services.render_pdf lo renderiza en un proceso aparte, por eso este
+módulo no importa modelos ni la base de datos.
+"""
+import base64
+import os
+from datetime import datetime
+from decimal import Decimal
+from io import BytesIO
+from typing import Optional
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+from app.utils.pdf import PlantillaPdf, dibujar_logo, formato_moneda
+
+FORMATO_RECIBO_PAGO = "recibo_pago"
+FORMATO_RECIBO_EGRESO = "recibo_egreso"
+FORMATO_RECIBO_MOVIMIENTO = "recibo_movimiento"
+FORMATO_RECIBO_CAJA_FUERTE = "recibo_caja_fuerte"
+FORMATO_CIERRE_CAJA = "cierre_caja"
+FORMATO_CONTRATO = "contrato"
+
+_ASSETS_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "..", "frontend", "src", "assets")
+)
+
+
+def _fecha_hora(valor: str) -> str:
+    return datetime.fromisoformat(valor).strftime("%Y-%m-%d %H:%M")
+
+
+def _moneda(valor: Optional[str]) -> str:
+    return formato_moneda(Decimal(valor or "0"))
+
+
+# ==================== RECIBOS ====================
+
+def recibo_pago(datos: dict) -> bytes:
+    estudiante = datos["estudiante"]
+    pdf = PlantillaPdf("Recibo de pago")
+    pdf.seccion("Datos del pago")
+    pdf.kv("ID pago", datos["id"])
+    pdf.kv("Fecha", _fecha_hora(datos["fecha"]))
+    pdf.kv("Concepto", datos["concepto"])
+    pdf.kv("Monto", _moneda(datos["monto"]))
+    pdf.kv("Metodo", datos["metodo"] or "MIXTO")
+    if datos["referencia"]:
+        pdf.kv("Referencia", datos["referencia"])
+
+    pdf.espacio()
+    pdf.seccion("Estudiante")
+    pdf.kv("Nombre", estudiante["nombre"] or "N/A")
+    pdf.kv("Cedula", estudiante["cedula"] or "N/A")
+    pdf.kv("Matricula", estudiante["matricula"] or "N/A")
+    if estudiante["saldo_pendiente"] and Decimal(estudiante["saldo_pendiente"]) > 0:
+        pdf.kv("Saldo pendiente", _moneda(estudiante["saldo_pendiente"]))
+
+    if datos["detalles"]:
+        pdf.espacio()
+        pdf.seccion("Detalle pago mixto")
+        for d in datos["detalles"]:
+            referencia = f" ({d['referencia']})" if d["referencia"] else ""
+            pdf.kv(d["metodo"], f"{_moneda(d['monto'])}{referencia}")
+
+    pdf.espacio()
+    pdf.seccion("Atendido por")
+    pdf.kv("Usuario", datos["usuario"] or "N/A")
+    return pdf.terminar()
+
+
+def recibo_egreso(datos: dict) -> bytes:
+    pdf = PlantillaPdf("Recibo de egreso")
+    pdf.seccion("Datos del egreso")
+    pdf.kv("ID egreso", datos["id"])
+    pdf.kv("Fecha", _fecha_hora(datos["fecha"]))
+    pdf.kv("Concepto", datos["concepto"])
+    pdf.kv("Categoria", datos["categoria"] or "OTROS")
+    pdf.kv("Metodo", datos["metodo"])
+    if datos["factura"]:
+        pdf.kv("Factura", datos["factura"])
+
+    pdf.espacio()
+    pdf.seccion("Monto")
+    pdf.kv("Total", _moneda(datos["monto"]))
+
+    pdf.espacio()
+    pdf.seccion("Atendido por")
+    pdf.kv("Usuario", datos["usuario"] or "N/A")
+    return pdf.terminar()
+
+
+def recibo_movimiento(datos: dict) -> bytes:
+    pdf = PlantillaPdf("Recibo de ingreso" if datos["ingreso"] else "Recibo de egreso")
+    pdf.seccion("Datos del movimiento")
+    pdf.kv("ID", datos["id"])
+    pdf.kv("Fecha", _fecha_hora(datos["fecha"]))
+    pdf.kv("Concepto", datos["concepto"])
+    pdf.kv("Categoria", datos["categoria"] or "OTROS")
+    if datos["tercero_nombre"]:
+        pdf.kv("Pagado por", datos["tercero_nombre"])
+    if datos["tercero_documento"]:
+        pdf.kv("Documento", datos["tercero_documento"])
+
+    pdf.espacio()
+    pdf.seccion("Monto")
+    pdf.kv("Total", _moneda(datos["monto"]))
+
+    pdf.espacio()
+    pdf.seccion("Metodo de pago")
+    if datos["detalles"] is not None:
+        for d in datos["detalles"]:
+            pdf.kv(d["metodo"], _moneda(d["monto"]))
+    else:
+        pdf.kv("Metodo", datos["metodo"])
+
+    pdf.espacio()
+    pdf.seccion("Atendido por")
+    pdf.kv("Usuario", datos["usuario"] or "N/A")
+    return pdf.terminar()
+
+
+def recibo_caja_fuerte(datos: dict) -> bytes:
+    pdf = PlantillaPdf("Recibo de egreso")
+    pdf.seccion("Datos del egreso")
+    pdf.kv("ID egreso", datos["id"])
+    pdf.kv("Fecha", _fecha_hora(datos["fecha"]))
+    pdf.kv("Concepto", datos["concepto"])
+    pdf.kv("Categoria", datos["categoria"] or "OTROS")
+    pdf.kv("Metodo", datos["metodo"])
+
+    pdf.espacio()
+    pdf.seccion("Monto")
+    pdf.kv("Total", _moneda(datos["monto"]))
+
+    pdf.espacio()
+    pdf.seccion("Atendido por")
+    pdf.kv("Usuario", datos["usuario"] or "N/A")
+    pdf.espacio(8)
+    pdf.seccion("Beneficiario")
+    pdf.c.setFont("Helvetica", 10)
+    pdf.c.drawString(120, pdf.y, "Nombre y firma:")
+    pdf.c.line(250, pdf.y - 2, 520, pdf.y - 2)
+    return pdf.terminar()
+
+
+# ==================== CIERRE DE CAJA ====================
+
+def cierre_caja(datos: dict) -> bytes:
+    continuacion = "Cierre de caja (continuacion)"
+    pdf = PlantillaPdf("Cierre de caja")
+    pdf.seccion("Datos de caja")
+    pdf.kv("ID caja", datos["id"])
+    pdf.kv("Apertura", _fecha_hora(datos["fecha_apertura"]))
+    if datos["fecha_cierre"]:
+        pdf.kv("Cierre", _fecha_hora(datos["fecha_cierre"]))
+    pdf.kv("Usuario apertura", datos["usuario_apertura"])
+    pdf.kv("Usuario cierre", datos["usuario_cierre"] or "N/A")
+
+    pdf.espacio()
+    pdf.seccion("Totales")
+    pdf.kv("Saldo inicial", _moneda(datos["saldo_inicial"]))
+    pdf.kv("Ingresos", _moneda(datos["total_ingresos"]))
+    pdf.kv("Egresos", _moneda(datos["total_egresos"]))
+    pdf.kv("Efectivo teorico", _moneda(datos["efectivo_teorico"]))
+    pdf.kv("Efectivo fisico", _moneda(datos["efectivo_fisico"]))
+    base_fija = Decimal(datos["saldo_inicial"] or "0")
+    produccion_teorica = Decimal(datos["total_ingresos_efectivo"] or "0") - Decimal(datos["total_egresos_efectivo"] or "0")
+    if produccion_teorica < 0:
+        produccion_teorica = Decimal("0")
+    efectivo_entregado = Decimal(datos["efectivo_fisico"] or "0") - base_fija
+    if efectivo_entregado < 0:
+        efectivo_entregado = Decimal("0")
+    pdf.kv("Base fija en caja", formato_moneda(base_fija))
+    pdf.kv("Produccion teorica (efectivo)", formato_moneda(produccion_teorica))
+    pdf.kv("Efectivo entregado (produccion)", formato_moneda(efectivo_entregado))
+    pdf.kv("Diferencia", _moneda(datos["diferencia"]))
+
+    pdf.asegurar_espacio(180, continuacion)
+    pdf.seccion("Detalle de egresos")
+    table_headers = ["Fecha", "Concepto", "Categoria", "Metodo", "Monto"]
+    table_widths = [80, 170, 90, 70, 42]
+    pdf.tabla_encabezado(table_headers, table_widths)
+    for e in datos["egresos"]:
+        if pdf.asegurar_espacio(PlantillaPdf.MARGEN_INFERIOR, continuacion):
+            pdf.seccion("Detalle de egresos")
+            pdf.tabla_encabezado(table_headers, table_widths)
+        pdf.tabla_fila(
+            [
+                datetime.fromisoformat(e["fecha"]).strftime("%Y-%m-%d"),
+                (e["concepto"] or "")[:24],
+                e["categoria"] or "OTROS",
+                e["metodo"],
+                _moneda(e["monto"])
+            ],
+            table_widths
+        )
+
+    pdf.asegurar_espacio(140, continuacion)
+    pdf.seccion("Resumen por categoria")
+    for r in datos["resumen_categorias"]:
+        pdf.kv(r["categoria"] or "OTROS", _moneda(r["total"]))
+    return pdf.terminar()
+
+
+# ==================== CONTRATO DE APRENDIZAJE ====================
+
+def contrato(datos: dict) -> bytes:
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
+
+    _draw_contrato_header(c)
+    y = 680
+
+    # Fecha de inscripcion
+    inscripcion = datetime.fromisoformat(datos["fecha_inscripcion"])
+    y = _draw_box_row(
+        c,
+        y,
+        [
+            ("Fecha de Inscripcion", ""),
+            ("Dia", f"{inscripcion.day:02d}"),
+            ("Mes", f"{inscripcion.month:02d}"),
+            ("Ano", f"{inscripcion.year}")
+        ],
+        [150, 80, 80, 120]
+    )
+
+    # Registro fotografico
+    y -= 10
+    y = _draw_section_bar(c, "REGISTRO FOTOGRAFICO", y)
+    photo_y = y - 120
+    _draw_photo_box(c, 50, photo_y, 120, 120, datos["foto_url"])
+    _draw_rect(c, 50, photo_y, 520, 120)
+    y = photo_y - 10
+
+    # Datos de matricula y RUNT
+    y = _draw_box_row(
+        c,
+        y,
+        [
+            ("Matricula Numero", datos["matricula_numero"] or ""),
+            ("No Solicitud en el RUNT", datos["expediente_runt"] or ""),
+            ("No Certificado", datos["no_certificado"] or ""),
+            ("Fecha de Salida", "")
+        ],
+        [140, 140, 120, 120]
+    )
+
+    # Datos personales
+    y -= 6
+    y = _draw_box_row(
+        c,
+        y,
+        [
+            ("Nombre del Alumno", datos["nombre"]),
+            ("Tipo de Documento", datos["tipo_documento"]),
+            ("Numero", datos["numero_documento"])
+        ],
+        [250, 120, 150]
+    )
+
+    nacimiento = datetime.fromisoformat(datos["fecha_nacimiento"])
+    y = _draw_box_row(
+        c,
+        y,
+        [
+            ("Fecha de Nacimiento", nacimiento.strftime("%Y-%m-%d")),
+            ("Dia", f"{nacimiento.day:02d}"),
+            ("Mes", f"{nacimiento.month:02d}"),
+            ("Ano", f"{nacimiento.year}"),
+            ("Estrato", str(datos["estrato"] or "")),
+            ("Nivel SISBEN", datos["nivel_sisben"] or "")
+        ],
+        [150, 60, 60, 60, 60, 110]
+    )
+
+    y = _draw_box_row(
+        c,
+        y,
+        [
+            ("Nombre de su EPS", datos["eps"] or ""),
+            ("Nombre de su ARL", datos["arl"])
+        ],
+        [250, 260]
+    )
+
+    y = _draw_box_row(
+        c,
+        y,
+        [
+            ("Estado Civil", datos["estado_civil"] or ""),
+            ("Ocupacion", datos["ocupacion"] or "")
+        ],
+        [180, 330]
+    )
+
+    y = _draw_box_row(
+        c,
+        y,
+        [
+            ("Direccion", datos["direccion"] or ""),
+        ],
+        [510]
+    )
+    y = _draw_box_row(
+        c,
+        y,
+        [
+            ("Telefono", datos["telefono"]),
+            ("Correo Electronico", datos["email"])
+        ],
+        [180, 330]
+    )
+
+    # Nivel educativo / necesidades especiales
+    y -= 6
+    y = _draw_section_bar(c, "NIVEL EDUCATIVO", y)
+    y = _draw_checkbox_row(
+        c,
+        y,
+        ["Basica Primaria", "Basica Secundaria", "Tecnica", "Pregrado", "Postgrado", "Sin Estudio"],
+        datos["nivel_educativo"]
+    )
+    y = _draw_section_bar(c, "NECESIDADES ESPECIALES", y)
+    y = _draw_checkbox_row(
+        c,
+        y,
+        ["Idioma", "Discapacidad", "Otra"],
+        datos["necesidades_especiales"]
+    )
+
+    # Certificacion y categoria
+    y = _draw_section_bar(c, "MIN-TRANSPORTE", y)
+    seleccion_cert = "Recategorizar" if datos["recategorizacion"] else "Obtener por primera vez"
+    y = _draw_certificacion_row(c, y, seleccion_cert)
+    y = _draw_boxed_checkbox_row(
+        c,
+        y,
+        ["A2", "B1", "C1"],
+        datos["categorias"],
+        prefix="CATEGORIA"
+    )
+    y -= 20
+
+    # Texto del contrato
+    y = _ensure_space_contrato(c, y, 120)
+    y = _draw_paragraphs(c, CONTRATO_PARRAFOS, 50, y, 520, 12)
+
+    # Firmas
+    y = _ensure_space_contrato(c, y, 140)
+    y -= 30
+    y = _draw_signature_lines(c, y)
+
+    c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+
+def _draw_contrato_header(c: canvas.Canvas) -> None:
+    dibujar_logo(c, 30, 700, 240, 90)
+    c.setFont("Helvetica-Bold", 11)
+    c.drawCentredString(330, 770, "SISTEMA DE GESTION DE CALIDAD SGC")
+    c.setFont("Helvetica-Bold", 12)
+    c.drawCentredString(330, 752, "CONTRATO DE APRENDIZAJE")
+    _draw_header_cells(c, 720)
+
+
+def _draw_header_cells(c: canvas.Canvas, y: int) -> None:
+    x = 200
+    w = 320
+    h = 14
+    col = w / 3
+    _draw_rect(c, x, y, w, h)
+    _draw_rect(c, x, y, col, h)
+    _draw_rect(c, x + col, y, col, h)
+    _draw_rect(c, x + 2 * col, y, col, h)
+    c.setFont("Helvetica", 7)
+    c.drawCentredString(x + col / 2, y + 4, "Vigente desde: 01/07/2022")
+    c.drawCentredString(x + col + col / 2, y + 4, "Codigo: SGC - FR 01")
+    c.drawCentredString(x + 2 * col + col / 2, y + 4, "Version: 01")
+
+
+def _draw_photo_box(c: canvas.Canvas, x: int, y: int, w: int, h: int, foto_url: Optional[str]) -> None:
+    if foto_url and foto_url.startswith("data:image"):
+        try:
+            header, data = foto_url.split(",", 1)
+            image_data = BytesIO(base64.b64decode(data))
+            c.drawImage(ImageReader(image_data), x + 5, y + 5, width=w - 10, height=h - 10, preserveAspectRatio=True, mask='auto')
+            return
+        except Exception:
+            pass
+    c.setFont("Helvetica", 8)
+    c.drawCentredString(x + w / 2, y + h / 2, "FOTO")
+
+
+def _draw_rect(c: canvas.Canvas, x: int, y: int, w: int, h: int) -> None:
+    c.setLineWidth(0.6)
+    c.rect(x, y, w, h)
+
+
+def _draw_section_bar(c: canvas.Canvas, title: str, y: int) -> int:
+    c.setFillColor(colors.Color(0.95, 0.96, 0.98))
+    c.rect(50, y - 16, 520, 16, fill=1, stroke=1)
+    c.setFillColor(colors.black)
+    c.setFont("Helvetica-Bold", 9)
+    c.drawCentredString(310, y - 12, title)
+    return y - 22
+
+
+def _draw_box_row(c: canvas.Canvas, y: int, items: list, widths: list, total_width: int = 520) -> int:
+    x = 50
+    h = 22
+    c.setFont("Helvetica", 8)
+    used = sum(widths)
+    if widths and used < total_width:
+        widths = list(widths)
+        widths[-1] += (total_width - used)
+    for (label, value), w in zip(items, widths):
+        _draw_rect(c, x, y - h, w, h)
+        c.setFont("Helvetica-Bold", 7)
+        c.drawString(x + 4, y - 10, label)
+        c.setFont("Helvetica", 8)
+        c.drawString(x + 4, y - 18, str(value))
+        x += w
+    return y - h
+
+
+def _draw_checkbox_row(c: canvas.Canvas, y: int, options: list, selected, prefix: Optional[str] = None) -> int:
+    x = 50
+    h = 18
+    total_width = 520
+    prefix_width = 70 if prefix else 0
+    available = max(0, total_width - prefix_width)
+    count = max(1, len(options))
+    step = min(110, max(70, available / count))
+    if isinstance(selected, (list, tuple, set)):
+        selected_norms = {str(item).lower() for item in selected}
+    else:
+        selected_norms = {str(selected).lower()} if selected else set()
+    if prefix:
+        c.setFont("Helvetica-Bold", 8)
+        c.drawString(x, y - 12, prefix)
+        x += 70
+    for opt in options:
+        opt_norm = opt.lower().replace(" ", "_")
+        _draw_rect(c, x, y - h, 12, 12)
+        if selected_norms and (opt_norm in selected_norms or opt.lower() in selected_norms):
+            c.setFont("Helvetica-Bold", 9)
+            c.drawString(x + 3, y - 12, "X")
+        c.setFont("Helvetica", 8)
+        c.drawString(x + 16, y - 12, opt)
+        x += step
+    return y - h
+
+
+def _draw_boxed_checkbox_row(
+    c: canvas.Canvas,
+    y: int,
+    options: list,
+    selected: Optional[str],
+    prefix: Optional[str] = None
+) -> int:
+    box_h = 22
+    _draw_rect(c, 50, y - box_h, 520, box_h)
+    y = _draw_checkbox_row(c, y, options, selected, prefix=prefix)
+    return y
+
+
+def _draw_certificacion_row(c: canvas.Canvas, y: int, selected: str) -> int:
+    x = 50
+    h = 40
+    _draw_rect(c, x, y - h, 520, h)
+
+    c.setFont("Helvetica-Bold", 7)
+    c.drawString(x + 4, y - 12, "Certificacion de la aptitud en")
+    c.drawString(x + 4, y - 24, "conduccion a solicitar")
+
+    selected_norm = (selected or "").lower()
+    options = ["Obtener por primera vez", "Recategorizar"]
+    option_x = x + 240
+    for index, opt in enumerate(options):
+        box_y = y - 12 - (index * 14)
+        _draw_rect(c, option_x, box_y - 8, 12, 12)
+        if opt.lower() in selected_norm:
+            c.setFont("Helvetica-Bold", 9)
+            c.drawString(option_x + 3, box_y - 7, "X")
+        c.setFont("Helvetica", 8)
+        c.drawString(option_x + 16, box_y - 7, opt)
+
+    return y - h
+
+
+def _draw_paragraphs(c: canvas.Canvas, paragraphs: list, x: int, y: int, width: int, leading: int) -> int:
+    font_name = "Helvetica"
+    font_size = 9
+    c.setFont(font_name, font_size)
+    for entry in paragraphs:
+        if isinstance(entry, tuple):
+            title, body = entry
+            c.setFont("Helvetica-Bold", font_size)
+            if y < 80:
+                c.showPage()
+                _draw_contrato_header(c)
+                y = 680
+            c.drawString(x, y, title)
+            y -= leading
+            c.setFont(font_name, font_size)
+            if not body:
+                y -= 4
+                continue
+            text = body
+        else:
+            text = entry
+        lines = _wrap_text(c, text, width, font_name, font_size)
+        for i, line in enumerate(lines):
+            if y < 80:
+                c.showPage()
+                _draw_contrato_header(c)
+                y = 680
+                c.setFont(font_name, font_size)
+            is_last = (i == len(lines) - 1)
+            _draw_justified_line(c, line, x, y, width, font_name, font_size, is_last)
+            y -= leading
+        y -= 6
+    return y
+
+
+def _wrap_text(c: canvas.Canvas, text: str, max_width: int, font_name: str, font_size: int) -> list:
+    words = text.split()
+    lines = []
+    current = []
+    for word in words:
+        test = " ".join(current + [word])
+        if c.stringWidth(test, font_name, font_size) <= max_width:
+            current.append(word)
+        else:
+            if current:
+                lines.append(" ".join(current))
+            current = [word]
+    if current:
+        lines.append(" ".join(current))
+    return lines
+
+
+def _draw_justified_line(
+    c: canvas.Canvas,
+    line: str,
+    x: int,
+    y: int,
+    width: int,
+    font_name: str,
+    font_size: int,
+    is_last: bool
+) -> None:
+    words = line.split()
+    if is_last or len(words) <= 1:
+        c.drawString(x, y, line)
+        return
+    words_width = sum(c.stringWidth(w, font_name, font_size) for w in words)
+    spaces = len(words) - 1
+    if spaces <= 0:
+        c.drawString(x, y, line)
+        return
+    space_width = (width - words_width) / spaces
+    cursor = x
+    for i, word in enumerate(words):
+        c.drawString(cursor, y, word)
+        cursor += c.stringWidth(word, font_name, font_size)
+        if i < spaces:
+            cursor += space_width
+
+
+def _draw_signature_lines(c: canvas.Canvas, y: int) -> int:
+    c.setLineWidth(0.6)
+    c.line(60, y, 260, y)
+    c.line(320, y, 520, y)
+    c.line(60, y - 50, 260, y - 50)
+    c.setFont("Helvetica", 8)
+    c.drawString(60, y - 12, "FIRMA ALUMNO: ACEPTO LAS CONDICIONES DEL CEAP")
+    c.drawString(320, y - 12, "FIRMA REPRESENTANTE LEGAL CEA")
+    c.drawString(60, y - 62, "FIRMA DE ACUDIENTE O PADRE DE FAMILIA")
+    _draw_rect(c, 480, y - 80, 50, 50)
+    _draw_rep_signature(c, 330, y + 4, 150, 30)
+    return y - 90
+
+
+def _draw_rep_signature(c: canvas.Canvas, x: int, y: int, w: int, h: int) -> None:
+    signature_path = os.path.join(_ASSETS_DIR, "firma jerson.png")
+    if signature_path and os.path.exists(signature_path):
+        try:
+            c.drawImage(ImageReader(signature_path), x, y, width=w, height=h, preserveAspectRatio=True, mask="auto")
+        except Exception:
+            return
+
+
+def _ensure_space_contrato(c: canvas.Canvas, y: int, min_y: int) -> int:
+    if y < min_y:
+        c.showPage()
+        _draw_contrato_header(c)
+        return 680
+    return y
+
+
+CONTRATO_PARRAFOS = [
+    ("1. PRIMERA. Objetivo:", "Formar personas con aptitudes, habilidades, destrezas y fundamentar los conocimientos requeridos para la conduccion de un vehiculo automotor, sin poner en riesgo su vida y la de los demas segun la reglamentacion expedida por el Ministerio de Transporte, Decreto 1500 de 2009, Resolucion 3245 del 21 de Julio de 2009 y demas requisitos legales aplicables y reglamentarios."),
+    ("2. SEGUNDA. Naturaleza de la capacitacion.", "El alumno aspira a obtener la certificacion de aptitud en conduccion para la categoria A2___, B1___, C1___, de acuerdo con la formacion que imparte el Centro de Ensenanza Automovilistica y la aplicabilidad que el mismo tiene para la obtencion de la licencia de conduccion en la categoria seleccionada anteriormente por el alumno."),
+    ("3. TERCERA. Duracion y Periodos de la formacion.", "La formacion tiene una duracion maxima de 3 meses, comprendidos entre la fecha de iniciacion de los modulos de la formacion y la fecha de terminacion de los mismos. La capacitacion se encuentra distribuida en 3 modulos: Modulo de formacion teorica, Modulo de formacion basica aplicada y el Modulo de formacion especifica."),
+    ("PARAGRAFO. 1°", "Este contrato puede ser modificado en su duracion parcial y total, cuando por el rendimiento en la formacion del alumno y previo analisis de las evaluaciones que el Centro de Ensenanza le aplique al terminar cada bloque modular se identifique alguna necesidad de recapacitar al alumno en algun(os) tema(s) especifico(s)."),
+    ("PARAGRAFO. 2º", "La certificacion de la aptitud en conduccion del alumno esta sujeta al cumplimiento y aprobacion de los rangos establecidos por el Ministerio de Transporte al momento de realizar la evaluacion teorico-Practica."),
+    ("4. CUARTO: Contenido y desarrollo del curso:", "La formacion de conductores se llevara a cabo en (3) tres modulos con temas relacionados con:"),
+    ("MODULO I FORMACION TEORICA:", "ADAPTACION AL MEDIO: Ubicacion del vehiculo en la via y sus componentes, senales de transito, accidentalidad en Colombia, Normas de transito, Autoridades de transito, elementos, personas, definicion de terminos y factores que intervienen en el transito, la via, el vehiculo. ETICA, PREVENCION DE CONFLICTOS Y COMUNICACION: Valores del conductor, el peaton: deberes y responsabilidades, el conductor: deberes y responsabilidades, conductas apropiadas e inapropiadas de los usuarios de la via, los derechos humanos, compromiso con el medio ambiente, la movilidad y el transito, accesibilidad y sus barreras, respeto por el espacio publico, el alcohol y otras sustancias, cultura ciudadana, la agresividad y la velocidad, la responsabilidad social, autocontrol y autodiagnostico del conductor, respeto a la vida, sensibilizacion ante la incapacidad."),
+    ("MODULO II FORMACION BASICA APLICADA:", "MECANICA BASICA: Descripcion del vehiculo, partes esenciales y localizacion, accesorios del motor, cambio de aceite y llantas, funcionamiento de averias mas frecuentes. MARCO LEGAL: Aspectos legales de transito, documentos obligatorios, licencias, clasificacion y requisitos, Codigo Nacional de transito y sus reglamentaciones, procedimientos juridicos, normas de salud ocupacional, normas ambientales, normas de convivencia y restricciones por ciudades. TECNICAS EN CONDUCCION: Componentes del vehiculo, elementos de seguridad, inspeccion al vehiculo, adaptacion al vehiculo, familiarizacion con los distintos controles, conceptos de velocidad, operacion del control de velocidades o seleccion de velocidades, conduccion del vehiculo, manejo de las distancias en la conduccion, primeros auxilios en salud o mecanicos, adaptacion viso-espacial al vehiculo, parqueo y estacionamientos."),
+    ("MODULO III FORMACION ESPECIFICA:", "UNIDAD PRACTICA: Taller inspeccion pre operacional, ajuste de asiento, adaptacion Visio-espacial, utilizacion de elementos de seguridad, puesta en marcha del motor, regulacion de velocidades, puesta en marcha del vehiculo, coordinacion, aceleracion-freno-embrague, aceleracion y desaceleracion, control de cambios, conduccion del vehiculo en via urbana, carretera, terreno plano, terreno inclinado, maniobra de cruces y adelantamientos, utilizacion de senales luminicas, corporales y acusticas, utilizacion de calzadas, carriles, afrontar y utilizacion de glorietas, afrontar intersecciones, respeto a las marcas viales y senales de transito, distancias de reaccion, frenado, maniobras de adelantamiento, reversa, entrada y salida de curvas, parqueo, estacionamiento frontal y en reversa, utilizacion del equipo de seguridad, nomenclatura urbana y nacional, normas de seguridad en el aseguramiento de la carga, uso de salidas de emergencia."),
+    ("5. HORARIOS.", "Los horarios para las clases practicas se programaran con antelacion para que se puedan adecuar a la disponibilidad de tiempo de cada uno de los alumnos, en cuanto a las clases teoricas, se le entregara al alumno al inicio de sus clases el cronograma con sus respectivos horarios debido a que estos modulos se desarrollan en grupo, por lo cual tienen un horario fijo."),
+    ("6. METODOLOGIA.", "Clases presenciales, talleres con ejercicios, conferencias y practicas de campo orientadas a trabajar para el desarrollo de las habilidades teorico-practicas como conductor en cada modulo y al finalizar cada modulo se realizara una evaluacion."),
+    ("7. INTENSIDAD HORARIA.", "Al alumno se le impartira la formacion teorico-practica de acuerdo a la intensidad horaria reglamentada en el Anexo I de la Resolucion 3245 de 2009 emitida por el Ministerio de Transporte."),
+    ("8. CONDICIONES PARA LA PRESTACION DEL SERVICIO:", ""),
+    ("8.1", "Para acceder al proceso de capacitacion y de formacion como conductor, el aspirante debera como minimo, saber leer y escribir, tener 16 anos cumplidos para el servicio diferente al publico, y tener 18 anos para vehiculos de servicio publico. (Art. 15 Decreto 1500 de 2009)."),
+    ("8.2", "Cuando se este impartiendo ensenanza practica solo podran ir en el vehiculo el instructor debidamente acreditado y el aprendiz, excepto en los vehiculos tipo B2, C2, B3 y C3, de acuerdo a lo establecido por el Ministerio de Transporte. (Art. 7 Decreto 1500 de 2009)."),
+    ("8.3", "Quien padezca una limitacion fisica, podra obtener la licencia de conduccion, si ademas de cumplir con todos los requisitos, demuestra en el examen de aptitud fisica, mental y de coordinacion motriz, que se encuentra habilitado y adiestrado para conducir con dicha limitacion. (Art. 21 Ley 769 de 2002)."),
+    ("8.4", "Los horarios son programados por el Centro de Ensenanza, por lo tanto, no se responsabiliza por la ensenanza impartida por fuera de dicha programacion."),
+    ("8.5", "En caso de que el alumno suspenda su clase practica previamente programada, debe informar con 2 horas de anticipacion para realizar la reprogramacion de la misma."),
+    ("8.5", "Para el desarrollo de las clases el alumno debera presentarse en el Centro de Ensenanza Automovilistica en el horario programado."),
+    ("8.6", "Una vez iniciado el curso, no se admite interferencia de terceras personas."),
+    ("8.7", "No es posible cambiar horas teoricas por horas practicas, ya que la estructura curricular esta basada en modulos que son necesarios aprobar en todos los aspectos tanto teoricos como practicos."),
+    ("8.8", "Es deber del alumno manifestar al centro de ensenanza el grado de conformidad con el sistema de aprendizaje empleado por los instructores, para retroalimentar el Sistema de mejoramiento continuo de nuestra empresa.")
+]
+
+
+FORMATOS = {
+    FORMATO_RECIBO_PAGO: recibo_pago,
+    FORMATO_RECIBO_EGRESO: recibo_egreso,
+    FORMATO_RECIBO_MOVIMIENTO: recibo_movimiento,
+    FORMATO_RECIBO_CAJA_FUERTE: recibo_caja_fuerte,
+    FORMATO_CIERRE_CAJA: cierre_caja,
+    FORMATO_CONTRATO: contrato,
+}
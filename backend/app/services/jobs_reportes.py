@@ -0,0 +1,209 @@
+"""
+Jobs de reportes en segundo plano.
+
+Los reportes de rangos muy grandes (dashboards interanuales, exportaciones de
+todo el histórico) pueden tardar más que el timeout del proxy. En lugar de
+calcularlos dentro del request se encolan como job:
+
+- enviar_job registra el job y lo entrega a un pool de pocos hilos
+  (REPORTES_JOBS_HILOS), así los jobs pesados no acaparan las conexiones que
+  necesita la operación de caja. Con la cola llena lanza ColaJobsLlena.
+- El resultado (JSON, CSV, XLSX o PDF) se escribe en REPORTES_JOBS_DIR junto
+  a un <id>.json con el estado del job, que se consulta con obtener_job.
+  Como el estado vive en disco, cualquier worker puede responder el polling.
+- Los jobs vencen a los REPORTES_JOBS_TTL_SECONDS y limpiar_jobs_vencidos
+  borra sus archivos.
+"""
+import json
+import logging
+import os
+import re
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Union
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ESTADO_PENDIENTE = "PENDIENTE"
+ESTADO_EN_PROCESO = "EN_PROCESO"
+ESTADO_COMPLETADO = "COMPLETADO"
+ESTADO_ERROR = "ERROR"
+
+# Formato -> tipo de contenido del resultado
+TIPOS_CONTENIDO = {
+    "json": "application/json",
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "pdf": "application/pdf",
+}
+
+_ID_VALIDO = re.compile(r"^[0-9a-f]{32}$")
+
+
+class ColaJobsLlena(Exception):
+    """Hay REPORTES_JOBS_MAX_PENDIENTES jobs sin terminar"""
+
+
+@dataclass
+class JobReporte:
+    id: str
+    tipo: str
+    formato: str
+    parametros: Dict[str, Any]
+    estado: str
+    creado_en: datetime
+    expira_en: datetime
+    iniciado_en: Optional[datetime] = None
+    terminado_en: Optional[datetime] = None
+    error: Optional[str] = None
+    tamano_bytes: Optional[int] = None
+
+    @property
+    def archivo(self) -> str:
+        return f"{self.id}.{self.formato}"
+
+
+_EXECUTOR = ThreadPoolExecutor(
+    max_workers=settings.REPORTES_JOBS_HILOS,
+    thread_name_prefix="reporte-job"
+)
+_LOCK = threading.Lock()
+_SIN_TERMINAR = 0
+
+
+def directorio_jobs() -> Path:
+    directorio = Path(settings.REPORTES_JOBS_DIR)
+    directorio.mkdir(parents=True, exist_ok=True)
+    return directorio
+
+
+def _ruta_estado(job_id: str) -> Path:
+    return directorio_jobs() / f"{job_id}.json"
+
+
+def ruta_resultado(job: JobReporte) -> Path:
+    return directorio_jobs() / job.archivo
+
+
+def _guardar_estado(job: JobReporte) -> None:
+    """Escribe el estado en un temporal y lo renombra (escritura atómica)"""
+    ruta = _ruta_estado(job.id)
+    temporal = ruta.with_suffix(".json.tmp")
+    temporal.write_text(json.dumps(asdict(job), default=str), encoding="utf-8")
+    os.replace(temporal, ruta)
+
+
+def _leer_estado(job_id: str) -> Optional[JobReporte]:
+    try:
+        datos = json.loads(_ruta_estado(job_id).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return None
+    for campo in ("creado_en", "expira_en", "iniciado_en", "terminado_en"):
+        if datos.get(campo):
+            datos[campo] = datetime.fromisoformat(datos[campo])
+    return JobReporte(**datos)
+
+
+def _borrar_job(job: JobReporte) -> None:
+    for ruta in (ruta_resultado(job), _ruta_estado(job.id)):
+        try:
+            ruta.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def obtener_job(job_id: str) -> Optional[JobReporte]:
+    """Estado del job, o None si no existe o ya venció."""
+    if not _ID_VALIDO.match(job_id):
+        return None
+    job = _leer_estado(job_id)
+    if job is None:
+        return None
+    if job.expira_en < datetime.utcnow():
+        _borrar_job(job)
+        return None
+    return job
+
+
+def limpiar_jobs_vencidos() -> int:
+    """Borra los resultados y estados vencidos. Retorna cuántos jobs borró."""
+    ahora = datetime.utcnow()
+    borrados = 0
+    for ruta in directorio_jobs().glob("*.json"):
+        job = _leer_estado(ruta.stem)
+        if job is not None and job.expira_en < ahora:
+            _borrar_job(job)
+            borrados += 1
+    return borrados
+
+
+def _ejecutar(job: JobReporte, generar: Callable[[], Iterable[Union[str, bytes]]]) -> None:
+    global _SIN_TERMINAR
+    job.estado = ESTADO_EN_PROCESO
+    job.iniciado_en = datetime.utcnow()
+    _guardar_estado(job)
+
+    destino = ruta_resultado(job)
+    temporal = destino.with_name(destino.name + ".tmp")
+    try:
+        with open(temporal, "wb") as archivo:
+            for bloque in generar():
+                archivo.write(bloque.encode("utf-8") if isinstance(bloque, str) else bloque)
+        os.replace(temporal, destino)
+        job.estado = ESTADO_COMPLETADO
+        job.tamano_bytes = destino.stat().st_size
+    except Exception as e:
+        logger.exception("Error en job de reporte %s (%s)", job.id, job.tipo)
+        job.estado = ESTADO_ERROR
+        job.error = str(e)
+        temporal.unlink(missing_ok=True)
+    finally:
+        job.terminado_en = datetime.utcnow()
+        _guardar_estado(job)
+        with _LOCK:
+            _SIN_TERMINAR -= 1
+
+
+def enviar_job(
+    tipo: str,
+    formato: str,
+    parametros: Dict[str, Any],
+    generar: Callable[[], Iterable[Union[str, bytes]]]
+) -> JobReporte:
+    """
+    Encola un job. `generar` produce el resultado por bloques (str o bytes) y
+    corre en el pool de jobs; debe abrir su propia sesión de base de datos.
+    """
+    global _SIN_TERMINAR
+    if formato not in TIPOS_CONTENIDO:
+        raise ValueError(f"Formato no soportado: {formato}")
+    with _LOCK:
+        if _SIN_TERMINAR >= settings.REPORTES_JOBS_MAX_PENDIENTES:
+            raise ColaJobsLlena("Hay demasiados reportes en cola, intenta de nuevo en unos minutos")
+        _SIN_TERMINAR += 1
+
+    try:
+        limpiar_jobs_vencidos()
+        ahora = datetime.utcnow()
+        job = JobReporte(
+            id=uuid.uuid4().hex,
+            tipo=tipo,
+            formato=formato,
+            parametros=parametros,
+            estado=ESTADO_PENDIENTE,
+            creado_en=ahora,
+            expira_en=ahora + timedelta(seconds=settings.REPORTES_JOBS_TTL_SECONDS)
+        )
+        _guardar_estado(job)
+        _EXECUTOR.submit(_ejecutar, job, generar)
+    except Exception:
+        with _LOCK:
+            _SIN_TERMINAR -= 1
+        raise
+    return job
@@ -0,0 +1,182 @@
+"""
+Outbox transaccional para el trabajo externo de los endpoints (correos,
+facturación electrónica, PDF de cierre).
+
+El endpoint llama encolar_evento dentro de su transacción, así el evento
+existe si y solo si el commit del registro se hizo. Después del commit
+notificar_outbox despierta al despachador, que corre en un hilo aparte:
+
+- Reserva un lote de eventos con SELECT ... FOR UPDATE SKIP LOCKED, así
+  varios workers pueden despachar sin tomar el mismo evento. La reserva dura
+  OUTBOX_RESERVA_SEGUNDOS; si el proceso muere, otro la retoma al vencer.
+- Ejecuta el manejador registrado para el tipo (manejador_outbox). Si falla
+  lo reprograma con backoff exponencial y al agotar OUTBOX_MAX_INTENTOS lo
+  deja FALLIDO con el último error.
+
+Los manejadores deben ser idempotentes: un evento puede ejecutarse más de una
+vez si el proceso cae justo después de ejecutarlo.
+"""
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.outbox import EventoOutbox, EstadoEventoOutbox
+
+logger = logging.getLogger(__name__)
+
+TIPO_RECIBO_PAGO = "RECIBO_PAGO"
+TIPO_FACTURA_FACTUS = "FACTURA_FACTUS"
+TIPO_CIERRE_PDF = "CIERRE_PDF"
+
+LARGO_MAXIMO_ERROR = 2000
+
+Manejador = Callable[[Session, EventoOutbox], None]
+_MANEJADORES: Dict[str, Manejador] = {}
+
+
+def manejador_outbox(tipo: str):
+    """Decorador: registra la función que ejecuta los eventos de un tipo"""
+    def registrar(funcion: Manejador) -> Manejador:
+        _MANEJADORES[tipo] = funcion
+        return funcion
+    return registrar
+
+
+def encolar_evento(db: Session, tipo: str, entidad_id: int, payload: Optional[dict] = None) -> EventoOutbox:
+    """Agrega el evento a la transacción en curso (sin commit)."""
+    evento = EventoOutbox(
+        tipo=tipo,
+        entidad_id=entidad_id,
+        payload=payload,
+        estado=EstadoEventoOutbox.PENDIENTE.value,
+        intentos=0,
+        proximo_intento=datetime.utcnow()
+    )
+    db.add(evento)
+    return evento
+
+
+def _espera_reintento(intentos: int) -> timedelta:
+    segundos = settings.OUTBOX_BACKOFF_BASE_SEGUNDOS * 2 ** max(intentos - 1, 0)
+    return timedelta(seconds=min(segundos, settings.OUTBOX_BACKOFF_MAX_SEGUNDOS))
+
+
+def _reservar_lote(db: Session) -> List[int]:
+    """Marca PROCESANDO un lote de eventos vencidos y retorna sus ids."""
+    ahora = datetime.utcnow()
+    eventos = db.query(EventoOutbox).filter(
+        EventoOutbox.estado.in_([EstadoEventoOutbox.PENDIENTE.value, EstadoEventoOutbox.PROCESANDO.value]),
+        EventoOutbox.proximo_intento <= ahora
+    ).order_by(
+        EventoOutbox.proximo_intento, EventoOutbox.id
+    ).limit(settings.OUTBOX_LOTE).with_for_update(skip_locked=True).all()
+
+    for evento in eventos:
+        evento.estado = EstadoEventoOutbox.PROCESANDO.value
+        evento.intentos += 1
+        evento.proximo_intento = ahora + timedelta(seconds=settings.OUTBOX_RESERVA_SEGUNDOS)
+    ids = [evento.id for evento in eventos]
+    db.commit()
+    return ids
+
+
+def procesar_evento(evento_id: int) -> None:
+    """Ejecuta un evento reservado y registra el resultado."""
+    db = SessionLocal()
+    try:
+        evento = db.get(EventoOutbox, evento_id)
+        if evento is None:
+            return
+        try:
+            manejador = _MANEJADORES.get(evento.tipo)
+            if manejador is None:
+                raise RuntimeError(f"No hay manejador para eventos {evento.tipo}")
+            manejador(db, evento)
+        except Exception as e:
+            db.rollback()
+            evento = db.get(EventoOutbox, evento_id)
+            evento.ultimo_error = str(e)[:LARGO_MAXIMO_ERROR]
+            if evento.intentos >= settings.OUTBOX_MAX_INTENTOS:
+                evento.estado = EstadoEventoOutbox.FALLIDO.value
+                evento.procesado_en = datetime.utcnow()
+                logger.error("Evento outbox %s (%s) falló definitivamente: %s", evento.id, evento.tipo, e)
+            else:
+                evento.estado = EstadoEventoOutbox.PENDIENTE.value
+                evento.proximo_intento = datetime.utcnow() + _espera_reintento(evento.intentos)
+                logger.warning(
+                    "Evento outbox %s (%s) falló (intento %s), se reintenta a las %s: %s",
+                    evento.id, evento.tipo, evento.intentos, evento.proximo_intento, e
+                )
+        else:
+            evento.estado = EstadoEventoOutbox.COMPLETADO.value
+            evento.procesado_en = datetime.utcnow()
+            evento.ultimo_error = None
+        db.commit()
+    finally:
+        db.close()
+
+
+def despachar_pendientes() -> int:
+    """Procesa lotes hasta que no queden eventos vencidos. Retorna cuántos procesó."""
+    procesados = 0
+    while True:
+        db = SessionLocal()
+        try:
+            ids = _reservar_lote(db)
+        finally:
+            db.close()
+        if not ids:
+            return procesados
+        for evento_id in ids:
+            procesar_evento(evento_id)
+        procesados += len(ids)
+
+
+# ==================== DESPACHADOR ====================
+
+class DespachadorOutbox:
+    """Hilo que despacha el outbox cada OUTBOX_INTERVALO_SEGUNDOS o al ser notificado"""
+
+    def __init__(self):
+        self._despertar = threading.Event()
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    def iniciar(self) -> None:
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._ejecutar, name="outbox", daemon=True)
+        self._hilo.start()
+
+    def detener(self, timeout: float = 10) -> None:
+        self._detener.set()
+        self._despertar.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+
+    def notificar(self) -> None:
+        self._despertar.set()
+
+    def _ejecutar(self) -> None:
+        while not self._detener.is_set():
+            self._despertar.clear()
+            try:
+                despachar_pendientes()
+            except Exception:
+                logger.exception("Error despachando el outbox")
+            self._despertar.wait(settings.OUTBOX_INTERVALO_SEGUNDOS)
+
+
+despachador_outbox = DespachadorOutbox()
+
+
+def notificar_outbox() -> None:
+    """Llamar después del commit para despachar sin esperar el intervalo."""
+    if settings.OUTBOX_ENABLED:
+        despachador_outbox.notificar()
@@ -0,0 +1,70 @@
+"""
+Referidores (tramitadores, guardas de tránsito) normalizados.
+
+El nombre del referidor llega como texto libre al asignar el servicio del
+estudiante. Para poder agrupar el ranking en SQL cada estudiante referido
+apunta a una fila de referidores: se deduplica por teléfono y, cuando no hay
+teléfono, por nombre normalizado.
+"""
+import re
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.referidor import Referidor
+
+
+def normalizar_nombre_referidor(nombre: Optional[str]) -> str:
+    """Mayúsculas y espacios colapsados: ' juan  perez ' -> 'JUAN PEREZ'"""
+    return " ".join((nombre or "").split()).upper()
+
+
+def normalizar_telefono(telefono: Optional[str]) -> Optional[str]:
+    """Solo dígitos y sin el indicativo de Colombia (57)"""
+    digitos = re.sub(r"\D", "", telefono or "")
+    if len(digitos) == 12 and digitos.startswith("57"):
+        digitos = digitos[2:]
+    return digitos or None
+
+
+def obtener_o_crear_referidor(
+    db: Session,
+    nombre: Optional[str],
+    telefono: Optional[str] = None
+) -> Optional[Referidor]:
+    """
+    Referidor correspondiente a nombre/teléfono, creándolo si no existe.
+    No hace commit: la fila queda en la transacción del llamador.
+    """
+    nombre_normalizado = normalizar_nombre_referidor(nombre)
+    if not nombre_normalizado:
+        return None
+    telefono_normalizado = normalizar_telefono(telefono)
+
+    if telefono_normalizado:
+        referidor = db.query(Referidor).filter(Referidor.telefono == telefono_normalizado).first()
+        if referidor:
+            return referidor
+        # Mismo nombre registrado antes sin teléfono: se completa en lugar de duplicar
+        referidor = db.query(Referidor).filter(
+            Referidor.nombre_normalizado == nombre_normalizado,
+            Referidor.telefono.is_(None)
+        ).order_by(Referidor.id).first()
+        if referidor:
+            referidor.telefono = telefono_normalizado
+            return referidor
+    else:
+        referidor = db.query(Referidor).filter(
+            Referidor.nombre_normalizado == nombre_normalizado
+        ).order_by(Referidor.telefono.is_(None), Referidor.id).first()
+        if referidor:
+            return referidor
+
+    referidor = Referidor(
+        nombre=" ".join(nombre.split()),
+        nombre_normalizado=nombre_normalizado,
+        telefono=telefono_normalizado
+    )
+    db.add(referidor)
+    db.flush()
+    return referidor
@@ -0,0 +1,141 @@
+"""
+Render de PDF en procesos aparte.
+
+reportlab es CPU puro y mantiene el GIL: renderizado en el threadpool de
+FastAPI, una ráfaga de descargas de cierres o contratos frena todos los
+demás requests del worker. renderizar_pdf envía el dict del documento (ver
+app.services.formatos_pdf) a un ProcessPoolExecutor de PDF_RENDER_PROCESOS
+procesos y espera el resultado:
+
+- La cola es acotada: con PDF_RENDER_MAX_PENDIENTES documentos sin terminar
+  lanza ColaPdfLlena (los endpoints responden 429, el outbox reintenta).
+- La profundidad de la cola, la espera y el tiempo de render se publican en
+  /metrics (app.core.metricas).
+- Los procesos se crean con "spawn": el proceso de la API tiene hilos
+  (outbox, threadpool) y hacer fork con hilos vivos puede dejar locks tomados.
+- Con PDF_RENDER_PROCESOS = 0 se renderiza en el hilo que llama (scripts,
+  desarrollo).
+"""
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+
+from app.core.config import settings
+from app.core.metricas import registrar_render_pdf, registrar_rechazo_pdf, actualizar_cola_pdf
+from app.services.formatos_pdf import FORMATOS
+from app.utils.pdf import cargar_marca
+
+logger = logging.getLogger(__name__)
+
+
+class ColaPdfLlena(Exception):
+    """Hay PDF_RENDER_MAX_PENDIENTES documentos sin terminar"""
+
+
+_EXECUTOR: Optional[ProcessPoolExecutor] = None
+_LOCK = threading.Lock()
+_SIN_TERMINAR = 0
+
+
+def _renderizar(formato: str, datos: dict) -> Tuple[bytes, float, float]:
+    """Corre en el proceso de render. Retorna el PDF y cuándo empezó y terminó (epoch)."""
+    inicio = time.time()
+    contenido = FORMATOS[formato](datos)
+    return contenido, inicio, time.time()
+
+
+def _publicar_cola() -> None:
+    en_proceso = min(_SIN_TERMINAR, settings.PDF_RENDER_PROCESOS)
+    actualizar_cola_pdf(_SIN_TERMINAR - en_proceso, en_proceso)
+
+
+def _executor() -> ProcessPoolExecutor:
+    global _EXECUTOR
+    with _LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ProcessPoolExecutor(
+                max_workers=settings.PDF_RENDER_PROCESOS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=cargar_marca
+            )
+        return _EXECUTOR
+
+
+def iniciar_render_pdf() -> None:
+    """Crea los procesos de render al arrancar (y no en el primer PDF)."""
+    if settings.PDF_RENDER_PROCESOS <= 0:
+        return
+    executor = _executor()
+    for _ in range(settings.PDF_RENDER_PROCESOS):
+        executor.submit(cargar_marca)
+
+
+def detener_render_pdf() -> None:
+    global _EXECUTOR
+    with _LOCK:
+        executor, _EXECUTOR = _EXECUTOR, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _descartar_executor(executor: ProcessPoolExecutor) -> None:
+    """Un proceso murió (p. ej. por memoria): el pool queda roto y se recrea en el siguiente PDF."""
+    global _EXECUTOR
+    with _LOCK:
+        if _EXECUTOR is executor:
+            _EXECUTOR = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _terminado(_future=None) -> None:
+    global _SIN_TERMINAR
+    with _LOCK:
+        _SIN_TERMINAR -= 1
+        _publicar_cola()
+
+
+def renderizar_pdf(formato: str, datos: dict) -> bytes:
+    """
+    PDF del formato con los datos dados. Bloquea hasta que el documento se
+    renderiza; lanza ColaPdfLlena si la cola está llena.
+    """
+    global _SIN_TERMINAR
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato PDF no soportado: {formato}")
+    if settings.PDF_RENDER_PROCESOS <= 0:
+        inicio = time.perf_counter()
+        contenido = FORMATOS[formato](datos)
+        registrar_render_pdf(0.0, time.perf_counter() - inicio)
+        return contenido
+
+    with _LOCK:
+        if _SIN_TERMINAR >= settings.PDF_RENDER_MAX_PENDIENTES:
+            registrar_rechazo_pdf()
+            raise ColaPdfLlena("Hay demasiados PDF en cola, intenta de nuevo en unos segundos")
+        _SIN_TERMINAR += 1
+        _publicar_cola()
+
+    executor = _executor()
+    enviado = time.time()
+    try:
+        future = executor.submit(_renderizar, formato, datos)
+    except Exception:
+        _terminado()
+        raise
+    # El contador baja cuando el proceso termina, aunque el request ya no espere
+    future.add_done_callback(_terminado)
+
+    try:
+        contenido, inicio, fin = future.result(timeout=settings.PDF_RENDER_TIMEOUT_SEGUNDOS)
+    except BrokenProcessPool:
+        logger.exception("El pool de render PDF se rompió; se recrea")
+        _descartar_executor(executor)
+        raise
+    except FuturesTimeoutError:
+        raise TimeoutError(f"El PDF {formato} tardó más de {settings.PDF_RENDER_TIMEOUT_SEGUNDOS} s")
+    registrar_render_pdf(max(inicio - enviado, 0.0), fin - inicio)
+    return contenido
@@ -0,0 +1,257 @@
+"""
+Resumen financiero diario (rollup) para el dashboard ejecutivo.
+
+Cada pago, egreso o movimiento registrado en caja acumula su monto en la
+tabla resumen_financiero_diario dentro de la misma transacción, de modo que
+los KPIs del dashboard se calculan sobre una fila por día/método/categoría
+en lugar de recorrer todas las transacciones del período.
+"""
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Optional
+
+from sqlalchemy import func, select, union_all, literal, cast, insert, Date, Integer, String
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.caja import MovimientoCaja, DetallePagoMovimientoCaja, TipoMovimiento
+from app.models.pago import Pago, DetallePago, EstadoPago
+from app.models.resumen_financiero import ResumenFinancieroDiario
+from app.utils.fechas import filtro_fechas
+
+ORIGEN_PAGO = "PAGO"
+ORIGEN_MOVIMIENTO = "MOVIMIENTO"
+CATEGORIA_PAGO_ESTUDIANTE = "PAGO_ESTUDIANTE"
+CATEGORIA_SIN_DEFINIR = "OTROS"
+METODO_SIN_DEFINIR = "SIN_METODO"
+
+# Tabla de origen de cada fila de flujos_financieros
+FUENTE_PAGO = "pagos"
+FUENTE_DETALLE_PAGO = "detalles_pago"
+FUENTE_MOVIMIENTO = "movimientos_caja"
+FUENTE_DETALLE_MOVIMIENTO = "detalles_pago_movimiento_caja"
+
+
+@dataclass
+class TotalesPeriodo:
+    """Totales financieros de un período (montos en pesos)"""
+    ingresos: Decimal = Decimal("0")
+    egresos: Decimal = Decimal("0")
+    ingresos_por_metodo: Dict[str, Decimal] = field(default_factory=dict)
+    egresos_por_categoria: Dict[str, Decimal] = field(default_factory=dict)
+
+
+def _valor(valor, por_defecto: str) -> str:
+    if valor is None or valor == "":
+        return por_defecto
+    if hasattr(valor, "value"):
+        return valor.value
+    return str(valor)
+
+
+def acumular_flujo(
+    db: Session,
+    fecha: datetime,
+    tipo: TipoMovimiento,
+    origen: str,
+    metodo_pago,
+    monto: Decimal,
+    categoria=None
+) -> None:
+    """Suma un flujo al resumen del día (upsert atómico, sin commit)."""
+    if monto is None:
+        return
+    stmt = pg_insert(ResumenFinancieroDiario).values(
+        fecha=fecha.date() if isinstance(fecha, datetime) else fecha,
+        tipo=_valor(tipo, TipoMovimiento.INGRESO.value),
+        origen=origen,
+        metodo_pago=_valor(metodo_pago, METODO_SIN_DEFINIR),
+        categoria=_valor(categoria, CATEGORIA_SIN_DEFINIR),
+        monto=Decimal(str(monto)),
+        cantidad=1,
+        updated_at=datetime.utcnow()
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_resumen_financiero_diario",
+        set_={
+            "monto": ResumenFinancieroDiario.monto + stmt.excluded.monto,
+            "cantidad": ResumenFinancieroDiario.cantidad + stmt.excluded.cantidad,
+            "updated_at": stmt.excluded.updated_at
+        }
+    )
+    db.execute(stmt)
+
+
+def totales_periodo(db: Session, fecha_inicio: date, fecha_fin: date) -> TotalesPeriodo:
+    """Totales del período [fecha_inicio, fecha_fin] leídos del resumen diario."""
+    filas = db.query(
+        ResumenFinancieroDiario.tipo,
+        ResumenFinancieroDiario.metodo_pago,
+        ResumenFinancieroDiario.categoria,
+        func.sum(ResumenFinancieroDiario.monto).label("total")
+    ).filter(
+        ResumenFinancieroDiario.fecha >= fecha_inicio,
+        ResumenFinancieroDiario.fecha <= fecha_fin
+    ).group_by(
+        ResumenFinancieroDiario.tipo,
+        ResumenFinancieroDiario.metodo_pago,
+        ResumenFinancieroDiario.categoria
+    ).all()
+    return _acumular_totales(filas)
+
+
+def _acumular_totales(filas) -> TotalesPeriodo:
+    """Convierte filas (tipo, metodo_pago, categoria, total) en TotalesPeriodo."""
+    totales = TotalesPeriodo()
+    for fila in filas:
+        monto = Decimal(str(fila.total or 0))
+        if fila.tipo == TipoMovimiento.INGRESO.value:
+            totales.ingresos += monto
+            totales.ingresos_por_metodo[fila.metodo_pago] = (
+                totales.ingresos_por_metodo.get(fila.metodo_pago, Decimal("0")) + monto
+            )
+        else:
+            totales.egresos += monto
+            totales.egresos_por_categoria[fila.categoria] = (
+                totales.egresos_por_categoria.get(fila.categoria, Decimal("0")) + monto
+            )
+    return totales
+
+
+def flujos_financieros(fecha_inicio: Optional[date] = None, fecha_fin: Optional[date] = None):
+    """
+    UNION ALL de todos los flujos de dinero con un método de pago por fila:
+    pagos simples, detalles de pagos mixtos, movimientos simples y detalles
+    de movimientos mixtos. Columnas: fecha, tipo, origen, metodo_pago,
+    categoria, monto, fuente (tabla de la fila), fuente_id (id en esa tabla)
+    y estudiante_id (solo pagos).
+    """
+    ingreso = literal(TipoMovimiento.INGRESO.value, String)
+    origen_pago = literal(ORIGEN_PAGO, String)
+    origen_movimiento = literal(ORIGEN_MOVIMIENTO, String)
+    categoria_pago = literal(CATEGORIA_PAGO_ESTUDIANTE, String)
+    categoria_movimiento = func.coalesce(cast(MovimientoCaja.categoria, String), CATEGORIA_SIN_DEFINIR)
+
+    pagos_simples = select(
+        cast(Pago.fecha_pago, Date).label("fecha"),
+        ingreso.label("tipo"),
+        origen_pago.label("origen"),
+        func.coalesce(cast(Pago.metodo_pago, String), METODO_SIN_DEFINIR).label("metodo_pago"),
+        categoria_pago.label("categoria"),
+        Pago.monto.label("monto"),
+        literal(FUENTE_PAGO, String).label("fuente"),
+        Pago.id.label("fuente_id"),
+        Pago.estudiante_id.label("estudiante_id")
+    ).where(
+        Pago.estado == EstadoPago.COMPLETADO,
+        Pago.es_pago_mixto == 0,
+        *filtro_fechas(Pago.fecha_pago, fecha_inicio, fecha_fin)
+    )
+
+    pagos_mixtos = select(
+        cast(Pago.fecha_pago, Date),
+        ingreso,
+        origen_pago,
+        cast(DetallePago.metodo_pago, String),
+        categoria_pago,
+        DetallePago.monto,
+        literal(FUENTE_DETALLE_PAGO, String),
+        DetallePago.id,
+        Pago.estudiante_id
+    ).join(
+        Pago, Pago.id == DetallePago.pago_id
+    ).where(
+        Pago.estado == EstadoPago.COMPLETADO,
+        Pago.es_pago_mixto == 1,
+        *filtro_fechas(Pago.fecha_pago, fecha_inicio, fecha_fin)
+    )
+
+    movimientos_simples = select(
+        cast(MovimientoCaja.fecha, Date),
+        cast(MovimientoCaja.tipo, String),
+        origen_movimiento,
+        func.coalesce(MovimientoCaja.metodo_pago, METODO_SIN_DEFINIR),
+        categoria_movimiento,
+        MovimientoCaja.monto,
+        literal(FUENTE_MOVIMIENTO, String),
+        MovimientoCaja.id,
+        literal(None, Integer)
+    ).where(
+        MovimientoCaja.es_pago_mixto == 0,
+        *filtro_fechas(MovimientoCaja.fecha, fecha_inicio, fecha_fin)
+    )
+
+    movimientos_mixtos = select(
+        cast(MovimientoCaja.fecha, Date),
+        cast(MovimientoCaja.tipo, String),
+        origen_movimiento,
+        cast(DetallePagoMovimientoCaja.metodo_pago, String),
+        categoria_movimiento,
+        DetallePagoMovimientoCaja.monto,
+        literal(FUENTE_DETALLE_MOVIMIENTO, String),
+        DetallePagoMovimientoCaja.id,
+        literal(None, Integer)
+    ).join(
+        MovimientoCaja, MovimientoCaja.id == DetallePagoMovimientoCaja.movimiento_id
+    ).where(
+        MovimientoCaja.es_pago_mixto == 1,
+        *filtro_fechas(MovimientoCaja.fecha, fecha_inicio, fecha_fin)
+    )
+
+    return union_all(pagos_simples, pagos_mixtos, movimientos_simples, movimientos_mixtos)
+
+
+def totales_en_vivo(db: Session, fecha_inicio: date, fecha_fin: date) -> TotalesPeriodo:
+    """Totales del período calculados en SQL sobre las tablas de origen (un solo query)."""
+    flujos = flujos_financieros(fecha_inicio, fecha_fin).subquery("flujos")
+    filas = db.query(
+        flujos.c.tipo,
+        flujos.c.metodo_pago,
+        flujos.c.categoria,
+        func.sum(flujos.c.monto).label("total")
+    ).group_by(
+        flujos.c.tipo,
+        flujos.c.metodo_pago,
+        flujos.c.categoria
+    ).all()
+    return _acumular_totales(filas)
+
+
+def reconstruir_resumen(db: Session, fecha_inicio: Optional[date] = None, fecha_fin: Optional[date] = None) -> int:
+    """
+    Recalcula el resumen diario desde pagos y movimientos (backfill).
+    Sin fechas reconstruye todo el histórico. Retorna las filas generadas.
+    """
+    borrar = db.query(ResumenFinancieroDiario)
+    if fecha_inicio:
+        borrar = borrar.filter(ResumenFinancieroDiario.fecha >= fecha_inicio)
+    if fecha_fin:
+        borrar = borrar.filter(ResumenFinancieroDiario.fecha <= fecha_fin)
+    borrar.delete(synchronize_session=False)
+
+    flujos = flujos_financieros(fecha_inicio, fecha_fin).subquery("flujos")
+    agrupado = select(
+        flujos.c.fecha,
+        flujos.c.tipo,
+        flujos.c.origen,
+        flujos.c.metodo_pago,
+        flujos.c.categoria,
+        func.sum(flujos.c.monto),
+        func.count(),
+        func.now()
+    ).group_by(
+        flujos.c.fecha,
+        flujos.c.tipo,
+        flujos.c.origen,
+        flujos.c.metodo_pago,
+        flujos.c.categoria
+    )
+    resultado = db.execute(
+        insert(ResumenFinancieroDiario).from_select(
+            ["fecha", "tipo", "origen", "metodo_pago", "categoria", "monto", "cantidad", "updated_at"],
+            agrupado
+        )
+    )
+    db.commit()
+    return resultado.rowcount or 0
@@ -0,0 +1,302 @@
+"""
+Snapshots inmutables de períodos cerrados.
+
+Una caja CERRADA ya no cambia sus totales y un mes terminado ya no recibe
+movimientos, así que sus agregados se congelan una sola vez:
+
+- snapshots_caja: copia de los totales de la caja al cerrarla (cerrar_caja).
+- snapshots_mensuales: flujos del mes agrupados por tipo/método/categoría,
+  congelados en el primer cierre de caja posterior al fin de mes.
+
+Los reportes leen los tramos históricos de los snapshots y calculan en vivo
+solo la cola abierta (cajas abiertas, meses incompletos o sin congelar).
+verificar_snapshots recalcula los snapshots desde el origen y reporta las
+diferencias.
+"""
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import func, select, insert, literal, cast, String
+from sqlalchemy.orm import Session
+
+from app.models.caja import Caja
+from app.models.snapshot_financiero import SnapshotCaja, SnapshotMensual, MesCongelado, COLUMNAS_TOTALES_CAJA
+from app.services.contadores_caja import totales_caja_desde_flujos
+from app.services.resumen_financiero import TotalesPeriodo, flujos_financieros, _acumular_totales
+from app.utils.fechas import filtro_fechas
+
+
+def inicio_mes(fecha: date) -> date:
+    return fecha.replace(day=1)
+
+
+def siguiente_mes(mes: date) -> date:
+    return (mes.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def fin_mes(mes: date) -> date:
+    return siguiente_mes(mes) - timedelta(days=1)
+
+
+# ==================== CONGELAR ====================
+
+def congelar_caja(db: Session, caja: Caja) -> SnapshotCaja:
+    """Copia los totales de la caja cerrada en snapshots_caja (sin commit)."""
+    db.query(SnapshotCaja).filter(SnapshotCaja.caja_id == caja.id).delete(synchronize_session=False)
+    snapshot = SnapshotCaja(
+        caja_id=caja.id,
+        fecha_apertura=caja.fecha_apertura,
+        fecha_cierre=caja.fecha_cierre,
+        **{columna: getattr(caja, columna) for columna in COLUMNAS_TOTALES_CAJA}
+    )
+    db.add(snapshot)
+    return snapshot
+
+
+def _flujos_agrupados_mes(mes: date):
+    """SELECT tipo, metodo_pago, categoria, monto, cantidad de los flujos del mes"""
+    flujos = flujos_financieros(mes, fin_mes(mes)).subquery("flujos")
+    return select(
+        flujos.c.tipo,
+        flujos.c.metodo_pago,
+        flujos.c.categoria,
+        func.sum(flujos.c.monto).label("monto"),
+        func.count().label("cantidad")
+    ).group_by(
+        flujos.c.tipo,
+        flujos.c.metodo_pago,
+        flujos.c.categoria
+    )
+
+
+def congelar_mes(db: Session, mes: date, hoy: Optional[date] = None) -> int:
+    """
+    Congela los flujos de un mes terminado (sin commit). Retorna las filas.
+    Lanza ValueError si el mes todavía no terminó.
+    """
+    mes = inicio_mes(mes)
+    hoy = hoy or datetime.utcnow().date()
+    if fin_mes(mes) >= hoy:
+        raise ValueError(f"El mes {mes:%Y-%m} no ha terminado")
+
+    db.query(SnapshotMensual).filter(SnapshotMensual.mes == mes).delete(synchronize_session=False)
+    db.query(MesCongelado).filter(MesCongelado.mes == mes).delete(synchronize_session=False)
+
+    agrupado = _flujos_agrupados_mes(mes).subquery("agrupado")
+    resultado = db.execute(
+        insert(SnapshotMensual).from_select(
+            ["mes", "tipo", "metodo_pago", "categoria", "monto", "cantidad", "congelado_en"],
+            select(
+                literal(mes),
+                agrupado.c.tipo,
+                agrupado.c.metodo_pago,
+                agrupado.c.categoria,
+                agrupado.c.monto,
+                agrupado.c.cantidad,
+                func.now()
+            )
+        )
+    )
+    db.add(MesCongelado(mes=mes))
+    db.flush()
+    return resultado.rowcount or 0
+
+
+def congelar_meses_pendientes(db: Session, hoy: Optional[date] = None) -> List[date]:
+    """
+    Congela los meses terminados posteriores al último congelado (sin commit).
+    Sin ningún mes congelado solo toma el mes anterior; el histórico lo
+    congela la migración create_snapshots_financieros.
+    """
+    hoy = hoy or datetime.utcnow().date()
+    mes_actual = inicio_mes(hoy)
+    ultimo = db.query(func.max(MesCongelado.mes)).scalar()
+    mes = siguiente_mes(ultimo) if ultimo else inicio_mes(mes_actual - timedelta(days=1))
+
+    congelados = []
+    while mes < mes_actual:
+        congelar_mes(db, mes, hoy)
+        congelados.append(mes)
+        mes = siguiente_mes(mes)
+    return congelados
+
+
+# ==================== LECTURA ====================
+
+def _sumar_totales(destino: TotalesPeriodo, origen: TotalesPeriodo) -> None:
+    destino.ingresos += origen.ingresos
+    destino.egresos += origen.egresos
+    for metodo, monto in origen.ingresos_por_metodo.items():
+        destino.ingresos_por_metodo[metodo] = destino.ingresos_por_metodo.get(metodo, Decimal("0")) + monto
+    for categoria, monto in origen.egresos_por_categoria.items():
+        destino.egresos_por_categoria[categoria] = destino.egresos_por_categoria.get(categoria, Decimal("0")) + monto
+
+
+def totales_con_snapshots(
+    db: Session,
+    fecha_inicio: date,
+    fecha_fin: date,
+    calcular_tramo: Callable[[Session, date, date], TotalesPeriodo]
+) -> TotalesPeriodo:
+    """
+    Totales de [fecha_inicio, fecha_fin]: los meses completos y congelados se
+    leen de snapshots_mensuales; los demás días se calculan con calcular_tramo.
+    """
+    meses = [
+        mes for (mes,) in db.query(MesCongelado.mes).filter(
+            MesCongelado.mes >= fecha_inicio,
+            MesCongelado.mes <= fecha_fin
+        ).order_by(MesCongelado.mes).all()
+        if fin_mes(mes) <= fecha_fin
+    ]
+
+    totales = TotalesPeriodo()
+    if meses:
+        filas = db.query(
+            SnapshotMensual.tipo,
+            SnapshotMensual.metodo_pago,
+            SnapshotMensual.categoria,
+            func.sum(SnapshotMensual.monto).label("total")
+        ).filter(
+            SnapshotMensual.mes.in_(meses)
+        ).group_by(
+            SnapshotMensual.tipo,
+            SnapshotMensual.metodo_pago,
+            SnapshotMensual.categoria
+        ).all()
+        _sumar_totales(totales, _acumular_totales(filas))
+
+    # Tramos sin snapshot: huecos entre los meses congelados
+    desde = fecha_inicio
+    for mes in meses:
+        if desde < mes:
+            _sumar_totales(totales, calcular_tramo(db, desde, mes - timedelta(days=1)))
+        desde = siguiente_mes(mes)
+    if desde <= fecha_fin:
+        _sumar_totales(totales, calcular_tramo(db, desde, fecha_fin))
+    return totales
+
+
+def cajas_con_snapshot(fecha_inicio: date, fecha_fin: date):
+    """
+    Subquery con una fila por caja abierta en el período: las cerradas salen
+    de snapshots_caja y las que no tienen snapshot de la tabla cajas.
+    Columnas: id, fecha_apertura, fecha_cierre, estado y COLUMNAS_TOTALES_CAJA.
+    """
+    congeladas = select(
+        SnapshotCaja.caja_id.label("id"),
+        SnapshotCaja.fecha_apertura.label("fecha_apertura"),
+        SnapshotCaja.fecha_cierre.label("fecha_cierre"),
+        literal("CERRADA", String).label("estado"),
+        *[getattr(SnapshotCaja, columna).label(columna) for columna in COLUMNAS_TOTALES_CAJA]
+    ).where(
+        *filtro_fechas(SnapshotCaja.fecha_apertura, fecha_inicio, fecha_fin)
+    )
+    en_vivo = select(
+        Caja.id,
+        Caja.fecha_apertura,
+        Caja.fecha_cierre,
+        cast(Caja.estado, String),
+        *[getattr(Caja, columna) for columna in COLUMNAS_TOTALES_CAJA]
+    ).outerjoin(
+        SnapshotCaja, SnapshotCaja.caja_id == Caja.id
+    ).where(
+        SnapshotCaja.id.is_(None),
+        *filtro_fechas(Caja.fecha_apertura, fecha_inicio, fecha_fin)
+    )
+    return congeladas.union_all(en_vivo).subquery("cajas_periodo")
+
+
+# ==================== VERIFICACIÓN ====================
+
+def _totales_caja_recalculados(db: Session, caja: Caja) -> Dict[str, Decimal]:
+    """
+    Totales de la caja recalculados desde pagos y movimientos. La base, el
+    efectivo físico contado y la diferencia no salen de los flujos: base y
+    físico se toman de la caja y la diferencia se rehace como en cerrar_caja.
+    """
+    cero = Decimal("0")
+    totales = totales_caja_desde_flujos(db, caja.id)
+    recalculado = {
+        columna: totales.get(columna, cero)
+        for columna in COLUMNAS_TOTALES_CAJA
+        if columna not in ("saldo_inicial", "efectivo_teorico", "efectivo_fisico", "diferencia")
+    }
+    saldo_inicial = caja.saldo_inicial or cero
+    efectivo_teorico = max(recalculado["total_ingresos_efectivo"] - recalculado["total_egresos_efectivo"], cero)
+    recalculado["saldo_inicial"] = saldo_inicial
+    recalculado["efectivo_teorico"] = efectivo_teorico
+    recalculado["efectivo_fisico"] = caja.efectivo_fisico
+    if caja.efectivo_fisico is not None:
+        recalculado["diferencia"] = (caja.efectivo_fisico - saldo_inicial) - efectivo_teorico
+    else:
+        recalculado["diferencia"] = caja.diferencia
+    return recalculado
+
+
+def verificar_snapshot_caja(db: Session, caja_id: int) -> Dict:
+    """Recalcula los totales de la caja desde pagos y movimientos y los compara con el snapshot."""
+    snapshot = db.query(SnapshotCaja).filter(SnapshotCaja.caja_id == caja_id).first()
+    caja = db.query(Caja).filter(Caja.id == caja_id).first()
+    if snapshot is None or caja is None:
+        return {"caja_id": caja_id, "consistente": False, "error": "Caja o snapshot no encontrado", "diferencias": []}
+
+    recalculado = _totales_caja_recalculados(db, caja)
+    diferencias = [
+        {"campo": columna, "snapshot": getattr(snapshot, columna), "recalculado": recalculado[columna]}
+        for columna in COLUMNAS_TOTALES_CAJA
+        if (getattr(snapshot, columna) or Decimal("0")) != (recalculado[columna] or Decimal("0"))
+    ]
+    return {"caja_id": caja_id, "consistente": not diferencias, "diferencias": diferencias}
+
+
+def verificar_snapshot_mes(db: Session, mes: date) -> Dict:
+    """Recalcula los flujos del mes desde pagos y movimientos y los compara con el snapshot."""
+    mes = inicio_mes(mes)
+    guardado = {
+        (f.tipo, f.metodo_pago, f.categoria): (f.monto or Decimal("0"), f.cantidad or 0)
+        for f in db.query(SnapshotMensual).filter(SnapshotMensual.mes == mes).all()
+    }
+    recalculado = {
+        (f.tipo, f.metodo_pago, f.categoria): (Decimal(str(f.monto or 0)), f.cantidad or 0)
+        for f in db.execute(_flujos_agrupados_mes(mes)).all()
+    }
+
+    diferencias = []
+    for clave in sorted(set(guardado) | set(recalculado)):
+        valor_guardado = guardado.get(clave, (Decimal("0"), 0))
+        valor_recalculado = recalculado.get(clave, (Decimal("0"), 0))
+        if valor_guardado != valor_recalculado:
+            tipo, metodo_pago, categoria = clave
+            diferencias.append({
+                "tipo": tipo,
+                "metodo_pago": metodo_pago,
+                "categoria": categoria,
+                "snapshot": valor_guardado[0],
+                "recalculado": valor_recalculado[0],
+                "cantidad_snapshot": valor_guardado[1],
+                "cantidad_recalculada": valor_recalculado[1],
+            })
+    return {"mes": mes, "consistente": not diferencias, "diferencias": diferencias}
+
+
+def verificar_snapshots(db: Session, fecha_inicio: Optional[date] = None, fecha_fin: Optional[date] = None) -> Dict:
+    """Verifica todos los meses congelados y snapshots de caja del rango."""
+    meses = db.query(MesCongelado.mes).order_by(MesCongelado.mes)
+    cajas = db.query(SnapshotCaja.caja_id).order_by(SnapshotCaja.fecha_apertura)
+    if fecha_inicio:
+        meses = meses.filter(MesCongelado.mes >= inicio_mes(fecha_inicio))
+    if fecha_fin:
+        meses = meses.filter(MesCongelado.mes <= fecha_fin)
+    cajas = cajas.filter(*filtro_fechas(SnapshotCaja.fecha_apertura, fecha_inicio, fecha_fin))
+
+    resultados_meses = [verificar_snapshot_mes(db, mes) for (mes,) in meses.all()]
+    resultados_cajas = [verificar_snapshot_caja(db, caja_id) for (caja_id,) in cajas.all()]
+    return {
+        "consistente": all(r["consistente"] for r in resultados_meses + resultados_cajas),
+        "meses_verificados": len(resultados_meses),
+        "cajas_verificadas": len(resultados_cajas),
+        "meses_inconsistentes": [r for r in resultados_meses if not r["consistente"]],
+        "cajas_inconsistentes": [r for r in resultados_cajas if not r["consistente"]],
+    }
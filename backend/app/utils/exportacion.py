@@ -0,0 +1,70 @@
+"""
+Generadores para exportar listados grandes como CSV o XLSX por streaming.
+
+Reciben un iterable de filas (normalmente un query con yield_per) y producen
+el archivo por bloques, sin armar el listado completo en memoria.
+"""
+import csv
+import io
+import tempfile
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Iterable, Iterator, Sequence
+
+from openpyxl import Workbook
+
+TAMANO_BLOQUE = 64 * 1024
+
+
+def _texto_csv(valor: Any) -> str:
+    if valor is None:
+        return ""
+    if isinstance(valor, bool):
+        return "Sí" if valor else "No"
+    if isinstance(valor, datetime):
+        return valor.isoformat(sep=" ", timespec="seconds")
+    if isinstance(valor, date):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return format(valor, "f")
+    return str(valor)
+
+
+def stream_csv(encabezados: Sequence[str], filas: Iterable[Sequence[Any]]) -> Iterator[str]:
+    """CSV UTF-8 con BOM (como las exportaciones del frontend), en bloques de ~64 KB"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow(encabezados)
+    for fila in filas:
+        writer.writerow([_texto_csv(valor) for valor in fila])
+        if buffer.tell() >= TAMANO_BLOQUE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_xlsx(titulo: str, encabezados: Sequence[str], filas: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+    """
+    XLSX en modo write_only: openpyxl escribe las filas a disco a medida que
+    llegan y el archivo final (zip) se envía por bloques desde un temporal.
+    """
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet(title=titulo[:31])
+    hoja.append(list(encabezados))
+    for fila in filas:
+        hoja.append([
+            valor.replace(tzinfo=None) if isinstance(valor, datetime) else valor
+            for valor in fila
+        ])
+
+    with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as archivo:
+        libro.save(archivo)
+        archivo.seek(0)
+        while True:
+            bloque = archivo.read(TAMANO_BLOQUE)
+            if not bloque:
+                break
+            yield bloque
@@ -0,0 +1,78 @@
+"""
+Filtros de rango de fechas para consultas sobre columnas DateTime.
+
+Los reportes reciben fechas (días) y las columnas guardan timestamps. En lugar
+de comparar con CAST(columna AS DATE), que impide usar índices, el rango de
+días se convierte en un intervalo semiabierto de timestamps:
+
+    [fecha_inicio 00:00, fecha_fin + 1 día 00:00)
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Any, List, Optional, Tuple, Union
+
+FechaFiltro = Union[date, datetime]
+
+
+def inicio_dia(fecha: date) -> datetime:
+    """Primer instante del día"""
+    return datetime.combine(fecha, time.min)
+
+
+def rango_timestamps(
+    fecha_inicio: Optional[FechaFiltro] = None,
+    fecha_fin: Optional[FechaFiltro] = None
+) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Convierte un rango de días (ambos inclusive) en (desde, hasta) semiabierto.
+    Si se recibe un datetime se respeta como instante exacto (hasta se
+    desplaza un microsegundo para conservar la comparación inclusiva).
+    """
+    desde = None
+    hasta = None
+    if fecha_inicio is not None:
+        desde = fecha_inicio if isinstance(fecha_inicio, datetime) else inicio_dia(fecha_inicio)
+    if fecha_fin is not None:
+        if isinstance(fecha_fin, datetime):
+            hasta = fecha_fin + timedelta(microseconds=1)
+        else:
+            hasta = inicio_dia(fecha_fin + timedelta(days=1))
+    return desde, hasta
+
+
+def filtro_fechas(
+    columna,
+    fecha_inicio: Optional[FechaFiltro] = None,
+    fecha_fin: Optional[FechaFiltro] = None
+) -> List:
+    """
+    Condiciones SQLAlchemy para filtrar una columna DateTime por rango de días.
+    Uso: query.filter(*filtro_fechas(Pago.fecha_pago, fecha_inicio, fecha_fin))
+    """
+    desde, hasta = rango_timestamps(fecha_inicio, fecha_fin)
+    condiciones = []
+    if desde is not None:
+        condiciones.append(columna >= desde)
+    if hasta is not None:
+        condiciones.append(columna < hasta)
+    return condiciones
+
+
+def parse_fecha(value: Any) -> Optional[datetime]:
+    """Interpreta fechas guardadas en JSON (date, datetime o texto en varios formatos)"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, datetime.min.time())
+    if isinstance(value, str):
+        for fmt in ("%Y-%m-%d", "%Y/%m/%d", "%d/%m/%Y"):
+            try:
+                return datetime.strptime(value, fmt)
+            except ValueError:
+                continue
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    return None
@@ -0,0 +1,39 @@
+"""
+Paginación por cursor (keyset) para listados ordenados por fecha descendente.
+
+El cursor es opaco para el cliente: codifica la fecha y el id de la última
+fila entregada, y la siguiente página pide las filas estrictamente
+anteriores en el orden (fecha DESC, id DESC). A diferencia de OFFSET, el costo
+no crece con el número de página y no se repiten ni saltan filas cuando se
+insertan registros nuevos mientras se recorre la lista.
+"""
+import base64
+from datetime import datetime
+from typing import Tuple
+
+from sqlalchemy import and_, or_
+
+
+def codificar_cursor(fecha: datetime, id_fila: int) -> str:
+    crudo = f"{fecha.isoformat()}|{id_fila}"
+    return base64.urlsafe_b64encode(crudo.encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Retorna (fecha, id). Lanza ValueError si el cursor no es válido."""
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        crudo = base64.urlsafe_b64decode(cursor + relleno).decode()
+        fecha, id_fila = crudo.rsplit("|", 1)
+        return datetime.fromisoformat(fecha), int(id_fila)
+    except Exception as exc:
+        raise ValueError("Cursor inválido") from exc
+
+
+def filtro_despues_de_cursor(columna_fecha, columna_id, cursor: str):
+    """Condición para las filas que siguen al cursor en orden (fecha DESC, id DESC)"""
+    fecha, id_fila = decodificar_cursor(cursor)
+    return or_(
+        columna_fecha < fecha,
+        and_(columna_fecha == fecha, columna_id < id_fila)
+    )
@@ -0,0 +1,231 @@
+"""
+Plantilla de los PDF con la marca de CEA EDUCAR (recibos, cierre de caja,
+contrato).
+
+La marca se carga una vez por proceso (cargar_marca, al iniciar la app): se
+resuelve la ruta del logo, se decodifica la imagen y se codifica como
+XObject de imagen de PDF. Cada documento registra una copia de ese XObject
+en lugar de volver a comprimir el logo, que era casi todo el tiempo de
+generar un recibo.
+
+El encabezado (logo y nombre de la escuela) se dibuja una vez por documento
+como form XObject; cada página solo lo referencia y agrega su título.
+PlantillaPdf expone las primitivas de layout de los recibos: sección,
+etiqueta/valor y tabla, con salto de página.
+"""
+import copy
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from decimal import Decimal
+from io import BytesIO
+from typing import Optional, Sequence
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfdoc
+from reportlab.pdfgen import canvas
+
+logger = logging.getLogger(__name__)
+
+_ASSETS_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "..", "frontend", "src", "assets")
+)
+_LOGOS = ("cea_educar_final.png", "cea educar final.jpg")
+_NOMBRE_LOGO = "logo_cea"
+_FORM_ENCABEZADO = "encabezado_cea"
+
+
+@dataclass
+class _Logo:
+    lector: ImageReader
+    imagen: pdfdoc.PDFImageXObject
+    mascara: Optional[pdfdoc.PDFImageXObject]  # Transparencia del PNG
+
+
+_logo: Optional[_Logo] = None
+_marca_cargada = False
+_lock = threading.Lock()
+
+
+def _ruta_logo() -> Optional[str]:
+    """CEA_LOGO_PATH o el logo de los assets del frontend"""
+    ruta = os.getenv("CEA_LOGO_PATH")
+    if ruta:
+        return ruta if os.path.exists(ruta) else None
+    for nombre in _LOGOS:
+        ruta = os.path.join(_ASSETS_DIR, nombre)
+        if os.path.exists(ruta):
+            return ruta
+    if os.path.isdir(_ASSETS_DIR):
+        for nombre in sorted(os.listdir(_ASSETS_DIR)):
+            if nombre.lower().endswith(".png"):
+                return os.path.join(_ASSETS_DIR, nombre)
+    return None
+
+
+def cargar_marca() -> None:
+    """Resuelve, decodifica y codifica el logo. Solo trabaja la primera vez."""
+    global _logo, _marca_cargada
+    if _marca_cargada:
+        return
+    with _lock:
+        if _marca_cargada:
+            return
+        ruta = _ruta_logo()
+        if ruta:
+            try:
+                lector = ImageReader(ruta)
+                imagen = pdfdoc.PDFImageXObject(_NOMBRE_LOGO, lector, mask="auto")
+                imagen.name = _NOMBRE_LOGO
+                mascara = getattr(imagen, "_smask", None)
+                if mascara is not None:
+                    del imagen._smask
+                _logo = _Logo(lector=lector, imagen=imagen, mascara=mascara)
+            except Exception:
+                logger.exception("No se pudo cargar el logo %s", ruta)
+        _marca_cargada = True
+
+
+def _registrar_logo(c: canvas.Canvas) -> str:
+    """Agrega el logo precodificado al documento (una vez) y retorna su nombre interno"""
+    documento = c._doc
+    nombre_interno = documento.getXObjectName(_logo.imagen.name)
+    if nombre_interno not in documento.idToObject:
+        # Copia superficial: comparte el stream ya comprimido, pero cada
+        # documento registra su propio objeto
+        imagen = copy.copy(_logo.imagen)
+        documento.Reference(imagen, nombre_interno)
+        documento.addForm(imagen.name, imagen)
+        if _logo.mascara is not None:
+            mascara = copy.copy(_logo.mascara)
+            imagen.smask = documento.Reference(mascara, documento.getXObjectName(mascara.name))
+    return nombre_interno
+
+
+def dibujar_logo(c: canvas.Canvas, x: float, y: float, ancho: float, alto: float) -> None:
+    """Logo centrado en la caja (x, y, ancho, alto), conservando la proporción"""
+    cargar_marca()
+    if _logo is None:
+        return
+    escala = min(ancho / _logo.imagen.width, alto / _logo.imagen.height)
+    w = _logo.imagen.width * escala
+    h = _logo.imagen.height * escala
+    x += (ancho - w) / 2
+    y += (alto - h) / 2
+    try:
+        nombre_interno = _registrar_logo(c)
+    except Exception:
+        # API interna de reportlab: si cambia, se dibuja de la forma normal
+        c.drawImage(_logo.lector, x, y, width=w, height=h, mask="auto")
+        return
+    c.saveState()
+    c.translate(x, y)
+    c.scale(w, h)
+    c._code.append(f"/{nombre_interno} Do")
+    c.restoreState()
+    c._formsinuse.append(_logo.imagen.name)
+
+
+def formato_moneda(value: Decimal) -> str:
+    try:
+        return f"${value:,.0f}"
+    except Exception:
+        return f"${value}"
+
+
+class PlantillaPdf:
+    """
+    Documento carta con el encabezado de CEA EDUCAR y un cursor vertical:
+    cada primitiva dibuja en `y` y lo mueve hacia abajo.
+    """
+
+    MARGEN_INFERIOR = 90
+
+    def __init__(self, titulo: str):
+        self._buffer = BytesIO()
+        self.c = canvas.Canvas(self._buffer, pagesize=letter)
+        self.y = 0
+        self._encabezado_definido = False
+        self.encabezado(titulo)
+
+    def _definir_encabezado(self) -> None:
+        c = self.c
+        c.beginForm(_FORM_ENCABEZADO)
+        dibujar_logo(c, 186, 675, 240, 120)
+        c.setFont("Helvetica-Bold", 16)
+        c.drawCentredString(306, 652, "CEA EDUCAR")
+        c.setFont("Helvetica", 11)
+        c.drawCentredString(306, 636, "Centro de ensenanza automovilistica")
+        c.endForm()
+        self._encabezado_definido = True
+
+    def encabezado(self, titulo: str) -> None:
+        if not self._encabezado_definido:
+            self._definir_encabezado()
+        c = self.c
+        c.doForm(_FORM_ENCABEZADO)
+        c.setFont("Helvetica-Bold", 14)
+        c.drawCentredString(306, 620, titulo)
+        self.y = 580
+        c.setLineWidth(0.5)
+        c.line(80, self.y, 532, self.y)
+        self.y -= 20
+
+    def nueva_pagina(self, titulo: str) -> None:
+        self.c.showPage()
+        self.encabezado(titulo)
+
+    def asegurar_espacio(self, min_y: float, titulo: str) -> bool:
+        """Pasa a una página nueva si no queda espacio hasta min_y. True si saltó."""
+        if self.y < min_y:
+            self.nueva_pagina(titulo)
+            return True
+        return False
+
+    def espacio(self, puntos: float = 6) -> None:
+        self.y -= puntos
+
+    def seccion(self, titulo: str) -> None:
+        c = self.c
+        titulo = titulo.upper()
+        x = 80
+        width = 452
+        height = 18
+        c.setFillColor(colors.Color(0.95, 0.96, 0.98))
+        c.setStrokeColor(colors.Color(0.88, 0.90, 0.94))
+        c.rect(x, self.y - 12, width, height, fill=1, stroke=1)
+        c.setFillColor(colors.black)
+        c.setFont("Helvetica-Bold", 11)
+        text_width = c.stringWidth(titulo, "Helvetica-Bold", 11)
+        c.drawString(x + (width - text_width) / 2, self.y - 8, titulo)
+        self.y -= 24
+
+    def kv(self, etiqueta: str, valor) -> None:
+        c = self.c
+        c.setFont("Helvetica-Bold", 10)
+        c.drawString(120, self.y, f"{etiqueta}:")
+        c.setFont("Helvetica", 10)
+        c.drawString(300, self.y, str(valor))
+        self.y -= 18
+
+    def tabla_encabezado(self, columnas: Sequence[str], anchos: Sequence[float]) -> None:
+        self._fila(columnas, anchos, "Helvetica-Bold")
+
+    def tabla_fila(self, valores: Sequence, anchos: Sequence[float]) -> None:
+        self._fila(valores, anchos, "Helvetica")
+
+    def _fila(self, valores: Sequence, anchos: Sequence[float], fuente: str) -> None:
+        x = 80
+        self.c.setFont(fuente, 9)
+        for valor, ancho in zip(valores, anchos):
+            self.c.drawString(x, self.y, str(valor))
+            x += ancho
+        self.y -= 14
+
+    def terminar(self) -> bytes:
+        self.c.showPage()
+        self.c.save()
+        return self._buffer.getvalue()
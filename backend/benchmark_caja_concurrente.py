@@ -0,0 +1,112 @@
+"""
+Benchmark de concurrencia en caja: N cajeros registrando pagos a la vez.
+
+Compara el patrón anterior (SELECT ... FOR UPDATE de la caja al inicio del
+request y suma en Python) con el actual (UPDATE atómico col = col + :monto
+después del trabajo del request, ver _aplicar_totales_caja). Cada operación
+simula el trabajo del request dentro de la transacción y termina con
+ROLLBACK, así el benchmark no deja datos.
+
+Ejecutar contra una base con una caja ABIERTA:
+    python benchmark_caja_concurrente.py --cajeros 8 --operaciones 50 --trabajo-ms 20
+
+Reporta p50/p99 de latencia por operación y el throughput de cada patrón.
+"""
+import argparse
+import statistics
+import threading
+import time
+from decimal import Decimal
+
+from sqlalchemy import text
+
+from app.core.database import SessionLocal
+from app.models.caja import Caja, EstadoCaja
+from app.models.pago import MetodoPago
+from app.api.v1.endpoints.caja import _actualizar_caja_por_metodo, _aplicar_totales_caja
+
+MONTO = Decimal("1000")
+
+
+def _operacion_bloqueo(db, caja_id: int, trabajo: float) -> None:
+    caja = db.query(Caja).filter(Caja.id == caja_id).with_for_update().first()
+    time.sleep(trabajo)  # validaciones, inserts del pago, resumen diario...
+    caja.total_ingresos_efectivo += MONTO
+    db.flush()
+
+
+def _operacion_atomica(db, caja_id: int, trabajo: float) -> None:
+    db.query(Caja).filter(Caja.id == caja_id).first()
+    time.sleep(trabajo)
+    totales = {}
+    _actualizar_caja_por_metodo(totales, MetodoPago.EFECTIVO, MONTO)
+    _aplicar_totales_caja(db, caja_id, totales)
+
+
+def _percentil(valores: list, p: float) -> float:
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, max(0, round(p / 100 * len(ordenados)) - 1))
+    return ordenados[indice]
+
+
+def _medir(operacion, caja_id: int, cajeros: int, operaciones: int, trabajo: float):
+    latencias = []
+    lock = threading.Lock()
+    barrera = threading.Barrier(cajeros)
+
+    def cajero():
+        db = SessionLocal()
+        try:
+            db.execute(text("SELECT 1"))  # conexión lista antes de arrancar
+            db.rollback()
+            barrera.wait()
+            for _ in range(operaciones):
+                inicio = time.perf_counter()
+                try:
+                    operacion(db, caja_id, trabajo)
+                finally:
+                    db.rollback()
+                with lock:
+                    latencias.append(time.perf_counter() - inicio)
+        finally:
+            db.close()
+
+    hilos = [threading.Thread(target=cajero) for _ in range(cajeros)]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return latencias, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cajeros", type=int, default=8)
+    parser.add_argument("--operaciones", type=int, default=50, help="operaciones por cajero")
+    parser.add_argument("--trabajo-ms", type=float, default=20, help="trabajo simulado dentro de la transacción")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        caja = db.query(Caja).filter(Caja.estado == EstadoCaja.ABIERTA).first()
+        if caja is None:
+            print("✗ No hay una caja abierta")
+            return
+        caja_id = caja.id
+    finally:
+        db.close()
+
+    print(f"Caja #{caja_id}, {args.cajeros} cajeros x {args.operaciones} operaciones, "
+          f"{args.trabajo_ms:.0f} ms de trabajo por operación")
+    trabajo = args.trabajo_ms / 1000
+    for nombre, operacion in (("bloqueo", _operacion_bloqueo), ("atomico", _operacion_atomica)):
+        latencias, total = _medir(operacion, caja_id, args.cajeros, args.operaciones, trabajo)
+        print(f"{nombre:>8}: p50 {_percentil(latencias, 50) * 1000:.1f} ms, "
+              f"p99 {_percentil(latencias, 99) * 1000:.1f} ms, "
+              f"media {statistics.mean(latencias) * 1000:.1f} ms, "
+              f"{len(latencias) / total:.1f} ops/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Benchmark del dashboard ejecutivo: secciones en serie vs. en paralelo.
+
+Ejecutar contra una base con datos (copia de producción o base sembrada):
+    python benchmark_dashboard.py --desde 2025-01-01 --hasta 2025-12-31 --repeticiones 5
+
+Con --sembrar primero carga en la base un conjunto representativo para el
+período (una caja cerrada por día con sus pagos y egresos, estudiantes en
+todos los estados, pagos pendientes) y reconstruye el resumen financiero
+diario de esas fechas. Los registros sembrados se marcan con el dominio
+@benchmark.local y el prefijo BENCH-; si ya existen no se vuelven a sembrar.
+Usar solo en una base de pruebas:
+    python benchmark_dashboard.py --sembrar --estudiantes 3000 --pagos-por-dia 40
+
+Mide tiempo de reloj de _calcular_secciones_dashboard en ambos modos, sin
+pasar por el cache de reportes.
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.security import get_password_hash
+from app.api.v1.endpoints.reportes import _calcular_secciones_dashboard
+from app.models.usuario import Usuario, RolUsuario
+from app.models.estudiante import Estudiante, EstadoEstudiante, CategoriaLicencia
+from app.models.caja import Caja, MovimientoCaja, EstadoCaja, TipoMovimiento, ConceptoMovimientoCaja
+from app.models.pago import Pago, MetodoPago, EstadoPago
+from app.services.resumen_financiero import reconstruir_resumen
+
+DOMINIO_SEMBRADO = "benchmark.local"
+
+
+def _sembrar(fecha_inicio: date, fecha_fin: date, num_estudiantes: int, pagos_por_dia: int, egresos_por_dia: int) -> None:
+    """Carga el conjunto de prueba (una sola vez) y reconstruye el resumen diario"""
+    azar = random.Random(20240101)
+    db = SessionLocal()
+    try:
+        if db.query(Usuario.id).filter(Usuario.email.like(f"%@{DOMINIO_SEMBRADO}")).first():
+            print("La base ya tiene datos sembrados, no se vuelven a cargar")
+            return
+
+        inicio = time.perf_counter()
+        dias = (fecha_fin - fecha_inicio).days + 1
+        clave = get_password_hash("benchmark")
+        cajero_id = db.scalar(insert(Usuario).returning(Usuario.id), [{
+            "email": f"cajero@{DOMINIO_SEMBRADO}", "password_hash": clave, "nombre_completo": "Cajero benchmark",
+            "cedula": "BENCH-CAJERO", "rol": RolUsuario.CAJERO, "is_active": True
+        }])
+
+        usuarios_ids = db.scalars(insert(Usuario).returning(Usuario.id), [
+            {
+                "email": f"estudiante{i}@{DOMINIO_SEMBRADO}", "password_hash": clave,
+                "nombre_completo": f"Estudiante benchmark {i}", "cedula": f"BENCH-{i}",
+                "rol": RolUsuario.ESTUDIANTE, "is_active": True
+            }
+            for i in range(num_estudiantes)
+        ]).all()
+        estados = [e for e in EstadoEstudiante if e != EstadoEstudiante.PROSPECTO]
+        estudiantes = []
+        for i, usuario_id in enumerate(usuarios_ids):
+            valor = Decimal(azar.choice((900000, 1200000, 1500000, 2100000)))
+            estudiantes.append({
+                "usuario_id": usuario_id,
+                "fecha_nacimiento": date(1990 + i % 15, 1 + i % 12, 1 + i % 28),
+                "matricula_numero": f"BENCH-{i:06d}",
+                "categoria": azar.choice((CategoriaLicencia.A2, CategoriaLicencia.B1, CategoriaLicencia.C1)),
+                "estado": azar.choice(estados),
+                "fecha_inscripcion": datetime.combine(fecha_inicio, datetime.min.time())
+                + timedelta(days=azar.randrange(dias), hours=azar.randrange(8, 18)),
+                "valor_total_curso": valor,
+                "saldo_pendiente": valor * Decimal(azar.choice((0, 0, 25, 50, 100))) / 100,
+                "datos_adicionales": {},
+            })
+        estudiantes_ids = db.scalars(insert(Estudiante).returning(Estudiante.id), estudiantes).all()
+
+        cajas, pagos, egresos = [], [], []
+        for d in range(dias):
+            apertura = datetime.combine(fecha_inicio + timedelta(days=d), datetime.min.time()) + timedelta(hours=7)
+            efectivo = transferencia = egresos_efectivo = Decimal("0")
+            pagos_dia = []
+            for _ in range(pagos_por_dia):
+                monto = Decimal(azar.choice((50000, 100000, 200000, 350000)))
+                metodo = azar.choice((MetodoPago.EFECTIVO, MetodoPago.EFECTIVO, MetodoPago.NEQUI))
+                if metodo == MetodoPago.EFECTIVO:
+                    efectivo += monto
+                else:
+                    transferencia += monto
+                pagos_dia.append({
+                    "estudiante_id": azar.choice(estudiantes_ids), "concepto": "Abono curso", "monto": monto,
+                    "metodo_pago": metodo, "es_pago_mixto": 0, "estado": EstadoPago.COMPLETADO,
+                    "fecha_pago": apertura + timedelta(minutes=azar.randrange(600)), "fecha_vencimiento": None,
+                    "created_by_user_id": cajero_id
+                })
+            egresos_dia = []
+            for _ in range(egresos_por_dia):
+                monto = Decimal(azar.choice((20000, 45000, 80000)))
+                egresos_efectivo += monto
+                egresos_dia.append({
+                    "tipo": TipoMovimiento.EGRESO, "concepto": "Gasto operativo",
+                    "categoria": azar.choice(list(ConceptoMovimientoCaja)), "monto": monto,
+                    "metodo_pago": MetodoPago.EFECTIVO.value, "usuario_id": cajero_id, "es_pago_mixto": 0,
+                    "fecha": apertura + timedelta(minutes=azar.randrange(600))
+                })
+            teorico = Decimal("200000") + efectivo - egresos_efectivo
+            cajas.append({
+                "fecha_apertura": apertura, "fecha_cierre": apertura + timedelta(hours=11),
+                "usuario_apertura_id": cajero_id, "usuario_cierre_id": cajero_id,
+                "saldo_inicial": Decimal("200000"), "estado": EstadoCaja.CERRADA,
+                "total_ingresos_efectivo": efectivo, "total_nequi": transferencia,
+                "total_ingresos_transferencia": transferencia, "total_egresos_efectivo": egresos_efectivo,
+                "efectivo_teorico": teorico, "efectivo_fisico": teorico, "diferencia": Decimal("0")
+            })
+            pagos.append(pagos_dia)
+            egresos.append(egresos_dia)
+
+        cajas_ids = db.scalars(insert(Caja).returning(Caja.id), cajas).all()
+        filas_pagos = [dict(p, caja_id=caja_id) for caja_id, lote in zip(cajas_ids, pagos) for p in lote]
+        filas_egresos = [dict(e, caja_id=caja_id) for caja_id, lote in zip(cajas_ids, egresos) for e in lote]
+        # Cuotas pendientes, la mitad ya vencidas
+        hoy = datetime.utcnow()
+        filas_pagos += [
+            {
+                "estudiante_id": azar.choice(estudiantes_ids), "concepto": "Cuota pendiente",
+                "monto": Decimal("150000"), "metodo_pago": None, "es_pago_mixto": 0,
+                "estado": EstadoPago.PENDIENTE, "fecha_pago": hoy,
+                "fecha_vencimiento": hoy + timedelta(days=azar.randrange(-60, 60)),
+                "created_by_user_id": cajero_id, "caja_id": None
+            }
+            for _ in range(num_estudiantes // 4)
+        ]
+        db.execute(insert(Pago), filas_pagos)
+        db.execute(insert(MovimientoCaja), filas_egresos)
+        db.commit()
+
+        filas_resumen = reconstruir_resumen(db, fecha_inicio, fecha_fin)
+        print(f"Sembrado en {time.perf_counter() - inicio:.1f} s: {num_estudiantes} estudiantes, "
+              f"{len(cajas_ids)} cajas, {len(filas_pagos)} pagos, {len(filas_egresos)} egresos, "
+              f"{filas_resumen} filas de resumen diario")
+    finally:
+        db.close()
+
+
+def _medir(paralelo: bool, fecha_inicio: date, fecha_fin: date, repeticiones: int) -> list:
+    tiempos = []
+    for _ in range(repeticiones):
+        db = SessionLocal()
+        try:
+            inicio = time.perf_counter()
+            _calcular_secciones_dashboard(db, fecha_inicio, fecha_fin, True, paralelo=paralelo)
+            tiempos.append(time.perf_counter() - inicio)
+        finally:
+            db.close()
+    return tiempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--desde", type=date.fromisoformat, default=date.today().replace(month=1, day=1))
+    parser.add_argument("--hasta", type=date.fromisoformat, default=date.today())
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--sembrar", action="store_true", help="cargar antes el conjunto de prueba del período")
+    parser.add_argument("--estudiantes", type=int, default=3000)
+    parser.add_argument("--pagos-por-dia", type=int, default=40)
+    parser.add_argument("--egresos-por-dia", type=int, default=8)
+    args = parser.parse_args()
+
+    if args.sembrar:
+        _sembrar(args.desde, args.hasta, args.estudiantes, args.pagos_por_dia, args.egresos_por_dia)
+
+    print(f"Período {args.desde} - {args.hasta}, {args.repeticiones} repeticiones, "
+          f"{settings.REPORTES_DASHBOARD_HILOS} hilos")
+
+    # Calentamiento: conexiones del pool y caches de Postgres
+    _medir(False, args.desde, args.hasta, 1)
+
+    resultados = {}
+    for nombre, paralelo in (("serie", False), ("paralelo", True)):
+        tiempos = _medir(paralelo, args.desde, args.hasta, args.repeticiones)
+        resultados[nombre] = statistics.median(tiempos)
+        print(f"{nombre:>9}: mediana {resultados[nombre] * 1000:.1f} ms "
+              f"(min {min(tiempos) * 1000:.1f} ms, max {max(tiempos) * 1000:.1f} ms)")
+
+    if resultados["paralelo"] > 0:
+        print(f"Aceleración: {resultados['serie'] / resultados['paralelo']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
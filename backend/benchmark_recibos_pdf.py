@@ -0,0 +1,149 @@
+"""
+Micro-benchmark de generación de recibos PDF.
+
+No necesita base de datos: arma un pago (mixto) y un egreso en memoria, los
+serializa con los mismos `_datos_*` que usan los endpoints de caja y los
+renderiza sin pasar por el almacén de documentos.
+
+1. Recibos por segundo de cada formato, renderizando en este proceso.
+2. Con --hilos N: N hilos piden recibos a la vez (como N descargas
+   simultáneas) mientras otro hilo mide la latencia de un trabajo corto de
+   Python (lo que sufre un request cualquiera del mismo worker). Se compara
+   renderizar en el hilo (PDF_RENDER_PROCESOS=0) contra el pool de procesos.
+
+    python benchmark_recibos_pdf.py --repeticiones 200 --hilos 8 --procesos 2
+"""
+import argparse
+import statistics
+import threading
+import time
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+from app.api.v1.endpoints.caja import _datos_recibo_pago, _datos_recibo_egreso, _datos_recibo_movimiento
+from app.core.config import settings
+from app.models.caja import TipoMovimiento, ConceptoMovimientoCaja
+from app.models.pago import MetodoPago
+from app.services import render_pdf
+from app.services.formatos_pdf import (
+    recibo_pago, recibo_egreso, recibo_movimiento, FORMATO_RECIBO_PAGO
+)
+
+
+def _pago():
+    usuario = SimpleNamespace(nombre_completo="Laura Gómez", cedula="1020304050")
+    return SimpleNamespace(
+        id=1234,
+        fecha_pago=datetime(2026, 3, 14, 10, 30),
+        concepto="Abono curso licencia B1",
+        monto=Decimal("350000"),
+        metodo_pago=None,
+        referencia_pago="TRX-998877",
+        es_pago_mixto=True,
+        detalles_pago=[
+            SimpleNamespace(metodo_pago=MetodoPago.EFECTIVO, monto=Decimal("200000"), referencia=None),
+            SimpleNamespace(metodo_pago=MetodoPago.NEQUI, monto=Decimal("150000"), referencia="NQ-1122"),
+        ],
+        estudiante=SimpleNamespace(usuario=usuario, matricula_numero="MAT-2026-0042", saldo_pendiente=Decimal("450000")),
+        usuario=SimpleNamespace(nombre_completo="Cajero Principal"),
+    )
+
+
+def _egreso():
+    return SimpleNamespace(
+        id=567,
+        tipo=TipoMovimiento.EGRESO,
+        fecha=datetime(2026, 3, 14, 15, 0),
+        concepto="Combustible vehículo 3",
+        categoria=ConceptoMovimientoCaja.COMBUSTIBLE,
+        metodo_pago=MetodoPago.EFECTIVO.value,
+        numero_factura="FV-3321",
+        monto=Decimal("80000"),
+        tercero_nombre="Estación Central",
+        tercero_documento="900123456",
+        es_pago_mixto=0,
+        detalles_pago=[],
+        usuario=SimpleNamespace(nombre_completo="Cajero Principal"),
+    )
+
+
+def _percentil(valores, p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[max(int(len(ordenados) * p) - 1, 0)]
+
+
+def _medir(nombre: str, generar, repeticiones: int) -> None:
+    generar()  # calentamiento (carga de marca, imports perezosos)
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        generar()
+        tiempos.append(time.perf_counter() - inicio)
+    total = sum(tiempos)
+    print(f"{nombre:>11}: {repeticiones / total:7.1f} recibos/s, "
+          f"mediana {statistics.median(tiempos) * 1000:.2f} ms, "
+          f"p95 {_percentil(tiempos, 0.95) * 1000:.2f} ms")
+
+
+def _concurrente(nombre: str, datos: dict, hilos: int, repeticiones: int) -> None:
+    """Recibos/s con `hilos` descargas a la vez y latencia de un trabajo corto en paralelo"""
+    terminado = threading.Event()
+    latencias = []
+
+    def sonda():
+        while not terminado.is_set():
+            inicio = time.perf_counter()
+            sum(range(20000))  # ~0.5 ms de Python puro
+            latencias.append(time.perf_counter() - inicio)
+            time.sleep(0.005)
+
+    def descargar():
+        for _ in range(repeticiones):
+            render_pdf.renderizar_pdf(FORMATO_RECIBO_PAGO, datos)
+
+    render_pdf.iniciar_render_pdf()
+    render_pdf.renderizar_pdf(FORMATO_RECIBO_PAGO, datos)  # calentamiento
+    hilo_sonda = threading.Thread(target=sonda)
+    hilo_sonda.start()
+    inicio = time.perf_counter()
+    trabajadores = [threading.Thread(target=descargar) for _ in range(hilos)]
+    for hilo in trabajadores:
+        hilo.start()
+    for hilo in trabajadores:
+        hilo.join()
+    total = time.perf_counter() - inicio
+    terminado.set()
+    hilo_sonda.join()
+    render_pdf.detener_render_pdf()
+    print(f"{nombre:>11}: {hilos * repeticiones / total:7.1f} recibos/s, "
+          f"sonda mediana {statistics.median(latencias) * 1000:.2f} ms, "
+          f"p99 {_percentil(latencias, 0.99) * 1000:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticiones", type=int, default=200)
+    parser.add_argument("--hilos", type=int, default=0, help="descargas simultáneas (0 = solo la medición por formato)")
+    parser.add_argument("--procesos", type=int, default=2, help="procesos de render para el modo --hilos")
+    args = parser.parse_args()
+
+    pago = _pago()
+    egreso = _egreso()
+    datos_pago = _datos_recibo_pago(pago)
+    _medir("pago", lambda: recibo_pago(_datos_recibo_pago(pago)), args.repeticiones)
+    _medir("egreso", lambda: recibo_egreso(_datos_recibo_egreso(egreso)), args.repeticiones)
+    _medir("movimiento", lambda: recibo_movimiento(_datos_recibo_movimiento(egreso)), args.repeticiones)
+
+    if args.hilos > 0:
+        por_hilo = max(args.repeticiones // args.hilos, 1)
+        print(f"\n{args.hilos} descargas simultáneas de recibos de pago ({por_hilo} por hilo):")
+        settings.PDF_RENDER_PROCESOS = 0
+        _concurrente("en hilo", datos_pago, args.hilos, por_hilo)
+        settings.PDF_RENDER_PROCESOS = args.procesos
+        settings.PDF_RENDER_MAX_PENDIENTES = max(settings.PDF_RENDER_MAX_PENDIENTES, args.hilos)
+        _concurrente(f"{args.procesos} procesos", datos_pago, args.hilos, por_hilo)
+
+
+if __name__ == "__main__":
+    main()
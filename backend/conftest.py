@@ -0,0 +1,63 @@
+"""
+Fixtures de pytest para las pruebas contra la base configurada (con datos).
+
+    pytest test_presupuesto_consultas.py
+
+Sin base disponible o sin un usuario ADMIN activo las pruebas se omiten.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
+
+from app.main import app
+from app.api.deps import get_current_active_user
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metricas import presupuesto_consultas
+from app.models.usuario import Usuario, RolUsuario
+
+# Scripts manuales con nombre test_*.py: se ejecutan con python, no son pruebas de pytest
+collect_ignore = ["test_create_estudiante.py", "test_pago_mixto.py", "test_planes_reportes.py"]
+
+
+@pytest.fixture(scope="session")
+def admin() -> Usuario:
+    db = SessionLocal()
+    try:
+        usuario = db.query(Usuario).filter(
+            Usuario.rol == RolUsuario.ADMIN,
+            Usuario.is_active == True
+        ).first()
+    except OperationalError as e:
+        pytest.skip(f"Base de datos no disponible: {e.orig}")
+    finally:
+        db.close()
+    if usuario is None:
+        pytest.skip("No hay un usuario ADMIN activo para ejecutar las pruebas")
+    return usuario
+
+
+@pytest.fixture
+def client(admin, monkeypatch):
+    """TestClient autenticado como ADMIN (sin pasar por el token)"""
+    # Sin cache de reportes: un acierto no ejecuta consultas y el presupuesto no mediría nada
+    monkeypatch.setattr(settings, "REPORTES_CACHE_ENABLED", False)
+    app.dependency_overrides[get_current_active_user] = lambda: admin
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def get_con_presupuesto(client):
+    """
+    GET que falla si el endpoint ejecuta más de `maximo` consultas o responde error:
+        get_con_presupuesto("/api/v1/reportes/dashboard", 45, comparar_periodo_anterior=True)
+    """
+    def get(ruta: str, maximo: int, **params):
+        with presupuesto_consultas(maximo) as medicion:
+            respuesta = client.get(ruta, params=params)
+        assert respuesta.status_code < 400, f"{ruta}: HTTP {respuesta.status_code} {respuesta.text[:200]}"
+        return respuesta, medicion
+    return get
@@ -0,0 +1,41 @@
+"""
+Agregar a cajas los contadores de egresos por método de pago y poblarlos
+desde los movimientos (ver app.services.contadores_caja).
+
+Se puede volver a ejecutar en cualquier momento para reconciliar los
+contadores con movimientos_caja y sus detalles de pago mixto:
+    python -m migrations.add_egresos_por_metodo_cajas [--caja-id ID]
+"""
+import argparse
+
+from sqlalchemy import text
+from app.core.database import engine, SessionLocal
+from app.services.contadores_caja import COLUMNA_CONTADOR_EGRESO, reconciliar_egresos_caja
+
+
+def run_migration(caja_id=None):
+    columnas = sorted(set(COLUMNA_CONTADOR_EGRESO.values()))
+    with engine.connect() as conn:
+        conn.execute(text(
+            "ALTER TABLE cajas "
+            + ", ".join(
+                f"ADD COLUMN IF NOT EXISTS {columna} NUMERIC(12, 2) DEFAULT 0 NOT NULL"
+                for columna in columnas
+            )
+        ))
+        conn.commit()
+
+    db = SessionLocal()
+    try:
+        corregidas = reconciliar_egresos_caja(db, caja_id)
+        print(f"Contadores de egresos reconciliados: {corregidas} cajas corregidas")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconciliar contadores de egresos por método en cajas")
+    parser.add_argument("--caja-id", type=int, default=None, help="solo esta caja (por defecto todas)")
+    args = parser.parse_args()
+    run_migration(args.caja_id)
+    print("Migración add_egresos_por_metodo_cajas aplicada.")
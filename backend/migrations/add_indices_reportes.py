@@ -0,0 +1,38 @@
+"""
+Índices para los filtros por rango de fechas de reportes, caja y caja fuerte.
+
+Las consultas filtran con rangos semiabiertos sobre la columna timestamp
+(ver app/utils/fechas.py), lo que permite a Postgres usar estos índices.
+"""
+from sqlalchemy import text
+from app.core.database import engine
+
+INDICES = [
+    ("ix_pagos_estado_fecha_pago", "pagos (estado, fecha_pago)"),
+    ("ix_pagos_estado_fecha_vencimiento", "pagos (estado, fecha_vencimiento)"),
+    ("ix_pagos_caja_id", "pagos (caja_id)"),
+    ("ix_detalles_pago_pago_id", "detalles_pago (pago_id)"),
+    ("ix_cajas_fecha_apertura", "cajas (fecha_apertura)"),
+    ("ix_movimientos_caja_tipo_fecha", "movimientos_caja (tipo, fecha)"),
+    ("ix_movimientos_caja_caja_id_tipo", "movimientos_caja (caja_id, tipo)"),
+    ("ix_movimientos_caja_fecha", "movimientos_caja (fecha)"),
+    ("ix_detalles_pago_movimiento_caja_movimiento_id", "detalles_pago_movimiento_caja (movimiento_id)"),
+    ("ix_estudiantes_fecha_inscripcion", "estudiantes (fecha_inscripcion)"),
+    ("ix_movimientos_caja_fuerte_caja_fecha", "movimientos_caja_fuerte (caja_fuerte_id, fecha)"),
+]
+
+
+def run_migration():
+    with engine.connect() as conn:
+        for nombre, definicion in INDICES:
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {nombre} ON {definicion};"))
+            print(f"✓ {nombre}")
+        for tabla in ("pagos", "detalles_pago", "cajas", "movimientos_caja",
+                      "detalles_pago_movimiento_caja", "estudiantes", "movimientos_caja_fuerte"):
+            conn.execute(text(f"ANALYZE {tabla};"))
+        conn.commit()
+
+
+if __name__ == "__main__":
+    run_migration()
+    print("Migración add_indices_reportes aplicada.")
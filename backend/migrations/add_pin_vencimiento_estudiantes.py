@@ -0,0 +1,53 @@
+"""
+Agregar columna indexada pin_vencimiento a estudiantes y poblarla.
+
+El valor se deriva de datos_adicionales (o fecha_inscripcion + 90 días) con
+calcular_pin_vencimiento; en adelante lo mantiene el modelo en cada escritura.
+"""
+from sqlalchemy import text
+from app.core.database import engine, SessionLocal
+from app.models.estudiante import Estudiante, calcular_pin_vencimiento
+
+LOTE = 500
+
+
+def run_migration():
+    with engine.connect() as conn:
+        conn.execute(text("""
+            ALTER TABLE estudiantes
+            ADD COLUMN IF NOT EXISTS pin_vencimiento TIMESTAMP;
+        """))
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_estudiantes_pin_vencimiento
+            ON estudiantes (pin_vencimiento);
+        """))
+        conn.commit()
+
+    db = SessionLocal()
+    try:
+        filas = db.query(
+            Estudiante.id, Estudiante.datos_adicionales, Estudiante.fecha_inscripcion
+        ).yield_per(LOTE)
+        cambios = []
+        total = 0
+        for fila in filas:
+            cambios.append({
+                "id": fila.id,
+                "pin_vencimiento": calcular_pin_vencimiento(fila.datos_adicionales, fila.fecha_inscripcion)
+            })
+            if len(cambios) >= LOTE:
+                db.bulk_update_mappings(Estudiante, cambios)
+                total += len(cambios)
+                cambios = []
+        if cambios:
+            db.bulk_update_mappings(Estudiante, cambios)
+            total += len(cambios)
+        db.commit()
+        print(f"pin_vencimiento calculado para {total} estudiantes")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run_migration()
+    print("Migración add_pin_vencimiento_estudiantes aplicada.")
@@ -0,0 +1,77 @@
+"""
+Crear tabla referidores, agregar estudiantes.referidor_id y poblarla.
+
+Los nombres de texto libre (referido_por / telefono_referidor) se fusionan
+en una fila por referidor: primero por teléfono y, sin teléfono, por nombre
+normalizado (mayúsculas y espacios colapsados). Se procesan primero los
+estudiantes con teléfono para que los nombres sueltos se unan a esas filas.
+Se puede volver a ejecutar: solo asigna estudiantes sin referidor_id.
+"""
+from sqlalchemy import text
+from app.core.database import engine, SessionLocal
+from app.models.estudiante import Estudiante
+from app.services.referidores import obtener_o_crear_referidor
+
+LOTE = 500
+
+
+def run_migration():
+    with engine.connect() as conn:
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS referidores (
+                id SERIAL PRIMARY KEY,
+                nombre VARCHAR(255) NOT NULL,
+                nombre_normalizado VARCHAR(255) NOT NULL,
+                telefono VARCHAR(20) UNIQUE,
+                created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+                updated_at TIMESTAMP DEFAULT NOW()
+            );
+        """))
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_referidores_nombre_normalizado
+            ON referidores (nombre_normalizado);
+        """))
+        conn.execute(text("""
+            ALTER TABLE estudiantes
+            ADD COLUMN IF NOT EXISTS referidor_id INTEGER REFERENCES referidores(id);
+        """))
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_estudiantes_referidor_fecha_inscripcion
+            ON estudiantes (referidor_id, fecha_inscripcion);
+        """))
+        conn.commit()
+
+    db = SessionLocal()
+    try:
+        filas = db.query(
+            Estudiante.id, Estudiante.referido_por, Estudiante.telefono_referidor
+        ).filter(
+            Estudiante.referido_por.isnot(None),
+            Estudiante.referidor_id.is_(None)
+        ).order_by(
+            Estudiante.telefono_referidor.is_(None), Estudiante.id
+        ).all()
+
+        cambios = []
+        total = 0
+        for fila in filas:
+            referidor = obtener_o_crear_referidor(db, fila.referido_por, fila.telefono_referidor)
+            if referidor is None:
+                continue
+            cambios.append({"id": fila.id, "referidor_id": referidor.id})
+            if len(cambios) >= LOTE:
+                db.bulk_update_mappings(Estudiante, cambios)
+                total += len(cambios)
+                cambios = []
+        if cambios:
+            db.bulk_update_mappings(Estudiante, cambios)
+            total += len(cambios)
+        db.commit()
+        print(f"referidor_id asignado a {total} estudiantes")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run_migration()
+    print("Migración add_referidores aplicada.")
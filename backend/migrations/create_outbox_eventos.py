@@ -0,0 +1,39 @@
+"""
+Crear tabla outbox_eventos (trabajo externo pendiente: recibos por correo y
+facturas Factus). La escriben los endpoints en la misma transacción que el
+pago y la consume el despachador de app.services.outbox.
+"""
+from sqlalchemy import text
+from app.core.database import engine
+
+
+def run_migration():
+    with engine.connect() as conn:
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS outbox_eventos (
+                id SERIAL PRIMARY KEY,
+                tipo VARCHAR(50) NOT NULL,
+                entidad_id INTEGER NOT NULL,
+                payload JSON,
+                estado VARCHAR(20) NOT NULL DEFAULT 'PENDIENTE',
+                intentos INTEGER NOT NULL DEFAULT 0,
+                proximo_intento TIMESTAMP NOT NULL DEFAULT NOW(),
+                ultimo_error TEXT,
+                created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+                procesado_en TIMESTAMP
+            );
+        """))
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_outbox_eventos_estado_proximo_intento
+            ON outbox_eventos (estado, proximo_intento);
+        """))
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_outbox_eventos_tipo_entidad_id
+            ON outbox_eventos (tipo, entidad_id);
+        """))
+        conn.commit()
+
+
+if __name__ == "__main__":
+    run_migration()
+    print("Migración create_outbox_eventos aplicada.")
@@ -0,0 +1,45 @@
+"""
+Crear tabla resumen_financiero_diario y poblarla con el histórico.
+
+Se puede volver a ejecutar en cualquier momento para reconstruir el resumen
+desde pagos y movimientos de caja.
+"""
+from sqlalchemy import text
+from app.core.database import engine, SessionLocal
+from app.services.resumen_financiero import reconstruir_resumen
+
+
+def run_migration():
+    with engine.connect() as conn:
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS resumen_financiero_diario (
+                id SERIAL PRIMARY KEY,
+                fecha DATE NOT NULL,
+                tipo VARCHAR(20) NOT NULL,
+                origen VARCHAR(20) NOT NULL,
+                metodo_pago VARCHAR(50) NOT NULL,
+                categoria VARCHAR(50) NOT NULL,
+                monto NUMERIC(14,2) NOT NULL DEFAULT 0,
+                cantidad INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT NOW(),
+                CONSTRAINT uq_resumen_financiero_diario
+                    UNIQUE (fecha, tipo, origen, metodo_pago, categoria)
+            );
+        """))
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_resumen_financiero_diario_fecha
+            ON resumen_financiero_diario (fecha);
+        """))
+        conn.commit()
+
+    db = SessionLocal()
+    try:
+        filas = reconstruir_resumen(db)
+        print(f"Resumen financiero reconstruido: {filas} filas")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run_migration()
+    print("Migración create_resumen_financiero_diario aplicada.")
@@ -0,0 +1,111 @@
+"""
+Crear tablas de snapshots de períodos cerrados y congelar el histórico.
+
+- snapshots_caja: una fila por caja CERRADA con sus totales.
+- snapshots_mensuales / meses_congelados: flujos de cada mes terminado.
+
+En adelante cerrar_caja congela la caja y los meses que hayan terminado.
+Se puede volver a ejecutar: vuelve a congelar todo el histórico.
+"""
+from datetime import datetime
+from sqlalchemy import text, func
+from app.core.database import engine, SessionLocal
+from app.models.caja import Caja, EstadoCaja, MovimientoCaja
+from app.models.pago import Pago
+from app.services.snapshots_financieros import congelar_caja, congelar_mes, inicio_mes, siguiente_mes
+
+LOTE = 500
+
+
+def run_migration():
+    with engine.connect() as conn:
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS snapshots_caja (
+                id SERIAL PRIMARY KEY,
+                caja_id INTEGER NOT NULL UNIQUE REFERENCES cajas(id),
+                fecha_apertura TIMESTAMP NOT NULL,
+                fecha_cierre TIMESTAMP,
+                saldo_inicial NUMERIC(12,2) NOT NULL DEFAULT 0,
+                total_ingresos_efectivo NUMERIC(12,2) NOT NULL DEFAULT 0,
+                total_nequi NUMERIC(12,2) NOT NULL DEFAULT 0,
+                total_nequi_escuela NUMERIC(12,2) NOT NULL DEFAULT 0,
+                total_nequi_gerencia NUMERIC(12,2) NOT NULL DEFAULT 0,
+                total_daviplata NUMERIC(12,2) NOT NULL DEFAULT 0,
+                total_bre_b NUMERIC(12,2) NOT NULL DEFAULT 0,
+                total_transferencia_bancaria NUMERIC(12,2) NOT NULL DEFAULT 0,
+                total_tarjeta_debito NUMERIC(12,2) NOT NULL DEFAULT 0,
+                total_tarjeta_credito NUMERIC(12,2) NOT NULL DEFAULT 0,
+                total_ingresos_transferencia NUMERIC(12,2) NOT NULL DEFAULT 0,
+                total_ingresos_tarjeta NUMERIC(12,2) NOT NULL DEFAULT 0,
+                total_egresos_efectivo NUMERIC(12,2) NOT NULL DEFAULT 0,
+                total_egresos_transferencia NUMERIC(12,2) NOT NULL DEFAULT 0,
+                total_egresos_tarjeta NUMERIC(12,2) NOT NULL DEFAULT 0,
+                total_credismart NUMERIC(12,2) NOT NULL DEFAULT 0,
+                total_sistecredito NUMERIC(12,2) NOT NULL DEFAULT 0,
+                efectivo_teorico NUMERIC(12,2),
+                efectivo_fisico NUMERIC(12,2),
+                diferencia NUMERIC(12,2),
+                congelado_en TIMESTAMP NOT NULL DEFAULT NOW()
+            );
+        """))
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_snapshots_caja_fecha_apertura
+            ON snapshots_caja (fecha_apertura);
+        """))
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS snapshots_mensuales (
+                id SERIAL PRIMARY KEY,
+                mes DATE NOT NULL,
+                tipo VARCHAR(20) NOT NULL,
+                metodo_pago VARCHAR(50) NOT NULL,
+                categoria VARCHAR(50) NOT NULL,
+                monto NUMERIC(14,2) NOT NULL DEFAULT 0,
+                cantidad INTEGER NOT NULL DEFAULT 0,
+                congelado_en TIMESTAMP NOT NULL DEFAULT NOW(),
+                CONSTRAINT uq_snapshots_mensuales UNIQUE (mes, tipo, metodo_pago, categoria)
+            );
+        """))
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_snapshots_mensuales_mes
+            ON snapshots_mensuales (mes);
+        """))
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS meses_congelados (
+                mes DATE PRIMARY KEY,
+                congelado_en TIMESTAMP NOT NULL DEFAULT NOW()
+            );
+        """))
+        conn.commit()
+
+    db = SessionLocal()
+    try:
+        total_cajas = 0
+        for caja in db.query(Caja).filter(Caja.estado == EstadoCaja.CERRADA).yield_per(LOTE):
+            congelar_caja(db, caja)
+            total_cajas += 1
+        db.commit()
+        print(f"Snapshots de caja: {total_cajas}")
+
+        primeras = [
+            db.query(func.min(Pago.fecha_pago)).scalar(),
+            db.query(func.min(MovimientoCaja.fecha)).scalar(),
+        ]
+        primeras = [f for f in primeras if f]
+        hoy = datetime.utcnow().date()
+        mes_actual = inicio_mes(hoy)
+        total_meses = 0
+        if primeras:
+            mes = inicio_mes(min(primeras).date())
+            while mes < mes_actual:
+                congelar_mes(db, mes, hoy)
+                total_meses += 1
+                mes = siguiente_mes(mes)
+        db.commit()
+        print(f"Meses congelados: {total_meses}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run_migration()
+    print("Migración create_snapshots_financieros aplicada.")
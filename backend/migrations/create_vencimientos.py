@@ -0,0 +1,49 @@
+"""
+Crear tabla vencimientos (calendario unificado de vencimientos) y poblarla.
+
+Reúne en una sola tabla los documentos de vehículos, las licencias y
+certificados de instructores, los PIN SICOV, los pagos pendientes y las
+cuotas abiertas. En adelante la mantienen los eventos de app.models.vencimiento.
+Ejecutar después de add_pin_vencimiento_estudiantes. Se puede volver a
+ejecutar para reconstruir la tabla.
+"""
+from sqlalchemy import text
+from app.core.database import engine, SessionLocal
+from app.models.vencimiento import reconstruir_vencimientos
+
+
+def run_migration():
+    with engine.connect() as conn:
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS vencimientos (
+                id SERIAL PRIMARY KEY,
+                tipo_entidad VARCHAR(20) NOT NULL,
+                entidad_id INTEGER NOT NULL,
+                documento VARCHAR(30) NOT NULL,
+                fecha_vencimiento TIMESTAMP NOT NULL,
+                updated_at TIMESTAMP DEFAULT NOW(),
+                CONSTRAINT uq_vencimientos_entidad_documento
+                    UNIQUE (tipo_entidad, entidad_id, documento)
+            );
+        """))
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_vencimientos_fecha_vencimiento
+            ON vencimientos (fecha_vencimiento);
+        """))
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_vencimientos_tipo_entidad_entidad_id
+            ON vencimientos (tipo_entidad, entidad_id);
+        """))
+        conn.commit()
+
+    db = SessionLocal()
+    try:
+        filas = reconstruir_vencimientos(db)
+        print(f"Calendario de vencimientos reconstruido: {filas} filas")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run_migration()
+    print("Migración create_vencimientos aplicada.")
@@ -0,0 +1,73 @@
+"""
+Verifica que las consultas de reportes pueden usar los índices de fechas.
+
+Ejecutar contra una base con la migración add_indices_reportes aplicada:
+    python test_planes_reportes.py
+
+Con enable_seqscan desactivado el planificador elige un índice siempre que
+la condición lo permita; si el plan sigue mostrando "Seq Scan" sobre la
+tabla, el filtro no es indexable (por ejemplo, un CAST sobre la columna).
+"""
+from datetime import date, timedelta
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+from app.core.database import SessionLocal
+from app.models.caja import Caja, MovimientoCaja, TipoMovimiento
+from app.models.pago import Pago, EstadoPago
+from app.models.estudiante import Estudiante
+from app.models.caja_fuerte import MovimientoCajaFuerte
+from app.utils.fechas import filtro_fechas
+
+fin = date.today()
+inicio = fin - timedelta(days=30)
+
+
+def _consultas(db):
+    return {
+        "pagos": db.query(Pago.id).filter(
+            Pago.estado == EstadoPago.COMPLETADO,
+            *filtro_fechas(Pago.fecha_pago, inicio, fin)
+        ),
+        "movimientos_caja": db.query(MovimientoCaja.id).filter(
+            MovimientoCaja.tipo == TipoMovimiento.EGRESO,
+            *filtro_fechas(MovimientoCaja.fecha, inicio, fin)
+        ),
+        "cajas": db.query(Caja.id).filter(*filtro_fechas(Caja.fecha_apertura, inicio, fin)),
+        "estudiantes": db.query(Estudiante.id).filter(
+            *filtro_fechas(Estudiante.fecha_inscripcion, inicio, fin)
+        ),
+        "movimientos_caja_fuerte": db.query(MovimientoCajaFuerte.id).filter(
+            MovimientoCajaFuerte.caja_fuerte_id == 1,
+            *filtro_fechas(MovimientoCajaFuerte.fecha, inicio, fin)
+        ),
+    }
+
+
+def main():
+    db = SessionLocal()
+    fallas = []
+    try:
+        db.execute(text("SET enable_seqscan = off"))
+        for tabla, query in _consultas(db).items():
+            sql = query.statement.compile(
+                dialect=postgresql.dialect(),
+                compile_kwargs={"literal_binds": True}
+            )
+            plan = "\n".join(fila[0] for fila in db.execute(text(f"EXPLAIN {sql}")))
+            usa_indice = "Index" in plan and f"Seq Scan on {tabla}" not in plan
+            print(f"{'✓' if usa_indice else '✗'} {tabla}")
+            if not usa_indice:
+                print(plan)
+                fallas.append(tabla)
+    finally:
+        db.rollback()
+        db.close()
+
+    if fallas:
+        raise SystemExit(f"Consultas sin índice: {', '.join(fallas)}")
+    print("\nTodas las consultas usan índices.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Presupuesto de consultas SQL por endpoint.
+
+Cada prueba llama al endpoint con TestClient contra la base configurada (con
+datos) y falla si supera el máximo de consultas (fixtures en conftest.py):
+    pytest test_presupuesto_consultas.py
+
+Los máximos no incluyen la autenticación (el usuario se inyecta). Si un
+cambio los supera, revisar primero si volvió un N+1 antes de subirlos.
+"""
+import pytest
+
+# Endpoint -> máximo de consultas permitido
+PRESUPUESTOS = {
+    "/api/v1/reportes/alertas-operativas": 10,
+    "/api/v1/reportes/alertas-vencimientos": 10,
+    "/api/v1/reportes/cierre-financiero": 5,
+    "/api/v1/caja/historial": 30,
+}
+
+# KPIs, gráficos, ranking, resumen de conceptos y la primera página de cada
+# lista; comparar con el período anterior repite los totales de ese período
+PRESUPUESTO_DASHBOARD = 45
+PRESUPUESTO_DASHBOARD_COMPARADO = 60
+
+# Primera página: conteo + página. Siguientes (con cursor): solo la página
+PRESUPUESTO_LISTA_PRIMERA_PAGINA = 3
+PRESUPUESTO_LISTA_CON_CURSOR = 2
+
+LISTAS = ["estudiantes-registrados", "estudiantes-pagos", "egresos-caja", "otros-movimientos"]
+
+
+@pytest.mark.parametrize("ruta,maximo", PRESUPUESTOS.items())
+def test_endpoint_dentro_de_presupuesto(get_con_presupuesto, ruta, maximo):
+    get_con_presupuesto(ruta, maximo)
+
+
+@pytest.mark.parametrize("comparar,maximo", [
+    (False, PRESUPUESTO_DASHBOARD),
+    (True, PRESUPUESTO_DASHBOARD_COMPARADO),
+])
+def test_dashboard_dentro_de_presupuesto(get_con_presupuesto, comparar, maximo):
+    respuesta, _ = get_con_presupuesto(
+        "/api/v1/reportes/dashboard", maximo, comparar_periodo_anterior=comparar
+    )
+    assert set(respuesta.json()["resumen_listas"]) == {lista.replace("-", "_") for lista in LISTAS}
+
+
+@pytest.mark.parametrize("lista", LISTAS)
+def test_lista_dentro_de_presupuesto(get_con_presupuesto, lista):
+    ruta = f"/api/v1/reportes/listas/{lista}"
+    respuesta, _ = get_con_presupuesto(ruta, PRESUPUESTO_LISTA_PRIMERA_PAGINA, limite=20)
+    pagina = respuesta.json()
+    assert pagina["total"] is not None
+
+    if pagina["siguiente_cursor"]:
+        respuesta, _ = get_con_presupuesto(
+            ruta, PRESUPUESTO_LISTA_CON_CURSOR, limite=20, cursor=pagina["siguiente_cursor"]
+        )
+        assert respuesta.json()["total"] is None
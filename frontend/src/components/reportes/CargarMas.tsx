@@ -0,0 +1,23 @@
+import { ChevronDown } from 'lucide-react';
+
+interface CargarMasProps {
+  mostrados: number;
+  total: number;
+  onCargarMas?: () => void;
+  cargando?: boolean;
+}
+
+// Pie de las tablas del dashboard: pide la siguiente página de la lista
+export const CargarMas = ({ mostrados, total, onCargarMas, cargando }: CargarMasProps) => {
+  if (!onCargarMas) return null;
+
+  return (
+    <div className="tabla-cargar-mas">
+      <span>Mostrando {mostrados} de {total}</span>
+      <button className="btn-ver-detalle secondary" onClick={onCargarMas} disabled={cargando}>
+        <ChevronDown size={14} />
+        {cargando ? 'Cargando...' : 'Cargar más'}
+      </button>
+    </div>
+  );
+};
@@ -2,6 +2,7 @@ import { useState } from 'react';
 import { FileText, Download, Eye } from 'lucide-react';
 import { cajaAPI } from '../../services/api';
 import { useUIFeedback } from '../../contexts/UIFeedbackContext';
+import { CargarMas } from './CargarMas';
 
 interface PagoConcepto {
   pago_id: number;
@@ -16,12 +17,22 @@ interface PagoConcepto {
   es_pago_mixto: boolean;
 }
 
+interface ConceptoResumen {
+  concepto: string;
+  cantidad: number;
+  total: string;
+}
+
 interface TablaConceptosPagosProps {
   pagos: PagoConcepto[];
+  conceptos: ConceptoResumen[];
+  total: number;
   onExportCSV?: () => void;
+  onCargarMas?: () => void;
+  cargandoMas?: boolean;
 }
 
-export const TablaConceptosPagos = ({ pagos, onExportCSV }: TablaConceptosPagosProps) => {
+export const TablaConceptosPagos = ({ pagos, conceptos, total, onExportCSV, onCargarMas, cargandoMas }: TablaConceptosPagosProps) => {
   const { showToast } = useUIFeedback();
   const [reciboUrl, setReciboUrl] = useState<string | null>(null);
   const [reciboNombre, setReciboNombre] = useState<string>('');
@@ -123,7 +134,7 @@ export const TablaConceptosPagos = ({ pagos, onExportCSV }: TablaConceptosPagosP
           <h3>Conceptos de Pagos</h3>
         </div>
         <div style={{ display: 'flex', alignItems: 'center', gap: '8px' }}>
-          <span className="tabla-count">{pagos.length} pago{pagos.length !== 1 ? 's' : ''}</span>
+          <span className="tabla-count">{total} pago{total !== 1 ? 's' : ''}</span>
           {onExportCSV && (
             <button className="btn-ver-detalle secondary" onClick={onExportCSV}>
               <Download size={14} />
@@ -133,6 +144,30 @@ export const TablaConceptosPagos = ({ pagos, onExportCSV }: TablaConceptosPagosP
         </div>
       </div>
 
+      {/* Resumen calculado en el servidor sobre todos los pagos del período */}
+      {conceptos.length > 0 && (
+        <div className="tabla-scroll tabla-resumen-conceptos">
+          <table className="tabla-estudiantes">
+            <thead>
+              <tr>
+                <th>Concepto</th>
+                <th>Pagos</th>
+                <th>Total</th>
+              </tr>
+            </thead>
+            <tbody>
+              {conceptos.map((c) => (
+                <tr key={`concepto-${c.concepto}`}>
+                  <td className="td-concepto">{c.concepto}</td>
+                  <td>{c.cantidad}</td>
+                  <td className="td-monto td-monto-success">{formatearMoneda(c.total)}</td>
+                </tr>
+              ))}
+            </tbody>
+          </table>
+        </div>
+      )}
+
       {pagos.length === 0 ? (
         <div className="tabla-empty">
           <FileText size={48} />
@@ -195,6 +230,8 @@ export const TablaConceptosPagos = ({ pagos, onExportCSV }: TablaConceptosPagosP
         </div>
       )}
 
+      <CargarMas mostrados={pagos.length} total={total} onCargarMas={onCargarMas} cargando={cargandoMas} />
+
       {reciboUrl && (
         <div className="pdf-preview-modal">
           <div className="pdf-preview-content" onClick={(e) => e.stopPropagation()}>
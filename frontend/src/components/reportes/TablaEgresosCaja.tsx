@@ -2,6 +2,7 @@ import { useState } from 'react';
 import { FileMinus, Download, Eye } from 'lucide-react';
 import { cajaAPI } from '../../services/api';
 import { useUIFeedback } from '../../contexts/UIFeedbackContext';
+import { CargarMas } from './CargarMas';
 
 interface EgresoItem {
   egreso_id: number;
@@ -15,10 +16,13 @@ interface EgresoItem {
 
 interface TablaEgresosCajaProps {
   egresos: EgresoItem[];
+  total: number;
   onExportCSV?: () => void;
+  onCargarMas?: () => void;
+  cargandoMas?: boolean;
 }
 
-export const TablaEgresosCaja = ({ egresos, onExportCSV }: TablaEgresosCajaProps) => {
+export const TablaEgresosCaja = ({ egresos, total, onExportCSV, onCargarMas, cargandoMas }: TablaEgresosCajaProps) => {
   const { showToast } = useUIFeedback();
   const [reciboUrl, setReciboUrl] = useState<string | null>(null);
   const [reciboId, setReciboId] = useState<number | null>(null);
@@ -91,7 +95,7 @@ export const TablaEgresosCaja = ({ egresos, onExportCSV }: TablaEgresosCajaProps
           <h3>Egresos Registrados</h3>
         </div>
         <div style={{ display: 'flex', alignItems: 'center', gap: '8px' }}>
-          <span className="tabla-count">{egresos.length} egreso{egresos.length !== 1 ? 's' : ''}</span>
+          <span className="tabla-count">{total} egreso{total !== 1 ? 's' : ''}</span>
           {onExportCSV && (
             <button className="btn-ver-detalle secondary" onClick={onExportCSV}>
               <Download size={14} />
@@ -161,6 +165,8 @@ export const TablaEgresosCaja = ({ egresos, onExportCSV }: TablaEgresosCajaProps
         </div>
       )}
 
+      <CargarMas mostrados={egresos.length} total={total} onCargarMas={onCargarMas} cargando={cargandoMas} />
+
       {reciboUrl && (
         <div className="pdf-preview-modal">
           <div className="pdf-preview-content" onClick={(e) => e.stopPropagation()}>
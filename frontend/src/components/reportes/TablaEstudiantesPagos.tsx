@@ -1,4 +1,5 @@
 import { DollarSign, Download } from 'lucide-react';
+import { CargarMas } from './CargarMas';
 
 interface EstudiantePago {
   estudiante_id: number;
@@ -15,10 +16,13 @@ interface EstudiantePago {
 
 interface TablaEstudiantesPagosProps {
   pagos: EstudiantePago[];
+  total: number;
   onExportCSV?: () => void;
+  onCargarMas?: () => void;
+  cargandoMas?: boolean;
 }
 
-export const TablaEstudiantesPagos = ({ pagos, onExportCSV }: TablaEstudiantesPagosProps) => {
+export const TablaEstudiantesPagos = ({ pagos, total, onExportCSV, onCargarMas, cargandoMas }: TablaEstudiantesPagosProps) => {
   const formatearMoneda = (valor: string | null) => {
     if (!valor) return 'N/A';
     return new Intl.NumberFormat('es-CO', {
@@ -88,7 +92,7 @@ export const TablaEstudiantesPagos = ({ pagos, onExportCSV }: TablaEstudiantesPa
           <h3>Estudiantes que Realizaron Pagos</h3>
         </div>
         <div style={{ display: 'flex', alignItems: 'center', gap: '8px' }}>
-          <span className="tabla-count">{pagos.length} pago{pagos.length !== 1 ? 's' : ''}</span>
+          <span className="tabla-count">{total} pago{total !== 1 ? 's' : ''}</span>
           {onExportCSV && (
             <button className="btn-ver-detalle secondary" onClick={onExportCSV}>
               <Download size={14} />
@@ -149,6 +153,8 @@ export const TablaEstudiantesPagos = ({ pagos, onExportCSV }: TablaEstudiantesPa
           </table>
         </div>
       )}
+
+      <CargarMas mostrados={pagos.length} total={total} onCargarMas={onCargarMas} cargando={cargandoMas} />
     </div>
   );
 };
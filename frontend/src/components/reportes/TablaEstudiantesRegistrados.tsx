@@ -1,4 +1,5 @@
 import { Download, UserPlus } from 'lucide-react';
+import { CargarMas } from './CargarMas';
 
 interface EstudianteRegistrado {
   id: number;
@@ -14,10 +15,13 @@ interface EstudianteRegistrado {
 
 interface TablaEstudiantesRegistradosProps {
   estudiantes: EstudianteRegistrado[];
+  total: number;
   onExportCSV?: () => void;
+  onCargarMas?: () => void;
+  cargandoMas?: boolean;
 }
 
-export const TablaEstudiantesRegistrados = ({ estudiantes, onExportCSV }: TablaEstudiantesRegistradosProps) => {
+export const TablaEstudiantesRegistrados = ({ estudiantes, total, onExportCSV, onCargarMas, cargandoMas }: TablaEstudiantesRegistradosProps) => {
   const formatearMoneda = (valor: string | null) => {
     if (!valor) return 'N/A';
     return new Intl.NumberFormat('es-CO', {
@@ -63,7 +67,7 @@ export const TablaEstudiantesRegistrados = ({ estudiantes, onExportCSV }: TablaE
           <h3>Estudiantes Registrados</h3>
         </div>
         <div style={{ display: 'flex', alignItems: 'center', gap: '8px' }}>
-          <span className="tabla-count">{estudiantes.length} estudiante{estudiantes.length !== 1 ? 's' : ''}</span>
+          <span className="tabla-count">{total} estudiante{total !== 1 ? 's' : ''}</span>
           {onExportCSV && (
             <button className="btn-ver-detalle secondary" onClick={onExportCSV}>
               <Download size={14} />
@@ -128,6 +132,8 @@ export const TablaEstudiantesRegistrados = ({ estudiantes, onExportCSV }: TablaE
           </table>
         </div>
       )}
+
+      <CargarMas mostrados={estudiantes.length} total={total} onCargarMas={onCargarMas} cargando={cargandoMas} />
     </div>
   );
 };
@@ -2,6 +2,7 @@ import { useState } from 'react';
 import { FilePlus, Eye, Download } from 'lucide-react';
 import { cajaAPI } from '../../services/api';
 import { useUIFeedback } from '../../contexts/UIFeedbackContext';
+import { CargarMas } from './CargarMas';
 
 interface OtrosIngresoItem {
   movimiento_id: number;
@@ -18,10 +19,13 @@ interface OtrosIngresoItem {
 
 interface TablaOtrosIngresosProps {
   ingresos: OtrosIngresoItem[];
+  total: number;
   onExportCSV?: () => void;
+  onCargarMas?: () => void;
+  cargandoMas?: boolean;
 }
 
-export const TablaOtrosIngresos = ({ ingresos, onExportCSV }: TablaOtrosIngresosProps) => {
+export const TablaOtrosIngresos = ({ ingresos, total, onExportCSV, onCargarMas, cargandoMas }: TablaOtrosIngresosProps) => {
   const { showToast } = useUIFeedback();
   const [reciboUrl, setReciboUrl] = useState<string | null>(null);
   const [reciboId, setReciboId] = useState<number | null>(null);
@@ -93,7 +97,7 @@ export const TablaOtrosIngresos = ({ ingresos, onExportCSV }: TablaOtrosIngresos
           <h3>Otros ingresos</h3>
         </div>
         <div style={{ display: 'flex', alignItems: 'center', gap: '8px' }}>
-          <span className="tabla-count">{ingresos.length} ingreso{ingresos.length !== 1 ? 's' : ''}</span>
+          <span className="tabla-count">{total} ingreso{total !== 1 ? 's' : ''}</span>
           {onExportCSV && (
             <button className="btn-ver-detalle secondary" onClick={onExportCSV}>
               <Download size={14} />
@@ -167,6 +171,8 @@ export const TablaOtrosIngresos = ({ ingresos, onExportCSV }: TablaOtrosIngresos
       </div>
       )}
 
+      <CargarMas mostrados={ingresos.length} total={total} onCargarMas={onCargarMas} cargando={cargandoMas} />
+
       {reciboUrl && (
         <div className="pdf-preview-modal">
           <div className="pdf-preview-content" onClick={(e) => e.stopPropagation()}>
@@ -1,4 +1,4 @@
-import { useState } from 'react';
+import { useRef, useState } from 'react';
 import {
   BarChart3, DollarSign, Users, TrendingUp, AlertCircle,
   Calendar, CreditCard, PieChart, Download
@@ -29,8 +29,25 @@ interface DashboardData {
   lista_estudiantes_pagos: any[];
   lista_egresos_caja: any[];
   lista_otros_movimientos: any[];
+  resumen_listas?: Record<string, { total: number; siguiente_cursor?: string | null }>;
+  conceptos_pagos?: any[];
 }
 
+const construirParamsPeriodo = (fechaInicio: string, fechaFin: string) => {
+  const params: { fecha_inicio?: string; fecha_fin?: string } = {};
+  if (fechaInicio) {
+    const inicio = new Date(fechaInicio);
+    inicio.setHours(0, 0, 0, 0);
+    params.fecha_inicio = inicio.toISOString();
+  }
+  if (fechaFin) {
+    const fin = new Date(fechaFin);
+    fin.setHours(23, 59, 59, 999);
+    params.fecha_fin = fin.toISOString();
+  }
+  return params;
+};
+
 export const Reportes = () => {
   const [dashboard, setDashboard] = useState<DashboardData | null>(null);
   const [loading, setLoading] = useState(false);
@@ -45,6 +62,12 @@ export const Reportes = () => {
     comparar: false
   });
 
+  // Páginas cargadas con "Cargar más" por lista, después de la primera que trae el dashboard
+  const [paginasExtra, setPaginasExtra] = useState<Record<string, { items: any[]; siguiente_cursor: string | null }>>({});
+  const [cargandoLista, setCargandoLista] = useState<string | null>(null);
+  // Descarta páginas que llegan después de cambiar el período
+  const cargaDashboard = useRef(0);
+
   // El componente FiltrosPeriodo cargará automáticamente con "hoy"
 
   const cargarDashboard = async (fechaInicio: string, fechaFin: string, comparar: boolean) => {
@@ -52,20 +75,15 @@ export const Reportes = () => {
       setLoading(true);
       setError(null);
       setFiltrosAplicados({ fechaInicio, fechaFin, comparar });
+      cargaDashboard.current += 1;
       
-      const params: any = { comparar_periodo_anterior: comparar };
-      if (fechaInicio) {
-        const inicio = new Date(fechaInicio);
-        inicio.setHours(0, 0, 0, 0);
-        params.fecha_inicio = inicio.toISOString();
-      }
-      if (fechaFin) {
-        const fin = new Date(fechaFin);
-        fin.setHours(23, 59, 59, 999);
-        params.fecha_fin = fin.toISOString();
-      }
+      const params: any = {
+        ...construirParamsPeriodo(fechaInicio, fechaFin),
+        comparar_periodo_anterior: comparar
+      };
 
       const data = await reportesAPI.getDashboard(params);
+      setPaginasExtra({});
       setDashboard(data);
     } catch (err) {
       console.error('Error al cargar dashboard:', err);
@@ -156,9 +174,52 @@ export const Reportes = () => {
     lista_estudiantes_registrados,
     lista_estudiantes_pagos,
     lista_otros_movimientos,
-    lista_egresos_caja
+    lista_egresos_caja,
+    resumen_listas,
+    conceptos_pagos
   } = dashboard!;
 
+  // El dashboard trae solo la primera página de cada lista
+  const totalLista = (lista: string, primeraPagina: any[]) =>
+    resumen_listas?.[lista]?.total ?? (primeraPagina?.length || 0);
+
+  const itemsLista = (lista: string, primeraPagina: any[]) =>
+    [...(primeraPagina || []), ...(paginasExtra[lista]?.items || [])];
+
+  const cursorLista = (lista: string) =>
+    paginasExtra[lista] ? paginasExtra[lista].siguiente_cursor : resumen_listas?.[lista]?.siguiente_cursor ?? null;
+
+  const cargarMas = async (lista: string) => {
+    const cursor = cursorLista(lista);
+    if (!cursor) return;
+    const carga = cargaDashboard.current;
+    try {
+      setCargandoLista(lista);
+      const pagina = await reportesAPI.getLista(lista, {
+        ...construirParamsPeriodo(filtrosAplicados.fechaInicio, filtrosAplicados.fechaFin),
+        cursor
+      });
+      if (carga !== cargaDashboard.current) return;
+      setPaginasExtra((prev) => ({
+        ...prev,
+        [lista]: {
+          items: [...(prev[lista]?.items || []), ...(pagina.items || [])],
+          siguiente_cursor: pagina.siguiente_cursor ?? null
+        }
+      }));
+    } catch (err) {
+      console.error('Error al cargar más filas:', err);
+    } finally {
+      setCargandoLista(null);
+    }
+  };
+
+  const propsPaginacion = (lista: string, primeraPagina: any[]) => ({
+    total: totalLista(lista, primeraPagina),
+    onCargarMas: cursorLista(lista) ? () => cargarMas(lista) : undefined,
+    cargandoMas: cargandoLista === lista
+  });
+
   // Preparar datos para gráfico de línea (ingresos)
   const datosIngresosLinea = (grafico_ingresos?.datos || []).map((d: any) => ({
     mes: d.fecha,
@@ -197,7 +258,10 @@ export const Reportes = () => {
       return str;
     };
     const csv = rows.map((row) => row.map(escape).join(',')).join('\n');
-    const blob = new Blob(['\uFEFF', csv], { type: 'text/csv;charset=utf-8;' });
+    descargarBlob(filename, new Blob(['\uFEFF', csv], { type: 'text/csv;charset=utf-8;' }));
+  };
+
+  const descargarBlob = (filename: string, blob: Blob) => {
     const url = window.URL.createObjectURL(blob);
     const link = document.createElement('a');
     link.href = url;
@@ -213,25 +277,6 @@ export const Reportes = () => {
     return `${base}_${stamp}.csv`;
   };
 
-  const getMetodoPagoLabel = (metodo?: string | null, esMixto?: boolean) => {
-    if (esMixto) return 'MIXTO';
-    if (!metodo) return 'N/A';
-    const labels: Record<string, string> = {
-      EFECTIVO: 'Efectivo',
-      NEQUI: 'Nequi (Legado)',
-      NEQUI_ESCUELA: 'Nequi Escuela',
-      NEQUI_GERENCIA: 'Nequi Gerencia',
-      BRE_B: 'Bre-B',
-      DAVIPLATA: 'Daviplata',
-      TRANSFERENCIA_BANCARIA: 'Transferencia Bancaria',
-      TARJETA_DEBITO: 'Tarjeta Débito',
-      TARJETA_CREDITO: 'Tarjeta Crédito',
-      CREDISMART: 'CrediSmart',
-      SISTECREDITO: 'Sistecredito'
-    };
-    return labels[metodo] || metodo;
-  };
-
   const exportarCSV = () => {
     if (!dashboard) return;
     const rows: (string | number)[][] = [
@@ -282,133 +327,26 @@ export const Reportes = () => {
     );
 
     rows.push([]);
-    rows.push(['Resumen - Estudiantes Registrados', safeNumber(lista_estudiantes_registrados?.length || 0)]);
-    rows.push(['Resumen - Estudiantes con Pagos', safeNumber(lista_estudiantes_pagos?.length || 0)]);
-    rows.push(['Resumen - Egresos Registrados', safeNumber(lista_egresos_caja?.length || 0)]);
-    rows.push(['Resumen - Otros Ingresos', safeNumber(lista_otros_movimientos?.length || 0)]);
-    rows.push(['Resumen - Conceptos de Pagos', safeNumber(lista_estudiantes_pagos?.length || 0)]);
+    rows.push(['Resumen - Estudiantes Registrados', safeNumber(totalLista('estudiantes_registrados', lista_estudiantes_registrados))]);
+    rows.push(['Resumen - Estudiantes con Pagos', safeNumber(totalLista('estudiantes_pagos', lista_estudiantes_pagos))]);
+    rows.push(['Resumen - Egresos Registrados', safeNumber(totalLista('egresos_caja', lista_egresos_caja))]);
+    rows.push(['Resumen - Otros Ingresos', safeNumber(totalLista('otros_movimientos', lista_otros_movimientos))]);
+    rows.push(['Resumen - Conceptos de Pagos', safeNumber(totalLista('estudiantes_pagos', lista_estudiantes_pagos))]);
 
     downloadCSV(`reportes_${new Date().toISOString().slice(0, 10)}.csv`, rows);
   };
 
-  const exportarEstudiantesRegistradosCSV = () => {
-    const rows: (string | number)[][] = [
-      ['Estudiantes Registrados - Detallado'],
-      ['Generado', new Date().toLocaleString('es-CO')],
-      ['Período inicio', formatearPeriodoCsv(filtrosAplicados.fechaInicio)],
-      ['Período fin', formatearPeriodoCsv(filtrosAplicados.fechaFin)],
-      ['Nombre', 'Documento', 'Categoría', 'Fecha Inscripción', 'Origen', 'Referido Por', 'Valor Curso', 'Estado']
-    ];
-    (lista_estudiantes_registrados || []).forEach((est: any) => {
-      rows.push([
-        est.nombre_completo || '',
-        est.documento || '',
-        est.categoria || '',
-        formatearFechaCsv(est.fecha_inscripcion),
-        est.origen_cliente || '',
-        est.referido_por || '',
-        safeNumber(est.valor_total_curso),
-        est.estado || ''
-      ]);
-    });
-    downloadCSV(buildFilename('estudiantes_registrados_detallado'), rows);
-  };
-
-  const exportarEstudiantesPagosCSV = () => {
-    const rows: (string | number)[][] = [
-      ['Estudiantes que Realizaron Pagos - Detallado'],
-      ['Generado', new Date().toLocaleString('es-CO')],
-      ['Período inicio', formatearPeriodoCsv(filtrosAplicados.fechaInicio)],
-      ['Período fin', formatearPeriodoCsv(filtrosAplicados.fechaFin)],
-      ['Pago ID', 'Nombre', 'Documento', 'Categoría', 'Fecha Pago', 'Concepto', 'Monto', 'Método Pago', 'Saldo Pendiente', 'Pago Mixto']
-    ];
-    (lista_estudiantes_pagos || []).forEach((pago: any) => {
-      rows.push([
-        pago.pago_id || '',
-        pago.nombre_completo || '',
-        pago.documento || '',
-        pago.categoria || '',
-        formatearFechaCsv(pago.fecha_pago),
-        pago.concepto || '',
-        safeNumber(pago.monto),
-        getMetodoPagoLabel(pago.metodo_pago, pago.es_pago_mixto),
-        safeNumber(pago.saldo_pendiente),
-        pago.es_pago_mixto ? 'Sí' : 'No'
-      ]);
-    });
-    downloadCSV(buildFilename('estudiantes_pagos_detallado'), rows);
-  };
-
-  const exportarEgresosCSV = () => {
-    const rows: (string | number)[][] = [
-      ['Egresos Registrados - Detallado'],
-      ['Generado', new Date().toLocaleString('es-CO')],
-      ['Período inicio', formatearPeriodoCsv(filtrosAplicados.fechaInicio)],
-      ['Período fin', formatearPeriodoCsv(filtrosAplicados.fechaFin)],
-      ['Egreso ID', 'Fecha', 'Concepto', 'Categoría', 'Método', 'Monto', 'Usuario', 'Factura', 'Observaciones']
-    ];
-    (lista_egresos_caja || []).forEach((eg: any) => {
-      rows.push([
-        eg.egreso_id || '',
-        formatearFechaCsv(eg.fecha),
-        eg.concepto || '',
-        eg.categoria || '',
-        getMetodoPagoLabel(eg.metodo_pago, eg.metodo_pago === 'MIXTO'),
-        safeNumber(eg.monto),
-        eg.usuario || '',
-        eg.numero_factura || '',
-        eg.observaciones || ''
-      ]);
-    });
-    downloadCSV(buildFilename('egresos_registrados_detallado'), rows);
-  };
-
-  const exportarOtrosIngresosCSV = () => {
-    const rows: (string | number)[][] = [
-      ['Otros Ingresos - Detallado'],
-      ['Generado', new Date().toLocaleString('es-CO')],
-      ['Período inicio', formatearPeriodoCsv(filtrosAplicados.fechaInicio)],
-      ['Período fin', formatearPeriodoCsv(filtrosAplicados.fechaFin)],
-      ['Movimiento ID', 'Tipo', 'Fecha', 'Concepto', 'Categoría', 'Método', 'Monto', 'Tercero', 'Documento Tercero', 'Usuario']
-    ];
-    (lista_otros_movimientos || []).forEach((mov: any) => {
-      rows.push([
-        mov.movimiento_id || '',
-        mov.tipo || '',
-        formatearFechaCsv(mov.fecha),
-        mov.concepto || '',
-        mov.categoria || '',
-        getMetodoPagoLabel(mov.metodo_pago, mov.metodo_pago === 'MIXTO'),
-        safeNumber(mov.monto),
-        mov.tercero_nombre || '',
-        mov.tercero_documento || '',
-        mov.usuario || ''
-      ]);
-    });
-    downloadCSV(buildFilename('otros_ingresos_detallado'), rows);
-  };
-
-  const exportarConceptosPagosCSV = () => {
-    const rows: (string | number)[][] = [
-      ['Conceptos de Pagos - Detallado'],
-      ['Generado', new Date().toLocaleString('es-CO')],
-      ['Período inicio', formatearPeriodoCsv(filtrosAplicados.fechaInicio)],
-      ['Período fin', formatearPeriodoCsv(filtrosAplicados.fechaFin)],
-      ['Pago ID', 'Fecha', 'Concepto', 'Estudiante', 'Documento', 'Categoría', 'Método', 'Monto']
-    ];
-    (lista_estudiantes_pagos || []).forEach((pago: any) => {
-      rows.push([
-        pago.pago_id || '',
-        formatearFechaCsv(pago.fecha_pago),
-        pago.concepto || '',
-        pago.nombre_completo || '',
-        pago.documento || '',
-        pago.categoria || '',
-        getMetodoPagoLabel(pago.metodo_pago, pago.es_pago_mixto),
-        safeNumber(pago.monto)
-      ]);
-    });
-    downloadCSV(buildFilename('conceptos_pagos_detallado'), rows);
+  // Las listas completas se exportan en el servidor (CSV por streaming), no se arman en el navegador
+  const exportarLista = async (lista: string) => {
+    try {
+      const blob = await reportesAPI.exportarLista(
+        lista,
+        construirParamsPeriodo(filtrosAplicados.fechaInicio, filtrosAplicados.fechaFin)
+      );
+      descargarBlob(buildFilename(`${lista}_detallado`), blob);
+    } catch (err) {
+      console.error('Error al exportar lista:', err);
+    }
   };
 
   return (
@@ -614,24 +552,30 @@ export const Reportes = () => {
       {/* Tablas de Estudiantes */}
       <div className="tablas-estudiantes-grid">
         <TablaEstudiantesRegistrados
-          estudiantes={lista_estudiantes_registrados || []}
-          onExportCSV={exportarEstudiantesRegistradosCSV}
+          estudiantes={itemsLista('estudiantes_registrados', lista_estudiantes_registrados)}
+          {...propsPaginacion('estudiantes_registrados', lista_estudiantes_registrados)}
+          onExportCSV={() => exportarLista('estudiantes_registrados')}
         />
         <TablaEstudiantesPagos
-          pagos={lista_estudiantes_pagos || []}
-          onExportCSV={exportarEstudiantesPagosCSV}
+          pagos={itemsLista('estudiantes_pagos', lista_estudiantes_pagos)}
+          {...propsPaginacion('estudiantes_pagos', lista_estudiantes_pagos)}
+          onExportCSV={() => exportarLista('estudiantes_pagos')}
         />
         <TablaEgresosCaja
-          egresos={lista_egresos_caja || []}
-          onExportCSV={exportarEgresosCSV}
+          egresos={itemsLista('egresos_caja', lista_egresos_caja)}
+          {...propsPaginacion('egresos_caja', lista_egresos_caja)}
+          onExportCSV={() => exportarLista('egresos_caja')}
         />
         <TablaOtrosIngresos
-          ingresos={lista_otros_movimientos || []}
-          onExportCSV={exportarOtrosIngresosCSV}
+          ingresos={itemsLista('otros_movimientos', lista_otros_movimientos)}
+          {...propsPaginacion('otros_movimientos', lista_otros_movimientos)}
+          onExportCSV={() => exportarLista('otros_movimientos')}
         />
         <TablaConceptosPagos
-          pagos={lista_estudiantes_pagos || []}
-          onExportCSV={exportarConceptosPagosCSV}
+          pagos={itemsLista('estudiantes_pagos', lista_estudiantes_pagos)}
+          conceptos={conceptos_pagos || []}
+          {...propsPaginacion('estudiantes_pagos', lista_estudiantes_pagos)}
+          onExportCSV={() => exportarLista('estudiantes_pagos')}
         />
       </div>
     </div>
@@ -435,6 +435,33 @@ export const reportesAPI = {
     const response = await api.get(`/reportes/cierre-financiero${query ? `?${query}` : ''}`);
     return response.data;
   },
+  getLista: async (
+    lista: string,
+    params?: { fecha_inicio?: string; fecha_fin?: string; cursor?: string; limite?: number }
+  ): Promise<any> => {
+    const queryParams = new URLSearchParams();
+    if (params?.fecha_inicio) queryParams.append('fecha_inicio', params.fecha_inicio);
+    if (params?.fecha_fin) queryParams.append('fecha_fin', params.fecha_fin);
+    if (params?.cursor) queryParams.append('cursor', params.cursor);
+    if (params?.limite !== undefined) queryParams.append('limite', params.limite.toString());
+    const query = queryParams.toString();
+    const response = await api.get(`/reportes/listas/${lista.replace(/_/g, '-')}${query ? `?${query}` : ''}`);
+    return response.data;
+  },
+  // Lista completa del período generada en el servidor (CSV por streaming)
+  exportarLista: async (
+    lista: string,
+    params?: { fecha_inicio?: string; fecha_fin?: string; formato?: 'csv' | 'xlsx' }
+  ): Promise<Blob> => {
+    const queryParams = new URLSearchParams();
+    queryParams.append('formato', params?.formato || 'csv');
+    if (params?.fecha_inicio) queryParams.append('fecha_inicio', params.fecha_inicio);
+    if (params?.fecha_fin) queryParams.append('fecha_fin', params.fecha_fin);
+    const response = await api.get(`/reportes/exportar/${lista.replace(/_/g, '-')}?${queryParams.toString()}`, {
+      responseType: 'blob'
+    });
+    return response.data;
+  },
 };
 
 // Vehículos endpoints